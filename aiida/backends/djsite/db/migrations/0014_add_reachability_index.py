@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+from __future__ import unicode_literals
+
+from __future__ import absolute_import
+from django.db import models, migrations
+from aiida.backends.djsite.db.migrations import update_schema_version
+
+SCHEMA_VERSION = "1.0.14"
+
+# Deleting or changing links may disconnect pairs of nodes, so the index is cleared and disabled
+CREATE_CLEAR_TRIGGER = """
+    CREATE OR REPLACE FUNCTION clear_reachability() RETURNS trigger AS $$
+    BEGIN
+        DELETE FROM db_dbsetting WHERE key = 'reachability|link_id';
+        IF EXISTS (SELECT 1 FROM db_dbreachability) THEN
+            TRUNCATE db_dbreachability;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    CREATE TRIGGER clear_reachability
+    AFTER UPDATE OF input_id, output_id, type OR DELETE OR TRUNCATE ON db_dblink
+    FOR EACH STATEMENT EXECUTE PROCEDURE clear_reachability();
+"""
+
+DROP_CLEAR_TRIGGER = """
+    DROP TRIGGER IF EXISTS clear_reachability ON db_dblink;
+    DROP FUNCTION IF EXISTS clear_reachability();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('db', '0013_django_1_8'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DbReachability',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('ancestor_id', models.IntegerField()),
+                ('descendant_id', models.IntegerField(db_index=True)),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='dbreachability',
+            unique_together=set([('ancestor_id', 'descendant_id')]),
+        ),
+        migrations.RunSQL(CREATE_CLEAR_TRIGGER, reverse_sql=DROP_CLEAR_TRIGGER),
+        update_schema_version(SCHEMA_VERSION)
+    ]
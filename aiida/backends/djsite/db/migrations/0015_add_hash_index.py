@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+from __future__ import unicode_literals
+
+from __future__ import absolute_import
+from django.db import models, migrations
+from aiida.backends.djsite.db.migrations import update_schema_version
+
+SCHEMA_VERSION = "1.0.15"
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('db', '0014_add_reachability_index'),
+    ]
+
+    operations = [
+        # The partial index on the hashes of the nodes, used to find the nodes to cache from
+        migrations.RunSQL(
+            "CREATE INDEX db_dbextra_aiida_hash ON db_dbextra (tval) WHERE key = '_aiida_hash'",
+            reverse_sql="DROP INDEX IF EXISTS db_dbextra_aiida_hash"),
+        update_schema_version(SCHEMA_VERSION)
+    ]
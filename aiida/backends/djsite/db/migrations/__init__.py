@@ -10,7 +10,7 @@
 
 from __future__ import absolute_import
 
-LATEST_MIGRATION = '0013_django_1_8'
+LATEST_MIGRATION = '0015_add_hash_index'
 
 
 def _update_schema_version(version, apps, schema_editor):
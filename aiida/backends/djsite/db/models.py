@@ -275,6 +275,24 @@ class DbLink(m.Model):
             self.output.pk, )
 
 
+@python_2_unicode_compatible
+class DbReachability(m.Model):
+    """
+    The pairs of nodes such that the descendant can be reached from the ancestor by following create and input links.
+    The table is only filled when the reachability index is enabled, see :py:mod:`aiida.orm.utils.reachability`.
+    There are no foreign keys to speed up the bulk inserts: a trigger on the link table clears it when a link is
+    deleted, which is also the case when a node is deleted.
+    """
+    ancestor_id = m.IntegerField()
+    descendant_id = m.IntegerField(db_index=True)
+
+    class Meta:
+        unique_together = ('ancestor_id', 'descendant_id')
+
+    def __str__(self):
+        return "{} --> {}".format(self.ancestor_id, self.descendant_id)
+
+
 attrdatatype_choice = (
     ('float', 'float'),
     ('int', 'int'),
@@ -78,6 +78,12 @@ class DbLink(Base):
     output = relationship("DbNode", primaryjoin="DbLink.output_id == DbNode.id")
     label = Column(String(255), index=True, nullable=False)
 
+class DbReachability(Base):
+    __tablename__ = "db_dbreachability"
+    id = Column(Integer, primary_key=True)
+    ancestor_id = Column(Integer, nullable=False)
+    descendant_id = Column(Integer, nullable=False)
+
 class DbCalcState(Base):
     __tablename__ = "db_dbcalcstate"
     id = Column(Integer, primary_key=True)
@@ -65,6 +65,10 @@ class QueryBuilderImplDjango(QueryBuilderInterface):
     def Link(self):
         return dummy_model.DbLink
 
+    @property
+    def Reachability(self):
+        return dummy_model.DbReachability
+
     @property
     def Computer(self):
         return dummy_model.DbComputer
@@ -539,12 +543,14 @@ class QueryBuilderImplDjango(QueryBuilderInterface):
         with transaction.atomic():
             return query.first()
 
-    def iterall(self, query, batch_size, tag_to_index_dict):
+    def iterall(self, query, batch_size, tag_to_index_dict, raw=False):
         from django.db import transaction
 
         if not tag_to_index_dict:
             raise Exception("Got an empty dictionary: {}".format(tag_to_index_dict))
 
+        get_res = self.get_raw_res if raw else self.get_aiida_res
+
         with transaction.atomic():
             results = query.yield_per(batch_size)
 
@@ -552,16 +558,17 @@ class QueryBuilderImplDjango(QueryBuilderInterface):
                 # Sqlalchemy, for some strange reason, does not return a list of lsits
                 # if you have provided an ormclass
 
-                if list(tag_to_index_dict.values()) == ['*']:
+                # In raw mode the entities are projected as their id column
+                if list(tag_to_index_dict.values()) == ['*'] and not raw:
                     for rowitem in results:
-                        yield [self.get_aiida_res(tag_to_index_dict[0], rowitem)]
+                        yield [get_res(tag_to_index_dict[0], rowitem)]
                 else:
                     for rowitem, in results:
-                        yield [self.get_aiida_res(tag_to_index_dict[0], rowitem)]
+                        yield [get_res(tag_to_index_dict[0], rowitem)]
             elif len(tag_to_index_dict) > 1:
                 for resultrow in results:
                     yield [
-                        self.get_aiida_res(tag_to_index_dict[colindex], rowitem)
+                        get_res(tag_to_index_dict[colindex], rowitem)
                         for colindex, rowitem
                         in enumerate(resultrow)
                     ]
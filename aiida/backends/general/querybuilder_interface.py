@@ -11,6 +11,24 @@ from __future__ import absolute_import
 from abc import abstractmethod, ABCMeta
 import six
 
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+
+class explain(Executable, ClauseElement):
+    """
+    The plan of a statement, as estimated by the PostgreSQL planner without executing it.
+    """
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(explain, 'postgresql')
+def pg_explain(element, compiler, **kw):
+    return 'EXPLAIN (FORMAT JSON) ' + compiler.process(element.statement, **kw)
+
+
 @six.add_metaclass(ABCMeta)
 class QueryBuilderInterface:
     @abstractmethod
@@ -33,6 +51,13 @@ class QueryBuilderInterface:
         """
         pass
 
+    @abstractmethod
+    def Reachability(self):
+        """
+        A property, decorated with @property. Returns the implementation for the DbReachability
+        """
+        pass
+
     @abstractmethod
     def Computer(self):
         """
@@ -144,7 +169,34 @@ class QueryBuilderInterface:
         """
         pass
 
+    def get_raw_res(self, key, res):
+        """
+        Convert a result returned by the query like :meth:`get_aiida_res`,
+        but without ever instantiating an AiiDA class: ORM instances, which
+        are only returned by injected queries, are returned as their id.
+
+        :param key: the key that this entry would be returned with
+        :param res: the result returned by the query
+
+        :returns: a plain value
+        """
+        if isinstance(res, (self.Group, self.Node, self.Computer, self.User)):
+            return res.id
+        return self.get_aiida_res(key, res)
+
+    def defer_node_columns(self, query, aliases):
+        """
+        Defer the loading of the attributes and extras of the nodes projected
+        with the given aliases, for nodes that are loaded lazily. By default
+        the query is returned unchanged, for backends that do not load these
+        with the node.
 
+        :param query: the query
+        :param aliases: the aliases of the entities projected as instances
+
+        :returns: the query, with the options that defer the columns
+        """
+        return query
 
     @abstractmethod
     def yield_per(self, batch_size):
@@ -164,6 +216,21 @@ class QueryBuilderInterface:
         """
         pass
 
+    def estimate_count(self, query):
+        """
+        Estimates the number of results with the query planner of the database,
+        without executing the query. This is fast also for queries with many
+        results, but can be quite off, especially for queries with many filters.
+
+        :returns: the estimated number of results
+        """
+        try:
+            plan = self.get_session().execute(explain(query.statement.params(query._params))).scalar()
+        except Exception:
+            self.get_session().rollback()
+            raise
+        return int(plan[0]['Plan']['Plan Rows'])
+
     @abstractmethod
     def first(self):
         """
@@ -176,6 +243,9 @@ class QueryBuilderInterface:
     @abstractmethod
     def iterall(self, batch_size=100):
         """
+        :param bool raw: if True, return the raw values of the columns, see :meth:`get_raw_res`,
+            for a query built in raw mode, where the entities are projected as their id.
+
         :returns: An iterator over all the results of a list of lists.
         """
         pass
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""Adding the index on the hash of the nodes
+
+Revision ID: 3d6c8a51f2e4
+Revises: f76aed4c61c7
+Create Date: 2026-10-16 22:15:47.204518
+
+"""
+from __future__ import absolute_import
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '3d6c8a51f2e4'
+down_revision = 'f76aed4c61c7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    conn.execute("CREATE INDEX ix_db_dbnode_aiida_hash ON db_dbnode ((extras ->> '_aiida_hash'))")
+
+
+def downgrade():
+    op.drop_index('ix_db_dbnode_aiida_hash', 'db_dbnode')
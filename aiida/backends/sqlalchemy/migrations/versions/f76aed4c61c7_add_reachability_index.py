@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""Adding the reachability index table and the trigger clearing it
+
+Revision ID: f76aed4c61c7
+Revises: 59edaf8a8b79
+Create Date: 2026-10-16 21:40:12.351874
+
+"""
+from __future__ import absolute_import
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'f76aed4c61c7'
+down_revision = '59edaf8a8b79'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'db_dbreachability', sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('ancestor_id', sa.Integer(), nullable=False),
+        sa.Column('descendant_id', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id', name=u'db_dbreachability_pkey'),
+        sa.UniqueConstraint('ancestor_id', 'descendant_id', name=u'db_dbreachability_ancestor_id_descendant_id_key'))
+    op.create_index('ix_db_dbreachability_descendant_id', 'db_dbreachability', ['descendant_id'])
+
+    # Deleting or changing links may disconnect pairs of nodes, so the index is cleared and disabled
+    conn = op.get_bind()
+    conn.execute("""
+        CREATE OR REPLACE FUNCTION clear_reachability() RETURNS trigger AS $$
+        BEGIN
+            DELETE FROM db_dbsetting WHERE key = 'reachability|link_id';
+            IF EXISTS (SELECT 1 FROM db_dbreachability) THEN
+                TRUNCATE db_dbreachability;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        CREATE TRIGGER clear_reachability
+        AFTER UPDATE OF input_id, output_id, type OR DELETE OR TRUNCATE ON db_dblink
+        FOR EACH STATEMENT EXECUTE PROCEDURE clear_reachability();
+    """)
+
+
+def downgrade():
+    conn = op.get_bind()
+    conn.execute("DROP TRIGGER IF EXISTS clear_reachability ON db_dblink")
+    conn.execute("DROP FUNCTION IF EXISTS clear_reachability()")
+    conn.execute("DELETE FROM db_dbsetting WHERE key = 'reachability|link_id'")
+    op.drop_index('ix_db_dbreachability_descendant_id', 'db_dbreachability')
+    op.drop_table('db_dbreachability')
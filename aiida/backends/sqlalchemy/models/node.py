@@ -9,7 +9,7 @@
 ###########################################################################
 
 from __future__ import absolute_import
-from sqlalchemy import ForeignKey, select, func, join, and_, case
+from sqlalchemy import ForeignKey, select, func, join, and_, case, cast, event, DDL, Index
 from sqlalchemy.orm import (
     relationship, backref, Query, mapper,
     foreign, aliased
@@ -186,15 +186,13 @@ class DbNode(Base):
             thistype = thistype[:-1]  # Strip final dot
             return thistype.rpartition('.')[2]
 
-    def set_attr(self, key, value):
+    def set_attr(self, key, value, increment_version=False):
         DbNode._set_attr(self.attributes, key, value)
-        flag_modified(self, "attributes")
-        self.save()
+        self._update_json_column("attributes", values={key: value}, increment_version=increment_version)
 
-    def set_extra(self, key, value):
+    def set_extra(self, key, value, increment_version=False):
         DbNode._set_attr(self.extras, key, value)
-        flag_modified(self, "extras")
-        self.save()
+        self._update_json_column("extras", values={key: value}, increment_version=increment_version)
 
     def reset_extras(self, new_extras):
         self.extras.clear()
@@ -202,15 +200,103 @@ class DbNode(Base):
         flag_modified(self, "extras")
         self.save()
 
-    def del_attr(self, key):
+    def del_attr(self, key, increment_version=False):
         DbNode._del_attr(self.attributes, key)
-        flag_modified(self, "attributes")
-        self.save()
+        self._update_json_column("attributes", delete_key=key, increment_version=increment_version)
 
-    def del_extra(self, key):
+    def del_extra(self, key, increment_version=False):
         DbNode._del_attr(self.extras, key)
-        flag_modified(self, "extras")
-        self.save()
+        self._update_json_column("extras", delete_key=key, increment_version=increment_version)
+
+    def _update_json_column(self, name, values=None, delete_key=None, increment_version=False):
+        """
+        Write a change of some keys of a JSONB column, which has already been applied to the in-memory dictionary, and
+        commit. For a node that is in the database only the changed keys are sent, with a single UPDATE that merges
+        them into the column with the `||` operator or removes them with the `-` operator, instead of rewriting the
+        whole column.
+
+        :param name: the name of the column, either 'attributes' or 'extras'
+        :param values: a dictionary of keys to set to the given values
+        :param delete_key: a key to remove
+        :param increment_version: if True, the nodeversion is incremented in the same statement
+        """
+        if self.id is None:
+            flag_modified(self, name)
+            if increment_version:
+                self.nodeversion = (self.nodeversion or 1) + 1
+            self.save()
+            return
+
+        session = self.session
+        # Write any pending change of the row first, such that it cannot overwrite the update afterwards
+        session.flush()
+
+        column = getattr(DbNode, name)
+        expression = func.coalesce(column, cast({}, JSONB))
+        if values:
+            expression = expression.op('||')(cast(values, JSONB))
+        if delete_key is not None:
+            expression = expression.op('-')(cast(delete_key, Text))
+
+        updates = {name: expression}
+        if increment_version:
+            updates['nodeversion'] = DbNode.nodeversion + 1
+
+        session.query(DbNode).filter(DbNode.id == self.id).update(updates, synchronize_session=False)
+        session.commit()
+
+    @classmethod
+    def set_extras_many(cls, pks, extras, increment_version=False):
+        """
+        Set the same extras on many nodes with a single UPDATE statement, that merges them into the JSONB column of
+        every node, and commit.
+
+        :param pks: the primary keys of the nodes
+        :param extras: a dictionary of extras
+        :param increment_version: if True, the nodeversion of the nodes is incremented in the same statement
+        """
+        validated = {}
+        for key, value in extras.items():
+            cls._set_attr(validated, key, value)
+
+        pks = list(pks)
+        if not pks or not validated:
+            return
+
+        updates = {'extras': func.coalesce(cls.extras, cast({}, JSONB)).op('||')(cast(validated, JSONB))}
+        if increment_version:
+            updates['nodeversion'] = cls.nodeversion + 1
+
+        session = cls.session
+        session.flush()
+        session.query(cls).filter(cls.id.in_(pks)).update(updates, synchronize_session=False)
+        session.commit()
+
+    @classmethod
+    def set_extra_values_many(cls, key, values, increment_version=False):
+        """
+        Set one extra to a different value on many nodes with a single UPDATE statement, that merges it into the
+        JSONB column of every node, and commit.
+
+        :param key: the key of the extra
+        :param values: a dictionary mapping the primary key of each node to the value of its extra, that must be
+            serializable to JSON
+        :param increment_version: if True, the nodeversion of the nodes is incremented in the same statement
+        """
+        cls._set_attr({}, key, None)
+
+        if not values:
+            return
+
+        value = case({pk: cast(value, JSONB) for pk, value in values.items()}, value=cls.id)
+        updates = {'extras': func.coalesce(cls.extras, cast({}, JSONB)).op('||')(func.jsonb_build_object(key, value))}
+        if increment_version:
+            updates['nodeversion'] = cls.nodeversion + 1
+
+        session = cls.session
+        session.flush()
+        session.query(cls).filter(cls.id.in_(list(values))).update(updates, synchronize_session=False)
+        session.commit()
 
     @staticmethod
     def _set_attr(d, key, value):
@@ -344,6 +430,10 @@ class DbNode(Base):
             label('laststate')
 
 
+# The index on the hash of the nodes, used to find the nodes to cache from
+Index('ix_db_dbnode_aiida_hash', DbNode.extras['_aiida_hash'].astext)
+
+
 class DbLink(Base):
     __tablename__ = "db_dblink"
 
@@ -386,3 +476,43 @@ class DbLink(Base):
             self.output.get_simple_name(invalid_result="Unknown node"),
             self.output.pk
         )
+
+
+class DbReachability(Base):
+    """
+    The pairs of nodes such that the descendant can be reached from the ancestor by following create and input links.
+    The table is only filled when the reachability index is enabled, see :py:mod:`aiida.orm.utils.reachability`.
+    There are no foreign keys to speed up the bulk inserts: a trigger on the link table clears it when a link is
+    deleted, which is also the case when a node is deleted.
+    """
+    __tablename__ = "db_dbreachability"
+
+    id = Column(Integer, primary_key=True)
+    ancestor_id = Column(Integer, nullable=False)
+    descendant_id = Column(Integer, nullable=False, index=True)
+
+    __table_args__ = (
+        UniqueConstraint('ancestor_id', 'descendant_id'),
+    )
+
+    def __str__(self):
+        return "{} --> {}".format(self.ancestor_id, self.descendant_id)
+
+
+# The trigger is installed by the migrations, and here for the databases created from the models
+event.listen(Base.metadata, 'after_create', DDL("""
+    CREATE OR REPLACE FUNCTION clear_reachability() RETURNS trigger AS $$
+    BEGIN
+        DELETE FROM db_dbsetting WHERE key = 'reachability|link_id';
+        IF EXISTS (SELECT 1 FROM db_dbreachability) THEN
+            TRUNCATE db_dbreachability;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    DROP TRIGGER IF EXISTS clear_reachability ON db_dblink;
+    CREATE TRIGGER clear_reachability
+    AFTER UPDATE OF input_id, output_id, type OR DELETE OR TRUNCATE ON db_dblink
+    FOR EACH STATEMENT EXECUTE PROCEDURE clear_reachability();
+"""))
@@ -104,6 +104,11 @@ class QueryBuilderImplSQLA(QueryBuilderInterface):
         import aiida.backends.sqlalchemy.models.node
         return aiida.backends.sqlalchemy.models.node.DbLink
 
+    @property
+    def Reachability(self):
+        import aiida.backends.sqlalchemy.models.node
+        return aiida.backends.sqlalchemy.models.node.DbReachability
+
     @property
     def Computer(self):
         import aiida.backends.sqlalchemy.models.computer
@@ -494,6 +499,19 @@ class QueryBuilderImplSQLA(QueryBuilderInterface):
             returnval = res
         return returnval
 
+    def defer_node_columns(self, query, aliases):
+        from sqlalchemy import inspect
+        from sqlalchemy.orm import Load
+
+        options = [
+            Load(alias).defer('attributes').defer('extras')
+            for alias in aliases
+            if inspect(alias).mapper.class_ is self.Node
+        ]
+        if options:
+            return query.options(*options)
+        return query
+
     def yield_per(self, query, batch_size):
         """
         :param count: Number of rows to yield per step
@@ -531,10 +549,12 @@ class QueryBuilderImplSQLA(QueryBuilderInterface):
             self.get_session().rollback()
             raise e
 
-    def iterall(self, query, batch_size, tag_to_index_dict):
+    def iterall(self, query, batch_size, tag_to_index_dict, raw=False):
         if not tag_to_index_dict:
             raise Exception("Got an empty dictionary: {}".format(tag_to_index_dict))
 
+        get_res = self.get_raw_res if raw else self.get_aiida_res
+
         try:
             results = query.yield_per(batch_size)
 
@@ -542,16 +562,17 @@ class QueryBuilderImplSQLA(QueryBuilderInterface):
                 # Sqlalchemy, for some strange reason, does not return a list of lsits
                 # if you have provided an ormclass
 
-                if list(tag_to_index_dict.values()) == ['*']:
+                # In raw mode the entities are projected as their id column
+                if list(tag_to_index_dict.values()) == ['*'] and not raw:
                     for rowitem in results:
-                        yield [self.get_aiida_res(tag_to_index_dict[0], rowitem)]
+                        yield [get_res(tag_to_index_dict[0], rowitem)]
                 else:
                     for rowitem, in results:
-                        yield [self.get_aiida_res(tag_to_index_dict[0], rowitem)]
+                        yield [get_res(tag_to_index_dict[0], rowitem)]
             elif len(tag_to_index_dict) > 1:
                 for resultrow in results:
                     yield [
-                        self.get_aiida_res(tag_to_index_dict[colindex], rowitem)
+                        get_res(tag_to_index_dict[colindex], rowitem)
                         for colindex, rowitem
                         in enumerate(resultrow)
                     ]
@@ -199,3 +199,71 @@ class TestDbExtrasSqla(AiidaTestCase):
         self.assertEquals(n1.get_extras(), new_attrs)
         # Also check that other nodes were not damaged
         self.assertEquals(n2.get_extras(), {'pippo2': [3, 4, 'b'], '_aiida_hash': n2.get_hash()})
+
+
+class TestBatchedImport(AiidaTestCase):
+    """
+    Test the batched import of export archives.
+    """
+
+    def test_batched_import(self):
+        """
+        Nodes, attributes, links and groups should be imported across several
+        batches, and importing the same archive twice should find the nodes.
+        """
+        import os
+        import shutil
+        import tempfile
+
+        from aiida.orm import load_node
+        from aiida.orm.calculation.job import JobCalculation
+        from aiida.orm.data.base import Int
+        from aiida.orm.group import Group
+        from aiida.orm.importexport import export, import_data
+
+        temp_folder = tempfile.mkdtemp()
+        try:
+            inputs = [Int(value).store() for value in range(5)]
+
+            calc = JobCalculation()
+            calc.set_computer(self.computer)
+            calc.set_resources({"num_machines": 1, "num_mpiprocs_per_machine": 1})
+            calc.store()
+            for index, node in enumerate(inputs):
+                calc.add_link_from(node, label='input_{}'.format(index))
+
+            group = Group(name='batched_group')
+            group.store()
+            group.add_nodes(inputs)
+
+            calc_uuid = calc.uuid
+            group_uuid = group.uuid
+            values = {node.uuid: node.value for node in inputs}
+
+            filename = os.path.join(temp_folder, "export.tar.gz")
+            export([calc, group], outfile=filename, silent=True)
+
+            self.clean_db()
+            self.insert_data()
+
+            result = import_data(filename, silent=True, batch_size=2)
+            self.assertEqual(len(result['Node']['new']), 6)
+            self.assertEqual(len(result['Link']['new']), 5)
+
+            for uuid, value in values.items():
+                self.assertEqual(load_node(uuid).value, value)
+
+            imported_inputs = load_node(calc_uuid).get_inputs_dict()
+            self.assertEqual(
+                {imported_inputs['input_{}'.format(index)].uuid for index in range(5)},
+                set(values.keys()))
+
+            imported_group = Group.get(uuid=group_uuid)
+            self.assertEqual({node.uuid for node in imported_group.nodes}, set(values.keys()))
+
+            result = import_data(filename, silent=True, batch_size=2)
+            self.assertEqual(len(result['Node']['new']), 0)
+            self.assertEqual(len(result['Node']['existing']), 6)
+            self.assertNotIn('Link', result)
+        finally:
+            shutil.rmtree(temp_folder, ignore_errors=True)
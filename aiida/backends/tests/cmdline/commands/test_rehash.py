@@ -98,3 +98,39 @@ class TestVerdiRehash(AiidaTestCase):
         options = ['-e', 'aiida.data.structure']
         result = self.runner.invoke(cmd_rehash.rehash, options)
         self.assertIsNotNone(result.exception)
+
+    def test_rehash_processes(self):
+        """Computing the hashes in parallel, in chunks smaller than the number of nodes, should rehash all 5 nodes."""
+        expected_node_count = 5
+        options = ['-p', '2', '--chunk-size', '2']
+        result = self.runner.invoke(cmd_rehash.rehash, options)
+        self.assertIsNone(result.exception, result.output)
+        self.assertTrue('{} nodes'.format(expected_node_count) in result.output)
+        self.assertEqual(self.node_int.get_extra('_aiida_hash'), self.node_int.get_hash())
+
+    def test_rehash_resume(self):
+        """A checkpoint left by an interrupted run should be resumed, unless the run is restarted."""
+        from aiida.backends.utils import get_global_setting, set_global_setting
+        from aiida.orm.data.float import Float
+
+        # Pretend that the floats have been rehashed: the checkpoint of another class is not resumed
+        checkpoint = [Float._query_type_string, self.node_float.pk]
+        set_global_setting(cmd_rehash.CHECKPOINT_KEY, checkpoint)
+        self.node_int.set_extra('_aiida_hash', 'invalid')
+
+        result = self.runner.invoke(cmd_rehash.rehash, ['-e', 'aiida.data:int'])
+        self.assertIsNone(result.exception, result.output)
+        self.assertTrue('1 nodes' in result.output)
+        self.assertEqual(self.node_int.get_extra('_aiida_hash'), self.node_int.get_hash())
+
+        set_global_setting(cmd_rehash.CHECKPOINT_KEY, checkpoint)
+        result = self.runner.invoke(cmd_rehash.rehash, ['-e', 'aiida.data:float'])
+        self.assertIsNone(result.exception, result.output)
+        self.assertTrue('0 nodes' in result.output)
+        with self.assertRaises(KeyError):
+            get_global_setting(cmd_rehash.CHECKPOINT_KEY)
+
+        set_global_setting(cmd_rehash.CHECKPOINT_KEY, checkpoint)
+        result = self.runner.invoke(cmd_rehash.rehash, ['-e', 'aiida.data:float', '--restart'])
+        self.assertIsNone(result.exception, result.output)
+        self.assertTrue('1 nodes' in result.output)
@@ -67,3 +67,44 @@ class TestComputer(AiidaTestCase):
 
         with self.assertRaises(NotExistent):
             Computer.get(comp_pk)
+
+    def test_minimum_job_poll_interval(self):
+        """
+        Test the getter and setter of the minimum job poll interval of a Computer
+        """
+        from aiida.orm import Computer
+        new_comp = Computer(name='ccc',
+                            hostname='localhost',
+                            transport_type='local',
+                            scheduler_type='direct',
+                            workdir='/tmp/aiida')
+        new_comp.store()
+
+        self.assertEquals(new_comp.get_minimum_job_poll_interval(),
+                          Computer.PROPERTY_MINIMUM_SCHEDULER_POLL_INTERVAL__DEFAULT)
+
+        new_comp.set_minimum_job_poll_interval(2)
+        self.assertEquals(new_comp.get_minimum_job_poll_interval(), 2.)
+
+        with self.assertRaises(ValueError):
+            new_comp.set_minimum_job_poll_interval(-1)
+
+    def test_archive_upload(self):
+        """
+        Test the getter and setter of the archive upload flag of a Computer
+        """
+        from aiida.orm import Computer
+        new_comp = Computer(name='ddd',
+                            hostname='localhost',
+                            transport_type='local',
+                            scheduler_type='direct',
+                            workdir='/tmp/aiida')
+        new_comp.store()
+
+        self.assertFalse(new_comp.get_archive_upload())
+
+        new_comp.set_archive_upload(True)
+        self.assertTrue(new_comp.get_archive_upload())
+
+        with self.assertRaises(TypeError):
+            new_comp.set_archive_upload('yes')
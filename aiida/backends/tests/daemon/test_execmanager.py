@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""Tests for the upload of the calculation inputs as a single archive in `aiida.daemon.execmanager`."""
+from __future__ import absolute_import
+import io
+import os
+import shutil
+import tempfile
+
+from aiida.backends.testbase import AiidaTestCase
+from aiida.common.folders import SandboxFolder
+from aiida.daemon.execmanager import _batch_remote_copy, _upload_as_archive
+from aiida.transport.plugins.local import LocalTransport
+
+
+class TestArchiveUpload(AiidaTestCase):
+    """Test the archive upload and the batched remote copies, with the local transport."""
+
+    def setUp(self):
+        super(TestArchiveUpload, self).setUp()
+        from aiida.orm import Computer
+
+        self.archive_computer = Computer(
+            name='archive_upload_{}'.format(self.id().split('.')[-1]),
+            hostname='localhost',
+            transport_type='local',
+            scheduler_type='direct',
+            workdir='/tmp/aiida')
+        self.archive_computer.set_archive_upload(True)
+        self.archive_computer.store()
+
+        self.local_dir = tempfile.mkdtemp()
+        self.remote_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.local_dir)
+        shutil.rmtree(self.remote_dir)
+        super(TestArchiveUpload, self).tearDown()
+
+    def _write_file(self, path, content):
+        with io.open(path, 'w', encoding='utf8') as handle:
+            handle.write(content)
+
+    def _read_file(self, path):
+        with io.open(path, encoding='utf8') as handle:
+            return handle.read()
+
+    def test_upload_as_archive(self):
+        """
+        The folder and the local_copy_list are unpacked in the remote folder, and the archive is removed.
+        """
+        self.assertTrue(self.archive_computer.get_archive_upload())
+
+        local_file = os.path.join(self.local_dir, 'extra.dat')
+        self._write_file(local_file, u'extra')
+
+        with SandboxFolder() as folder:
+            folder.create_file_from_filelike(io.StringIO(u'input'), 'aiida.in')
+            folder.get_subfolder('pseudo', create=True).create_file_from_filelike(io.StringIO(u'pseudo'), 'Si.upf')
+
+            # A file copied to an existing folder ends up inside of it, like with `Transport.put`
+            local_copy_list = [(local_file, 'extra.dat'), (local_file, 'pseudo')]
+
+            with LocalTransport() as transport:
+                transport.chdir(self.remote_dir)
+                _upload_as_archive(transport, folder, local_copy_list)
+
+        self.assertEqual(sorted(os.listdir(self.remote_dir)), ['aiida.in', 'extra.dat', 'pseudo'])
+        self.assertEqual(sorted(os.listdir(os.path.join(self.remote_dir, 'pseudo'))), ['Si.upf', 'extra.dat'])
+        self.assertEqual(self._read_file(os.path.join(self.remote_dir, 'aiida.in')), u'input')
+        self.assertEqual(self._read_file(os.path.join(self.remote_dir, 'pseudo', 'Si.upf')), u'pseudo')
+        self.assertEqual(self._read_file(os.path.join(self.remote_dir, 'pseudo', 'extra.dat')), u'extra')
+
+    def test_batch_remote_copy(self):
+        """
+        The copies on the same machine without wildcards are done at once, the others are returned.
+        """
+        from aiida.orm.calculation.job import JobCalculation
+
+        calculation = JobCalculation(
+            computer=self.archive_computer, resources={
+                'num_machines': 1,
+                'num_mpiprocs_per_machine': 1
+            })
+        computer_uuid = self.archive_computer.uuid
+
+        source_file = os.path.join(self.local_dir, 'a.dat')
+        source_folder = os.path.join(self.local_dir, 'b')
+        os.mkdir(source_folder)
+        self._write_file(source_file, u'a')
+        self._write_file(os.path.join(source_folder, 'c.dat'), u'c')
+
+        wildcard_entry = (computer_uuid, os.path.join(self.local_dir, '*.dat'), '.')
+        other_computer_entry = (self.computer.uuid, source_file, 'other.dat')
+        remote_copy_list = [
+            (computer_uuid, source_file, 'a_copy.dat'),
+            wildcard_entry,
+            (computer_uuid, source_folder, 'b_copy'),
+            other_computer_entry,
+        ]
+
+        with LocalTransport() as transport:
+            transport.chdir(self.remote_dir)
+            remaining = _batch_remote_copy(calculation, transport, remote_copy_list)
+
+            self.assertEqual(remaining, [wildcard_entry, other_computer_entry])
+            self.assertEqual(sorted(os.listdir(self.remote_dir)), ['a_copy.dat', 'b_copy'])
+            self.assertEqual(self._read_file(os.path.join(self.remote_dir, 'a_copy.dat')), u'a')
+            self.assertEqual(self._read_file(os.path.join(self.remote_dir, 'b_copy', 'c.dat')), u'c')
+
+            with self.assertRaises(IOError):
+                _batch_remote_copy(calculation, transport,
+                                   [(computer_uuid, os.path.join(self.local_dir, 'missing'), 'missing')])
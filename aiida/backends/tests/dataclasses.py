@@ -2118,6 +2118,44 @@ Ag 0 0
             with self.assertRaises(TypeError):
                 StructureData()._parse_xyz(xyz_string)
 
+    def test_set_sites(self):
+        """
+        Test setting all the sites at once and getting their positions
+        """
+        import numpy as np
+        from aiida.orm.data.structure import StructureData, Kind
+
+        a = StructureData(cell=[[4., 0., 0.], [0., 4., 0.], [0., 0., 4.]])
+        a.append_kind(Kind(symbols='Ba', name='Ba'))
+        a.append_kind(Kind(symbols='O', name='O'))
+
+        positions = np.array([[0., 0., 0.], [2., 2., 0.], [2., 0., 2.], [0., 2., 2.]])
+        a.set_sites(positions, ['Ba', 'O', 'O', 'O'])
+
+        self.assertEquals(a.get_site_kindnames(), ['Ba', 'O', 'O', 'O'])
+        self.assertEquals(a.get_formula(), 'BaO3')
+        self.assertEquals(a.get_composition(), {'Ba': 1, 'O': 3})
+        self.assertEquals(a.sites[1].position, (2., 2., 0.))
+        self.assertTrue(np.array_equal(a.get_positions(), positions))
+
+        with self.assertRaises(ValueError):
+            a.set_sites(positions, ['Ba', 'O', 'O', 'Ti'])
+        with self.assertRaises(ValueError):
+            a.set_sites(positions, ['Ba', 'O', 'O'])
+        with self.assertRaises(ValueError):
+            a.set_sites(positions[:, :2], ['Ba', 'O', 'O', 'O'])
+
+        # Moving the sites keeps their kinds
+        a.reset_sites_positions(positions + 1.)
+        self.assertEquals(a.get_site_kindnames(), ['Ba', 'O', 'O', 'O'])
+        self.assertTrue(np.array_equal(a.get_positions(), positions + 1.))
+
+        a.store()
+        b = load_node(a.pk)
+        self.assertEquals(b.get_site_kindnames(), ['Ba', 'O', 'O', 'O'])
+        self.assertTrue(np.array_equal(b.get_positions(), positions + 1.))
+        self.assertEquals(StructureData().get_positions().shape, (0, 3))
+
 
 class TestStructureDataLock(AiidaTestCase):
     """
@@ -3067,6 +3105,39 @@ class TestArrayData(AiidaTestCase):
             if name == 'third':
                 self.assertAlmostEquals(abs(third - array).max(), 0.)
 
+    def test_mmap_and_cache(self):
+        """
+        Check the memory mapped arrays and the bounded cache of the arrays
+        """
+        from aiida.orm.data.array import ArrayData
+        import numpy
+
+        n = ArrayData()
+        first = numpy.random.rand(4, 5)
+        second = numpy.arange(10)
+        n.set_array('first', first)
+        n.set_array('second', second)
+        n.store()
+
+        n2 = load_node(n.uuid, sub_class=ArrayData)
+        mapped = n2.get_array('first', mmap=True)
+        self.assertIsInstance(mapped, numpy.memmap)
+        self.assertFalse(mapped.flags.writeable)
+        self.assertAlmostEquals(abs(first[2] - mapped[2]).max(), 0.)
+
+        # The cache keeps only the most recently used arrays that fit
+        n2.array_cache_max_bytes = first.nbytes
+        self.assertAlmostEquals(abs(first - n2.get_array('first')).max(), 0.)
+        self.assertEquals(list(n2._cached_arrays), ['first'])
+        self.assertAlmostEquals(abs(second - n2.get_array('second')).max(), 0.)
+        self.assertEquals(list(n2._cached_arrays), ['second'])
+        self.assertLessEqual(n2._cached_arrays_nbytes, n2.array_cache_max_bytes)
+
+        n2.array_cache_max_bytes = 0
+        n2.clear_internal_cache()
+        self.assertAlmostEquals(abs(first - n2.get_array('first')).max(), 0.)
+        self.assertEquals(len(n2._cached_arrays), 0)
+
 
 class TestTrajectoryData(AiidaTestCase):
     """
@@ -3472,6 +3543,71 @@ class TestTrajectoryData(AiidaTestCase):
                     if os.path.exists(file):
                         os.remove(file)
 
+    def test_append_steps(self):
+        """
+        Check that a trajectory built block by block is the same as one set
+        at once, also when its steps are read back after storing.
+        """
+        from aiida.orm.data.array.trajectory import TrajectoryData
+        import numpy
+
+        numsteps = 7
+        stepids = numpy.arange(numsteps) * 10
+        times = stepids * 0.01
+        cells = numpy.array([numpy.eye(3) * (2. + i) for i in range(numsteps)])
+        symbols = numpy.array(['H', 'O', 'C'])
+        positions = numpy.random.rand(numsteps, 3, 3)
+        velocities = numpy.random.rand(numsteps, 3, 3)
+
+        full = TrajectoryData()
+        full.set_trajectory(stepids=stepids, cells=cells, symbols=symbols,
+                            positions=positions, times=times,
+                            velocities=velocities)
+
+        n = TrajectoryData()
+        # The symbols are required with the first block
+        with self.assertRaises(ValueError):
+            n.append_steps(stepids[:3], cells[:3], positions[:3])
+
+        n.append_steps(stepids[:3], cells[:3], positions[:3], times=times[:3],
+                       velocities=velocities[:3], symbols=symbols)
+        # The times and velocities are required for all the blocks
+        with self.assertRaises(ValueError):
+            n.append_steps(stepids[3:], cells[3:], positions[3:])
+        for start, stop in ((3, 4), (4, numsteps)):
+            n.append_steps(stepids[start:stop], cells[start:stop],
+                           positions[start:stop], times=times[start:stop],
+                           velocities=velocities[start:stop])
+
+        self.assertEqual(n.numsteps, numsteps)
+        self.assertEqual(n.get_shape('positions'), positions.shape)
+        self.assertAlmostEqual(abs(positions - n.get_positions()).sum(), 0.)
+        self.assertAlmostEqual(abs(velocities - n.get_velocities()).sum(), 0.)
+        self.assertEqual(full._prepare_xsf()[0], n._prepare_xsf()[0])
+
+        # Read the steps in blocks smaller than the trajectory
+        n._steps_block_size = 2
+        self.assertEqual(full._prepare_xsf()[0], n._prepare_xsf()[0])
+        self.assertEqual(full._prepare_xsf(index=5)[0],
+                         n._prepare_xsf(index=5)[0])
+
+        # The arrays are validated at store through maps of the files
+        self.assertIsInstance(n.get_array('positions', mmap=True), numpy.memmap)
+        n.store()
+        n2 = load_node(n.pk)
+        for index in (0, 4, numsteps - 1):
+            data = n2.get_step_data(index)
+            self.assertEqual(data[0], stepids[index])
+            self.assertAlmostEqual(data[1], times[index])
+            self.assertAlmostEqual(abs(cells[index] - data[2]).sum(), 0.)
+            self.assertEqual(symbols.tolist(), data[3].tolist())
+            self.assertAlmostEqual(abs(positions[index] - data[4]).sum(), 0.)
+            self.assertAlmostEqual(abs(velocities[index] - data[5]).sum(), 0.)
+
+        with self.assertRaises(ModificationNotAllowed):
+            n.append_steps(stepids[:1], cells[:1], positions[:1],
+                           times=times[:1], velocities=velocities[:1])
+
 
 class TestKpointsData(AiidaTestCase):
     """
@@ -4290,3 +4426,156 @@ class TestBandsData(AiidaTestCase):
                 for file in files_created:
                     if os.path.exists(file):
                         os.remove(file)
+
+    @staticmethod
+    def _get_bands(bands, occupations=None):
+        """
+        Return an unstored BandsData with three kpoints and the given bands.
+        """
+        from aiida.orm.data.array.bands import BandsData
+
+        b = BandsData()
+        b.set_kpoints([[0., 0., 0.], [0.5, 0., 0.], [0.5, 0.5, 0.]])
+        b.set_bands(bands, occupations=occupations)
+        return b
+
+    def test_find_bandgap(self):
+        """
+        Check the band gap found from the occupations, the number of electrons
+        or the Fermi energy.
+        """
+        import numpy
+        from aiida.orm.data.array.bands import find_bandgap
+
+        # Two valence bands below 1 and two conduction bands above 3
+        bands = numpy.array([[-1., 0.5, 3.5, 5.],
+                             [-2., 1., 3., 4.],
+                             [-1.5, 0.8, 3.2, 4.5]])
+        occupations = numpy.array([[2., 2., 0., 0.]] * 3)
+        b = self._get_bands(bands, occupations)
+
+        for kwargs in [{}, {'number_electrons': 4}, {'fermi_energy': 2.}]:
+            is_insulator, gap = find_bandgap(b, **kwargs)
+            self.assertTrue(is_insulator)
+            self.assertAlmostEqual(gap, 2.)
+
+        # An odd number of electrons without spin polarization
+        self.assertEqual(find_bandgap(b, number_electrons=3), (False, None))
+        # The Fermi energy crosses the second band
+        self.assertEqual(find_bandgap(b, fermi_energy=0.9), (False, None))
+        with self.assertRaises(ValueError):
+            find_bandgap(b, fermi_energy=10.)
+
+        # The levels are sorted by energy before looking at the occupations
+        b = self._get_bands(bands[:, [0, 2, 1, 3]], occupations[:, [0, 2, 1, 3]])
+        is_insulator, gap = find_bandgap(b)
+        self.assertTrue(is_insulator)
+        self.assertAlmostEqual(gap, 2.)
+
+        # The last occupied level is not the same at every kpoint
+        b = self._get_bands(bands, numpy.array([[2., 2., 0., 0.], [2., 2., 0., 0.], [2., 0., 2., 0.]]))
+        self.assertEqual(find_bandgap(b), (False, None))
+
+        # Spin polarized bands, with both spins joined per kpoint
+        b = self._get_bands(numpy.array([bands, bands + 0.5]),
+                            numpy.array([[[1., 1., 0., 0.]] * 3] * 2))
+        is_insulator, gap = find_bandgap(b)
+        self.assertTrue(is_insulator)
+        self.assertAlmostEqual(gap, 1.5)
+
+    def test_find_bandgaps(self):
+        """
+        Check that the band gaps of many nodes are stored as extras that can be
+        queried for.
+        """
+        import numpy
+        from aiida.orm.data.array.bands import BandsData, find_bandgaps
+        from aiida.orm.querybuilder import QueryBuilder
+
+        bands = numpy.array([[-1., 0.5, 3.5, 5.],
+                             [-2., 1., 3., 4.],
+                             [-1.5, 0.8, 3.2, 4.5]])
+        insulator = self._get_bands(bands, numpy.array([[2., 2., 0., 0.]] * 3)).store()
+        metal = self._get_bands(bands, numpy.array([[2., 2., 0., 0.], [2., 2., 0., 0.], [2., 0., 2., 0.]])).store()
+        # Without occupations the analysis fails
+        no_occupations = self._get_bands(bands).store()
+        pks = [insulator.pk, metal.pk, no_occupations.pk]
+
+        bandgaps = find_bandgaps([insulator, metal.pk, no_occupations], chunk_size=2)
+        self.assertEqual(set(bandgaps), set(pks))
+        self.assertTrue(bandgaps[insulator.pk][0])
+        self.assertAlmostEqual(bandgaps[insulator.pk][1], 2.)
+        self.assertEqual(bandgaps[metal.pk], (False, None))
+        self.assertIsNone(bandgaps[no_occupations.pk])
+
+        self.assertTrue(load_node(insulator.pk).get_extra('is_insulator'))
+        self.assertAlmostEqual(load_node(insulator.pk).get_extra('bandgap'), 2.)
+        self.assertIsNone(load_node(metal.pk).get_extra('bandgap'))
+        self.assertIsNone(load_node(no_occupations.pk).get_extra('bandgap', None))
+
+        builder = QueryBuilder()
+        builder.append(BandsData, filters={'id': {'in': pks}, 'extras.bandgap': {'>': 1.}}, project=['id'])
+        self.assertEqual(builder.all(), [[insulator.pk]])
+
+        # The nodes can also be given by a QueryBuilder
+        builder = QueryBuilder()
+        builder.append(BandsData, filters={'id': {'in': pks}}, project=['id'])
+        self.assertEqual(find_bandgaps(builder, store=False), bandgaps)
+
+
+class TestUpfFamily(AiidaTestCase):
+    """
+    Tests the resolution of the pseudopotentials of UPF families.
+    """
+
+    def test_get_pseudos_from_structure(self):
+        """
+        Check the pseudopotentials found for the kinds of a structure, also
+        after the nodes of the family change.
+        """
+        import os
+        import shutil
+        import tempfile
+        from aiida.common.exceptions import NotExistent
+        from aiida.orm import Group
+        from aiida.orm.data.structure import StructureData
+        from aiida.orm.data.upf import UpfData, get_family_pseudos, get_pseudos_from_structure
+
+        folder = tempfile.mkdtemp()
+        try:
+            pseudos = {}
+            for element in ['Si', 'Ge', 'C']:
+                filename = os.path.join(folder, '{}.upf'.format(element))
+                with open(filename, 'w') as handle:
+                    handle.write('<UPF version="2.0.1">\n<PP_HEADER\nelement="{}"\n/>\n</UPF>\n'.format(element))
+                pseudos[element] = UpfData(file=filename).store()
+        finally:
+            shutil.rmtree(folder)
+
+        family, _ = Group.get_or_create(name='test_upf_family', type_string=UpfData.upffamily_type_string)
+        family.add_nodes([pseudos['Si'], pseudos['Ge']])
+
+        structure = StructureData(cell=((5., 0., 0.), (0., 5., 0.), (0., 0., 5.)))
+        structure.append_atom(position=(0., 0., 0.), symbols='Si', name='Si1')
+        structure.append_atom(position=(1., 1., 1.), symbols='Si', name='Si2')
+        structure.append_atom(position=(2., 2., 2.), symbols='Ge')
+
+        kind_pseudos = get_pseudos_from_structure(structure, 'test_upf_family')
+        self.assertEqual({name: pseudo.pk for name, pseudo in kind_pseudos.items()},
+                         {'Si1': pseudos['Si'].pk, 'Si2': pseudos['Si'].pk, 'Ge': pseudos['Ge'].pk})
+        self.assertIsInstance(kind_pseudos['Ge'], UpfData)
+        self.assertEqual(get_family_pseudos('test_upf_family'), {'Si': pseudos['Si'].pk, 'Ge': pseudos['Ge'].pk})
+
+        structure.append_atom(position=(3., 3., 3.), symbols='C')
+        with self.assertRaises(NotExistent):
+            get_pseudos_from_structure(structure, 'test_upf_family')
+
+        # The cached family follows the changes of the nodes of the group
+        family.add_nodes([pseudos['C']])
+        self.assertEqual(get_pseudos_from_structure(structure, 'test_upf_family')['C'].pk, pseudos['C'].pk)
+        family.remove_nodes([pseudos['C']])
+        with self.assertRaises(NotExistent):
+            get_pseudos_from_structure(structure, 'test_upf_family')
+
+        with self.assertRaises(NotExistent):
+            get_family_pseudos('nonexistent_upf_family')
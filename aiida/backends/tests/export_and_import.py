@@ -696,6 +696,61 @@ class TestSimple(AiidaTestCase):
             # Deleting the created temporary folder
             shutil.rmtree(temp_folder, ignore_errors=True)
 
+    def test_export_zip(self):
+        """
+        Test that the data.json written incrementally to a zip file contains
+        the nodes, their attributes, the links and the group members.
+        """
+        import os
+        import shutil
+        import tempfile
+
+        from aiida.orm import load_node
+        from aiida.orm.calculation.job import JobCalculation
+        from aiida.orm.data.base import Int
+        from aiida.orm.group import Group
+        from aiida.orm.importexport import export_zip
+
+        temp_folder = tempfile.mkdtemp()
+        try:
+            inputs = [Int(value).store() for value in range(3)]
+
+            jc = JobCalculation()
+            jc.set_computer(self.computer)
+            jc.set_resources({"num_machines": 1, "num_mpiprocs_per_machine": 1})
+            jc.store()
+            for index, node in enumerate(inputs):
+                jc.add_link_from(node, label='input_{}'.format(index))
+
+            group = Group(name='zip_group')
+            group.store()
+            group.add_nodes(inputs)
+
+            group_uuid = group.uuid
+            jc_uuid = jc.uuid
+            values = {node.uuid: node.value for node in inputs}
+
+            filename = os.path.join(temp_folder, "export.zip")
+            export_zip([jc, group], outfile=filename, silent=True)
+
+            self.clean_db()
+            self.insert_data()
+            import_data(filename, silent=True)
+
+            for uuid, value in values.items():
+                self.assertEquals(load_node(uuid).value, value)
+
+            imported_inputs = load_node(jc_uuid).get_inputs_dict()
+            self.assertEquals(
+                {imported_inputs['input_{}'.format(index)].uuid for index in range(3)},
+                set(values.keys()))
+
+            imported_group = Group.get(uuid=group_uuid)
+            self.assertEquals({node.uuid for node in imported_group.nodes},
+                              set(values.keys()))
+        finally:
+            shutil.rmtree(temp_folder, ignore_errors=True)
+
     def test_workfunction_1(self):
         import shutil, os, tempfile
 
@@ -1514,6 +1569,47 @@ class TestLinks(AiidaTestCase):
         finally:
             shutil.rmtree(tmp_folder, ignore_errors=True)
 
+    def test_batched_import_return_links(self):
+        """
+        Check that the batched import stores the RETURN links entering a node
+        with the same label from different workflows, and that importing the
+        archive again does not duplicate the links.
+        """
+        import os, shutil, tempfile
+
+        from aiida.orm.data.int import Int
+        from aiida.orm.importexport import export
+        from aiida.orm.calculation.work import WorkCalculation
+        from aiida.common.links import LinkType
+
+        tmp_folder = tempfile.mkdtemp()
+
+        try:
+            node_work1 = WorkCalculation().store()
+            node_work2 = WorkCalculation().store()
+            node_input = Int(1).store()
+            node_output = Int(2).store()
+
+            node_work1.add_link_from(node_input, 'input', link_type=LinkType.INPUT)
+            node_work2.add_link_from(node_input, 'input', link_type=LinkType.INPUT)
+            node_output.add_link_from(node_work1, 'result', link_type=LinkType.RETURN)
+            node_output.add_link_from(node_work2, 'result', link_type=LinkType.RETURN)
+
+            export_links = sorted(tuple(_) for _ in self.get_all_node_links())
+            export_file = os.path.join(tmp_folder, 'export.tar.gz')
+            export([node_work1, node_work2, node_input, node_output], outfile=export_file, silent=True)
+
+            self.clean_db()
+            self.insert_data()
+
+            import_data(export_file, silent=True, batch_size=1)
+            self.assertEquals(sorted(tuple(_) for _ in self.get_all_node_links()), export_links)
+
+            import_data(export_file, silent=True, batch_size=1)
+            self.assertEquals(sorted(tuple(_) for _ in self.get_all_node_links()), export_links)
+        finally:
+            shutil.rmtree(tmp_folder, ignore_errors=True)
+
     def construct_complex_graph(self, export_combination = 0):
         """
         This method creates a "complex" graph with all available link types
@@ -1686,6 +1782,65 @@ class TestLinks(AiidaTestCase):
             finally:
                 shutil.rmtree(tmp_folder, ignore_errors=True)
 
+    def get_exported_uuids(self, node, **kwargs):
+        """
+        Export a node with the given options, import it in an empty database
+        and return the uuids of the imported nodes.
+        """
+        import os, shutil, tempfile
+        from aiida.orm.importexport import export
+        from aiida.orm.querybuilder import QueryBuilder
+        from aiida.orm import Node
+
+        tmp_folder = tempfile.mkdtemp()
+        try:
+            export_file = os.path.join(tmp_folder, 'export.tar.gz')
+            export([node], outfile=export_file, silent=True, **kwargs)
+
+            self.clean_db()
+            self.insert_data()
+
+            import_data(export_file, silent=True)
+        finally:
+            shutil.rmtree(tmp_folder, ignore_errors=True)
+
+        qb = QueryBuilder()
+        qb.append(Node, project='uuid')
+        return set(str(_[0]) for _ in qb.all())
+
+    def test_export_without_create_reversed(self):
+        """
+        Without create_reversed, the creator of an exported data node is not
+        exported.
+        """
+        graph_nodes, _ = self.construct_complex_graph()
+        d3 = graph_nodes[2]
+
+        self.assertEquals(self.get_exported_uuids(d3, create_reversed=False),
+                          set([str(d3.uuid)]))
+
+    def test_export_input_forward(self):
+        """
+        With input_forward, the calculations using an exported data node, and
+        in turn their outputs, are exported.
+        """
+        graph_nodes, _ = self.construct_complex_graph()
+        d1 = graph_nodes[0]
+
+        self.assertEquals(self.get_exported_uuids(d1, input_forward=True),
+                          set(str(_.uuid) for _ in graph_nodes))
+
+    def test_export_return_reversed(self):
+        """
+        With return_reversed, the workflow returning an exported data node is
+        exported, but not the workflow calling it.
+        """
+        graph_nodes, _ = self.construct_complex_graph()
+        d1, d2, d3, d4, d5, d6, pw1, pw2, wc1, wc2 = graph_nodes
+
+        self.assertEquals(self.get_exported_uuids(d3, return_reversed=True),
+                          set(str(_.uuid) for _ in [d1, d3, d4, pw1, wc2]))
+
     def test_recursive_export_input_and_create_links_proper(self):
         """
         Check that CALL, INPUT, RETURN and CREATE links are followed
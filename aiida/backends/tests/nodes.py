@@ -20,7 +20,7 @@ from six.moves import range
 from sqlalchemy.exc import StatementError
 
 from aiida.backends.testbase import AiidaTestCase
-from aiida.common.exceptions import ModificationNotAllowed, UniquenessError
+from aiida.common.exceptions import ModificationNotAllowed, UniquenessError, ValidationError
 from aiida.common.links import LinkType
 from aiida.orm.calculation import Calculation
 from aiida.orm.data import Data
@@ -172,6 +172,28 @@ class TestNodeHashing(AiidaTestCase):
             self.assertNotEquals(a1.uuid, a2.uuid)
             self.assertFalse('_aiida_cached_from' in a2.extras())
 
+    def test_find_cached(self):
+        """
+        Tests that the nodes to cache from are found in bulk.
+        """
+        n1 = self.create_simple_node(3.0, 3.1)
+        n1.store()
+        n2 = self.create_simple_node(4.0, 4.1)
+        n2.store()
+        self.assertEqual(n1.get_extra('_aiida_hash'), n1.get_hash())
+
+        unstored = [self.create_simple_node(4.0, 4.1), self.create_simple_node(5.0), self.create_simple_node(3.0, 3.1)]
+        cache_nodes = Node.find_cached(unstored)
+        self.assertEqual([n.uuid if n is not None else None for n in cache_nodes], [n2.uuid, None, n1.uuid])
+        self.assertEqual(Node.find_cached([]), [])
+
+        self.assertEqual([n.uuid for n in unstored[0].get_all_same_nodes()], [n2.uuid])
+
+        stored = Node.store_many(unstored, use_cache=True)
+        self.assertEqual(stored[0].get_extra('_aiida_cached_from'), n2.uuid)
+        self.assertFalse('_aiida_cached_from' in stored[1].extras())
+        self.assertEqual(stored[2].get_extra('_aiida_cached_from'), n1.uuid)
+
     def test_updatable_attributes(self):
         """
         Tests that updatable attributes are ignored.
@@ -1116,6 +1138,39 @@ class TestNodeBasic(AiidaTestCase):
             del all_extras[k]
             self.assertEquals({k: v for k, v in a.iterextras()}, all_extras)
 
+    def test_set_extras_many(self):
+        """
+        Checks that the same extras can be set on many nodes at once, without
+        touching the other extras and attributes, and that the node version
+        is incremented.
+        """
+        a = Node()
+        a._set_attr('attribute', 1)
+        a.store()
+        a.set_extra('existing', 'value')
+        b = Node().store()
+        unstored = Node()
+
+        version_a = a.nodeversion
+        version_b = b.nodeversion
+
+        Node.set_extras_many([a, b], {'dict': self.dictval, 'integer': self.intval})
+
+        for node in [a, b]:
+            self.assertEquals(node.get_extra('dict'), self.dictval)
+            self.assertEquals(node.get_extra('integer'), self.intval)
+        self.assertEquals(a.get_extra('existing'), 'value')
+        self.assertEquals(a.get_attr('attribute'), 1)
+        self.assertEquals(load_node(b.pk).get_extra('integer'), self.intval)
+        self.assertEquals(a.nodeversion, version_a + 1)
+        self.assertEquals(b.nodeversion, version_b + 1)
+
+        with self.assertRaises(ModificationNotAllowed):
+            Node.set_extras_many([a, unstored], {'integer': 1})
+
+        with self.assertRaises(ValidationError):
+            Node.set_extras_many([a], {'invalid.key': 1})
+
     def test_replace_extras_1(self):
         """
         Checks the ability of replacing extras, removing the subkeys also when
@@ -1697,6 +1752,81 @@ class TestSubNodesAndLinks(AiidaTestCase):
             set([("N1", n1.uuid), ("N2", n2.uuid), ("N3", n3.uuid), ("N4",
                                                                      n4.uuid)]))
 
+    def test_store_many(self):
+        """
+        Check that a graph of unstored nodes can be stored at once, together
+        with the cached links between them and from stored nodes, in any order.
+        """
+        stored = Node().store()
+        n1 = Node()
+        n1._set_attr('value', 1)
+        n1.add_path(__file__, 'file.py')
+        n2 = Node()
+        endnode = Node()
+        outside = Node()
+
+        n2.add_link_from(n1, "N1")
+        n2.add_link_from(stored, "STORED")
+        endnode.add_link_from(n2, "N2")
+        endnode.add_link_from(n1, "N1")
+
+        # A node with an unstored parent that is not part of the batch
+        outside_child = Node()
+        outside_child.add_link_from(outside, "OUTSIDE")
+        with self.assertRaises(ModificationNotAllowed):
+            Node.store_many([n1, outside_child])
+        self.assertFalse(n1.is_stored)
+
+        ordered = Node.store_many([endnode, n2, n1, stored])
+
+        self.assertEqual(ordered, [n1, n2, endnode])
+        for node in [n1, n2, endnode]:
+            self.assertTrue(node.is_stored)
+            self.assertEqual(node.get_extra('_aiida_hash'), node.get_hash())
+
+        reloaded = load_node(n1.pk)
+        self.assertEqual(reloaded.get_attr('value'), 1)
+        self.assertEqual(reloaded.get_folder_list(), ['file.py'])
+        self.assertEqual(
+            set([(i[0], i[1].uuid)
+                 for i in load_node(n2.pk).get_inputs(only_in_db=True, also_labels=True)]),
+            set([("N1", n1.uuid), ("STORED", stored.uuid)]))
+        self.assertEqual(
+            set([(i[0], i[1].uuid)
+                 for i in load_node(endnode.pk).get_inputs(only_in_db=True, also_labels=True)]),
+            set([("N1", n1.uuid), ("N2", n2.uuid)]))
+
+    def test_store_many_cycle(self):
+        """
+        Check that store_many refuses cached links that form a cycle.
+        """
+        n1 = Node()
+        n2 = Node()
+        n2.add_link_from(n1, "N1")
+        n1.add_link_from(n2, "N2")
+
+        with self.assertRaises(ValueError):
+            Node.store_many([n1, n2])
+
+    def test_store_many_link_rules(self):
+        """
+        Check that store_many refuses cached links that could not be added to
+        the DB, before storing anything.
+        """
+        from aiida.orm.calculation.work import WorkCalculation
+
+        calc = WorkCalculation().store()
+        n1 = Node()
+        n2 = Node()
+        n2.add_link_from(n1, "N1")
+        # _replace_link_from does not check the link when it caches it
+        n2._replace_link_from(calc, "CALC", link_type=LinkType.INPUT)
+
+        with self.assertRaises(ValueError):
+            Node.store_many([n1, n2])
+        self.assertFalse(n1.is_stored)
+        self.assertFalse(n2.is_stored)
+
     def test_store_with_unstored_parents(self):
         """
         I want to check that if parents are unstored I cannot store
@@ -2386,3 +2516,44 @@ class TestNodeDeletion(AiidaTestCase):
             delete_nodes([called.pk], verbosity=2, force=True, follow_returns=True)
 
         self._check_existence(uuids_check_existence, uuids_check_deleted)
+
+
+class TestGraphTraversal(AiidaTestCase):
+    """
+    Tests for the traversal of the provenance graph inside the database
+    """
+
+    def test_traverse_graph(self):
+        from aiida.orm.calculation import Calculation
+        from aiida.orm.data import Data
+        from aiida.orm.utils.traversal import TraversalRule, traverse_graph
+
+        data_in, data_out = Data().store(), Data().store()
+        calc = Calculation().store()
+        calc.add_link_from(data_in, link_type=LinkType.INPUT)
+        data_out.add_link_from(calc, link_type=LinkType.CREATE)
+        # A loop, to check that the traversal terminates
+        calc.add_link_from(data_out, link_type=LinkType.INPUT)
+
+        self.assertEqual(traverse_graph([], [TraversalRule(LinkType.INPUT)]), set())
+        self.assertEqual(traverse_graph([data_in.pk], []), set([data_in.pk]))
+        self.assertEqual(
+            traverse_graph([data_in.pk], [TraversalRule(LinkType.INPUT), TraversalRule(LinkType.CREATE)]),
+            set([data_in.pk, calc.pk, data_out.pk]))
+        self.assertEqual(
+            traverse_graph([data_out.pk], [TraversalRule(LinkType.CREATE, forward=False)]),
+            set([data_out.pk, calc.pk]))
+
+        # The input links are only followed backwards from calculations to data
+        rules = [
+            TraversalRule(LinkType.INPUT, forward=False, source=Calculation, target=Data),
+            TraversalRule(LinkType.CREATE, source=Calculation, target=Data),
+        ]
+        self.assertEqual(traverse_graph([calc.pk], rules), set([data_in.pk, calc.pk, data_out.pk]))
+        self.assertEqual(traverse_graph([data_in.pk], rules), set([data_in.pk]))
+        self.assertEqual(
+            traverse_graph([calc.pk], [TraversalRule(LinkType.CREATE, source=Calculation, target=Calculation)]),
+            set([calc.pk]))
+
+        with self.assertRaises(TypeError):
+            TraversalRule(LinkType.INPUT.value)
@@ -436,6 +436,148 @@ class TestQueryBuilder(AiidaTestCase):
             'Calculation_1--ParameterData_1'
         ])
 
+    def test_iterrows(self):
+        """
+        The raw rows should contain the plain values of the projections, and the entities as their id.
+        """
+        from aiida.orm.querybuilder import QueryBuilder
+        from aiida.orm.data.parameter import ParameterData
+
+        nodes = [ParameterData(dict={'value': value, 'name': 'node{}'.format(value)}).store() for value in range(5)]
+        pks = [node.pk for node in nodes]
+
+        qb = QueryBuilder()
+        qb.append(ParameterData, tag='param', filters={'id': {'in': pks}},
+                  project=['*', 'uuid', 'attributes.value', 'attributes.name'])
+        qb.order_by({'param': ['id']})
+
+        self.assertEqual(qb.get_row_fields(),
+                         ['param_id', 'param_uuid', 'param_attributes_value', 'param_attributes_name'])
+
+        rows = list(qb.iterrows(batch_size=2))
+        self.assertEqual([row.param_id for row in rows], pks)
+        self.assertEqual([str(row.param_uuid) for row in rows], [node.uuid for node in nodes])
+        self.assertEqual([row.param_attributes_value for row in rows], list(range(5)))
+        self.assertEqual([row.param_attributes_name for row in rows], ['node{}'.format(value) for value in range(5)])
+
+        # The regular results are not affected by the raw mode
+        self.assertEqual([result[0].pk for result in qb.all()], pks)
+
+        batches = list(qb.iterbatches(batch_size=3))
+        self.assertEqual([len(batch['param_uuid']) for batch in batches], [3, 2])
+        self.assertEqual(batches[0]['param_attributes_value'].tolist(), [0, 1, 2])
+        self.assertEqual(batches[1]['param_attributes_name'].tolist(), ['node3', 'node4'])
+
+        # Without projections the last vertex is returned as its id
+        qb = QueryBuilder().append(ParameterData, filters={'id': {'in': pks}})
+        self.assertEqual(sorted(row[0] for row in qb.iterrows()), pks)
+
+    def test_keyset_pagination(self):
+        """
+        Paging with cursors should return the same rows as paging with offsets.
+        """
+        from aiida.common.exceptions import InputValidationError
+        from aiida.orm.querybuilder import QueryBuilder
+        from aiida.orm.data.parameter import ParameterData
+
+        nodes = [ParameterData(dict={}) for _ in range(7)]
+        for index, node in enumerate(nodes):
+            node.label = 'node{}'.format(index % 3)
+            node.store()
+        pks = [node.pk for node in nodes]
+
+        qb = QueryBuilder()
+        qb.append(ParameterData, tag='param', filters={'id': {'in': pks}}, project=['id', 'label'])
+        qb.order_by({'param': [{'label': 'desc'}, 'id']})
+        expected = [row['param']['id'] for row in qb.dict()]
+        self.assertEqual(len(expected), 7)
+
+        qb.limit(3)
+        results = []
+        page = qb.dict()
+        while page:
+            results.extend(row['param']['id'] for row in page)
+            qb.after(qb.get_cursor(page[-1]['param']))
+            page = qb.dict()
+        self.assertEqual(results, expected)
+
+        self.assertGreater(qb.after(None).count(estimate=True), 0)
+
+        # The order has to be unique
+        qb.order_by({'param': ['label']})
+        with self.assertRaises(InputValidationError):
+            qb.after(['node1']).all()
+
+    def test_lazy_nodes(self):
+        """
+        Lazy nodes should return the same attributes and extras as the regular ones, also after being modified.
+        """
+        from aiida.orm.querybuilder import QueryBuilder
+        from aiida.orm.data.parameter import ParameterData
+
+        nodes = [ParameterData(dict={'value': value}).store() for value in range(5)]
+        for node in nodes:
+            node.set_extra('double', 2 * node.get_attr('value'))
+        pks = [node.pk for node in nodes]
+
+        qb = QueryBuilder()
+        qb.append(ParameterData, filters={'id': {'in': pks}}, project=['*', 'label'])
+        qb.order_by({ParameterData: ['id']})
+
+        results = qb.all(batch_size=2, lazy=True)
+        self.assertEqual([node.pk for node, _ in results], pks)
+        self.assertEqual([label for _, label in results], [node.label for node in nodes])
+        self.assertEqual([node.get_extra('double') for node, _ in results], [0, 2, 4, 6, 8])
+        self.assertEqual([node.get_attr('value') for node, _ in results], list(range(5)))
+        self.assertEqual([node.get_dict() for node, _ in results], [node.get_dict() for node in nodes])
+
+        lazy_node = results[-1][0]
+        lazy_node.set_extra('double', 0)
+        self.assertEqual(lazy_node.get_extra('double'), 0)
+        self.assertEqual(lazy_node.folder.abspath, nodes[-1].folder.abspath)
+
+        qb = QueryBuilder().append(ParameterData, filters={'id': {'in': pks}})
+        self.assertEqual(sorted(node.pk for node, in qb.iterall(lazy=True)), pks)
+
+    def test_query_cache(self):
+        """
+        Queries with the same shape should reuse the same built query, with the values of their own filters.
+        """
+        from aiida.orm.querybuilder import QueryBuilder, _QUERY_CACHE
+        from aiida.orm.data.parameter import ParameterData
+
+        nodes = [ParameterData(dict={'value': value}) for value in range(3)]
+        for index, node in enumerate(nodes):
+            node.label = 'cached{}'.format(index)
+            node.store()
+
+        def get_query(node):
+            qb = QueryBuilder()
+            qb.append(ParameterData, filters={'label': node.label, 'attributes.value': node.get_attr('value')},
+                      project=['id'])
+            return qb
+
+        first = get_query(nodes[0])
+        self.assertEqual(first.all(), [[nodes[0].pk]])
+        for node in nodes:
+            qb = get_query(node)
+            self.assertEqual(qb.all(), [[node.pk]])
+            self.assertIs(qb.get_alias(ParameterData), first.get_alias(ParameterData))
+
+        # Changing the shape of the query should build a new one
+        qb = get_query(nodes[0])
+        cache_size = len(_QUERY_CACHE)
+        qb.add_filter(ParameterData, {'id': {'in': [node.pk for node in nodes]}})
+        self.assertEqual(qb.all(), [[nodes[0].pk]])
+        self.assertEqual(len(_QUERY_CACHE), cache_size + 1)
+
+        # Values that are not bound as parameters should be part of the shape
+        qb = QueryBuilder().append(ParameterData, filters={'attributes': {'==': {'value': 1}}}, project=['id'])
+        self.assertIn([nodes[1].pk], qb.all())
+        qb = QueryBuilder().append(ParameterData, filters={'attributes': {'==': {'value': 2}}}, project=['id'])
+        self.assertIn([nodes[2].pk], qb.all())
+        self.assertNotIn([nodes[1].pk], qb.all())
+
 
 class TestQueryHelp(AiidaTestCase):
     def test_queryhelp(self):   
@@ -921,6 +1063,78 @@ class QueryBuilderPath(AiidaTestCase):
         qb.add_filter('edge', {'depth': 6})
         self.assertTrue(set(next(zip(*qb.all()))), set([6]))
 
+    def test_reachability_index(self):
+        from aiida.orm.querybuilder import QueryBuilder
+        from aiida.orm import Node
+        from aiida.common.links import LinkType
+        from aiida.orm.utils.reachability import (
+            is_reachability_index_fresh, update_reachability_index, clear_reachability_index)
+
+        n1, n2, n3, n4, n5 = [Node().store() for _ in range(5)]
+        n2.add_link_from(n1, link_type=LinkType.INPUT)
+        n3.add_link_from(n2, link_type=LinkType.INPUT)
+        n4.add_link_from(n2, link_type=LinkType.INPUT)
+        n5.add_link_from(n3, link_type=LinkType.INPUT)
+
+        def get_descendants(node, distinct=True):
+            qb = QueryBuilder().append(
+                Node, filters={'id': node.pk}, tag='anc'
+            ).append(Node, descendant_of='anc', project='id')
+            if distinct:
+                qb.distinct()
+            return sorted(pk for pk, in qb.all())
+
+        def get_ancestor_count(node, ancestor, distinct=True):
+            qb = QueryBuilder().append(
+                Node, filters={'id': node.pk}, tag='desc'
+            ).append(Node, ancestor_of='desc', filters={'id': ancestor.pk})
+            if distinct:
+                qb.distinct()
+            return qb.count()
+
+        try:
+            self.assertFalse(is_reachability_index_fresh())
+            self.assertIsNone(update_reachability_index())
+            self.assertTrue(is_reachability_index_fresh())
+            self.assertEquals(get_descendants(n1), [n2.pk, n3.pk, n4.pk, n5.pk])
+            self.assertEquals(get_descendants(n3), [n5.pk])
+
+            # A second path between two nodes: the index is stale until it is updated,
+            # and the query returns the same rows with and without it
+            n5.add_link_from(n4, link_type=LinkType.INPUT)
+            self.assertFalse(is_reachability_index_fresh())
+            self.assertEquals(get_ancestor_count(n5, n1), 1)
+            self.assertEquals(get_ancestor_count(n5, n1, distinct=False), 2)
+            expected = get_descendants(n1, distinct=False)
+            self.assertEquals(update_reachability_index(), 1)
+            self.assertTrue(is_reachability_index_fresh())
+            self.assertEquals(get_ancestor_count(n5, n1), 1)
+            self.assertEquals(get_ancestor_count(n5, n1, distinct=False), 2)
+            self.assertEquals(get_descendants(n1, distinct=False), expected)
+            self.assertEquals(get_descendants(n4), [n5.pk])
+
+            # A query built with the fresh index is built again once a link makes the index stale
+            qb = QueryBuilder().append(
+                Node, filters={'id': n4.pk}, tag='anc'
+            ).append(Node, descendant_of='anc', project='id').distinct()
+            self.assertEquals([pk for pk, in qb.all()], [n5.pk])
+            n6 = Node().store()
+            n6.add_link_from(n5, link_type=LinkType.INPUT)
+            self.assertEquals(sorted(pk for pk, in qb.all()), [n5.pk, n6.pk])
+
+            # The paths are still found by the recursive query
+            qb = QueryBuilder().append(
+                Node, filters={'id': n1.pk}, tag='anc'
+            ).append(Node, descendant_of='anc', filters={'id': n5.pk}, edge_project='path')
+            self.assertEquals(len(qb.distinct().all()), 2)
+
+            self.assertIsNone(update_reachability_index(rebuild=True))
+            self.assertEquals(get_descendants(n1), [n2.pk, n3.pk, n4.pk, n5.pk, n6.pk])
+        finally:
+            clear_reachability_index()
+
+        self.assertFalse(is_reachability_index_fresh())
+
 
 class TestConsistency(AiidaTestCase):
     def test_create_node_and_query(self):
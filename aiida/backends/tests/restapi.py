@@ -9,6 +9,7 @@
 ###########################################################################
 from __future__ import absolute_import
 import json
+import os
 import unittest
 
 import six
@@ -414,6 +415,43 @@ class RESTApiTestSuite(RESTApiTestCase):
                                      "/computers/page/4?perpage=2&orderby=+id",
                                      expected_errormsg=expected_error)
 
+    def test_computers_list_keyset(self):
+        """
+        Full pages should link to the next page with a cursor, which returns
+        the same results as the corresponding offset.
+        """
+        computers = self.get_dummy_data()["computers"]
+        url = self._url_prefix + "/computers?limit=2&orderby=+id"
+        uuids = []
+
+        with self.app.test_client() as client:
+            while url is not None:
+                rv = client.get(url)
+                response = json.loads(rv.data)
+                uuids.extend(computer['uuid'] for computer in response["data"]["computers"])
+                if 'after=' not in url:
+                    # The first page, without a cursor, is counted exactly
+                    self.assertEqual(rv.headers['X-Total-Count'], str(len(computers)))
+
+                url = None
+                for link in rv.headers.get('Link', '').split(', '):
+                    if link.endswith('rel=next'):
+                        url = link[link.index('<') + 1:link.index('>')].replace('http://localhost', '')
+                        self.assertIn('after=', url)
+                        self.assertNotIn('X-Total-Count', client.get(url + '&count=none').headers)
+
+        self.assertEqual(uuids, [computer['uuid'] for computer in computers])
+
+    def test_computers_list_keyset_offset(self):
+        """
+        The cursor cannot be combined with an offset.
+        """
+        expected_error = "after key is incompatible with offset and with " \
+                         "requesting a specific page"
+        RESTApiTestCase.process_test(self, "computers",
+                                     "/computers?offset=2&after=WzFd&orderby=+id",
+                                     expected_errormsg=expected_error)
+
     ############### list filters ########################
     def test_computers_filter_id1(self):
         """
@@ -852,3 +890,91 @@ class RESTApiTestSuite(RESTApiTestCase):
                 available_properties = response["data"]["fields"].keys()
                 for prop in response["data"]["ordering"]:
                     self.assertIn(prop, available_properties)
+
+    ############### response cache #############
+    def test_response_cache(self):
+        """
+        Responses are sent with an ETag and served from the cache until the
+        node changes
+        """
+        from aiida.orm import load_node
+
+        app = App(__name__)
+        app.config['TESTING'] = True
+        AiidaApi(app, PREFIX=self._url_prefix,
+                 PERPAGE_DEFAULT=self._PERPAGE_DEFAULT,
+                 LIMIT_DEFAULT=self._LIMIT_DEFAULT,
+                 RESPONSE_CACHE={'type': 'memory', 'max_entries': 10})
+
+        node_uuid = self.get_dummy_data()["calculations"][1]["uuid"]
+        url = self.get_url_prefix() + '/calculations/' + str(
+            node_uuid) + '/content/extras'
+
+        with app.test_client() as client:
+            rv = client.get(url)
+            self.assertEqual(rv.status_code, 200)
+            etag = rv.headers['ETag']
+
+            # The same response comes from the cache, or is not sent at all
+            rv_cached = client.get(url)
+            self.assertEqual(rv_cached.data, rv.data)
+            self.assertEqual(rv_cached.headers['ETag'], etag)
+            rv_not_modified = client.get(url, headers={'If-None-Match': etag})
+            self.assertEqual(rv_not_modified.status_code, 304)
+
+            node = load_node(node_uuid)
+            node.set_extra('cached', True)
+            try:
+                rv_modified = client.get(url, headers={'If-None-Match': etag})
+                self.assertEqual(rv_modified.status_code, 200)
+                self.assertNotEqual(rv_modified.headers['ETag'], etag)
+                response = json.loads(rv_modified.data)
+                self.assertEqual(response["data"]["extras"], {'cached': True})
+            finally:
+                node.del_extra('cached')
+
+    def test_memory_response_cache(self):
+        """
+        The memory cache keeps the most recently used responses that fit in its size
+        """
+        from aiida.restapi.common.caching import get_response_cache
+
+        cache = get_response_cache({'type': 'memory', 'max_bytes': 10, 'max_body_bytes': 5})
+        small = (200, [('Content-Type', 'application/json')], b'1234')
+        cache.set('first', small)
+        cache.set('second', small)
+        self.assertEqual(cache.get('first'), small)
+        cache.set('third', small)
+        self.assertIsNone(cache.get('second'))
+        self.assertEqual(cache.get('first'), small)
+        self.assertEqual(cache.get('third'), small)
+
+        # A body larger than the limit is not stored
+        cache.set('large', (200, [('Content-Type', 'application/octet-stream')], b'123456'))
+        self.assertIsNone(cache.get('large'))
+        self.assertEqual(cache.get('first'), small)
+
+    def test_disk_response_cache(self):
+        """
+        The disk cache keeps the most recently written responses
+        """
+        import shutil
+        import tempfile
+        from aiida.restapi.common.caching import get_response_cache
+
+        directory = tempfile.mkdtemp()
+        try:
+            cache = get_response_cache({'type': 'disk', 'directory': directory, 'max_entries': 2})
+            value = (200, [('Content-Type', 'application/json')], b'{}')
+            cache.set('first', value)
+            self.assertEqual(cache.get('first'), value)
+            self.assertIsNone(cache.get('second'))
+
+            # Make sure that the files have different modification times
+            os.utime(os.path.join(directory, 'first'), (0, 0))
+            cache.set('second', value)
+            cache.set('third', value)
+            self.assertIsNone(cache.get('first'))
+            self.assertEqual(cache.get('third'), value)
+        finally:
+            shutil.rmtree(directory)
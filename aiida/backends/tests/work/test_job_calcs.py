@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+from __future__ import absolute_import
+import unittest
+
+import six
+from tornado.gen import coroutine, multi
+
+from aiida.backends.testbase import AiidaTestCase
+from aiida.work.job_calcs import JobManager
+from aiida.work.transports import TransportQueue
+
+
+@unittest.skipIf(six.PY3, "Broken on Python 3")
+class TestJobManager(AiidaTestCase):
+    """ Tests for the job manager """
+
+    def setUp(self, *args, **kwargs):
+        """ Set up a simple authinfo and for later use """
+        super(TestJobManager, self).setUp(*args, **kwargs)
+        self.authinfo = self.backend.authinfos.create(
+            computer=self.computer, user=self.backend.users.get_automatic_user())
+        self.authinfo.store()
+
+    def tearDown(self, *args, **kwargs):
+        self.backend.authinfos.remove(self.authinfo.id)
+        super(TestJobManager, self).tearDown(*args, **kwargs)
+
+    def test_get_jobs_list(self):
+        """ Test that the same jobs list is returned for the same authinfo """
+        job_manager = JobManager(TransportQueue())
+        self.assertIs(job_manager.get_jobs_list(self.authinfo), job_manager.get_jobs_list(self.authinfo))
+
+    def test_batched_update(self):
+        """ Test that concurrent update requests for jobs of the same authinfo result in a single scheduler query """
+        transport_queue = TransportQueue()
+        job_manager = JobManager(transport_queue)
+        loop = transport_queue.loop()
+
+        scheduler_class = self.computer.get_scheduler().__class__
+        original_get_jobs = scheduler_class.getJobs
+        calls = []
+
+        def get_jobs(scheduler, jobs=None, user=None, as_dict=False):
+            calls.append((jobs, user))
+            return {}
+
+        @coroutine
+        def update(job_id):
+            with job_manager.request_job_info_update(self.authinfo, job_id) as request:
+                job_info = yield request
+                self.assertIsNone(job_info)
+
+        try:
+            scheduler_class.getJobs = get_jobs
+            loop.run_sync(lambda: multi([update(job_id) for job_id in ['1', '2', '3']]))
+        finally:
+            scheduler_class.getJobs = original_get_jobs
+
+        self.assertEquals(len(calls), 1)
+        self.assertIsNotNone(job_manager.get_jobs_list(self.authinfo).last_updated)
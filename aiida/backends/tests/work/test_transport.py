@@ -137,3 +137,43 @@ class TestTransportQueue(AiidaTestCase):
 
         finally:
             transport_class._DEFAULT_SAFE_OPEN_INTERVAL = original_interval
+
+    def test_keep_alive(self):
+        """ Test that with a keep alive the transport is kept open and reused by a subsequent request """
+        queue = TransportQueue(keep_alive=60)
+        loop = queue.loop()
+
+        @coroutine
+        def test():
+            with queue.request_transport(self.authinfo) as request:
+                trans = yield request
+            raise Return(trans)
+
+        trans1 = loop.run_sync(lambda: test())
+        self.assertTrue(trans1.is_open)
+
+        trans2 = loop.run_sync(lambda: test())
+        self.assertIs(trans1, trans2)
+
+        queue.close()
+        self.assertFalse(trans1.is_open)
+
+    def test_keep_alive_reopen(self):
+        """ Test that a pooled transport that is no longer alive is transparently replaced by a new one """
+        queue = TransportQueue(keep_alive=60)
+        loop = queue.loop()
+
+        @coroutine
+        def test():
+            with queue.request_transport(self.authinfo) as request:
+                trans = yield request
+                self.assertTrue(trans.is_open)
+            raise Return(trans)
+
+        trans1 = loop.run_sync(lambda: test())
+        # Simulate a dropped connection
+        trans1.close()
+
+        trans2 = loop.run_sync(lambda: test())
+        self.assertIsNot(trans1, trans2)
+        queue.close()
@@ -9,6 +9,7 @@
 ###########################################################################
 
 from __future__ import absolute_import
+from contextlib import contextmanager
 
 import six
 
@@ -250,6 +251,60 @@ def delete_nodes_and_connections(pks):
     delete_nodes_backend(pks)
 
 
+@contextmanager
+def get_db_cursor(commit=False):
+    """
+    Return a DB-API cursor of the connection to the database of the current backend, for raw SQL statements.
+
+    :param commit: if True, the statements are executed in a transaction that is committed at the end
+    """
+    if settings.BACKEND == BACKEND_DJANGO:
+        from django.db import connection, transaction
+
+        if commit:
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    yield cursor
+        else:
+            with connection.cursor() as cursor:
+                yield cursor
+    elif settings.BACKEND == BACKEND_SQLA:
+        from aiida.backends.sqlalchemy import get_scoped_session
+
+        session = get_scoped_session()
+        cursor = session.connection().connection.cursor()
+        try:
+            yield cursor
+            if commit:
+                session.commit()
+        except Exception:
+            if commit:
+                session.rollback()
+            raise
+        finally:
+            cursor.close()
+    else:
+        raise Exception("unknown backend {}".format(settings.BACKEND))
+
+
+def close_db_connection():
+    """
+    Close the connections to the database of the current backend, which are reopened when they are next needed.
+
+    This must be called before forking worker processes, such that they do not share the connection of the parent.
+    """
+    if settings.BACKEND == BACKEND_DJANGO:
+        from django.db import connections
+        connections.close_all()
+    elif settings.BACKEND == BACKEND_SQLA:
+        from aiida.backends import sqlalchemy as sa
+
+        sa.get_scoped_session().close()
+        sa.engine.dispose()
+    else:
+        raise Exception("unknown backend {}".format(settings.BACKEND))
+
+
 def _get_column(colname, alias):
     """
     Return the column for a given projection. Needed by the QueryBuilder
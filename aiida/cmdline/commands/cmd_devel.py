@@ -165,6 +165,111 @@ def devel_run_daemon():
     start_daemon()
 
 
+@verdi_devel.command('repack')
+@click.option(
+    '-m',
+    '--max-size',
+    type=click.INT,
+    default=65536,
+    show_default=True,
+    help='Only pack the folders of nodes whose files are all smaller than this size in bytes.')
+@click.option(
+    '--vacuum/--no-vacuum',
+    default=True,
+    show_default=True,
+    help='Reclaim the space of pack records and deduplicated objects that are no longer used.')
+@decorators.with_dbenv()
+def devel_repack(max_size, vacuum):
+    """
+    Consolidate the small node folders of the repository into pack files.
+
+    The folders of the nodes whose files are all smaller than the maximum size are moved into append-only pack files,
+    which replaces many loose files with a few large ones. A packed folder is read directly from the packs, and only
+    extracted again when it is written to. The daemon should not be running while the repository is repacked.
+    """
+    import os
+
+    from aiida.common.folders import RepositoryFolder
+    from aiida.common.objectstore import get_object_store
+    from aiida.common.packs import get_pack_store
+    from aiida.common.utils import get_repository_folder
+    from aiida.daemon.client import DaemonClient
+
+    if DaemonClient().is_daemon_running:
+        echo.echo_critical('the daemon is running, stop it before repacking the repository')
+
+    section_folder = os.path.join(get_repository_folder('repository'), 'node')
+    count = 0
+
+    for shard_one in sorted(os.listdir(section_folder)) if os.path.isdir(section_folder) else []:
+        for shard_two in sorted(os.listdir(os.path.join(section_folder, shard_one))):
+            shard_folder = os.path.join(section_folder, shard_one, shard_two)
+            for rest in sorted(os.listdir(shard_folder)):
+                folder = RepositoryFolder('node', shard_one + shard_two + rest)
+                if _is_packable(folder.folder_limit, max_size):
+                    folder.pack()
+                    count += 1
+                    if count % 100 == 0:
+                        echo.echo('.', nl=False)
+
+    echo.echo('')
+    echo.echo_success('{} node folders packed'.format(count))
+
+    if vacuum:
+        packs_removed, pack_bytes = get_pack_store().vacuum()
+        objects_removed, object_bytes = get_object_store().clean()
+        echo.echo_success('{} packs rewritten and {} unused objects removed, {} bytes freed'.format(
+            packs_removed, objects_removed, pack_bytes + object_bytes))
+
+
+def _is_packable(abspath, max_size):
+    """
+    Return whether a node folder can be packed, i.e. it only contains regular files smaller than the maximum size.
+    """
+    import os
+
+    for dirpath, dirnames, filenames in os.walk(abspath):
+        for name in dirnames + filenames:
+            path = os.path.join(dirpath, name)
+            if os.path.islink(path) or (name in filenames and os.path.getsize(path) > max_size):
+                return False
+
+    return True
+
+
+@verdi_devel.command('reachability')
+@click.option(
+    '-r',
+    '--rebuild',
+    is_flag=True,
+    help='Rebuild the index in bulk instead of adding the links created since the last update.')
+@click.option(
+    '-c', '--clear', is_flag=True, help='Clear and disable the index, the recursive queries are then used again.')
+@decorators.with_dbenv()
+def devel_reachability(rebuild, clear):
+    """
+    Update the reachability index of the provenance graph.
+
+    When the index is fresh, the descendant_of and ancestor_of relationships of the QueryBuilder are resolved through
+    it instead of with recursive queries. The first update enables the index. It is not updated when links are
+    created, so it should be updated again after running calculations or importing archives. Large imports are added
+    by rebuilding the index in bulk.
+    """
+    from aiida.orm.utils.reachability import update_reachability_index, clear_reachability_index
+
+    if clear:
+        clear_reachability_index()
+        echo.echo_success('reachability index cleared')
+        return
+
+    count = update_reachability_index(rebuild=rebuild)
+
+    if count is None:
+        echo.echo_success('reachability index rebuilt')
+    else:
+        echo.echo_success('{} links added to the reachability index'.format(count))
+
+
 @verdi_devel.command('tests')
 @click.argument('paths', nargs=-1, type=TestModuleParamType(), required=False)
 @options.VERBOSE(help='Print the class and function name for each test.')
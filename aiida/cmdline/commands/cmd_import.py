@@ -25,8 +25,14 @@ from aiida.cmdline.utils import decorators, echo
     cls=MultipleValueOption,
     help="Discover all URL targets pointing to files with the .aiida extension for these HTTP addresses. "
     "Automatically discovered archive URLs will be downloadeded and added to ARCHIVES for importing")
+@click.option(
+    '-b',
+    '--batch-size',
+    type=click.INT,
+    default=None,
+    help='Import the archives in batches of this many nodes, which keeps the memory bounded for large archives.')
 @decorators.with_dbenv()
-def cmd_import(archives, webpages):
+def cmd_import(archives, webpages, batch_size):
     """Import one or multiple exported AiiDA archives
 
     The ARCHIVES can be specified by their relative or absolute file path, or their HTTP URL.
@@ -37,6 +43,7 @@ def cmd_import(archives, webpages):
 
     from aiida.common.folders import SandboxFolder
     from aiida.orm.importexport import get_valid_import_links, import_data
+    from aiida.orm.utils.reachability import is_reachability_index_enabled, update_reachability_index
 
     archives_url = []
     archives_file = []
@@ -66,7 +73,7 @@ def cmd_import(archives, webpages):
     for archive in archives_file:
         try:
             echo.echo_info('importing archive {}'.format(archive))
-            import_data(archive)
+            import_data(archive, batch_size=batch_size)
         except Exception:
             echo.echo_error('an exception occurred while importing the archive {}'.format(archive))
             echo.echo(traceback.format_exc())
@@ -84,7 +91,7 @@ def cmd_import(archives, webpages):
                 temp_file = 'importfile.tar.gz'
                 temp_folder.create_file_from_filelike(response, temp_file)
                 echo.echo_success('archive downloaded, proceeding with import')
-                import_data(temp_folder.get_abs_path(temp_file))
+                import_data(temp_folder.get_abs_path(temp_file), batch_size=batch_size)
 
         except Exception:
             echo.echo_error('an exception occurred while importing the archive {}'.format(archive))
@@ -92,3 +99,8 @@ def cmd_import(archives, webpages):
             click.confirm('do you want to continue?', abort=True)
         else:
             echo.echo_success('imported archive {}'.format(archive))
+
+    if is_reachability_index_enabled():
+        echo.echo_info('updating the reachability index')
+        update_reachability_index()
+        echo.echo_success('reachability index updated')
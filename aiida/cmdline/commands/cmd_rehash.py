@@ -16,6 +16,49 @@ from aiida.cmdline.params import arguments
 from aiida.cmdline.params.types.plugin import PluginParamType
 from aiida.cmdline.utils import decorators, echo
 
+# Global setting storing the entry point and the last pk of an interrupted run, such that it can be resumed
+CHECKPOINT_KEY = 'rehash|checkpoint'
+
+
+def _compute_hashes(pks):
+    """
+    Load the nodes with the given pks and compute their hashes.
+
+    This is a module level function, such that it can be sent to the worker processes of a pool.
+
+    :param pks: a list of node pks
+    :return: a list of tuples (pk, hash)
+    """
+    from aiida.orm.querybuilder import QueryBuilder
+    from aiida.orm.node import Node
+
+    builder = QueryBuilder()
+    builder.append(Node, filters={'id': {'in': pks}}, project=['*'])
+    return [(node.pk, node.get_hash()) for node, in builder.iterall()]
+
+
+def _iter_pk_chunks(entry_point, last_pk, chunk_size):
+    """
+    Yield the pks of the nodes of the given class, in chunks of increasing pks larger than `last_pk`.
+
+    Every chunk is fetched with its own query, filtering on the last pk of the previous one, such that the pks are
+    never all loaded in memory and the nodes created in the meantime do not shift the chunks.
+    """
+    from aiida.orm.querybuilder import QueryBuilder
+
+    while True:
+        builder = QueryBuilder()
+        builder.append(entry_point, tag='node', filters={'id': {'>': last_pk}}, project=['id'])
+        builder.order_by({'node': ['id']})
+        builder.limit(chunk_size)
+        pks = [pk for pk, in builder.iterall()]
+
+        if not pks:
+            return
+
+        last_pk = pks[-1]
+        yield pks
+
 
 @verdi.command('rehash')
 @arguments.NODES()
@@ -25,33 +68,105 @@ from aiida.cmdline.utils import decorators, echo
     type=PluginParamType(group=('node', 'calculations', 'data'), load=True),
     default='node',
     help='Only include nodes that are class or sub class of the class identified by this entry point.')
+@click.option(
+    '-p',
+    '--processes',
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help='Number of processes computing the hashes in parallel.')
+@click.option(
+    '--chunk-size',
+    type=click.IntRange(min=1),
+    default=1000,
+    show_default=True,
+    help='Number of nodes loaded, hashed and written at once.')
+@click.option(
+    '--restart',
+    is_flag=True,
+    help='Ignore the checkpoint of an interrupted run and rehash all the matching nodes from the start.')
 @decorators.with_dbenv()
-def rehash(nodes, entry_point):
+def rehash(nodes, entry_point, processes, chunk_size, restart):
     """Recompute the hash for nodes in the database
 
     The set of nodes that will be rehashed can be filtered by their identifier and/or based on their class.
+
+    The hashes are computed in chunks, possibly by several processes, and written back with one statement per chunk.
+    When all the nodes of a class are rehashed, the progress is stored after every chunk: an interrupted run is
+    resumed from there by running the same command again.
     """
+    from aiida.backends.utils import get_global_setting, set_global_setting, del_global_setting
+    from aiida.orm.node import Node
     from aiida.orm.querybuilder import QueryBuilder
 
+    checkpoint = None
+
     if nodes:
-        to_hash = [(node,) for node in nodes if isinstance(node, entry_point)]
+        pks = [node.pk for node in nodes if isinstance(node, entry_point)]
+        total = len(pks)
+        chunks = iter([pks[i:i + chunk_size] for i in range(0, total, chunk_size)])
     else:
+        checkpoint = [entry_point._query_type_string, 0]
+        try:
+            previous = get_global_setting(CHECKPOINT_KEY)
+        except KeyError:
+            previous = None
+
+        if previous is not None and not restart and previous[0] == checkpoint[0]:
+            checkpoint = list(previous)
+            echo.echo_info('resuming the interrupted run after the node with pk {}'.format(checkpoint[1]))
+
         builder = QueryBuilder()
-        builder.append(entry_point, tag='node')
-        to_hash = builder.all()
+        builder.append(entry_point, filters={'id': {'>': checkpoint[1]}})
+        total = builder.count()
+        chunks = _iter_pk_chunks(entry_point, checkpoint[1], chunk_size)
 
-    if not to_hash:
+    if not total:
+        if checkpoint is not None and checkpoint[1]:
+            del_global_setting(CHECKPOINT_KEY)
+            echo.echo_success('0 nodes re-hashed, the interrupted run was already complete')
+            return
         echo.echo_critical('no matching nodes found')
 
+    pool = None
+    if processes > 1:
+        import multiprocessing
+        from aiida.backends.utils import close_db_connection
+
+        # The workers must not share the database connection of this process
+        close_db_connection()
+        pool = multiprocessing.Pool(processes)
+
     count = 0
 
-    for i, (node,) in enumerate(to_hash):
+    try:
+        while True:
+            # With a pool, one chunk is given to each process at a time, otherwise chunks are hashed one by one
+            batch = [chunk for _, chunk in zip(range(processes), chunks)]
+            if not batch:
+                break
+
+            if pool is not None:
+                results = pool.map(_compute_hashes, batch)
+            else:
+                results = [_compute_hashes(chunk) for chunk in batch]
+
+            Node._set_db_hashes(dict(hash_ for result in results for hash_ in result))
+            count += sum(len(chunk) for chunk in batch)
+
+            if checkpoint is not None:
+                checkpoint[1] = batch[-1][-1]
+                set_global_setting(
+                    CHECKPOINT_KEY, checkpoint, description='Progress of an interrupted run of verdi rehash')
 
-        if i % 100 == 0:
             echo.echo('.', nl=False)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
 
-        node.rehash()
-        count += 1
+    if checkpoint is not None:
+        del_global_setting(CHECKPOINT_KEY)
 
     echo.echo('')
     echo.echo_success('{} nodes re-hashed'.format(count))
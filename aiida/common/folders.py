@@ -8,6 +8,8 @@
 # For further information please visit http://www.aiida.net               #
 ###########################################################################
 from __future__ import absolute_import
+import errno
+import io
 import os
 import shutil
 import fnmatch
@@ -393,7 +395,12 @@ class Folder(object):
         # Create parent dir, if needed, with the right mode
         pardir = os.path.dirname(self.abspath)
         if not os.path.exists(pardir):
-            os.makedirs(pardir, mode=self.mode_dir)
+            try:
+                os.makedirs(pardir, mode=self.mode_dir)
+            except OSError as exception:
+                # Another thread or process may have created it in the meantime
+                if exception.errno != errno.EEXIST:
+                    raise
 
         if move:
             shutil.move(srcdir, self.abspath)
@@ -524,12 +531,299 @@ class RepositoryFolder(Folder):
         """
         return self._subfolder
 
+    @property
+    def abspath(self):
+        """
+        The absolute path of the folder.
+
+        If the folder of the node was consolidated in a pack file, this is the path of a copy extracted in a temporary
+        cache, which should only be read. The methods of the folder that write to it first unpack it to the repository.
+        """
+        from aiida.common.packs import get_pack_store
+
+        if self._is_packed():
+            cached = get_pack_store().get_cached_folder(six.text_type(self._uuid))
+            return os.path.normpath(os.path.join(cached, self._subfolder))
+
+        return self._abspath
+
+    def _is_packed(self):
+        """
+        Return whether the folder of the node is stored in a pack file rather than as a directory on disk.
+        """
+        from aiida.common.packs import get_pack_store
+
+        if self._section != 'node' or os.path.isdir(self.folder_limit):
+            return False
+
+        return get_pack_store().has_folder(six.text_type(self._uuid))
+
+    def _get_packed_entries(self):
+        """
+        Return the files and directories of the packed folder of the node, see `PackStore.get_folder_entries`.
+
+        :return: a dictionary mapping the path of every file and directory relative to the top directory of the node
+            to the key of its object, which is None for directories, or None if the folder is not packed
+        """
+        from aiida.common.packs import get_pack_store
+
+        if self._section != 'node' or os.path.isdir(self.folder_limit):
+            return None
+
+        return get_pack_store().get_folder_entries(six.text_type(self._uuid))
+
+    def _get_packed_relpath(self, relpath=os.curdir):
+        """
+        Return the normalized path of a file or folder of this folder, relative to the top directory of the node.
+
+        :raise ValueError: if the path is absolute or goes beyond the top directory of the node
+        """
+        if os.path.isabs(relpath):
+            raise ValueError("relpath must be a relative path")
+
+        path = os.path.normpath(os.path.join(six.text_type(self._subfolder), six.text_type(relpath)))
+
+        if path == os.pardir or path.startswith(os.pardir + os.sep):
+            raise ValueError("You didn't specify a valid filename: {}".format(relpath))
+
+        return path
+
+    def _unpack(self):
+        """
+        Extract the folder of the node from the pack file to the repository and remove it from the packs, if it is
+        packed. This is needed before writing to the folder.
+        """
+        from aiida.common.packs import get_pack_store
+
+        if self._is_packed():
+            store = get_pack_store()
+            uuid = six.text_type(self._uuid)
+            store.extract_folder(uuid, self.folder_limit, mode_dir=self.mode_dir, mode_file=self.mode_file)
+            store.remove_folder(uuid)
+
+    def pack(self):
+        """
+        Consolidate the files of the node in the pack files of the repository and remove its directory from disk.
+        The folder is then read directly from the packs, and extracted again the next time it is written to.
+        """
+        from aiida.common.packs import get_pack_store
+
+        if self._subfolder != os.curdir:
+            raise ValueError('only the top directory of a repository folder can be packed')
+
+        if not self.exists():
+            return
+
+        get_pack_store().add_folder(six.text_type(self._uuid), self._abspath)
+        shutil.rmtree(self._abspath)
+
+    def get_subfolder(self, subfolder, create=False, reset_limit=False):
+        """
+        Return a Folder object pointing to a subfolder, see `Folder.get_subfolder`.
+
+        If the folder is packed, this is a RepositoryFolder, such that the subfolder is also read from the packs.
+        """
+        if not self._is_packed():
+            return super(RepositoryFolder, self).get_subfolder(subfolder, create=create, reset_limit=reset_limit)
+
+        new_folder = RepositoryFolder(self._section, self._uuid, self._get_packed_relpath(subfolder))
+
+        if create:
+            new_folder.create()
+
+        return new_folder
+
+    def get_content_list(self, pattern='*', only_paths=True):
+        """
+        Return a list of files (and subfolders) in the folder, matching a given pattern, see
+        `Folder.get_content_list`. A packed folder is listed from the index of the packs.
+        """
+        entries = self._get_packed_entries()
+
+        if entries is None:
+            return super(RepositoryFolder, self).get_content_list(pattern=pattern, only_paths=only_paths)
+
+        parent = self._get_packed_relpath()
+        if parent == os.curdir:
+            parent = ''
+
+        content = [(os.path.basename(relpath), key is not None)
+                   for relpath, key in entries.items()
+                   if relpath != os.curdir and os.path.dirname(relpath) == parent and
+                   fnmatch.fnmatch(os.path.basename(relpath), pattern)]
+
+        if only_paths:
+            return [name for name, _ in content]
+
+        return content
+
+    def get_abs_path(self, relpath, check_existence=False):
+        """
+        Return an absolute path for a file or folder in this folder, see `Folder.get_abs_path`.
+
+        If the folder is packed, the path points to the copy extracted in a temporary cache, which should only be read.
+        """
+        if not self._is_packed():
+            return super(RepositoryFolder, self).get_abs_path(relpath, check_existence=check_existence)
+
+        self._get_packed_relpath(relpath)
+        dest_abs_path = os.path.join(self.abspath, relpath)
+
+        if check_existence:
+            if not os.path.exists(dest_abs_path):
+                raise OSError("{} does not exist within the folder {}".format(relpath, self.abspath))
+
+        return dest_abs_path
+
+    def open(self, name, mode='r'):
+        """
+        Open a file in the current folder and return the corresponding file object.
+
+        A file of a packed folder is read from the packs in memory. Opening it for writing first unpacks the folder.
+        """
+        from aiida.common.packs import get_pack_store
+
+        if any(char in mode for char in 'wax+'):
+            self._unpack()
+            return super(RepositoryFolder, self).open(name, mode)
+
+        entries = self._get_packed_entries()
+
+        if entries is None:
+            return super(RepositoryFolder, self).open(name, mode)
+
+        relpath = self._get_packed_relpath(name)
+
+        if relpath not in entries:
+            raise IOError(errno.ENOENT, 'No such file or directory', self.get_abs_path(name))
+
+        if entries[relpath] is None:
+            raise IOError(errno.EISDIR, 'Is a directory', self.get_abs_path(name))
+
+        content = get_pack_store().get_object_content(entries[relpath])
+
+        if 'b' in mode or six.PY2:
+            return io.BytesIO(content)
+
+        return io.TextIOWrapper(io.BytesIO(content))
+
+    def exists(self):
+        """
+        Return True if the folder exists, False otherwise.
+        """
+        entries = self._get_packed_entries()
+
+        if entries is None:
+            return super(RepositoryFolder, self).exists()
+
+        relpath = self._get_packed_relpath()
+
+        return relpath == os.curdir or entries.get(relpath, False) is None
+
+    def isfile(self, relpath):
+        """
+        Return True if 'relpath' exists inside the folder and is a file, False otherwise.
+        """
+        entries = self._get_packed_entries()
+
+        if entries is None:
+            return super(RepositoryFolder, self).isfile(relpath)
+
+        return entries.get(os.path.normpath(os.path.join(self._subfolder, relpath))) is not None
+
+    def isdir(self, relpath):
+        """
+        Return True if 'relpath' exists inside the folder and is a directory, False otherwise.
+        """
+        entries = self._get_packed_entries()
+
+        if entries is None:
+            return super(RepositoryFolder, self).isdir(relpath)
+
+        path = os.path.normpath(os.path.join(self._subfolder, relpath))
+
+        return path == os.curdir or entries.get(path, False) is None
+
+    def create(self):
+        """
+        Creates the folder, if it does not exist on the disk yet, unpacking the folder of the node if needed.
+        """
+        if not self.exists():
+            self._unpack()
+            super(RepositoryFolder, self).create()
+
+    def create_symlink(self, src, name):
+        """
+        Create a symlink inside the folder to the location 'src', unpacking the folder of the node first.
+        """
+        self._unpack()
+        return super(RepositoryFolder, self).create_symlink(src, name)
+
+    def insert_path(self, src, dest_name=None, overwrite=True):
+        """
+        Copy a file to the folder, see `Folder.insert_path`, unpacking the folder of the node first.
+        """
+        self._unpack()
+        return super(RepositoryFolder, self).insert_path(src, dest_name=dest_name, overwrite=overwrite)
+
+    def create_file_from_filelike(self, src_filelike, dest_name):
+        """
+        Create a file from a file-like object, see `Folder.create_file_from_filelike`, unpacking the folder of the
+        node first.
+        """
+        self._unpack()
+        return super(RepositoryFolder, self).create_file_from_filelike(src_filelike, dest_name)
+
+    def remove_path(self, filename):
+        """
+        Remove a file or folder from the folder, unpacking the folder of the node first.
+        """
+        self._unpack()
+        return super(RepositoryFolder, self).remove_path(filename)
+
+    def erase(self, create_empty_folder=False):
+        """
+        Erases the folder. Should be called only in very specific cases,
+        in general folder should not be erased!
+
+        Doesn't complain if the folder does not exist. If the top directory is packed, it is removed from the pack
+        index without being extracted.
+
+        :param create_empty_folder: if True, after erasing, creates an empty dir.
+        """
+        from aiida.common.packs import get_pack_store
+
+        if self._is_packed():
+            if self._subfolder == os.curdir:
+                get_pack_store().remove_folder(six.text_type(self._uuid))
+            else:
+                self._unpack()
+
+        super(RepositoryFolder, self).erase(create_empty_folder=create_empty_folder)
+
     def get_topdir(self):
         """
         Returns the top directory, i.e., the section/uuid folder object.
         """
         return RepositoryFolder(self.section, self.uuid)
 
+    def deduplicate(self):
+        """
+        Deduplicate the files of this folder against the object store of the repository, if this was enabled with
+        the `repository.deduplicate` property. This should only be called once the content of the folder is final,
+        i.e. after the corresponding node was stored.
+
+        :return: a dictionary mapping the relative path of every deduplicated file to its key in the object store,
+            which is empty if deduplication is disabled
+        """
+        from aiida.common.objectstore import get_object_store
+        from aiida.common.setup import get_property
+
+        if not get_property('repository.deduplicate') or not self.exists():
+            return {}
+
+        return get_object_store().add_folder(self.abspath)
+
 
         # NOTE! The get_subfolder method will return a Folder object, and not a RepositoryFolder object
 
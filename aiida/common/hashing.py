@@ -9,9 +9,12 @@
 ###########################################################################
 
 from __future__ import absolute_import
+import collections
 import hashlib
 import numbers
+import os
 import random
+import threading
 import time
 import uuid
 from datetime import datetime
@@ -29,7 +32,7 @@ except ImportError: # Python2
 
 import numpy as np
 
-from .folders import Folder
+from .folders import Folder, RepositoryFolder
 
 """
 Here we define a single password hashing instance for the full AiiDA.
@@ -48,6 +51,14 @@ UNUSABLE_PASSWORD_SUFFIX_LENGTH = 40
 
 HASHING_KEY="HashingKey"
 
+# The files are hashed in blocks of this size, such that they are never fully loaded in memory
+FILE_HASH_BLOCK_SIZE = 1024 * 1024
+# The maximum number of file digests kept in the cache of _get_file_hash
+FILE_HASH_CACHE_SIZE = 10000
+
+_FILE_HASH_CACHE = collections.OrderedDict()
+_FILE_HASH_CACHE_LOCK = threading.Lock()
+
 pwd_context = CryptContext(
     # The list of hashes that we support
     schemes=["pbkdf2_sha256", "des_crypt"],
@@ -288,48 +299,113 @@ def _(object_to_hash, **kwargs):
     return make_hash_with_type('u', str(object_to_hash).encode('latin1'))
 
 
+def _get_filelike_hash(handle):
+    """
+    Return the hash of the content of a file opened in binary mode, the same as ``make_hash_with_type('pf', content)``,
+    reading it in blocks.
+
+    :param handle: the file-like object
+    """
+    hasher = hashlib.sha224(b'pf')
+    for block in iter(lambda: handle.read(FILE_HASH_BLOCK_SIZE), b''):
+        hasher.update(block)
+    return hasher.hexdigest()
+
+
+def _get_file_hash(path):
+    """
+    Return the hash of the content of a file, the same as ``make_hash_with_type('pf', content)``.
+
+    The file is read in blocks, and its digest is cached, keyed by its path, size and modification time, such that
+    files that did not change are not read again.
+
+    :param path: the absolute path of the file
+    """
+    stat = os.stat(path)
+    key = (path, stat.st_size, getattr(stat, 'st_mtime_ns', stat.st_mtime))
+
+    with _FILE_HASH_CACHE_LOCK:
+        digest = _FILE_HASH_CACHE.get(key, None)
+    if digest is not None:
+        return digest
+
+    with open(path, 'rb') as handle:
+        digest = _get_filelike_hash(handle)
+
+    with _FILE_HASH_CACHE_LOCK:
+        _FILE_HASH_CACHE[key] = digest
+        while len(_FILE_HASH_CACHE) > FILE_HASH_CACHE_SIZE:
+            _FILE_HASH_CACHE.popitem(last=False)
+
+    return digest
+
+
+def clear_file_hash_cache():
+    """
+    Clear the cache of the digests of the files hashed by make_hash.
+    """
+    with _FILE_HASH_CACHE_LOCK:
+        _FILE_HASH_CACHE.clear()
+
+
 @make_hash.register(Folder)
 def _(folder, **kwargs):
-    # make sure file is closed after being read
-    def _read_file(folder, name):
-        with folder.open(name, mode='rb') as f:
-            return f.read()
-
     ignored_folder_content = kwargs.get('ignored_folder_content', [])
 
+    # The files of a packed repository folder are not on disk, they are read from the packs rather than extracted
+    packed = isinstance(folder, RepositoryFolder) and folder._is_packed()  # pylint: disable=protected-access
+
+    def get_file_hash(name):
+        if packed:
+            with folder.open(name, 'rb') as handle:
+                return _get_filelike_hash(handle)
+        return _get_file_hash(folder.get_abs_path(name))
+
     return make_hash_with_type(
         'pd',
         make_hash([
             (
                 name,
                 folder.get_subfolder(name) if folder.isdir(name) else
-                make_hash_with_type('pf', _read_file(folder, name))
+                get_file_hash(name)
             )
             for name in sorted(folder.get_content_list())
             if name not in ignored_folder_content
         ], **kwargs).encode('latin1')
     )
 
+
+def _make_array_hash(type_chr, array):
+    """
+    Return the hash of an array, the same as ``make_hash_with_type(type_chr, make_hash(array.tobytes()))``.
+
+    The buffer of the array is fed to the hash function directly, without copying it to a bytes string first when
+    the array is contiguous.
+    """
+    if array.dtype.hasobject:
+        buffer = array.tobytes()
+    else:
+        buffer = np.ascontiguousarray(array).view(np.uint8)
+
+    hasher = hashlib.sha224(b's')
+    hasher.update(buffer)
+    return make_hash_with_type(type_chr, hasher.hexdigest().encode('latin1'))
+
+
 @make_hash.register(np.ndarray)
 def _(object_to_hash, **kwargs):
     if object_to_hash.dtype == np.float64:
-        return make_hash_with_type(
-            'af',
-            make_hash(truncate_array64(object_to_hash).tobytes(), **kwargs).encode('latin1')
-        )
+        return _make_array_hash('af', truncate_array64(object_to_hash))
     elif object_to_hash.dtype == np.complex128:
         return make_hash_with_type(
             'ac',
-            make_hash([
-                object_to_hash.real,
-                object_to_hash.imag
-            ], **kwargs).encode('latin1')
+            make_hash_with_type('L', ','.join([
+                _make_array_hash('af', truncate_array64(object_to_hash.real)),
+                _make_array_hash('af', truncate_array64(object_to_hash.imag)),
+            ]).encode('latin1')).encode('latin1')
         )
     else:
-        return make_hash_with_type(
-            'ao',
-            make_hash(object_to_hash.tobytes(), **kwargs).encode('latin1')
-        )
+        return _make_array_hash('ao', object_to_hash)
 
 def truncate_float64(x, num_bits=4):
     mask = ~(2**num_bits - 1)
@@ -340,6 +416,7 @@ def truncate_float64(x, num_bits=4):
 
 def truncate_array64(x, num_bits=4):
     mask = ~(2**num_bits - 1)
+    # The array is a copy, so it can be masked in place
     int_array = np.array(x, dtype=np.float64).view(np.int64)
-    masked_array = int_array & mask
-    return masked_array.view(np.float64)
+    int_array &= mask
+    return int_array.view(np.float64)
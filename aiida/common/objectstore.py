@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""A content-addressable object store used to deduplicate the files of the repository."""
+from __future__ import absolute_import
+import errno
+import hashlib
+import logging
+import os
+
+__all__ = ['ObjectStore', 'get_object_store']
+
+_LOGGER = logging.getLogger(__name__)
+
+# Size of the blocks in which files are read to compute their hash
+CHUNK_SIZE = 524288
+
+_OBJECT_STORE = None
+
+
+def get_object_store():
+    """
+    Return the object store of the repository of the current profile
+
+    :return: an ObjectStore instance
+    """
+    global _OBJECT_STORE  # pylint: disable=global-statement
+    from aiida.common.utils import get_repository_folder
+
+    if _OBJECT_STORE is None:
+        _OBJECT_STORE = ObjectStore(get_repository_folder('objects'))
+
+    return _OBJECT_STORE
+
+
+class ObjectStore(object):
+    """
+    A content-addressable store of files, where each object is stored once, under the sha256 hexdigest of its content,
+    in a folder sharded as ``<key[:2]>/<key[2:]>``.
+
+    The files of a node folder are deduplicated by replacing them with a hard link to the corresponding object. This
+    way identical files share a single inode and disk block, while the folder keeps the file based interface that is
+    used by `Node.add_path`, `Node.get_abs_path` and `Node.folder`. Only the folders of stored nodes, which are
+    immutable, should be deduplicated, since writing to a deduplicated file would change the content of all its copies.
+
+    The directory entries of a node folder are its manifest and the link count of an object is its reference count:
+    an object with a single link is no longer used by any node folder and is removed by `clean`.
+    """
+
+    def __init__(self, abspath):
+        """
+        :param abspath: the absolute path of the folder of the store, which should be on the same filesystem as the
+            folders to deduplicate, it is created if it does not exist
+        """
+        self._abspath = os.path.abspath(abspath)
+
+    @property
+    def abspath(self):
+        """
+        The absolute path of the folder of the store.
+        """
+        return self._abspath
+
+    @staticmethod
+    def get_key(filepath):
+        """
+        Compute the key of a file, which is the sha256 hexdigest of its content
+
+        :param filepath: the absolute path of the file
+        :return: the key as a string
+        """
+        sha256 = hashlib.sha256()
+        with open(filepath, 'rb') as handle:
+            for chunk in iter(lambda: handle.read(CHUNK_SIZE), b''):
+                sha256.update(chunk)
+        return sha256.hexdigest()
+
+    def get_object_path(self, key):
+        """
+        Return the absolute path of the object with the given key, which may not exist
+
+        :param key: the key of the object
+        :return: the absolute path
+        """
+        return os.path.join(self._abspath, key[:2], key[2:])
+
+    def has_object(self, key):
+        """
+        Return whether the object with the given key is in the store
+
+        :param key: the key of the object
+        """
+        return os.path.isfile(self.get_object_path(key))
+
+    def add_file(self, filepath):
+        """
+        Deduplicate a file. If an object with the same content is already in the store, the file is replaced by a hard
+        link to it, otherwise the file itself becomes the object for its content.
+
+        :param filepath: the absolute path of a regular file
+        :return: the key of the file, or None if the file could not be linked, for example because the filesystem does
+            not support hard links
+        """
+        key = self.get_key(filepath)
+        object_path = self.get_object_path(key)
+
+        try:
+            self._link(filepath, object_path)
+        except OSError as exception:
+            _LOGGER.warning('could not deduplicate the file %s: %s', filepath, exception)
+            return None
+
+        return key
+
+    def add_folder(self, abspath):
+        """
+        Deduplicate all the regular files in a folder, recursively. Symbolic links are left untouched.
+
+        :param abspath: the absolute path of the folder
+        :return: a dictionary mapping the path, relative to the folder, of every deduplicated file to its key
+        """
+        manifest = {}
+
+        for dirpath, _, filenames in os.walk(abspath):
+            for filename in filenames:
+                filepath = os.path.join(dirpath, filename)
+                if os.path.islink(filepath) or not os.path.isfile(filepath):
+                    continue
+                key = self.add_file(filepath)
+                if key is not None:
+                    manifest[os.path.relpath(filepath, abspath)] = key
+
+        return manifest
+
+    def iter_unreferenced(self):
+        """
+        Iterate over the objects that are no longer referenced by any folder
+
+        :return: a generator of tuples of the key and the size in bytes of each unreferenced object
+        """
+        if not os.path.isdir(self._abspath):
+            return
+
+        for shard in sorted(os.listdir(self._abspath)):
+            shard_path = os.path.join(self._abspath, shard)
+            if len(shard) != 2 or not os.path.isdir(shard_path):
+                continue
+            for name in sorted(os.listdir(shard_path)):
+                status = os.stat(os.path.join(shard_path, name))
+                if status.st_nlink == 1:
+                    yield shard + name, status.st_size
+
+    def clean(self):
+        """
+        Remove all the objects that are no longer referenced by any folder
+
+        :return: a tuple with the number of objects removed and the number of bytes freed
+        """
+        count = 0
+        size = 0
+
+        for key, object_size in list(self.iter_unreferenced()):
+            os.remove(self.get_object_path(key))
+            count += 1
+            size += object_size
+
+        return count, size
+
+    def _link(self, filepath, object_path):
+        """
+        Make the file and the object with the given path the same inode.
+
+        :param filepath: the absolute path of the file
+        :param object_path: the absolute path of the object
+        """
+        if not os.path.isfile(object_path):
+            shard = os.path.dirname(object_path)
+            if not os.path.isdir(shard):
+                try:
+                    os.makedirs(shard)
+                except OSError as exception:
+                    if exception.errno != errno.EEXIST:
+                        raise
+
+            try:
+                os.link(filepath, object_path)
+                return
+            except OSError as exception:
+                # Another process may have added the same content in the meantime, in which case link to that one
+                if exception.errno != errno.EEXIST:
+                    raise
+
+        if os.path.samefile(filepath, object_path):
+            return
+
+        # Replace the file atomically with a link to the existing object
+        temporary_path = '{}.{}.link'.format(filepath, os.getpid())
+        os.link(object_path, temporary_path)
+        try:
+            os.rename(temporary_path, filepath)
+        except OSError:
+            os.remove(temporary_path)
+            raise
@@ -0,0 +1,537 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""Append-only pack files to store the small files of many repository folders in a few large files."""
+from __future__ import absolute_import
+import atexit
+import collections
+import contextlib
+import errno
+import hashlib
+import io
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import zlib
+
+__all__ = ['PackStore', 'get_pack_store']
+
+# Name of the sqlite database with the index of the packs
+INDEX_FILENAME = 'index.sqlite'
+
+# A new pack is started once the current one reaches this size in bytes
+PACK_SIZE_LIMIT = 2**31
+
+# The least recently used folders extracted to the temporary cache of a process are removed beyond this size in bytes
+CACHE_SIZE_LIMIT = 2**30
+
+# The maximum number of packed folders whose entries are kept in memory by a process
+ENTRIES_CACHE_SIZE = 1000
+
+_PACK_STORE = None
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    key TEXT PRIMARY KEY,
+    pack INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    compressed INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS objects_pack ON objects (pack);
+CREATE TABLE IF NOT EXISTS entries (
+    uuid TEXT NOT NULL,
+    relpath TEXT NOT NULL,
+    key TEXT,
+    PRIMARY KEY (uuid, relpath)
+);
+CREATE INDEX IF NOT EXISTS entries_key ON entries (key);
+"""
+
+
+def get_pack_store():
+    """
+    Return the pack store of the repository of the current profile
+
+    :return: a PackStore instance
+    """
+    global _PACK_STORE  # pylint: disable=global-statement
+    from aiida.common.utils import get_repository_folder
+
+    if _PACK_STORE is None:
+        _PACK_STORE = PackStore(get_repository_folder('packs'))
+
+    return _PACK_STORE
+
+
+class PackStore(object):
+    """
+    A store that consolidates the files of many folders into a few append-only pack files.
+
+    The content of every file is written once, possibly compressed with zlib, at the end of the current pack
+    ``pack-<id>.pack``. An sqlite index records, for each object identified by the sha256 hexdigest of its content,
+    the pack, offset, length and compression flag of the record, and for each packed folder the list of its files and
+    directories. Single files can therefore be read with one seek, without unpacking a whole pack. When a path on
+    disk is needed, the folder is extracted to a temporary cache of the process, while the packs remain the only
+    source of its content. The cache holds at most ``CACHE_SIZE_LIMIT`` bytes: the least recently used folders are
+    removed first. The entries of the most recently used folders are also kept in memory, such that reading a packed
+    folder does not query the index every time.
+
+    Removing a folder drops its entries from the index. The records of its objects stay in the packs, since these are
+    never rewritten in place, until `vacuum` copies the live records to new packs and removes the old ones.
+
+    The connection to the index is opened once per process and shared by its threads.
+    """
+
+    def __init__(self, abspath):
+        """
+        :param abspath: the absolute path of the folder of the store, it is created when the first folder is packed
+        """
+        self._abspath = os.path.abspath(abspath)
+        self._lock = threading.RLock()
+        self._index = None
+        self._index_pid = None
+        self._cache_folder = None
+        # The path and the size of the extracted folders, from the least to the most recently used
+        self._cached_folders = collections.OrderedDict()
+        self._cached_folders_size = 0
+        self._cached_entries = collections.OrderedDict()
+
+    @property
+    def abspath(self):
+        """
+        The absolute path of the folder of the store.
+        """
+        return self._abspath
+
+    @property
+    def index_path(self):
+        """
+        The absolute path of the sqlite database with the index.
+        """
+        return os.path.join(self._abspath, INDEX_FILENAME)
+
+    def get_pack_path(self, pack_id):
+        """
+        Return the absolute path of the pack with the given id
+
+        :param pack_id: the integer id of the pack
+        :return: the absolute path
+        """
+        return os.path.join(self._abspath, 'pack-{}.pack'.format(pack_id))
+
+    def _get_index(self):
+        """
+        Return the connection to the index of this process, opening it and creating the schema the first time.
+        """
+        # A forked process must not use the connection of its parent
+        if self._index is None or self._index_pid != os.getpid():
+            if not os.path.isdir(self._abspath):
+                os.makedirs(self._abspath)
+
+            connection = sqlite3.connect(self.index_path, timeout=60, check_same_thread=False)
+            connection.executescript(_SCHEMA)
+            self._index = connection
+            self._index_pid = os.getpid()
+
+        return self._index
+
+    @contextlib.contextmanager
+    def _connection(self):
+        """
+        Use the connection to the index, commit on success and roll back on failure.
+        """
+        with self._lock:
+            connection = self._get_index()
+            with connection:
+                yield connection
+
+    def has_folder(self, uuid):
+        """
+        Return whether the folder with the given uuid is packed
+
+        :param uuid: the uuid of the folder
+        """
+        return self.get_folder_entries(uuid) is not None
+
+    def get_folder_entries(self, uuid):
+        """
+        Return the files and directories of a packed folder
+
+        :param uuid: the uuid of the folder
+        :return: a dictionary mapping the path of every file and directory relative to the folder to the key of its
+            object, which is None for directories, or None if the folder is not packed. It is shared with the cache of
+            the entries and should not be modified.
+        """
+        with self._lock:
+            entries = self._cached_entries.pop(uuid, None)
+            if entries is not None:
+                self._cached_entries[uuid] = entries
+                return entries
+
+        # Avoid creating the index when nothing was ever packed, since this is called for every repository folder
+        if not os.path.isfile(self.index_path):
+            return None
+
+        with self._connection() as connection:
+            rows = connection.execute('SELECT relpath, key FROM entries WHERE uuid = ?', (uuid,)).fetchall()
+
+        if not rows:
+            return None
+
+        entries = dict(rows)
+        with self._lock:
+            self._cached_entries[uuid] = entries
+            while len(self._cached_entries) > ENTRIES_CACHE_SIZE:
+                self._cached_entries.popitem(last=False)
+
+        return entries
+
+    def get_folder_uuids(self):
+        """
+        Return the uuids of all the packed folders
+
+        :return: a set of uuids
+        """
+        if not os.path.isfile(self.index_path):
+            return set()
+
+        with self._connection() as connection:
+            return set(row[0] for row in connection.execute('SELECT DISTINCT uuid FROM entries'))
+
+    def add_folder(self, uuid, abspath):
+        """
+        Pack all the files and subdirectories of a folder. The folder itself is not removed.
+
+        :param uuid: the uuid under which to store the folder
+        :param abspath: the absolute path of the folder
+        :raise ValueError: if the folder contains symbolic links, which cannot be packed
+        """
+        entries = []
+        files = []
+
+        for dirpath, dirnames, filenames in os.walk(abspath):
+            for name in dirnames + filenames:
+                path = os.path.join(dirpath, name)
+                if os.path.islink(path):
+                    raise ValueError('cannot pack the symbolic link {}'.format(path))
+            for dirname in dirnames:
+                entries.append((os.path.relpath(os.path.join(dirpath, dirname), abspath), None))
+            for filename in filenames:
+                files.append(os.path.relpath(os.path.join(dirpath, filename), abspath))
+
+        with self._connection() as connection:
+            pack_id, handle = self._open_current_pack(connection)
+            try:
+                for relpath in files:
+                    with io.open(os.path.join(abspath, relpath), 'rb') as source:
+                        content = source.read()
+                    key = hashlib.sha256(content).hexdigest()
+                    entries.append((relpath, key))
+
+                    if connection.execute('SELECT 1 FROM objects WHERE key = ?', (key,)).fetchone() is not None:
+                        continue
+
+                    record, compressed = self._encode(content)
+                    offset = handle.tell()
+                    handle.write(record)
+                    connection.execute(
+                        'INSERT INTO objects (key, pack, offset, length, compressed) VALUES (?, ?, ?, ?, ?)',
+                        (key, pack_id, offset, len(record), int(compressed)))
+
+                # The records have to be on disk before the index that points to them is committed
+                handle.flush()
+                os.fsync(handle.fileno())
+            finally:
+                handle.close()
+
+            connection.execute('DELETE FROM entries WHERE uuid = ?', (uuid,))
+            self._forget_folder(uuid)
+            connection.executemany('INSERT INTO entries (uuid, relpath, key) VALUES (?, ?, ?)',
+                                   [(uuid, relpath, key) for relpath, key in entries])
+
+            # An empty folder still needs an entry to be recognized as packed
+            if not entries:
+                connection.execute('INSERT INTO entries (uuid, relpath, key) VALUES (?, ?, NULL)', (uuid, os.curdir))
+
+    def get_object_content(self, key):
+        """
+        Return the content of an object, reading only its own record from the pack
+
+        :param key: the key of the object
+        :return: the content as bytes
+        :raise KeyError: if the object is not in the store
+        """
+        with self._connection() as connection:
+            row = connection.execute('SELECT pack, offset, length, compressed FROM objects WHERE key = ?',
+                                     (key,)).fetchone()
+
+        if row is None:
+            raise KeyError('object {} is not in the pack store'.format(key))
+
+        return self._read_record(*row)
+
+    def get_folder_content(self, uuid, relpath):
+        """
+        Return the content of a single file of a packed folder
+
+        :param uuid: the uuid of the folder
+        :param relpath: the path of the file relative to the folder
+        :return: the content as bytes
+        :raise KeyError: if the file is not in the store
+        """
+        with self._connection() as connection:
+            row = connection.execute(
+                'SELECT objects.pack, objects.offset, objects.length, objects.compressed FROM entries '
+                'JOIN objects ON entries.key = objects.key WHERE entries.uuid = ? AND entries.relpath = ?',
+                (uuid, os.path.normpath(relpath))).fetchone()
+
+        if row is None:
+            raise KeyError('file {} of folder {} is not in the pack store'.format(relpath, uuid))
+
+        return self._read_record(*row)
+
+    def extract_folder(self, uuid, abspath, mode_dir=None, mode_file=None):
+        """
+        Write a copy of a packed folder to disk. The folder stays in the index, use `remove_folder` to unpack it.
+
+        The folder is first written to a temporary sibling folder and then renamed into place, such that other
+        processes never see a partially extracted folder. If the destination already exists, because another process
+        extracted it in the meantime, the extracted copy is discarded.
+
+        :param uuid: the uuid of the folder
+        :param abspath: the absolute path where the folder should be written, which should not exist yet
+        :param mode_dir: if specified, the mode of the created directories
+        :param mode_file: if specified, the mode of the created files
+        :return: True if the folder was extracted, False if it was not packed
+        """
+        parent = os.path.dirname(abspath)
+        if not os.path.isdir(parent):
+            try:
+                os.makedirs(parent)
+            except OSError as exception:
+                if exception.errno != errno.EEXIST:
+                    raise
+
+        with self._connection() as connection:
+            rows = connection.execute(
+                'SELECT entries.relpath, objects.pack, objects.offset, objects.length, objects.compressed FROM entries '
+                'LEFT JOIN objects ON entries.key = objects.key WHERE entries.uuid = ? ORDER BY entries.relpath',
+                (uuid,)).fetchall()
+
+            if not rows:
+                return False
+
+            temporary = tempfile.mkdtemp(dir=parent, prefix='.unpack-')
+            try:
+                for relpath, pack_id, offset, length, compressed in rows:
+                    path = os.path.normpath(os.path.join(temporary, relpath))
+                    if pack_id is None:
+                        if not os.path.isdir(path):
+                            os.makedirs(path)
+                        continue
+                    if not os.path.isdir(os.path.dirname(path)):
+                        os.makedirs(os.path.dirname(path))
+                    with io.open(path, 'wb') as handle:
+                        handle.write(self._read_record(pack_id, offset, length, compressed))
+                    if mode_file is not None:
+                        os.chmod(path, mode_file)
+
+                if mode_dir is not None:
+                    for dirpath, _, _ in os.walk(temporary):
+                        os.chmod(dirpath, mode_dir)
+
+                try:
+                    os.rename(temporary, abspath)
+                except OSError:
+                    if not os.path.isdir(abspath):
+                        raise
+            finally:
+                if os.path.isdir(temporary):
+                    shutil.rmtree(temporary)
+
+        return True
+
+    def get_cached_folder(self, uuid):
+        """
+        Return the path of a copy of a packed folder, extracted the first time in a temporary cache of this process
+        that is removed when the process exits. The copy should only be read: the packs remain the source of the
+        content of the folder. Once the cache is larger than ``CACHE_SIZE_LIMIT``, the least recently used copies are
+        removed, so the path should only be used right away.
+
+        :param uuid: the uuid of the folder
+        :return: the absolute path of the copy
+        :raise KeyError: if the folder is not packed
+        """
+        with self._lock:
+            cached = self._cached_folders.pop(uuid, None)
+            if cached is not None:
+                if os.path.isdir(cached[0]):
+                    self._cached_folders[uuid] = cached
+                    return cached[0]
+                self._cached_folders_size -= cached[1]
+
+            if self._cache_folder is None:
+                self._cache_folder = tempfile.mkdtemp(prefix='aiida-packs-')
+                atexit.register(shutil.rmtree, self._cache_folder, True)
+
+            path = os.path.join(self._cache_folder, uuid)
+            if not self.extract_folder(uuid, path):
+                raise KeyError('folder {} is not in the pack store'.format(uuid))
+
+            size = sum(
+                os.path.getsize(os.path.join(dirpath, filename))
+                for dirpath, _, filenames in os.walk(path)
+                for filename in filenames)
+            self._cached_folders[uuid] = (path, size)
+            self._cached_folders_size += size
+
+            # The folder that was just extracted is kept, even if it is larger than the cache
+            while self._cached_folders_size > CACHE_SIZE_LIMIT and len(self._cached_folders) > 1:
+                old_path, old_size = self._cached_folders.popitem(last=False)[1]
+                self._cached_folders_size -= old_size
+                shutil.rmtree(old_path, True)
+
+            return path
+
+    def _forget_folder(self, uuid):
+        """
+        Drop a folder from the caches of this process, removing its extracted copy if any.
+
+        :param uuid: the uuid of the folder
+        """
+        with self._lock:
+            self._cached_entries.pop(uuid, None)
+            cached = self._cached_folders.pop(uuid, None)
+            if cached is not None:
+                self._cached_folders_size -= cached[1]
+                shutil.rmtree(cached[0], True)
+
+    def remove_folder(self, uuid):
+        """
+        Remove a packed folder from the index. Its records are reclaimed by the next `vacuum`.
+
+        :param uuid: the uuid of the folder
+        """
+        self._forget_folder(uuid)
+
+        if not os.path.isfile(self.index_path):
+            return
+
+        with self._connection() as connection:
+            connection.execute('DELETE FROM entries WHERE uuid = ?', (uuid,))
+
+    def vacuum(self):
+        """
+        Reclaim the space of the objects that are no longer referenced by any packed folder.
+
+        The live records of every pack that contains unreferenced records are appended to the current pack, after
+        which the old pack is removed. This should not run concurrently with processes that read from the store.
+
+        :return: a tuple with the number of packs that were removed and the number of bytes freed
+        """
+        if not os.path.isfile(self.index_path):
+            return 0, 0
+
+        removed = 0
+        freed = 0
+
+        with self._connection() as connection:
+            connection.execute('DELETE FROM objects WHERE key NOT IN (SELECT key FROM entries WHERE key IS NOT NULL)')
+
+            live = dict(connection.execute('SELECT pack, SUM(length) FROM objects GROUP BY pack').fetchall())
+            pack_ids = sorted(self._get_pack_ids())
+            new_pack_id = max(pack_ids) if pack_ids else 0
+
+            for pack_id in pack_ids:
+                size = os.path.getsize(self.get_pack_path(pack_id))
+                if size == live.get(pack_id, 0):
+                    continue
+
+                records = connection.execute('SELECT key, offset, length FROM objects WHERE pack = ?',
+                                             (pack_id,)).fetchall()
+
+                if records:
+                    new_pack_id += 1
+                    with io.open(self.get_pack_path(pack_id), 'rb') as source:
+                        with io.open(self.get_pack_path(new_pack_id), 'wb') as handle:
+                            for key, offset, length in records:
+                                source.seek(offset)
+                                new_offset = handle.tell()
+                                handle.write(source.read(length))
+                                connection.execute('UPDATE objects SET pack = ?, offset = ? WHERE key = ?',
+                                                   (new_pack_id, new_offset, key))
+                            handle.flush()
+                            os.fsync(handle.fileno())
+
+                # The index has to point to the new pack before the old one can be removed
+                connection.commit()
+                os.remove(self.get_pack_path(pack_id))
+                removed += 1
+                freed += size - live.get(pack_id, 0)
+
+        return removed, freed
+
+    def _get_pack_ids(self):
+        """
+        Return the ids of all the packs that exist on disk
+
+        :return: a list of integers
+        """
+        pack_ids = []
+        for filename in os.listdir(self._abspath):
+            if filename.startswith('pack-') and filename.endswith('.pack'):
+                pack_ids.append(int(filename[len('pack-'):-len('.pack')]))
+        return pack_ids
+
+    def _open_current_pack(self, connection):
+        """
+        Open the pack to which new records should be appended, starting a new one if the last pack is full.
+
+        :param connection: the open connection to the index, which should hold the write lock
+        :return: a tuple of the pack id and the handle of the pack opened in append mode
+        """
+        # Take the write lock of the index, which serializes the writers of the packs
+        connection.execute('BEGIN IMMEDIATE')
+
+        pack_ids = self._get_pack_ids()
+        pack_id = max(pack_ids) if pack_ids else 0
+
+        pack_path = self.get_pack_path(pack_id)
+        if os.path.isfile(pack_path) and os.path.getsize(pack_path) >= PACK_SIZE_LIMIT:
+            pack_id += 1
+
+        return pack_id, io.open(self.get_pack_path(pack_id), 'ab')
+
+    def _read_record(self, pack_id, offset, length, compressed):
+        """
+        Read and decode a single record from a pack.
+        """
+        with io.open(self.get_pack_path(pack_id), 'rb') as handle:
+            handle.seek(offset)
+            record = handle.read(length)
+
+        if compressed:
+            return zlib.decompress(record)
+
+        return record
+
+    @staticmethod
+    def _encode(content):
+        """
+        Compress the content of an object, unless that does not make it smaller.
+
+        :return: a tuple of the record to write and whether it is compressed
+        """
+        compressed = zlib.compress(content)
+        if len(compressed) < len(content):
+            return compressed, True
+        return content, False
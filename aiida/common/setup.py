@@ -780,6 +780,27 @@ _property_table = {
         "The timeout in seconds for calls to the circus client",
         DEFAULT_DAEMON_TIMEOUT,
         None),
+    "repository.deduplicate": (
+        "repository_deduplicate",
+        "bool",
+        "Whether to deduplicate the files of stored nodes, by replacing identical files in the repository with hard "
+        "links to a single copy in a content-addressable object store",
+        False,
+        None),
+    "transport.keep_alive": (
+        "transport_keep_alive",
+        "int",
+        "The time in seconds that the daemon keeps an idle transport open for reuse by subsequent transport "
+        "tasks, after which the connection is closed. Set to 0 to close transports as soon as they are no longer used",
+        0,
+        None),
+    "transport.max_connections_per_computer": (
+        "transport_max_connections_per_computer",
+        "int",
+        "The maximum number of transports that a daemon worker keeps open at the same time for a single computer. "
+        "Set to 0 for no limit",
+        0,
+        None),
     "verdishell.modules": (
         "modules_for_verdi_shell",
         "string",
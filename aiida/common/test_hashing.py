@@ -122,3 +122,42 @@ class MakeHashTest(unittest.TestCase):
             np.save(fhandle, np.arange(10))
             fhandle.close()
             self.assertEqual(make_hash(folder), '18e28635210ec949097222567d0c8ecfbcd918af8721766e4aaecf73')
+
+    def test_folder_file_cache(self):
+        from aiida.common import hashing
+
+        with SandboxFolder(sandbox_in_repo=False) as folder:
+            with folder.open('file1', 'w') as fhandle:
+                fhandle.write("hello there!\n")
+            folder.open('file2', 'a').close()
+            hash_before = make_hash(folder)
+
+            # The digest of a file that did not change is taken from the cache
+            hashing.clear_file_hash_cache()
+            self.assertEqual(make_hash(folder), hash_before)
+            self.assertEqual(len(hashing._FILE_HASH_CACHE), 2)  # pylint: disable=protected-access
+            self.assertEqual(make_hash(folder), hash_before)
+
+            # A file that changed is read again
+            with folder.open('file2', 'w') as fhandle:
+                fhandle.write("general Kenobi\n")
+            self.assertNotEqual(make_hash(folder), hash_before)
+
+    def test_file_hash_blocks(self):
+        from aiida.common import hashing
+
+        block_size = hashing.FILE_HASH_BLOCK_SIZE
+        hashing.FILE_HASH_BLOCK_SIZE = 7
+        try:
+            with SandboxFolder(sandbox_in_repo=False) as folder:
+                with folder.open('file', 'wb') as fhandle:
+                    fhandle.write(b'0123456789' * 10)
+                self.assertEqual(
+                    hashing._get_file_hash(folder.get_abs_path('file')),  # pylint: disable=protected-access
+                    hashing.make_hash_with_type('pf', b'0123456789' * 10))
+                with folder.open('file', 'rb') as fhandle:
+                    self.assertEqual(
+                        hashing._get_filelike_hash(fhandle),  # pylint: disable=protected-access
+                        hashing.make_hash_with_type('pf', b'0123456789' * 10))
+        finally:
+            hashing.FILE_HASH_BLOCK_SIZE = block_size
@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+from __future__ import absolute_import
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+
+class ObjectStoreTest(unittest.TestCase):
+    """
+    Tests for the ObjectStore class.
+    """
+
+    def setUp(self):
+        from aiida.common.objectstore import ObjectStore
+
+        self.tmpdir = tempfile.mkdtemp()
+        self.store = ObjectStore(os.path.join(self.tmpdir, 'objects'))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _create_folder(self, name, files):
+        folder = os.path.join(self.tmpdir, name)
+        for relpath, content in files.items():
+            filepath = os.path.join(folder, relpath)
+            if not os.path.isdir(os.path.dirname(filepath)):
+                os.makedirs(os.path.dirname(filepath))
+            with io.open(filepath, 'wb') as handle:
+                handle.write(content)
+        return folder
+
+    def test_add_folder(self):
+        """
+        Identical files in different folders should end up being the same inode.
+        """
+        files = {'a.txt': b'content', os.path.join('sub', 'b.txt'): b'other content'}
+        folder1 = self._create_folder('folder1', files)
+        folder2 = self._create_folder('folder2', files)
+
+        manifest1 = self.store.add_folder(folder1)
+        manifest2 = self.store.add_folder(folder2)
+
+        self.assertEqual(manifest1, manifest2)
+        self.assertEqual(set(manifest1.keys()), set(files.keys()))
+
+        for relpath, key in manifest1.items():
+            self.assertTrue(self.store.has_object(key))
+            self.assertEqual(key, self.store.get_key(os.path.join(folder1, relpath)))
+            self.assertTrue(os.path.samefile(os.path.join(folder1, relpath), os.path.join(folder2, relpath)))
+            self.assertTrue(os.path.samefile(os.path.join(folder1, relpath), self.store.get_object_path(key)))
+            with io.open(os.path.join(folder2, relpath), 'rb') as handle:
+                self.assertEqual(handle.read(), files[relpath])
+
+        # Adding a folder twice should be a no-op
+        self.assertEqual(self.store.add_folder(folder1), manifest1)
+
+    def test_add_folder_symlink(self):
+        """
+        Symbolic links should be left untouched.
+        """
+        folder = self._create_folder('folder', {'a.txt': b'content'})
+        os.symlink(os.path.join(folder, 'a.txt'), os.path.join(folder, 'link'))
+
+        manifest = self.store.add_folder(folder)
+
+        self.assertEqual(list(manifest.keys()), ['a.txt'])
+        self.assertTrue(os.path.islink(os.path.join(folder, 'link')))
+
+    def test_clean(self):
+        """
+        Only the objects that are no longer referenced by any folder should be removed.
+        """
+        folder1 = self._create_folder('folder1', {'a.txt': b'shared', 'b.txt': b'unique'})
+        folder2 = self._create_folder('folder2', {'a.txt': b'shared'})
+
+        manifest = self.store.add_folder(folder1)
+        self.store.add_folder(folder2)
+
+        self.assertEqual(list(self.store.iter_unreferenced()), [])
+        self.assertEqual(self.store.clean(), (0, 0))
+
+        shutil.rmtree(folder1)
+
+        self.assertEqual(list(self.store.iter_unreferenced()), [(manifest['b.txt'], len(b'unique'))])
+        self.assertEqual(self.store.clean(), (1, len(b'unique')))
+        self.assertFalse(self.store.has_object(manifest['b.txt']))
+        self.assertTrue(self.store.has_object(manifest['a.txt']))
+
+
+class PackStoreTest(unittest.TestCase):
+    """
+    Tests for the PackStore class.
+    """
+
+    def setUp(self):
+        from aiida.common.packs import PackStore
+
+        self.tmpdir = tempfile.mkdtemp()
+        self.store = PackStore(os.path.join(self.tmpdir, 'packs'))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _create_folder(self, name, files):
+        folder = os.path.join(self.tmpdir, name)
+        os.makedirs(os.path.join(folder, 'empty'))
+        for relpath, content in files.items():
+            filepath = os.path.join(folder, relpath)
+            if not os.path.isdir(os.path.dirname(filepath)):
+                os.makedirs(os.path.dirname(filepath))
+            with io.open(filepath, 'wb') as handle:
+                handle.write(content)
+        return folder
+
+    def test_pack_and_extract(self):
+        """
+        A folder should be restored identically after being packed, and single files should be readable directly.
+        """
+        files = {'a.txt': b'a' * 1000, os.path.join('sub', 'b.txt'): b'b', 'c.txt': b''}
+        folder = self._create_folder('folder', files)
+
+        self.assertFalse(self.store.has_folder('uuid'))
+        self.store.add_folder('uuid', folder)
+        shutil.rmtree(folder)
+
+        self.assertTrue(self.store.has_folder('uuid'))
+        self.assertEqual(self.store.get_folder_uuids(), set(['uuid']))
+        self.assertEqual(self.store.get_folder_content('uuid', os.path.join('sub', 'b.txt')), b'b')
+        with self.assertRaises(KeyError):
+            self.store.get_folder_content('uuid', 'missing.txt')
+
+        # Extracting a copy keeps the packs as the source of the folder
+        self.assertTrue(self.store.extract_folder('uuid', folder))
+        self.assertTrue(self.store.has_folder('uuid'))
+        self.assertTrue(os.path.isdir(os.path.join(folder, 'empty')))
+        for relpath, content in files.items():
+            with io.open(os.path.join(folder, relpath), 'rb') as handle:
+                self.assertEqual(handle.read(), content)
+
+        self.store.remove_folder('uuid')
+        self.assertFalse(self.store.has_folder('uuid'))
+        self.assertFalse(self.store.extract_folder('uuid', os.path.join(self.tmpdir, 'other')))
+
+    def test_read_without_extracting(self):
+        """
+        The entries of a packed folder and a cached copy should be available without removing it from the packs.
+        """
+        files = {'a.txt': b'a', os.path.join('sub', 'b.txt'): b'b'}
+        folder = self._create_folder('folder', files)
+        self.store.add_folder('uuid', folder)
+        shutil.rmtree(folder)
+
+        entries = self.store.get_folder_entries('uuid')
+        self.assertEqual(set(entries.keys()), set(['a.txt', 'empty', 'sub', os.path.join('sub', 'b.txt')]))
+        self.assertIsNone(entries['empty'])
+        self.assertEqual(self.store.get_object_content(entries['a.txt']), b'a')
+        self.assertIsNone(self.store.get_folder_entries('missing'))
+
+        cached = self.store.get_cached_folder('uuid')
+        self.assertEqual(self.store.get_cached_folder('uuid'), cached)
+        self.assertTrue(self.store.has_folder('uuid'))
+        with io.open(os.path.join(cached, 'sub', 'b.txt'), 'rb') as handle:
+            self.assertEqual(handle.read(), b'b')
+
+        self.store.remove_folder('uuid')
+        self.assertFalse(os.path.exists(cached))
+        with self.assertRaises(KeyError):
+            self.store.get_cached_folder('uuid')
+
+    def test_cache_limit(self):
+        """
+        The least recently used extracted folders should be removed once the cache is larger than its limit.
+        """
+        from aiida.common import packs
+
+        for uuid in ('uuid1', 'uuid2', 'uuid3'):
+            folder = self._create_folder(uuid, {'a.txt': uuid.encode('ascii') * 10})
+            self.store.add_folder(uuid, folder)
+            shutil.rmtree(folder)
+
+        cache_size_limit = packs.CACHE_SIZE_LIMIT
+        packs.CACHE_SIZE_LIMIT = 100
+        try:
+            cached1 = self.store.get_cached_folder('uuid1')
+            cached2 = self.store.get_cached_folder('uuid2')
+            self.assertEqual(self.store.get_cached_folder('uuid1'), cached1)
+            self.store.get_cached_folder('uuid3')
+        finally:
+            packs.CACHE_SIZE_LIMIT = cache_size_limit
+
+        self.assertTrue(os.path.isdir(cached1))
+        self.assertFalse(os.path.exists(cached2))
+        with io.open(os.path.join(self.store.get_cached_folder('uuid2'), 'a.txt'), 'rb') as handle:
+            self.assertEqual(handle.read(), b'uuid2' * 10)
+
+        # The entries kept in memory follow the changes of the folders made by this process
+        self.assertEqual(set(self.store.get_folder_entries('uuid1').keys()), set(['a.txt', 'empty']))
+        folder = self._create_folder('new', {'b.txt': b'b'})
+        self.store.add_folder('uuid1', folder)
+        self.assertEqual(set(self.store.get_folder_entries('uuid1').keys()), set(['b.txt', 'empty']))
+        self.store.remove_folder('uuid1')
+        self.assertFalse(self.store.has_folder('uuid1'))
+
+    def test_vacuum(self):
+        """
+        Vacuuming should only reclaim the records that are no longer used by a packed folder.
+        """
+        folder1 = self._create_folder('folder1', {'a.txt': b'shared', 'b.txt': b'unique'})
+        folder2 = self._create_folder('folder2', {'a.txt': b'shared'})
+
+        self.store.add_folder('uuid1', folder1)
+        self.store.add_folder('uuid2', folder2)
+
+        self.assertEqual(self.store.vacuum(), (0, 0))
+
+        self.store.remove_folder('uuid1')
+        removed, freed = self.store.vacuum()
+
+        self.assertEqual(removed, 1)
+        self.assertEqual(freed, len(b'unique'))
+        self.assertEqual(self.store.get_folder_content('uuid2', 'a.txt'), b'shared')
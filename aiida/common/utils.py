@@ -133,6 +133,10 @@ def get_repository_folder(subfolder=None):
             retval = os.path.abspath(os.path.join(REPOSITORY_PATH, 'sandbox'))
         elif subfolder == "repository":
             retval = os.path.abspath(os.path.join(REPOSITORY_PATH, 'repository'))
+        elif subfolder == "objects":
+            retval = os.path.abspath(os.path.join(REPOSITORY_PATH, 'objects'))
+        elif subfolder == "packs":
+            retval = os.path.abspath(os.path.join(REPOSITORY_PATH, 'packs'))
         else:
             raise ValueError("Invalid 'subfolder' passed to " "get_repository_folder: {}".format(subfolder))
         _repository_folder_cache[subfolder] = retval
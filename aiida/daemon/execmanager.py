@@ -121,13 +121,6 @@ def submit_calculation(calculation, transport, calc_info, script_filename):
                 transport.put(code.get_abs_path(f), f)
             transport.chmod(code.get_local_executable(), 0o755)  # rwxr-xr-x
 
-    # copy all files, recursively with folders
-    for f in folder.get_content_list():
-        execlogger.debug("[submission of calculation {}] "
-                         "copying file/folder {}...".format(calculation.pk, f),
-                         extra=logger_extra)
-        transport.put(folder.get_abs_path(f), f)
-
     # local_copy_list is a list of tuples,
     # each with (src_abs_path, dest_rel_path)
     # NOTE: validation of these lists are done
@@ -136,15 +129,35 @@ def submit_calculation(calculation, transport, calc_info, script_filename):
     remote_copy_list = calc_info.remote_copy_list
     remote_symlink_list = calc_info.remote_symlink_list
 
-    if local_copy_list is not None:
-        for src_abs_path, dest_rel_path in local_copy_list:
+    archive_upload = computer.get_archive_upload()
+
+    if archive_upload:
+        # copy all files and the local_copy_list through a single archive
+        execlogger.debug("[submission of calculation {}] "
+                         "copying files and folders as a single archive".format(calculation.pk),
+                         extra=logger_extra)
+        _upload_as_archive(transport, folder, local_copy_list or [])
+    else:
+        # copy all files, recursively with folders
+        for f in folder.get_content_list():
             execlogger.debug("[submission of calculation {}] "
-                             "copying local file/folder to {}".format(
-                calculation.pk, dest_rel_path),
-                extra=logger_extra)
-            transport.put(src_abs_path, dest_rel_path)
+                             "copying file/folder {}...".format(calculation.pk, f),
+                             extra=logger_extra)
+            transport.put(folder.get_abs_path(f), f)
+
+        if local_copy_list is not None:
+            for src_abs_path, dest_rel_path in local_copy_list:
+                execlogger.debug("[submission of calculation {}] "
+                                 "copying local file/folder to {}".format(
+                    calculation.pk, dest_rel_path),
+                    extra=logger_extra)
+                transport.put(src_abs_path, dest_rel_path)
 
     if remote_copy_list is not None:
+        if archive_upload:
+            # all the copies without wildcards are performed with a single command, the others are left to the loop
+            remote_copy_list = _batch_remote_copy(calculation, transport, remote_copy_list, logger_extra)
+
         for (remote_computer_uuid, remote_abs_path,
              dest_rel_path) in remote_copy_list:
             if remote_computer_uuid == computer.uuid:
@@ -200,30 +213,101 @@ def submit_calculation(calculation, transport, calc_info, script_filename):
     calculation._set_job_id(job_id)
 
 
-def update_calculation(calculation, transport):
+def _upload_as_archive(transport, folder, local_copy_list):
     """
-    Update the scheduler state of a calculation
+    Upload the content of a folder together with the files of the local_copy_list to the current working directory
+    of the transport, packed in a single compressed tar archive that is unpacked remotely.
 
-    :param calculation: the instance of JobCalculation to update.
-    :param transport: an already opened transport to use to query the scheduler
+    :param transport: an already opened transport, whose current working directory is the remote working directory
+    :param folder: the Folder whose content to upload
+    :param local_copy_list: list of tuples (src_abs_path, dest_rel_path) of local files to upload as well
+    :raise IOError: if unpacking the archive on the remote failed
     """
-    scheduler = calculation.get_computer().get_scheduler()
-    scheduler.set_transport(transport)
+    import tarfile
+    import tempfile
+    from aiida.common.utils import escape_for_bash
 
-    job_id = calculation.get_job_id()
+    archive_name = '.aiida_upload.tar.gz'
 
-    kwargs = {'as_dict': True}
+    with tempfile.NamedTemporaryFile(suffix='.tar.gz') as handle:
+        with tarfile.open(fileobj=handle, mode='w:gz') as archive:
+            for filename in folder.get_content_list():
+                archive.add(folder.get_abs_path(filename), arcname=filename)
+
+            # Like `Transport.put`, a file copied to an existing folder ends up inside of it
+            for src_abs_path, dest_rel_path in local_copy_list:
+                if folder.isdir(dest_rel_path):
+                    dest_rel_path = os.path.join(dest_rel_path, os.path.split(src_abs_path)[1])
+                archive.add(src_abs_path, arcname=dest_rel_path)
+
+        handle.flush()
+        transport.putfile(handle.name, archive_name)
+
+    command = 'tar -xzf {archive} && rm -f {archive}'.format(archive=escape_for_bash(archive_name))
+    retval, stdout, stderr = transport.exec_command_wait(command)
+
+    if retval != 0:
+        raise IOError("Error while unpacking the uploaded archive. Exit code: {}, stdout: '{}', stderr: '{}', "
+                      "command: '{}'".format(retval, stdout, stderr, command))
+
+
+def _batch_remote_copy(calculation, transport, remote_copy_list, logger_extra=None):
+    """
+    Perform all the entries of the remote_copy_list that are on the same machine and whose source contains no
+    wildcards with a single remote shell command.
+
+    :param calculation: the instance of JobCalculation being submitted.
+    :param transport: an already opened transport, whose current working directory is the remote working directory
+    :param remote_copy_list: list of tuples (remote_computer_uuid, remote_abs_path, dest_rel_path)
+    :return: the entries of the remote_copy_list that were not copied
+    :raise IOError: if the copy command failed
+    """
+    from aiida.common.utils import escape_for_bash
+
+    computer_uuid = calculation.get_computer().uuid
+    batched = []
+    remaining = []
+
+    for entry in remote_copy_list:
+        remote_computer_uuid, remote_abs_path, _ = entry
+        if remote_computer_uuid == computer_uuid and not transport.has_magic(remote_abs_path):
+            batched.append(entry)
+        else:
+            remaining.append(entry)
+
+    if not batched:
+        return remaining
+
+    command = ' && '.join('cp -r -f {} {}'.format(escape_for_bash(remote_abs_path), escape_for_bash(dest_rel_path))
+                          for _, remote_abs_path, dest_rel_path in batched)
+
+    execlogger.debug("[submission of calculation {}] "
+                     "copying {} remote resources with a single command".format(calculation.pk, len(batched)),
+                     extra=logger_extra)
+
+    retval, stdout, stderr = transport.exec_command_wait(command)
+
+    if retval != 0:
+        execlogger.warning("[submission of calculation {}] "
+                           "Unable to copy remote resources! Stopping.".format(calculation.pk),
+                           extra=logger_extra)
+        raise IOError("Error while executing cp. Exit code: {}, stdout: '{}', stderr: '{}', "
+                      "command: '{}'".format(retval, stdout, stderr, command))
+
+    return remaining
 
-    if scheduler.get_feature('can_query_by_user'):
-        kwargs['user'] = "$USER"
-    else:
-        # In general schedulers can either query by user or by jobs, but not both
-        # (see also docs of the Scheduler class)
-        kwargs['jobs'] = [job_id]
 
-    found_jobs = scheduler.getJobs(**kwargs)
-    job_info = found_jobs.get(job_id, None)
+def update_calculation(calculation, job_info):
+    """
+    Update the scheduler state of a calculation from the information returned by the scheduler
+
+    The scheduler is not queried by this function: the job infos of all the calculations running on a given computer
+    are retrieved in a single scheduler query by the `JobManager` of the runner, see `aiida.work.job_calcs`.
 
+    :param calculation: the instance of JobCalculation to update.
+    :param job_info: the `JobInfo` of the job as returned by the scheduler, or None if the job was not found
+    :return: True if the job is done, False otherwise
+    """
     if job_info is None:
         # If the job is computed or not found assume it's done
         job_done = True
@@ -232,15 +316,25 @@ def update_calculation(calculation, transport):
         job_done = job_info.job_state == JOB_STATES.DONE
         update_job_calc_from_job_info(calculation, job_info)
 
-    if job_done:
-        try:
-            detailed_job_info = scheduler.get_detailed_jobinfo(job_id)
-        except exceptions.FeatureNotAvailable:
-            detailed_job_info = ('This scheduler does not implement get_detailed_jobinfo')
+    return job_done
 
-        update_job_calc_from_detailed_job_info(calculation, detailed_job_info)
 
-    return job_done
+def retrieve_detailed_job_info(calculation, transport):
+    """
+    Retrieve the detailed job info of a completed job calculation from the scheduler and store it on the calculation
+
+    :param calculation: the instance of JobCalculation to update.
+    :param transport: an already opened transport to use to query the scheduler
+    """
+    scheduler = calculation.get_computer().get_scheduler()
+    scheduler.set_transport(transport)
+
+    try:
+        detailed_job_info = scheduler.get_detailed_jobinfo(calculation.get_job_id())
+    except exceptions.FeatureNotAvailable:
+        detailed_job_info = ('This scheduler does not implement get_detailed_jobinfo')
+
+    update_job_calc_from_detailed_job_info(calculation, detailed_job_info)
 
 
 def retrieve_calculation(calculation, transport, retrieved_temporary_folder):
@@ -271,6 +365,9 @@ def retrieve_calculation(calculation, transport, retrieved_temporary_folder):
         link_type=LinkType.CREATE)
 
     with transport:
+        # The job is done, so first get the detailed job info from the scheduler
+        retrieve_detailed_job_info(calculation, transport)
+
         transport.chdir(workdir)
 
         # First, retrieve the files of folderdata
@@ -456,9 +553,12 @@ def _retrieve_singlefiles(job, transport, folder, retrieve_file_list, logger_ext
                          "to retrieve remote singlefile '{}'".format(
             job.pk, filename), extra=logger_extra)
         localfilename = os.path.join(folder.abspath, os.path.split(filename)[1])
-        transport.get(filename, localfilename, ignore_nonexisting=True)
         singlefile_list.append((linkname, subclassname, localfilename))
 
+    # retrieve all the singlefiles at once, so the transport can overlap the individual transfers
+    transport.get_many([filename for _, _, filename in retrieve_file_list],
+                       [localfilename for _, _, localfilename in singlefile_list], ignore_nonexisting=True)
+
     # ignore files that have not been retrieved
     singlefile_list = [i for i in singlefile_list if os.path.exists(i[2])]
 
@@ -499,23 +599,30 @@ def retrieve_files_from_list(calculation, transport, folder, retrieve_list):
     treated as the work directory of the folder and the depth integer determines
     upto what level of the original remotepath nesting the files will be copied.
 
+    The file patterns are expanded with a single listing per remote directory, after
+    which all the files are retrieved in one go through `Transport.get_many`.
+
     :param transport: the Transport instance
     :param folder: an absolute path to a folder to copy files in
     :param retrieve_list: the list of files to retrieve
     """
+    glob_remote = _CachedRemoteGlob(transport)
+    remote_paths = []
+    local_paths = []
+
     for item in retrieve_list:
         if isinstance(item, list):
             tmp_rname, tmp_lname, depth = item
             # if there are more than one file I do something differently
             if transport.has_magic(tmp_rname):
-                remote_names = transport.glob(tmp_rname)
+                remote_names = glob_remote(tmp_rname)
                 local_names = []
                 for rem in remote_names:
                     to_append = rem.split(os.path.sep)[-depth:] if depth > 0 else []
                     local_names.append(os.path.sep.join([tmp_lname] + to_append))
             else:
                 remote_names = [tmp_rname]
-                to_append = remote_names.split(os.path.sep)[-depth:] if depth > 0 else []
+                to_append = tmp_rname.split(os.path.sep)[-depth:] if depth > 0 else []
                 local_names = [os.path.sep.join([tmp_lname] + to_append)]
             if depth > 1:  # create directories in the folder, if needed
                 for this_local_file in local_names:
@@ -526,7 +633,7 @@ def retrieve_files_from_list(calculation, transport, folder, retrieve_list):
                         os.makedirs(new_folder)
         else:  # it is a string
             if transport.has_magic(item):
-                remote_names = transport.glob(item)
+                remote_names = glob_remote(item)
                 local_names = [os.path.split(rem)[1] for rem in remote_names]
             else:
                 remote_names = [item]
@@ -534,4 +641,39 @@ def retrieve_files_from_list(calculation, transport, folder, retrieve_list):
 
         for rem, loc in zip(remote_names, local_names):
             transport.logger.debug("[retrieval of calc {}] Trying to retrieve remote item '{}'".format(calculation.pk, rem))
-            transport.get(rem, os.path.join(folder, loc), ignore_nonexisting=True)
+            remote_paths.append(rem)
+            local_paths.append(os.path.join(folder, loc))
+
+    transport.get_many(remote_paths, local_paths, ignore_nonexisting=True)
+
+
+class _CachedRemoteGlob(object):
+    """
+    Expand remote pathname patterns, listing each remote directory only once.
+
+    Patterns whose directory part does not contain wildcards are matched locally against
+    the cached directory listing; other patterns fall back to `Transport.glob`.
+    """
+
+    def __init__(self, transport):
+        self._transport = transport
+        self._listings = {}
+
+    def __call__(self, pathname):
+        import fnmatch
+
+        dirname, basename = os.path.split(pathname)
+        if not basename or self._transport.has_magic(dirname):
+            return self._transport.glob(pathname)
+
+        if dirname not in self._listings:
+            try:
+                self._listings[dirname] = self._transport.listdir(dirname or '.')
+            except EnvironmentError:
+                self._listings[dirname] = []
+
+        names = self._listings[dirname]
+        if basename[0] != '.':
+            names = [name for name in names if name[0] != '.']
+
+        return [os.path.join(dirname, name) for name in fnmatch.filter(names, basename)]
@@ -8,8 +8,70 @@
 # For further information please visit http://www.aiida.net               #
 ###########################################################################
 from __future__ import absolute_import
+import collections
+import struct
+import tempfile
+
 from aiida.orm import Data
 
+# The .npy files start with a magic string, the version and the length of the header
+_NPY_PREFIX_LENGTH = 10
+# The header, and therefore the data, is aligned as numpy does
+_NPY_ALIGNMENT = 64
+# Number of characters by which the shape in the header of an appendable array can grow
+_NPY_HEADER_ROOM = 32
+
+
+def _get_npy_header(shape, dtype):
+    """
+    Return the header of a .npy file in C order, without padding.
+    """
+    from numpy.lib.format import dtype_to_descr
+
+    shape = tuple(int(dim) for dim in shape)
+    return "{{'descr': {!r}, 'fortran_order': False, 'shape': {!r}, }}".format(dtype_to_descr(dtype), shape)
+
+
+def _get_npy_header_length(shape, dtype, room=0):
+    """
+    Return the total length of an aligned .npy header for the given shape and dtype, with some room to spare.
+    """
+    length = _NPY_PREFIX_LENGTH + len(_get_npy_header(shape, dtype)) + 1 + room
+    return length + (-length % _NPY_ALIGNMENT)
+
+
+def _read_npy_header(handle):
+    """
+    Read the header of an open .npy file, leaving the file at the beginning of the data.
+
+    :return: a tuple with the shape, the fortran order, the dtype and the total length of the header
+    """
+    from numpy.lib import format as npy_format
+
+    handle.seek(0)
+    version = npy_format.read_magic(handle)
+    if version == (1, 0):
+        shape, fortran_order, dtype = npy_format.read_array_header_1_0(handle)
+    else:
+        shape, fortran_order, dtype = npy_format.read_array_header_2_0(handle)
+    return shape, fortran_order, dtype, handle.tell()
+
+
+def _write_npy_header(handle, shape, dtype, header_length):
+    """
+    Write a version 1.0 header at the beginning of an open .npy file, padded to the given total length.
+    """
+    from numpy.lib.format import magic
+
+    header = _get_npy_header(shape, dtype)
+    padding = header_length - _NPY_PREFIX_LENGTH - len(header) - 1
+    if padding < 0 or header_length - _NPY_PREFIX_LENGTH > 65535:
+        raise ValueError("A .npy header of length {} cannot contain the shape {}".format(header_length, shape))
+
+    handle.seek(0)
+    handle.write(magic(1, 0))
+    handle.write(struct.pack('<H', header_length - _NPY_PREFIX_LENGTH))
+    handle.write((header + ' ' * padding + '\n').encode('latin1'))
 
 
 class ArrayData(Data):
@@ -24,15 +86,22 @@ class ArrayData(Data):
       :py:meth:`.get_array` call, the array will be re-read from disk.
       If instead the ArrayData node has already been stored,
       the array is cached in memory after the first read, and the cached array
-      is used thereafter.
+      is used thereafter. The cache of each node holds at most
+      ``array_cache_max_bytes`` bytes: the least recently used arrays are
+      discarded first, and larger arrays are never cached.
       If too much RAM memory is used, you can clear the
-      cache with the :py:meth:`.clear_internal_cache` method.
+      cache with the :py:meth:`.clear_internal_cache` method, or read the
+      arrays with ``get_array(name, mmap=True)``, which maps the file in
+      memory instead of reading it.
     """
     array_prefix = "array|"
 
+    # Maximum number of bytes of the arrays cached in memory by each node
+    array_cache_max_bytes = 256 * 1024 * 1024
+
     def __init__(self, *args, **kwargs):
         super(ArrayData, self).__init__(*args, **kwargs)
-        self._cached_arrays = {}
+        self.clear_internal_cache()
 
     def delete_array(self, name):
         """
@@ -113,33 +182,71 @@ class ArrayData(Data):
         for name in self.get_arraynames():
             yield (name, self.get_array(name))
 
-    def get_array(self, name):
+    def get_array(self, name, mmap=False):
         """
         Return an array stored in the node
 
         :param name: The name of the array to return.
+        :param mmap: if True, return a read-only ``numpy.memmap`` of the
+            file, such that only the slices that are accessed are read from
+            disk. The map is kept by a stored node, and created again at every
+            call before storing. Arrays of python objects cannot be mapped,
+            and are read as usual.
         """
         import numpy
 
         # raw function used only internally
-        def get_array_from_file(self, name):
+        def get_array_from_file(self, name, mmap_mode=None):
             fname = '{}.npy'.format(name)
             if fname not in self.get_folder_list():
                 raise KeyError(
                     "Array with name '{}' not found in node pk= {}".format(
                         name, self.pk))
 
-            array = numpy.load(self.get_abs_path(fname))
+            try:
+                array = numpy.load(self.get_abs_path(fname), mmap_mode=mmap_mode)
+            except ValueError:
+                if mmap_mode is None:
+                    raise
+                # The dtype contains python objects
+                array = numpy.load(self.get_abs_path(fname))
             return array
 
         # Return with proper caching, but only after storing. Before, instead,
-        # always re-read from disk
+        # always re-read from disk, since the file can still be replaced
         if not self.is_stored:
-            return get_array_from_file(self, name)
+            return get_array_from_file(self, name, mmap_mode='r' if mmap else None)
+
+        if mmap:
+            # The map does not take memory, so it is kept as long as the node
+            if name not in self._mapped_arrays:
+                self._mapped_arrays[name] = get_array_from_file(self, name, mmap_mode='r')
+            return self._mapped_arrays[name]
+
+        try:
+            array = self._cached_arrays.pop(name)
+        except KeyError:
+            array = get_array_from_file(self, name)
         else:
-            if name not in self._cached_arrays:
-                self._cached_arrays[name] = get_array_from_file(self, name)
-            return self._cached_arrays[name]
+            self._cached_arrays_nbytes -= array.nbytes
+
+        self._cache_array(name, array)
+        return array
+
+    def _cache_array(self, name, array):
+        """
+        Put an array at the end of the cache, discarding the least recently
+        used arrays if the cache becomes larger than ``array_cache_max_bytes``.
+        """
+        if array.nbytes > self.array_cache_max_bytes:
+            return
+
+        self._cached_arrays[name] = array
+        self._cached_arrays_nbytes += array.nbytes
+
+        while self._cached_arrays_nbytes > self.array_cache_max_bytes:
+            _, discarded = self._cached_arrays.popitem(last=False)
+            self._cached_arrays_nbytes -= discarded.nbytes
 
     def clear_internal_cache(self):
         """
@@ -149,7 +256,9 @@ class ArrayData(Data):
         This function is useful if you want to keep the node in memory, but you
         do not want to waste memory to cache the arrays in RAM.
         """
-        self._cached_arrays = {}
+        self._cached_arrays = collections.OrderedDict()
+        self._cached_arrays_nbytes = 0
+        self._mapped_arrays = {}
 
     def set_array(self, name, array):
         """
@@ -189,6 +298,86 @@ class ArrayData(Data):
         self._set_attr("{}{}".format(self.array_prefix, name),
                        list(array.shape))
 
+    def _append_to_array(self, name, array):
+        """
+        Append a numpy array to the array with the given name along the first
+        axis, or create it if it does not exist yet. Can only be called before
+        storing.
+
+        Only the new elements are written at the end of the .npy file, and
+        its header is updated in place, such that arrays that do not fit in
+        memory can be built block by block. The header of an appendable file
+        leaves room for the shape to grow.
+
+        :param name: The name of the array.
+        :param array: The numpy array to append, with the same dtype and the
+            same dimensions, apart from the first one, of the existing array.
+        """
+        import numpy
+        from aiida.common.exceptions import ModificationNotAllowed
+
+        if self.is_stored:
+            raise ModificationNotAllowed(
+                "Cannot append to an array after storing the node")
+
+        if not isinstance(array, numpy.ndarray) or array.ndim == 0:
+            raise TypeError("ArrayData can only append numpy arrays with at "
+                            "least one dimension")
+        if array.dtype.hasobject:
+            raise TypeError("ArrayData cannot append arrays of python objects")
+
+        fname = '{}.npy'.format(name)
+        if fname not in self.get_folder_list():
+            self.set_array(name, array[:0])
+
+        path = self.get_abs_path(fname)
+        with open(path, 'rb') as handle:
+            shape, fortran_order, dtype, header_length = _read_npy_header(handle)
+
+        if shape[1:] != array.shape[1:] or dtype != array.dtype:
+            raise ValueError(
+                "Cannot append an array of shape {} and type {} to the array "
+                "'{}' of shape {} and type {}".format(
+                    array.shape, array.dtype, name, shape, dtype))
+
+        new_shape = (shape[0] + len(array),) + tuple(shape[1:])
+        if fortran_order or _get_npy_header_length(new_shape, dtype) > header_length:
+            # The file is rewritten once, with enough room for the header
+            self._reserve_npy_header(fname)
+            path = self.get_abs_path(fname)
+            with open(path, 'rb') as handle:
+                header_length = _read_npy_header(handle)[3]
+
+        with open(path, 'r+b') as handle:
+            # Drop anything after the existing data, e.g. left by an append that failed
+            handle.truncate(header_length + int(numpy.prod(shape)) * dtype.itemsize)
+            handle.seek(0, 2)
+            handle.write(numpy.ascontiguousarray(array).tobytes())
+            _write_npy_header(handle, new_shape, dtype, header_length)
+
+        self._set_attr("{}{}".format(self.array_prefix, name), list(new_shape))
+
+    def _reserve_npy_header(self, fname):
+        """
+        Rewrite a .npy file of the node in C order, with a header that leaves
+        room for the first dimension of the shape to grow. The data is copied
+        without being loaded in memory, unless it is in Fortran order.
+        """
+        import shutil
+        import numpy
+
+        path = self.get_abs_path(fname)
+        with open(path, 'rb') as source, tempfile.NamedTemporaryFile() as handle:
+            shape, fortran_order, dtype, _ = _read_npy_header(source)
+            header_length = _get_npy_header_length(shape, dtype, room=_NPY_HEADER_ROOM)
+            _write_npy_header(handle, shape, dtype, header_length)
+            if fortran_order:
+                handle.write(numpy.ascontiguousarray(numpy.load(path)).tobytes())
+            else:
+                shutil.copyfileobj(source, handle)
+            handle.flush()
+            self.add_path(handle.name, fname)
+
     def _validate(self):
         """
         Check if the list of .npy files stored inside the node and the
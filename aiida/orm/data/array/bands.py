@@ -42,6 +42,15 @@ def prepare_header_comment(uuid, plot_info, comment_char='#'):
 
     return "\n".join("{} {}".format(comment_char, l) for l in filetext)
 
+
+def _format_columns(table):
+    """
+    Format a 2D array of floats with 8 decimals, as a list of lines with the
+    values of each row separated by tabs.
+    """
+    line_template = "\t".join(["{:.8f}"] * table.shape[1])
+    return [line_template.format(*row) for row in table.tolist()]
+
 # TODO: set and get bands could have more functionalities: how do I know the number of bands for example?
 
 def find_bandgap(bandsdata, number_electrons=None, fermi_energy=None):
@@ -73,16 +82,6 @@ def find_bandgap(bandsdata, number_electrons=None, fermi_energy=None):
              float. The gap is None in case of a metal, zero when the homo is
              equal to the lumo (e.g. in semi-metals).
     """
-
-    def nint(num):
-        """
-        Stable rounding function
-        """
-        if (num > 0):
-            return int(num + .5)
-        else:
-            return int(num - .5)
-
     if fermi_energy and number_electrons:
         raise ValueError("Specify either the number of electrons or the "
                          "Fermi energy, but not both")
@@ -97,7 +96,7 @@ def find_bandgap(bandsdata, number_electrons=None, fermi_energy=None):
         # spin up and spin down array
 
         # put all spins on one band per kpoint
-        bands = numpy.concatenate([_ for _ in stored_bands], axis=1)
+        bands = numpy.concatenate(stored_bands, axis=1)
     else:
         bands = stored_bands
 
@@ -119,7 +118,7 @@ def find_bandgap(bandsdata, number_electrons=None, fermi_energy=None):
                 # spin up and spin down array
 
                 # put all spins on one band per kpoint
-                occupations = numpy.concatenate([_ for _ in stored_occupations], axis=1)
+                occupations = numpy.concatenate(stored_occupations, axis=1)
             else:
                 occupations = stored_occupations
 
@@ -127,23 +126,30 @@ def find_bandgap(bandsdata, number_electrons=None, fermi_energy=None):
             # Note: I am sort of assuming that I have an electronic ground state
 
             # sort the bands by energy, and reorder the occupations accordingly
-            # since after joining the two spins, I might have unsorted stuff
-            bands, occupations = [numpy.array(y) for y in zip(*[list(zip(*j)) for j in
-                                                                [sorted(zip(i[0].tolist(), i[1].tolist()),
-                                                                        key=lambda x: x[0])
-                                                                 for i in zip(bands, occupations)]])]
-            number_electrons = int(round(sum([sum(i) for i in occupations]) / num_kpoints))
-
-            homo_indexes = [numpy.where(numpy.array([nint(_) for _ in x]) > 0)[0][-1] for x in occupations]
-            if len(set(homo_indexes)) > 1:  # there must be intersections of valence and conduction bands
+            # since after joining the two spins, I might have unsorted stuff.
+            # The sort is stable, such that degenerate levels keep their order
+            order = numpy.argsort(bands, axis=1, kind='mergesort')
+            kpoint_indexes = numpy.arange(num_kpoints)[:, numpy.newaxis]
+            bands = bands[kpoint_indexes, order]
+            occupations = occupations[kpoint_indexes, order]
+            number_electrons = int(round(occupations.sum() / num_kpoints))
+
+            # a level is occupied if its occupation rounds to a positive integer
+            occupied = occupations + .5 >= 1.
+            if not occupied.any(axis=1).all():
+                raise ValueError("There are kpoints without any occupied band")
+
+            # index of the last occupied level at every kpoint
+            homo_indexes = occupied.shape[1] - 1 - numpy.argmax(occupied[:, ::-1], axis=1)
+            if (homo_indexes != homo_indexes[0]).any():  # there must be intersections of valence and conduction bands
                 return False, None
             else:
-                homo = [_[0][_[1]] for _ in zip(bands, homo_indexes)]
-                try:
-                    lumo = [_[0][_[1] + 1] for _ in zip(bands, homo_indexes)]
-                except IndexError:
+                homo_index = homo_indexes[0]
+                if homo_index + 1 >= bands.shape[1]:
                     raise ValueError("To understand if it is a metal or insulator, "
                                      "need more bands than n_band=number_electrons")
+                homo = bands[:, homo_index]
+                lumo = bands[:, homo_index + 1]
 
         else:
             bands = numpy.sort(bands)
@@ -153,10 +159,10 @@ def find_bandgap(bandsdata, number_electrons=None, fermi_energy=None):
             # calculation, 2 otherwise)
             number_electrons_per_band = 4 - len(stored_bands.shape)  # 1 or 2
             # gather the energies of the homo band, for every kpoint
-            homo = [i[number_electrons // number_electrons_per_band - 1] for i in bands]  # take the nth level
+            homo = bands[:, number_electrons // number_electrons_per_band - 1]  # take the nth level
             try:
                 # gather the energies of the lumo band, for every kpoint
-                lumo = [i[number_electrons // number_electrons_per_band] for i in bands]  # take the n+1th level
+                lumo = bands[:, number_electrons // number_electrons_per_band]  # take the n+1th level
             except IndexError:
                 raise ValueError("To understand if it is a metal or insulator, "
                                  "need more bands than n_band=number_electrons")
@@ -167,7 +173,7 @@ def find_bandgap(bandsdata, number_electrons=None, fermi_energy=None):
             return False, None
 
         # if the nth band crosses the (n+1)th, it is an insulator
-        gap = min(lumo) - max(homo)
+        gap = lumo.min() - homo.max()
         if gap == 0.:
             return False, 0.
         elif gap < 0.:
@@ -182,8 +188,9 @@ def find_bandgap(bandsdata, number_electrons=None, fermi_energy=None):
         # I need the bands sorted by energy
         bands.sort()
 
-        levels = bands.transpose()
-        max_mins = [(max(i), min(i)) for i in levels]
+        # maxima and minima of every energy level over the kpoints
+        level_maxima = bands.max(axis=0)
+        level_minima = bands.min(axis=0)
 
         if fermi_energy > bands.max():
             raise ValueError("The Fermi energy is above all band energies, "
@@ -193,20 +200,19 @@ def find_bandgap(bandsdata, number_electrons=None, fermi_energy=None):
                              "don't know what to do.")
 
         # one band is crossed by the fermi energy
-        if any(i[1] < fermi_energy and fermi_energy < i[0] for i in max_mins):
+        if ((level_minima < fermi_energy) & (fermi_energy < level_maxima)).any():
             return False, None
 
         # case of semimetals, fermi energy at the crossing of two bands
         # this will only work if the dirac point is computed!
-        elif (any(i[0] == fermi_energy for i in max_mins) and
-                  any(i[1] == fermi_energy for i in max_mins)):
+        elif (level_maxima == fermi_energy).any() and (level_minima == fermi_energy).any():
             return False, 0.
         # insulating case
         else:
             # take the max of the band maxima below the fermi energy
-            homo = max([i[0] for i in max_mins if i[0] < fermi_energy])
+            homo = level_maxima[level_maxima < fermi_energy].max()
             # take the min of the band minima above the fermi energy
-            lumo = min([i[1] for i in max_mins if i[1] > fermi_energy])
+            lumo = level_minima[level_minima > fermi_energy].min()
             gap = lumo - homo
             if gap <= 0.:
                 raise Exception("Something wrong has been implemented. "
@@ -214,6 +220,126 @@ def find_bandgap(bandsdata, number_electrons=None, fermi_energy=None):
             return True, gap
 
 
+def _get_node_value(value, pk):
+    """
+    Return a parameter of the band gap of a node, given either for all nodes or as a dictionary keyed by pk.
+    """
+    if isinstance(value, dict):
+        return value.get(pk)
+    return value
+
+
+def _get_chunk_values(value, pks):
+    """
+    Return the parameter of the band gaps of a chunk of nodes, such that only the values of the chunk are sent to
+    the process analysing it.
+    """
+    if isinstance(value, dict):
+        return {pk: value[pk] for pk in pks if pk in value}
+    return value
+
+
+def _compute_bandgaps(args):
+    """
+    Load the BandsData nodes with the given pks and find their band gaps.
+
+    This is a module level function, such that it can be sent to the worker processes of a pool.
+
+    :param args: a tuple (pks, number_electrons, fermi_energy), see :py:func:`find_bandgaps`
+    :return: a list of tuples (pk, is_insulator, gap), where is_insulator and gap are None if the analysis failed
+    """
+    from aiida.orm.querybuilder import QueryBuilder
+
+    pks, number_electrons, fermi_energy = args
+
+    builder = QueryBuilder()
+    builder.append(BandsData, filters={'id': {'in': pks}}, project=['*'])
+
+    results = []
+    for node, in builder.iterall():
+        try:
+            is_insulator, gap = find_bandgap(
+                node,
+                number_electrons=_get_node_value(number_electrons, node.pk),
+                fermi_energy=_get_node_value(fermi_energy, node.pk))
+        except (AttributeError, KeyError, ValueError):
+            results.append((node.pk, None, None))
+        else:
+            results.append((node.pk, bool(is_insulator), None if gap is None else float(gap)))
+
+    return results
+
+
+def find_bandgaps(nodes, number_electrons=None, fermi_energy=None, processes=1, chunk_size=1000, store=True):
+    """
+    Find the band gaps of many stored BandsData nodes, optionally in a pool of processes, and store them as the
+    extras ``is_insulator`` and ``bandgap`` of the nodes, such that they can be queried for.
+
+    The nodes are analysed in chunks, each loaded with one query, and the extras of every batch of chunks are
+    written with one statement per extra. See :py:func:`find_bandgap` for the analysis of a single node.
+
+    :param nodes: an iterable of stored BandsData nodes or of their pks, or a QueryBuilder whose first projection
+        is either of them
+    :param number_electrons: (optional) number of electrons, either for all nodes or as a dictionary keyed by pk
+    :param fermi_energy: (optional) Fermi energy, either for all nodes or as a dictionary keyed by pk
+    :param processes: the number of processes analysing the nodes in parallel
+    :param chunk_size: the number of nodes loaded and analysed at once by a process
+    :param store: if True, store the results as extras of the nodes
+    :return: a dictionary mapping the pk of each node to a tuple (is_insulator, gap), or to None if the analysis
+        of the node failed, e.g. because it has no occupations; failed analyses are not stored
+    """
+    from aiida.orm.node import Node
+    from aiida.orm.querybuilder import QueryBuilder
+
+    if isinstance(nodes, QueryBuilder):
+        nodes = (row[0] for row in nodes.iterall())
+
+    pks = [node.pk if isinstance(node, Node) else int(node) for node in nodes]
+    chunks = iter([(
+        pks[i:i + chunk_size],
+        _get_chunk_values(number_electrons, pks[i:i + chunk_size]),
+        _get_chunk_values(fermi_energy, pks[i:i + chunk_size]),
+    ) for i in range(0, len(pks), chunk_size)])
+
+    pool = None
+    if processes > 1:
+        import multiprocessing
+        from aiida.backends.utils import close_db_connection
+
+        # The workers must not share the database connection of this process
+        close_db_connection()
+        pool = multiprocessing.Pool(processes)
+
+    bandgaps = {}
+
+    try:
+        while True:
+            # With a pool, one chunk is given to each process at a time, otherwise chunks are analysed one by one
+            batch = [chunk for _, chunk in zip(range(processes), chunks)]
+            if not batch:
+                break
+
+            if pool is not None:
+                results = pool.map(_compute_bandgaps, batch)
+            else:
+                results = [_compute_bandgaps(chunk) for chunk in batch]
+
+            results = [result for chunk_results in results for result in chunk_results]
+            for pk, is_insulator, gap in results:
+                bandgaps[pk] = None if is_insulator is None else (is_insulator, gap)
+
+            found = [result for result in results if result[1] is not None]
+            if store and found:
+                Node.set_extra_values_many('is_insulator', {pk: is_insulator for pk, is_insulator, _ in found})
+                Node.set_extra_values_many('bandgap', {pk: gap for pk, _, gap in found})
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    return bandgaps
+
+
 class BandsData(KpointsData):
     """
     Class to handle bands data
@@ -454,11 +580,11 @@ class BandsData(KpointsData):
         stored_bands = self.get_bands()
         if len(stored_bands.shape) == 2:
             bands = stored_bands
-            band_type_idx = numpy.array([0]*stored_bands.shape[1])
+            band_type_idx = numpy.zeros(stored_bands.shape[1], dtype=int)
             two_band_types = False
         elif len(stored_bands.shape) == 3:
-            bands = numpy.concatenate([_ for _ in stored_bands], axis=1)
-            band_type_idx = numpy.array([0] * stored_bands.shape[2] + [1] * stored_bands.shape[2])
+            bands = numpy.concatenate(stored_bands, axis=1)
+            band_type_idx = numpy.repeat([0, 1], stored_bands.shape[2])
             two_band_types = True
         else:
             raise ValueError("Unexpected shape of bands")
@@ -485,10 +611,11 @@ class BandsData(KpointsData):
         # since I can have discontinuous paths, I set on those points the distance to zero
         # as a result, where there are discontinuities in the path,
         # I have two consecutive points with the same x coordinate
-        distances = [numpy.linalg.norm(kpoints[i] - kpoints[i - 1]) if not
-        (i in labels_indices and i - 1 in labels_indices) else 0.
-                     for i in range(1, len(kpoints))]
-        x = [float(sum(distances[:i])) for i in range(len(distances) + 1)]
+        is_label = numpy.zeros(len(kpoints), dtype=bool)
+        is_label[labels_indices] = True
+        distances = numpy.linalg.norm(numpy.diff(kpoints, axis=0), axis=1)
+        distances[is_label[1:] & is_label[:-1]] = 0.
+        x = [0.] + numpy.cumsum(distances).tolist()
 
         # transform the index of the labels in the coordinates of x
         raw_labels = [(x[i[0]], i[1]) for i in labels]
@@ -675,9 +802,7 @@ class BandsData(KpointsData):
         if comments:
             return_text.append(prepare_header_comment(self.uuid, plot_info, comment_char="#"))
 
-        for i in zip(x, bands):
-            line = ["{:.8f}".format(i[0])] + ["{:.8f}".format(j) for j in i[1]]
-            return_text.append("\t".join(line))
+        return_text.extend(_format_columns(numpy.column_stack([x, bands])))
 
         return ("\n".join(return_text) + '\n').encode('utf-8'), {}
 
@@ -718,9 +843,7 @@ class BandsData(KpointsData):
         the_bands = numpy.transpose(bands)
 
         for b in the_bands:
-            for i in zip(x, b):
-                line = ["{:.8f}".format(i[0]), "{:.8f}".format(i[1])]
-                return_text.append("\t".join(line))
+            return_text.extend(_format_columns(numpy.column_stack([x, b])))
             return_text.append("")
             return_text.append("")
 
@@ -1211,13 +1334,7 @@ class BandsData(KpointsData):
                                                 )
 
         # build the arrays with the xy coordinates
-        all_sets = []
-        for b in the_bands:
-            this_set = ""
-            for i in zip(x, b):
-                line = "{:.8f}".format(i[0]) + '\t' + "{:.8f}".format(i[1]) + "\n"
-                this_set += line
-            all_sets.append(this_set)
+        all_sets = ["\n".join(_format_columns(numpy.column_stack([x, b]))) + "\n" for b in the_bands]
 
         set_descriptions = ""
         for i, (this_set, band_type) in enumerate(zip(all_sets, plot_info['band_type_idx'])):
@@ -38,7 +38,13 @@ class TrajectoryData(ArrayData):
     """
     Stores a trajectory (a sequence of crystal structures with timestamps, and
     possibly with velocities).
+
+    The trajectory can be set at once with :py:meth:`.set_trajectory`, or built
+    block by block with :py:meth:`.append_steps`, without keeping all the
+    steps in memory.
     """
+    # Number of steps read at once from disk when iterating over the steps
+    _steps_block_size = 1000
 
     def _internal_validate(self, stepids, cells, symbols, positions, times, velocities):
         """
@@ -157,6 +163,92 @@ class TrajectoryData(ArrayData):
             except KeyError:
                 pass
 
+    def append_steps(self, stepids, cells, positions, times=None, velocities=None, symbols=None):
+        """
+        Append a block of steps to the trajectory, after checking that types
+        and dimensions are correct. Only the new steps are written to disk, so
+        that a parser can store a long trajectory while reading it, without
+        keeping all of it in memory. Can only be called before storing.
+
+        The parameters have the same meaning as in :py:meth:`.set_trajectory`,
+        with ``s`` the number of steps of the block.
+
+        :param symbols: string array with the symbols of the sites, that must
+            be given when appending the first block. If given afterwards, it
+            must be equal to the symbols of the trajectory.
+        :raises ValueError: if the shapes are inconsistent, or the times or
+            velocities are given for some blocks only.
+        """
+        import numpy
+
+        numsteps = self.numsteps
+        if numsteps == 0:
+            if symbols is None:
+                raise ValueError("The symbols must be given with the first block of steps")
+            # Validate before writing anything
+            self._internal_validate(stepids, cells, symbols, positions, times, velocities)
+            for name in ('steps', 'cells', 'positions', 'times', 'velocities'):
+                try:
+                    self.delete_array(name)
+                except KeyError:
+                    pass
+            self.set_array('symbols', symbols)
+        else:
+            existing_symbols = self.get_symbols()
+            if symbols is not None and not numpy.array_equal(symbols, existing_symbols):
+                raise ValueError("The symbols must be the same for all the steps")
+            self._internal_validate(stepids, cells, existing_symbols, positions, times, velocities)
+
+            arraynames = self.get_arraynames()
+            for name, array in (('times', times), ('velocities', velocities)):
+                if (array is not None) != (name in arraynames):
+                    raise ValueError("The {} must be given for all the blocks of steps, or for none".format(name))
+
+        self._append_to_array('steps', stepids)
+        self._append_to_array('cells', cells)
+        self._append_to_array('positions', positions)
+        if times is not None:
+            self._append_to_array('times', times)
+        if velocities is not None:
+            self._append_to_array('velocities', velocities)
+
+    def _iter_step_blocks(self, names, start=0, stop=None, stepsize=1):
+        """
+        Iterate over blocks of steps of some arrays of the trajectory, reading
+        from disk only one block at a time.
+
+        :param names: the names of the arrays with one element per step
+        :param start: the index of the first step
+        :param stop: the index after the last step, by default the number of steps
+        :param stepsize: the stride between the steps
+        :return: an iterator over tuples with the range of the indices of the
+            steps of the block, and the block of each array
+        """
+        import numpy
+
+        if stop is None:
+            stop = self.numsteps
+        arrays = [self.get_array(name, mmap=True) for name in names]
+        block_size = stepsize * self._steps_block_size
+
+        for block_start in range(start, stop, block_size):
+            block_stop = min(block_start + block_size, stop)
+            blocks = [numpy.array(array[block_start:block_stop:stepsize]) for array in arrays]
+            yield (range(block_start, block_stop, stepsize),) + tuple(blocks)
+
+    def _iter_steps(self, names, start=0, stop=None, stepsize=1):
+        """
+        Iterate over the steps of some arrays of the trajectory, reading them
+        from disk by blocks of steps. The parameters are the same as for
+        :py:meth:`._iter_step_blocks`.
+
+        :return: an iterator over tuples with the index of the step and the
+            element of each array for that step
+        """
+        for blocks in self._iter_step_blocks(names, start, stop, stepsize):
+            for values in zip(*blocks):
+                yield values
+
     def set_structurelist(self, structurelist):
         """
         Create trajectory from the list of
@@ -190,17 +282,27 @@ class TrajectoryData(ArrayData):
         # check dimensions, types
         from aiida.common.exceptions import ValidationError
 
+        # Only the headers of the mapped files are read, not the whole trajectory
+        def get_mapped_array(name, optional=False):
+            try:
+                return self.get_array(name, mmap=True)
+            except (AttributeError, KeyError):
+                if optional:
+                    return None
+                raise
+
         try:
-            self._internal_validate(self.get_stepids(),
-                                    self.get_cells(),
-                                    self.get_symbols(), self.get_positions(),
-                                    self.get_times(),
-                                    self.get_velocities())
+            self._internal_validate(get_mapped_array('steps'),
+                                    get_mapped_array('cells'),
+                                    get_mapped_array('symbols'),
+                                    get_mapped_array('positions'),
+                                    get_mapped_array('times', optional=True),
+                                    get_mapped_array('velocities', optional=True))
         # Should catch TypeErrors, ValueErrors, and KeyErrors for missing arrays
         except Exception as exc:
             raise ValidationError("The TrajectoryData did not validate. "
                                   "Error: {} with message {}".format(
-                type(e).__name__, exc))
+                type(exc).__name__, exc))
 
     @property
     def numsteps(self):
@@ -348,19 +450,32 @@ class TrajectoryData(ArrayData):
            0 to ``self.numsteps - 1``.
         :raises IndexError: if you require an index beyond the limits.
         :raises KeyError: if you did not store the trajectory yet.
+
+        .. note:: Once the node is stored, the arrays are mapped in memory and
+           only the data of the requested step is read from disk.
         """
+        import numpy
+
         if index >= self.numsteps:
             raise IndexError("You have only {} steps, but you are looking beyond"
                              " (index={})".format(self.numsteps, index))
 
-        vel = self.get_velocities()
-        if vel is not None:
-            vel = vel[index, :, :]
-        time = self.get_times()
-        if time is not None:
-            time = time[index]
-        return (self.get_stepids()[index], time, self.get_cells()[index, :, :],
-                self.get_symbols(), self.get_positions()[index, :, :], vel)
+        def get_step_array(name, step_slice):
+            """Return a copy of a slice of an array, or None if it was not set."""
+            try:
+                array = self.get_array(name, mmap=True)
+            except (AttributeError, KeyError):
+                return None
+            value = array[step_slice]
+            return numpy.array(value) if isinstance(value, numpy.ndarray) else value
+
+        vel = get_step_array('velocities', numpy.s_[index, :, :])
+        time = get_step_array('times', index)
+        return (self.get_array('steps', mmap=True)[index], time,
+                numpy.array(self.get_array('cells', mmap=True)[index, :, :]),
+                numpy.array(self.get_array('symbols', mmap=True)),
+                numpy.array(self.get_array('positions', mmap=True)[index, :, :]),
+                vel)
 
 
     def step_to_structure(self, index, custom_kinds=None):
@@ -397,7 +512,7 @@ class TrajectoryData(ArrayData):
           meaning that the strings in the ``symbols`` array must be valid
           chemical symbols.
         """
-        from aiida.orm.data.structure import StructureData, Kind, Site
+        from aiida.orm.data.structure import StructureData, Kind
 
         # ignore step, time, and velocities
         _, _, cell, symbols, positions, _ = self.get_step_data(index)
@@ -423,8 +538,7 @@ class TrajectoryData(ArrayData):
         if custom_kinds is not None:
             for k in custom_kinds:
                 struc.append_kind(k)
-            for s, p in zip(symbols, positions):
-                struc.append_site(Site(kind_name=s, position=p))
+            struc.set_sites(positions, symbols)
         else:
             for s, p in zip(symbols, positions):
                 # Automatic species generation
@@ -439,40 +553,31 @@ class TrajectoryData(ArrayData):
         from aiida.common.constants import elements
         _atomic_numbers = {data['symbol']: num for num, data in elements.items()}
 
-        indices = list(range(self.numsteps))
-        if index is not None:
-            indices = [index]
-        return_string = "ANIMSTEPS {}\nCRYSTAL\n".format(len(indices))
+        if index is None:
+            start, stop = 0, self.numsteps
+        else:
+            start, stop = index, index + 1
+        lines = ["ANIMSTEPS {}\nCRYSTAL\n".format(stop - start)]
         # Do the checks once and for all here:
         structure = self.get_step_structure(index=0)
         if structure.is_alloy() or structure.has_vacancies():
             raise NotImplementedError("XSF for alloys or systems with "
                                       "vacancies not implemented.")
-        cells = self.get_cells()
-        positions = self.get_positions()
         symbols = self.get_symbols()
         atomic_numbers_list = [_atomic_numbers[s] for s in symbols]
         nat = len(symbols)
 
-        for idx in indices:
-            return_string += "PRIMVEC {}\n".format(idx+1)
-            #~ structure = self.get_step_structure(index=idx)
-            #~ sites = structure.sites
-            #~ if structure.is_alloy() or structure.has_vacancies():
-                #~ raise NotImplementedError("XSF for alloys or systems with "
-                                          #~ "vacancies not implemented.")
-            for cell_vector in cells[idx]:
-                return_string += " ".join(["{:18.5f}".format(i) for i in cell_vector])
-                return_string += "\n"
-            return_string += "PRIMCOORD {}\n".format(idx+1)
-            return_string += "{} 1\n" .format(nat)
-            for atn, pos in zip(atomic_numbers_list, positions[idx]):
-                try:
-                    return_string += "{} {:18.10f} {:18.10f} {:18.10f}\n".format(atn, pos[0], pos[1], pos[2] )
-                except:
-                    print(atn, pos)
-                    raise
-        return return_string.encode('utf-8'), {}
+        # The steps are read from disk block by block
+        for idx, cell, positions in self._iter_steps(('cells', 'positions'), start, stop):
+            lines.append("PRIMVEC {}\n".format(idx+1))
+            for cell_vector in cell:
+                lines.append(" ".join(["{:18.5f}".format(i) for i in cell_vector]))
+                lines.append("\n")
+            lines.append("PRIMCOORD {}\n".format(idx+1))
+            lines.append("{} 1\n" .format(nat))
+            for atn, pos in zip(atomic_numbers_list, positions):
+                lines.append("{} {:18.10f} {:18.10f} {:18.10f}\n".format(atn, pos[0], pos[1], pos[2]))
+        return "".join(lines).encode('utf-8'), {}
 
     def _prepare_cif(self, trajectory_index=None, main_file_name=""):
         """
@@ -483,17 +588,18 @@ class TrajectoryData(ArrayData):
             import ase_loops, cif_from_ase, pycifrw_from_cif
         from aiida.common.utils import HiddenPrints
 
-        cif = ""
-        indices = list(range(self.numsteps))
+        cifs = []
+        indices = range(self.numsteps)
         if trajectory_index is not None:
             indices = [trajectory_index]
+        # Each step is read from disk on its own by get_step_structure
         for idx in indices:
             structure = self.get_step_structure(idx)
             ciffile = pycifrw_from_cif(cif_from_ase(structure.get_ase()),
                                        ase_loops)
             with HiddenPrints():
-                cif = cif + ciffile.WriteOut()
-        return cif.encode('utf-8'), {}
+                cifs.append(ciffile.WriteOut())
+        return "".join(cifs).encode('utf-8'), {}
 
     def _prepare_tcod(self, main_file_name="", **kwargs):
         """
@@ -717,19 +823,19 @@ class TrajectoryData(ArrayData):
         from ase.data import covalent_radii, atomic_numbers
         from aiida.common.exceptions import InputValidationError
 
-        def collapse_into_unit_cell(point, cell):
+        def collapse_into_unit_cell(points, cell):
             """
             Applies linear transformation to coordinate system based on crystal
             lattice, vectors. The inverse of that inverse transformation matrix with the
-            point given results in the point being given as a multiples of lattice vectors
+            points given results in the points being given as a multiples of lattice vectors
             Than take the integer of the rows to find how many times you have to shift
-            the point back"""
-            invcell = np.matrix(cell).T.I
-            # point in crystal coordinates
-            points_in_crystal = np.dot(invcell,point).tolist()[0]
-            #point collapsed into unit cell
-            points_in_unit_cell = [i%1 for i in points_in_crystal]
-            return np.dot(cell.T, points_in_unit_cell).tolist()
+            the points back"""
+            invcell = np.linalg.inv(cell)
+            # points in crystal coordinates
+            points_in_crystal = np.dot(points, invcell)
+            #points collapsed into unit cell
+            points_in_unit_cell = points_in_crystal % 1
+            return np.dot(points_in_unit_cell, cell)
 
 
         elements = kwargs.pop('elements', None)
@@ -749,32 +855,32 @@ class TrajectoryData(ArrayData):
             maxindex = len(times)
         else:
             maxindex = np.argmin(times < maxtime)
-        positions = self.get_positions()[minindex:maxindex:stepsize]
-
 
         try:
             if self.get_attr('units|positions') in ('bohr', 'atomic'):
                 from aiida.common.constants import bohr_to_ang
-                positions *= bohr_to_ang
+                factor = bohr_to_ang
+            else:
+                factor = 1.
         except KeyError:
-            pass
+            factor = 1.
 
         symbols = self.get_symbols()
         if elements is None:
             elements = set(symbols)
 
         cell = np.array(self.get_cells()[0])
-        storage_dict = {s:{} for s in elements}
-        for ele in elements:
-                storage_dict[ele] = [np.array([]),np.array([]),np.array([])]
-        for iat, ele in enumerate(symbols):
-            if ele in elements:
-                for idim in range(3):
-                    storage_dict[ele][idim] = np.concatenate((storage_dict[ele][idim], positions[:,iat,idim].flatten()))
+        site_indices = {ele: [iat for iat, sym in enumerate(symbols) if sym == ele] for ele in elements}
+        storage_dict = {ele: [] for ele in elements}
+
+        # The positions are read from disk block by block, and only those of the requested elements are kept
+        for _, positions in self._iter_step_blocks(('positions',), minindex, maxindex, stepsize):
+            for ele in elements:
+                storage_dict[ele].append(positions[:, site_indices[ele]].reshape(-1, 3) * factor)
 
         for ele in elements:
-            storage_dict[ele] = np.array(storage_dict[ele]).T
-            storage_dict[ele] = np.array([collapse_into_unit_cell(pos, cell) for pos in storage_dict[ele]]).T
+            points = np.concatenate(storage_dict[ele]) if storage_dict[ele] else np.zeros((0, 3))
+            storage_dict[ele] = collapse_into_unit_cell(points, cell).T
 
         white = (1,1,1)
         mlab.figure(bgcolor=white, size=(1080, 720))
@@ -982,14 +982,16 @@ class StructureData(Data):
             raise ValidationError(
                 "Unable to validate the sites: {}".format(exc))
 
-        for site in sites:
-            if site.kind_name not in [k.name for k in kinds]:
-                raise ValidationError(
-                    "A site has kind {}, but no specie with that name exists"
-                    "".format(site.kind_name))
+        kind_names = set(k.name for k in kinds)
+        site_kind_names = set(s.kind_name for s in sites)
+
+        sites_without_kinds = site_kind_names - kind_names
+        if sites_without_kinds:
+            raise ValidationError(
+                "A site has kind {}, but no specie with that name exists"
+                "".format(sorted(sites_without_kinds)[0]))
 
-        kinds_without_sites = (
-            set(k.name for k in kinds) - set(s.kind_name for s in sites))
+        kinds_without_sites = kind_names - site_kind_names
         if kinds_without_sites:
             raise ValidationError("The following kinds are defined, but there "
                                   "are no sites with that kind: {}".format(
@@ -1172,14 +1174,13 @@ class StructureData(Data):
         self.set_pbc(pbc)
 
         # Calculating the minimal cell:
-        positions = np.array([site.position for site in self.sites])
+        positions = self.get_positions()
         position_min, position_max = get_extremas_from_positions(positions)
 
         # Translate the structure to the origin, such that the minimal values in each dimension
         # amount to (0,0,0)
         positions -= position_min
-        for index, site in enumerate(self.get_attr('sites')):
-            site['position'] = list(positions[index])
+        self.set_sites(positions, self.get_site_kindnames())
 
         # The orthorhombic cell that (just) accomodates the whole structure is now given by the
         # extremas of position in each dimension:
@@ -1262,10 +1263,7 @@ class StructureData(Data):
             used to group and/or order the symbols in the formula
         """
 
-        symbol_list = [self.get_kind(s.kind_name).get_symbols_string()
-                       for s in self.sites]
-
-        return get_formula(symbol_list, mode=mode, separator=separator)
+        return get_formula(self._get_site_symbols(), mode=mode, separator=separator)
 
     def get_site_kindnames(self):
         """
@@ -1278,7 +1276,14 @@ class StructureData(Data):
 
         :return: a list of strings
         """
-        return [this_site.kind_name for this_site in self.sites]
+        return [site['kind_name'] for site in self.get_attr('sites', [])]
+
+    def _get_site_symbols(self):
+        """
+        Return the list of the symbols strings of the kinds of the sites, building each kind only once.
+        """
+        symbols = {kind.name: kind.get_symbols_string() for kind in self.kinds}
+        return [symbols[kind_name] for kind_name in self.get_site_kindnames()]
 
     def get_composition(self):
         """
@@ -1290,14 +1295,9 @@ class StructureData(Data):
 
         :returns: a dictionary with the composition
         """
-        symbols_list = [self.get_kind(s.kind_name).get_symbols_string()
-                        for s in self.sites]
-        composition = {
-            symbol: symbols_list.count(symbol)
-            for symbol
-            in set(symbols_list)
-            }
-        return composition
+        from collections import Counter
+
+        return dict(Counter(self._get_site_symbols()))
 
     def get_ase(self):
         """
@@ -1385,7 +1385,7 @@ class StructureData(Data):
 
         new_kind = Kind(kind=kind)  # So we make a copy
 
-        if kind.name in [k.name for k in self.kinds]:
+        if kind.name in self.get_kind_names():
             raise ValueError("A kind with the same name ({}) already exists."
                              "".format(kind.name))
 
@@ -1415,14 +1415,76 @@ class StructureData(Data):
 
         new_site = Site(site=site)  # So we make a copy
 
-        if site.kind_name not in [k.name for k in self.kinds]:
+        kind_names = self.get_kind_names()
+        if site.kind_name not in kind_names:
             raise ValueError("No kind with name '{}', available kinds are: "
-                             "{}".format(site.kind_name,
-                                         [k.name for k in self.kinds]))
+                             "{}".format(site.kind_name, kind_names))
 
         # If here, no exceptions have been raised, so I add the site.
         self._append_to_attr('sites', new_site.get_raw())
 
+    def set_sites(self, positions, kind_names):
+        """
+        Replace all the sites of the
+        :py:class:`StructureData <aiida.orm.data.structure.StructureData>`
+        at once, much faster than appending them one by one.
+
+        :param positions: the positions of the sites, in angstrom, as an Nx3
+            array or list of lists
+        :param kind_names: the N names of the kinds of the sites, that must
+            have been appended to the structure already
+
+        :raise ValueError: if the positions are not an Nx3 array of floats, or
+            a kind name is unknown
+        """
+        import numpy as np
+        from aiida.common.exceptions import ModificationNotAllowed
+
+        if self.is_stored:
+            raise ModificationNotAllowed(
+                "The StructureData object cannot be modified, "
+                "it has already been stored")
+
+        try:
+            positions = np.array(positions, dtype=np.float64)
+        except (ValueError, TypeError):
+            raise ValueError("Wrong format for the positions, must be a "
+                             "list of lists of three float numbers.")
+        if len(kind_names) == 0 and positions.size == 0:
+            positions = positions.reshape(0, 3)
+        if positions.ndim != 2 or positions.shape[1] != 3:
+            raise ValueError("Wrong shape for the positions, must be Nx3; "
+                             "found instead {}".format(positions.shape))
+
+        kind_names = [six.text_type(kind_name) for kind_name in kind_names]
+        if len(kind_names) != len(positions):
+            raise ValueError("There are {} positions but {} kind names"
+                             "".format(len(positions), len(kind_names)))
+
+        existing_kind_names = self.get_kind_names()
+        unknown_kind_names = set(kind_names) - set(existing_kind_names)
+        if unknown_kind_names:
+            raise ValueError("No kind with name '{}', available kinds are: "
+                             "{}".format(sorted(unknown_kind_names)[0],
+                                         existing_kind_names))
+
+        # The raw sites are built directly in their clean form
+        sites = [{'position': position, 'kind_name': kind_name}
+                 for position, kind_name in zip(positions.tolist(), kind_names)]
+        self._set_attr('sites', sites, clean=False)
+
+    def get_positions(self):
+        """
+        Return the positions of all the sites, without building the Site
+        objects.
+
+        :return: a Nx3 numpy array of floats, in angstrom
+        """
+        import numpy as np
+
+        positions = [site['position'] for site in self.get_attr('sites', [])]
+        return np.array(positions, dtype=np.float64).reshape(-1, 3)
+
     def append_atom(self, **kwargs):
         """
         Append an atom to the Structure, taking care of creating the
@@ -1682,7 +1744,7 @@ class StructureData(Data):
 
         :return: a list of strings.
         """
-        return [k.name for k in self.kinds]
+        return [kind['name'] for kind in self.get_attr('kinds', [])]
 
     @property
     def cell(self):
@@ -1751,33 +1813,13 @@ class StructureData(Data):
         else:
 
             # test consistency of th enew input
-            n_sites = len(self.sites)
-            if n_sites != len(new_positions) and conserve_particle:
+            kind_names = self.get_site_kindnames()
+            if len(kind_names) != len(new_positions) and conserve_particle:
                 raise ValueError(
                     "the new positions should be as many as the previous structure.")
 
-            new_sites = []
-            for i in range(n_sites):
-                try:
-                    this_pos = [float(j) for j in new_positions[i]]
-                except ValueError:
-                    raise ValueError(
-                        "Expecting a list of floats. Found instead {}"
-                        .format(new_positions[i]))
-
-                if len(this_pos) != 3:
-                    raise ValueError("Expecting a list of lists of length 3. "
-                                     "found instead {}".format(len(this_pos)))
-
-                # now append this Site to the new_site list.
-                new_site = Site(site=self.sites[i])  # So we make a copy
-                new_site.position = copy.deepcopy(this_pos)
-                new_sites.append(new_site)
-
-            # now clear the old sites, and substitute with the new ones
-            self.clear_sites()
-            for this_new_site in new_sites:
-                self.append_site(this_new_site)
+            # set_sites checks that the positions are a list of lists of three floats
+            self.set_sites(new_positions, kind_names)
 
     @property
     def pbc(self):
@@ -48,39 +48,104 @@ _element_v2_regexp = re.compile(
    """, re.VERBOSE)
 
 
+# Pseudopotentials of the UPF families resolved in this process, mapping the pk of a family to a tuple
+# (members, pseudos), with the sorted pks of the nodes of the group and a dictionary {element: pk} of its UpfData
+_family_pseudos_cache = {}
+
+_FAMILY_MEMBERS = """
+    SELECT family.id, array_agg(membership.dbnode_id ORDER BY membership.dbnode_id)
+    FROM db_dbgroup AS family
+    LEFT JOIN db_dbgroup_dbnodes AS membership ON membership.dbgroup_id = family.id
+    WHERE family.name = %(name)s AND family.type = %(type)s
+    GROUP BY family.id
+"""
+
+
+def get_family_pseudos(family_name):
+    """
+    Return the pks of the UpfData nodes of a UPF family, per element.
+
+    The elements of the pseudopotentials are fetched with a single query, and
+    cached in this process. The cache of a family is only built again when the
+    nodes of the group change, which is checked with one query on its members.
+
+    :param family_name: the name of the UpfFamily group
+    :return: a dictionary {element: pk}
+    :raise NotExistent: if there is no UpfFamily group with the given name
+    :raise MultipleObjectsError: if more than one UPF for the same element is
+       found in the group.
+    """
+    from aiida.backends.utils import get_db_cursor
+    from aiida.common.exceptions import NotExistent, MultipleObjectsError
+    from aiida.orm.querybuilder import QueryBuilder
+
+    with get_db_cursor() as cursor:
+        cursor.execute(_FAMILY_MEMBERS, {'name': family_name, 'type': UpfData.upffamily_type_string})
+        rows = cursor.fetchall()
+
+    if not rows:
+        raise NotExistent("No UPF family named {} found".format(family_name))
+
+    # The members of an empty group are a single NULL, because of the left join
+    family_pk, members = rows[0]
+    members = tuple(pk for pk in members if pk is not None)
+
+    cached = _family_pseudos_cache.get(family_pk)
+    if cached is not None and cached[0] == members:
+        return cached[1]
+
+    family_pseudos = {}
+    if members:
+        builder = QueryBuilder()
+        builder.append(UpfData, filters={'id': {'in': members}}, project=['id', 'attributes.element'])
+        for pk, element in builder.iterall():
+            if element in family_pseudos:
+                raise MultipleObjectsError(
+                    "More than one UPF for element {} found in "
+                    "family {}".format(element, family_name))
+            family_pseudos[element] = pk
+
+    _family_pseudos_cache[family_pk] = (members, family_pseudos)
+
+    return family_pseudos
+
+
 def get_pseudos_from_structure(structure, family_name):
     """
     Given a family name (a UpfFamily group in the DB) and a AiiDA
     structure, return a dictionary associating each kind name with its
     UpfData object.
 
+    Only the pseudopotentials of the elements of the structure are loaded,
+    see :py:func:`get_family_pseudos` for how the family is resolved.
+
     :raise MultipleObjectsError: if more than one UPF for the same element is
        found in the group.
     :raise NotExistent: if no UPF for an element in the group is
        found in the group.
     """
-    from aiida.common.exceptions import NotExistent, MultipleObjectsError
+    from aiida.common.exceptions import NotExistent
+    from aiida.orm.querybuilder import QueryBuilder
 
-    family_pseudos = {}
-    family = UpfData.get_upf_group(family_name)
-    for node in family.nodes:
-        if isinstance(node, UpfData):
-            if node.element in family_pseudos:
-                raise MultipleObjectsError(
-                    "More than one UPF for element {} found in "
-                    "family {}".format(node.element, family_name))
-            family_pseudos[node.element] = node
+    family_pseudos = get_family_pseudos(family_name)
 
-    pseudo_list = {}
+    kind_pks = {}
     for kind in structure.kinds:
         symbol = kind.symbol
         try:
-            pseudo_list[kind.name] = family_pseudos[symbol]
+            kind_pks[kind.name] = family_pseudos[symbol]
         except KeyError:
             raise NotExistent("No UPF for element {} found in family {}".format(
                 symbol, family_name))
 
-    return pseudo_list
+    if not kind_pks:
+        return {}
+
+    builder = QueryBuilder()
+    builder.append(UpfData, filters={'id': {'in': list(set(kind_pks.values()))}}, project=['*'])
+    pseudos = {node.pk: node for node, in builder.iterall()}
+
+    return {kind_name: pseudos[pk] for kind_name, pk in kind_pks.items()}
 
 
 def get_pseudos_dict(structure, family_name):
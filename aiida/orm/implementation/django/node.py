@@ -16,7 +16,7 @@ import six
 
 from django.core.exceptions import ObjectDoesNotExist
 from django.db import IntegrityError, transaction
-from django.db.models import F
+from django.db.models import F, Q
 
 from aiida.backends.djsite.db.models import DbLink
 from aiida.common.exceptions import (InternalError, ModificationNotAllowed,
@@ -45,6 +45,23 @@ class Node(AbstractNode):
                 uuid, cls.__name__))
         return node
 
+    @classmethod
+    def _get_pks_by_hash(cls, hashes):
+        from aiida.backends.djsite.db.models import DbExtra
+
+        hashes = list(hashes)
+        pks_by_hash = {}
+        if not hashes:
+            return pks_by_hash
+
+        # The filter on the key and the text value is the one of the db_dbextra_aiida_hash partial index
+        query = DbExtra.objects.filter(key=_HASH_EXTRA_KEY, tval__in=hashes).order_by('dbnode_id').values_list(
+            'tval', 'dbnode__type', 'dbnode_id')
+        for hash_, type_string, pk in query:
+            pks_by_hash.setdefault((hash_, type_string), []).append(pk)
+
+        return pks_by_hash
+
     @classmethod
     def get_subclass_from_pk(cls, pk):
         from aiida.backends.djsite.db.models import DbNode
@@ -108,9 +125,7 @@ class Node(AbstractNode):
 
             self._dbnode = dbnode
 
-            # If this is changed, fix also the importer
-            self._repo_folder = RepositoryFolder(section=self._section_name,
-                                                 uuid=self.uuid)
+            # The repository folder is only created when it is first needed
 
         # NO VALIDATION ON __init__ BY DEFAULT, IT IS TOO SLOW SINCE IT OFTEN
         # REQUIRES MULTIPLE DB HITS
@@ -355,6 +370,61 @@ class Node(AbstractNode):
                                    stop_if_existing=exclusive)
         self._increment_version_number_db()
 
+    @classmethod
+    def _set_db_extras_many(cls, nodes, extras):
+        import operator
+        from aiida.backends.djsite.db.models import DbExtra, DbNode
+
+        if not nodes or not extras:
+            return
+
+        pks = [node.pk for node in nodes]
+        # Also delete the subitems of a previous list or dictionary value
+        keys_query = reduce(
+            operator.or_, [Q(key=key) | Q(key__startswith='{}{}'.format(key, DbExtra._sep)) for key in extras])
+
+        with transaction.atomic():
+            DbExtra.objects.filter(keys_query, dbnode_id__in=pks).delete()
+            DbExtra.objects.bulk_create([
+                extra for pk in pks for key, value in extras.items()
+                for extra in DbExtra.create_value(key, value, subspecifier_value=DbNode(id=pk))
+            ])
+            DbNode.objects.filter(pk__in=pks).update(nodeversion=F('nodeversion') + 1)
+
+        # Reload the nodes, to have the incremented version in memory
+        dbnodes = DbNode.objects.in_bulk(pks)
+        for node in nodes:
+            node._dbnode = dbnodes[node.pk]
+
+    @classmethod
+    def _set_db_extra_values_many(cls, key, values):
+        from aiida.backends.djsite.db.models import DbExtra, DbNode
+
+        pks = list(values)
+        with transaction.atomic():
+            # Also delete the subitems of a previous list or dictionary value
+            DbExtra.objects.filter(dbnode_id__in=pks).filter(
+                Q(key=key) | Q(key__startswith='{}{}'.format(key, DbExtra._sep))).delete()
+            DbExtra.objects.bulk_create([
+                extra for pk, value in values.items()
+                for extra in DbExtra.create_value(key, value, subspecifier_value=DbNode(id=pk))
+            ])
+            DbNode.objects.filter(pk__in=pks).update(nodeversion=F('nodeversion') + 1)
+
+    @classmethod
+    def _set_db_hashes(cls, hashes):
+        from aiida.backends.djsite.db.models import DbExtra, DbNode
+
+        pks = list(hashes)
+        with transaction.atomic():
+            DbExtra.objects.filter(dbnode_id__in=pks, key=_HASH_EXTRA_KEY).delete()
+            DbExtra.objects.bulk_create([
+                DbExtra(dbnode_id=pk, key=_HASH_EXTRA_KEY, datatype='txt' if hash_ is not None else 'none',
+                        tval=hash_ if hash_ is not None else '')
+                for pk, hash_ in hashes.items()
+            ])
+            DbNode.objects.filter(pk__in=pks).update(nodeversion=F('nodeversion') + 1)
+
     def _reset_db_extras(self, new_extras):
         raise NotImplementedError("Reset of extras has not been implemented"
                                   "for Django backend.")
@@ -619,7 +689,7 @@ class Node(AbstractNode):
         from django.db import transaction
         from aiida.common.utils import EmptyContextManager
         from aiida.common.exceptions import ValidationError
-        from aiida.backends.djsite.db.models import DbAttribute
+        from aiida.backends.djsite.db.models import DbAttribute, DbExtra
         import aiida.orm.autogroup
 
         if with_transaction:
@@ -634,6 +704,8 @@ class Node(AbstractNode):
         # I assume that if a node exists in the DB, its folder is in place.
         # On the other hand, periodically the user might need to run some
         # bookkeeping utility to check for lone folders.
+        # The hash is computed on the sandbox folder, and stored with the node such that it is always in the index
+        hash_ = self.get_hash()
         self._repository_folder.replace_with_folder(
             self._get_temp_folder().abspath, move=True, overwrite=True)
 
@@ -648,6 +720,8 @@ class Node(AbstractNode):
                 DbAttribute.reset_values_for_node(self._dbnode,
                                                   attributes=self._attrs_cache,
                                                   with_transaction=False)
+                # I store the hash without cleaning and without incrementing the nodeversion number
+                DbExtra.set_value_for_node(self._dbnode, _HASH_EXTRA_KEY, hash_, with_transaction=False)
                 # This should not be used anymore: I delete it to
                 # possibly free memory
                 del self._attrs_cache
@@ -668,8 +742,6 @@ class Node(AbstractNode):
                 self._repository_folder.abspath, move=True, overwrite=True)
             raise
 
-        from aiida.backends.djsite.db.models import DbExtra
-        # I store the hash without cleaning and without incrementing the nodeversion number
-        DbExtra.set_value_for_node(self._dbnode, _HASH_EXTRA_KEY, self.get_hash())
+        self._repository_folder.deduplicate()
 
         return self
@@ -42,6 +42,10 @@ class AbstractComputer(object):
     """
     _logger = logging.getLogger(__name__)
 
+    PROPERTY_MINIMUM_SCHEDULER_POLL_INTERVAL = 'minimum_scheduler_poll_interval'
+    PROPERTY_MINIMUM_SCHEDULER_POLL_INTERVAL__DEFAULT = 10.
+    PROPERTY_ARCHIVE_UPLOAD = 'archive_upload'
+
     def __int__(self):
         """
         Convert the class to an integer. This is needed to allow querying with Django.
@@ -513,6 +517,50 @@ class AbstractComputer(object):
                 raise TypeError("def_cpus_per_machine must be an integer (or None)")
         self._set_property("default_mpiprocs_per_machine", def_cpus_per_machine)
 
+    def get_minimum_job_poll_interval(self):
+        """
+        Get the minimum interval in seconds between two consecutive queries of the scheduler
+        of this computer for the state of its jobs. All job update requests that arrive within
+        this interval are served by a single scheduler query.
+
+        :return: the minimum interval in seconds
+        :rtype: float
+        """
+        return self._get_property(self.PROPERTY_MINIMUM_SCHEDULER_POLL_INTERVAL,
+                                  self.PROPERTY_MINIMUM_SCHEDULER_POLL_INTERVAL__DEFAULT)
+
+    def set_minimum_job_poll_interval(self, interval):
+        """
+        Set the minimum interval in seconds between two consecutive queries of the scheduler
+        of this computer for the state of its jobs.
+
+        :param interval: the minimum interval in seconds, must be a non-negative number
+        """
+        if not isinstance(interval, (six.integer_types, float)) or interval < 0:
+            raise ValueError("the minimum job poll interval must be a non-negative number")
+        self._set_property(self.PROPERTY_MINIMUM_SCHEDULER_POLL_INTERVAL, float(interval))
+
+    def get_archive_upload(self):
+        """
+        Return whether the input files of calculations are uploaded to this computer as a single archive, which
+        requires the `tar` command to be available on the computer.
+
+        :return: True if archive upload is enabled, False otherwise
+        """
+        return self._get_property(self.PROPERTY_ARCHIVE_UPLOAD, False)
+
+    def set_archive_upload(self, val):
+        """
+        Set whether the input files of calculations are uploaded to this computer as a single archive, which is
+        unpacked remotely, instead of one file at a time. With archive upload, the copies of the remote_copy_list
+        are also performed with a single command.
+
+        :param val: boolean, True to enable archive upload
+        """
+        if not isinstance(val, bool):
+            raise TypeError("the archive upload flag must be a boolean")
+        self._set_property(self.PROPERTY_ARCHIVE_UPLOAD, val)
+
     @abstractmethod
     def get_transport_params(self):
         pass
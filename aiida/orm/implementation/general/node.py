@@ -25,7 +25,7 @@ import six
 from aiida.backends.utils import validate_attribute_key
 from aiida.common.caching import get_use_cache
 from aiida.common.exceptions import InternalError, ModificationNotAllowed, UniquenessError, ValidationError
-from aiida.common.folders import SandboxFolder
+from aiida.common.folders import RepositoryFolder, SandboxFolder
 from aiida.common.lang import override
 from aiida.common.links import LinkType
 from aiida.common.utils import abstractclassmethod
@@ -1135,6 +1135,96 @@ class AbstractNode(object):
         except AttributeError:
             raise AttributeError("set_extras takes a dictionary as argument")
 
+    @classmethod
+    def set_extras_many(cls, nodes, extras):
+        """
+        Immediately sets the same extras on several nodes, in the DB!
+        No .store() to be called.
+        Can be used *only* after saving. Backends that support it set the
+        extras of all nodes at once, rather than with one write per node and key.
+
+        :param nodes: an iterable of stored nodes
+        :param extras: a dictionary of key:value to be set as extras
+        :raise ModificationNotAllowed: if any of the nodes is not stored
+        """
+        if not isinstance(extras, dict):
+            raise TypeError("set_extras_many takes a dictionary as argument")
+
+        for key in extras:
+            validate_attribute_key(key)
+
+        nodes = list(nodes)
+        for node in nodes:
+            if node._to_be_stored:
+                raise ModificationNotAllowed(
+                    "The extras of a node can be set only after "
+                    "storing the node")
+
+        cls._set_db_extras_many(nodes, {key: clean_value(value) for key, value in extras.items()})
+
+    @classmethod
+    def _set_db_extras_many(cls, nodes, extras):
+        """
+        Store the same extras on several nodes directly in the DB, without checks.
+        By default the extras are set node by node, backends can override this
+        to do it in bulk.
+
+        DO NOT USE DIRECTLY.
+
+        :param nodes: a list of stored nodes
+        :param extras: a dictionary of key:value to be set as extras
+        """
+        for node in nodes:
+            for key, value in extras.items():
+                node._set_db_extra(key, value, False)
+
+    @classmethod
+    def set_extra_values_many(cls, key, values):
+        """
+        Immediately sets one extra to a different value on several nodes, in the DB!
+        No .store() to be called.
+        The extra of all nodes is written at once, rather than with one write
+        per node.
+
+        :param key: the key of the extra
+        :param values: a dictionary mapping the pk of each stored node to the
+            value of its extra
+        """
+        if not isinstance(values, dict):
+            raise TypeError("set_extra_values_many takes a dictionary as argument")
+
+        validate_attribute_key(key)
+
+        cls._set_db_extra_values_many(key, {int(pk): clean_value(value) for pk, value in values.items()})
+
+    @abstractclassmethod
+    def _set_db_extra_values_many(cls, key, values):
+        """
+        Store one extra with a different value on several nodes directly in
+        the DB, without checks, incrementing their nodeversion.
+
+        DO NOT USE DIRECTLY.
+
+        :param key: the key of the extra
+        :param values: a dictionary mapping the pk of each node to the value of its extra
+        """
+        pass
+
+    @classmethod
+    def _set_lazy_loading(cls, nodes):
+        """
+        Mark nodes that were loaded together, by a single query, whose
+        attributes and extras were not fetched yet. By default nothing is
+        done, backends can override this to load the attributes and extras
+        of all the nodes with a single query, the first time that they are
+        accessed on any of them.
+
+        DO NOT USE DIRECTLY.
+
+        :param nodes: a list of stored nodes
+        """
+        pass
+
     def reset_extras(self, new_extras):
         """
         Deletes existing extras and creates new ones.
@@ -1431,6 +1521,9 @@ class AbstractNode(object):
 
         :return: the permanent RepositoryFolder object
         """
+        # The folder of a node loaded from the DB is only created when it is first needed
+        if self._repo_folder is None:
+            self._repo_folder = RepositoryFolder(section=self._section_name, uuid=self.uuid)
         return self._repo_folder
 
     @property
@@ -1683,26 +1776,164 @@ class AbstractNode(object):
                 # call implementation-dependent store method
                 self._db_store(with_transaction)
 
-            # Set up autogrouping used by verdi run
-            from aiida.orm.autogroup import current_autogroup, Autogroup, VERDIAUTOGROUP_TYPE
-            from aiida.orm import Group
-
-            if current_autogroup is not None:
-                if not isinstance(current_autogroup, Autogroup):
-                    raise ValidationError(
-                        "current_autogroup is not an AiiDA Autogroup")
-
-                if current_autogroup.is_to_be_grouped(self):
-                    group_name = current_autogroup.get_group_name()
-                    if group_name is not None:
-                        g = Group.get_or_create(
-                            name=group_name, type_string=VERDIAUTOGROUP_TYPE)[0]
-                        g.add_nodes(self)
+            self._add_to_autogroup([self])
 
         # This is useful because in this way I can do
         # n = Node().store()
         return self
 
+    @staticmethod
+    def _add_to_autogroup(nodes):
+        """
+        Add the nodes that were just stored to the current autogroup, used
+        by verdi run, if there is one.
+
+        :param nodes: a list of stored nodes
+        """
+        from aiida.orm.autogroup import current_autogroup, Autogroup, VERDIAUTOGROUP_TYPE
+        from aiida.orm import Group
+
+        if current_autogroup is None:
+            return
+
+        if not isinstance(current_autogroup, Autogroup):
+            raise ValidationError(
+                "current_autogroup is not an AiiDA Autogroup")
+
+        to_be_grouped = [node for node in nodes if current_autogroup.is_to_be_grouped(node)]
+        if to_be_grouped:
+            group_name = current_autogroup.get_group_name()
+            if group_name is not None:
+                g = Group.get_or_create(
+                    name=group_name, type_string=VERDIAUTOGROUP_TYPE)[0]
+                g.add_nodes(to_be_grouped)
+
+    @classmethod
+    def store_many(cls, nodes, with_transaction=True, use_cache=None):
+        """
+        Store several new nodes at once, together with the links in the
+        cache between them or from nodes that are already stored.
+
+        Backends that support it insert the nodes and their links in bulk,
+        which is much faster than calling store() on each node. Nodes that
+        are already stored are skipped.
+
+        :param nodes: an iterable of nodes
+        :parameter with_transaction: if False, no transaction is used. This
+          is meant to be used ONLY if the outer calling function has already
+          a transaction open!
+        :param use_cache: Determines whether caching is used to find an
+          equivalent node, if None the default for the type of each node is used
+
+        :return: the list of the nodes, in the order in which they were stored
+        :raise ModificationNotAllowed: if one of the nodes has a cached input
+          link from an unstored node that is not part of the nodes to store
+        :raise ValueError: if the cached links between the nodes form a cycle
+        """
+        ordered = cls._sort_by_cached_links(nodes)
+
+        # As a first thing, I check if the data and the links are valid, since
+        # the backend may insert the links in bulk without _add_dblink_from
+        for node in ordered:
+            node._validate()
+            node._check_cached_input_links()
+
+        cls._db_store_many(ordered, with_transaction=with_transaction, use_cache=use_cache)
+
+        return ordered
+
+    def _check_cached_input_links(self):
+        """
+        Check the input links in the cache of an unstored node with the rules
+        applied when a link is added to the DB, see :meth:`.add_link_from`.
+
+        The links cannot create a loop: the node has no outputs in the DB yet,
+        and cycles between the cached links are refused by store_many.
+
+        :raise ValueError: if a link is not allowed
+        """
+        for label, (src, link_type) in self._inputlinks_cache.items():
+            if src.uuid == self.uuid:
+                raise ValueError("Cannot link to itself (label {})".format(label))
+            src._linking_as_output(self, link_type)
+
+    @staticmethod
+    def _sort_by_cached_links(nodes):
+        """
+        Sort the unstored nodes such that the sources of the cached input links
+        of every node come before the node itself.
+
+        :param nodes: an iterable of nodes
+        :return: the sorted list of unstored nodes
+        :raise ModificationNotAllowed: if a cached input link comes from an
+          unstored node that is not among the given nodes
+        :raise ValueError: if the cached links form a cycle
+        """
+        unstored = collections.OrderedDict()
+        for node in nodes:
+            if node._to_be_stored:
+                unstored[id(node)] = node
+
+        ordered = []
+        visited = set()
+        visiting = set()
+
+        for node in unstored.values():
+            # Iterative depth first visit, to avoid hitting the recursion
+            # limit for long chains of nodes
+            stack = [(node, False)]
+            while stack:
+                current, parents_done = stack.pop()
+                if parents_done:
+                    visiting.discard(id(current))
+                    visited.add(id(current))
+                    ordered.append(current)
+                    continue
+                if id(current) in visited:
+                    continue
+                if id(current) in visiting:
+                    raise ValueError(
+                        "The cached links between the nodes to store form a "
+                        "cycle through node with UUID={}".format(current.uuid))
+                visiting.add(id(current))
+                stack.append((current, True))
+                for label, (parent, _) in current._inputlinks_cache.items():
+                    if parent.is_stored or id(parent) in visited:
+                        continue
+                    if id(parent) not in unstored:
+                        raise ModificationNotAllowed(
+                            "Cannot store the input link '{}' because the "
+                            "source node is not stored and is not among the "
+                            "nodes to store".format(label))
+                    stack.append((parent, False))
+
+        return ordered
+
+    @classmethod
+    def _db_store_many(cls, nodes, with_transaction=True, use_cache=None):
+        """
+        Store several new nodes in the DB, together with their cached input
+        links. By default the nodes are stored one by one, backends can
+        override this to do it in bulk.
+
+        DO NOT USE DIRECTLY.
+
+        :param nodes: a list of validated unstored nodes, sorted such that the
+          sources of the cached input links of a node come before it
+        :parameter with_transaction: if False, no transaction is used.
+        :param use_cache: Determines whether caching is used to find an
+          equivalent node.
+        """
+        for node in nodes:
+            node.store(with_transaction=with_transaction, use_cache=use_cache)
+
+    def _has_custom_store(self):
+        """
+        Return whether the class of this node overrides store(), in which case
+        it can only be stored through it rather than in bulk.
+        """
+        return six.get_unbound_function(type(self).store) is not six.get_unbound_function(AbstractNode.store)
+
     def _store_from_cache(self, cache_node, with_transaction):
         from aiida.orm.mixins import Sealable
         assert self.type == cache_node.type
@@ -1807,6 +2038,33 @@ class AbstractNode(object):
         """
         self.set_extra(_HASH_EXTRA_KEY, None)
 
+    @classmethod
+    def rehash_many(cls, nodes):
+        """
+        Re-generates the stored hashes of several stored nodes, writing them all at once.
+
+        :param nodes: an iterable of stored nodes
+        :raise ModificationNotAllowed: if any of the nodes is not stored
+        """
+        hashes = {}
+        for node in nodes:
+            if node._to_be_stored:
+                raise ModificationNotAllowed("The hash of a node can be set only after storing the node")
+            hashes[node.pk] = node.get_hash()
+
+        cls._set_db_hashes(hashes)
+
+    @abstractclassmethod
+    def _set_db_hashes(cls, hashes):
+        """
+        Store the hashes of several nodes directly in the DB, without checks, incrementing their nodeversion.
+
+        DO NOT USE DIRECTLY.
+
+        :param hashes: a dictionary mapping the pk of each node to its hash
+        """
+        pass
+
     def _get_same_node(self):
         """
         Returns a stored node from which the current Node can be cached, meaning that the returned Node is a valid cache, and its ``_aiida_hash`` attribute matches ``self.get_hash()``.
@@ -1835,14 +2093,68 @@ class AbstractNode(object):
         if not self._cacheable:
             return iter(())
 
+        hash_ = self.get_hash()
+        if not hash_:
+            return iter(())
+
+        pks = self._get_pks_by_hash([hash_]).get((hash_, self.type), [])
+        nodes = self._load_nodes_by_pk(pks)
+        return (nodes[pk] for pk in pks if pk in nodes and nodes[pk]._is_valid_cache())
+
+    @classmethod
+    def find_cached(cls, nodes):
+        """
+        Return, for each of the given nodes, a stored node from which it can be cached, or None if there is none.
+
+        The hashes of all the nodes are resolved with a single query on the hash index, and the candidate nodes are
+        loaded with a second one, instead of two queries per node.
+
+        :param nodes: a list of nodes
+        :return: a list with the node to cache from, or None, for each of the given nodes
+        """
+        hashes = [node.get_hash() if node._cacheable else None for node in nodes]
+        pks_by_hash = cls._get_pks_by_hash(set(hash_ for hash_ in hashes if hash_))
+        candidates = cls._load_nodes_by_pk(set(pk for pks in pks_by_hash.values() for pk in pks))
+
+        cache_nodes = []
+        for node, hash_ in zip(nodes, hashes):
+            cache_node = None
+            for pk in pks_by_hash.get((hash_, node.type), []) if hash_ else []:
+                if pk in candidates and candidates[pk]._is_valid_cache():
+                    cache_node = candidates[pk]
+                    break
+            cache_nodes.append(cache_node)
+
+        return cache_nodes
+
+    @abstractclassmethod
+    def _get_pks_by_hash(cls, hashes):
+        """
+        Return the pks of the stored nodes with the given hashes, using the hash index of the backend.
+
+        :param hashes: an iterable of hashes
+        :return: a dictionary mapping a tuple (hash, type) to the sorted list of the pks of the nodes with that hash
+          and that type string
+        """
+        pass
+
+    @staticmethod
+    def _load_nodes_by_pk(pks):
+        """
+        Load the nodes with the given pks with a single query.
+
+        :param pks: an iterable of pks
+        :return: a dictionary mapping each pk to its node
+        """
+        from aiida.orm.node import Node
         from aiida.orm.querybuilder import QueryBuilder
 
-        hash_ = self.get_hash()
-        if hash_:
-            qb = QueryBuilder()
-            qb.append(self.__class__, filters={'extras._aiida_hash': hash_}, project='*', subclassing=False)
-            same_nodes = (n[0] for n in qb.iterall())
-        return (n for n in same_nodes if n._is_valid_cache())
+        pks = list(pks)
+        if not pks:
+            return {}
+
+        qb = QueryBuilder().append(Node, filters={'id': {'in': pks}}, project='*')
+        return {node.pk: node for node, in qb.iterall()}
 
     def _is_valid_cache(self):
         """
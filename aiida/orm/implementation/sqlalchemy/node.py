@@ -43,6 +43,9 @@ class Node(AbstractNode):
         super(Node, self).__init__()
 
         self._temp_folder = None
+        # Set by _set_lazy_loading for nodes whose attributes and extras are loaded for a whole batch
+        self._lazy_batch = None
+        self._lazy_columns = set()
 
         dbnode = kwargs.pop('dbnode', None)
 
@@ -62,8 +65,7 @@ class Node(AbstractNode):
 
             self._dbnode = dbnode
 
-            # If this is changed, fix also the importer
-            self._repo_folder = RepositoryFolder(section=self._section_name, uuid=self.uuid)
+            # The repository folder is only created when it is first needed
 
         else:
             user = self._backend.users.get_automatic_user()
@@ -105,6 +107,24 @@ class Node(AbstractNode):
         except DatabaseError as exc:
             raise ValueError(str(exc))
 
+    @classmethod
+    def _get_pks_by_hash(cls, hashes):
+        from aiida.backends.sqlalchemy import get_scoped_session
+
+        hashes = list(hashes)
+        pks_by_hash = {}
+        if not hashes:
+            return pks_by_hash
+
+        # The expression is the one of the ix_db_dbnode_aiida_hash index
+        hash_column = DbNode.extras[_HASH_EXTRA_KEY].astext
+        query = get_scoped_session().query(hash_column, DbNode.type, DbNode.id).filter(
+            hash_column.in_(hashes)).order_by(DbNode.id)
+        for hash_, type_string, pk in query:
+            pks_by_hash.setdefault((hash_, type_string), []).append(pk)
+
+        return pks_by_hash
+
     @classmethod
     def get_subclass_from_pk(cls, pk):
         from aiida.orm.querybuilder import QueryBuilder
@@ -349,8 +369,7 @@ class Node(AbstractNode):
         :param value: its value
         """
         try:
-            self._dbnode.set_attr(key, value)
-            self._increment_version_number_db()
+            self._dbnode.set_attr(key, value, increment_version=True)
         except:
             from aiida.backends.sqlalchemy import get_scoped_session
             session = get_scoped_session()
@@ -359,8 +378,7 @@ class Node(AbstractNode):
 
     def _del_db_attr(self, key):
         try:
-            self._dbnode.del_attr(key)
-            self._increment_version_number_db()
+            self._dbnode.del_attr(key, increment_version=True)
         except:
             from aiida.backends.sqlalchemy import get_scoped_session
             session = get_scoped_session()
@@ -378,14 +396,50 @@ class Node(AbstractNode):
             raise NotImplementedError("exclusive=True not implemented yet in SQLAlchemy backend")
 
         try:
-            self._dbnode.set_extra(key, value)
-            self._increment_version_number_db()
+            self._dbnode.set_extra(key, value, increment_version=True)
         except:
             from aiida.backends.sqlalchemy import get_scoped_session
             session = get_scoped_session()
             session.rollback()
             raise
 
+    @classmethod
+    def _set_db_extras_many(cls, nodes, extras):
+        try:
+            DbNode.set_extras_many([node.pk for node in nodes], extras, increment_version=True)
+        except:
+            from aiida.backends.sqlalchemy import get_scoped_session
+            session = get_scoped_session()
+            session.rollback()
+            raise
+
+    @classmethod
+    def _set_db_extra_values_many(cls, key, values):
+        try:
+            DbNode.set_extra_values_many(key, values, increment_version=True)
+        except:
+            from aiida.backends.sqlalchemy import get_scoped_session
+            session = get_scoped_session()
+            session.rollback()
+            raise
+
+    @classmethod
+    def _set_db_hashes(cls, hashes):
+        try:
+            DbNode.set_extra_values_many(_HASH_EXTRA_KEY, hashes, increment_version=True)
+        except:
+            from aiida.backends.sqlalchemy import get_scoped_session
+            session = get_scoped_session()
+            session.rollback()
+            raise
+
+    @classmethod
+    def _set_lazy_loading(cls, nodes):
+        batch = _LazyLoadingBatch([node._dbnode for node in nodes])
+        for node in nodes:
+            node._lazy_batch = batch
+            node._lazy_columns = set(_LazyLoadingBatch.columns)
+
     def _reset_db_extras(self, new_extras):
         try:
             self._dbnode.reset_extras(new_extras)
@@ -404,8 +458,7 @@ class Node(AbstractNode):
 
     def _del_db_extra(self, key):
         try:
-            self._dbnode.del_extra(key)
-            self._increment_version_number_db()
+            self._dbnode.del_extra(key, increment_version=True)
         except:
             from aiida.backends.sqlalchemy import get_scoped_session
             session = get_scoped_session()
@@ -669,6 +722,8 @@ class Node(AbstractNode):
         # I assume that if a node exists in the DB, its folder is in place.
         # On the other hand, periodically the user might need to run some
         # bookkeeping utility to check for lone folders.
+        # The hash is computed on the sandbox folder, and stored with the node such that it is always in the index
+        hash_ = self.get_hash()
         self._repository_folder.replace_with_folder(self._get_temp_folder().abspath, move=True, overwrite=True)
 
         try:
@@ -677,6 +732,7 @@ class Node(AbstractNode):
             # the version for each add.
             self._dbnode.attributes = self._attrs_cache
             flag_modified(self._dbnode, "attributes")
+            self._dbnode.extras = dict(self._dbnode.extras or {}, **{_HASH_EXTRA_KEY: hash_})
             # This should not be used anymore: I delete it to
             # possibly free memory
             del self._attrs_cache
@@ -706,9 +762,181 @@ class Node(AbstractNode):
             self._get_temp_folder().replace_with_folder(self._repository_folder.abspath, move=True, overwrite=True)
             raise
 
-        self._dbnode.set_extra(_HASH_EXTRA_KEY, self.get_hash())
+        self._repository_folder.deduplicate()
         return self
 
+    @classmethod
+    def _db_store_many(cls, nodes, with_transaction=True, use_cache=None):
+        """
+        Store several new nodes in the DB, inserting the rows of the nodes and
+        of their cached input links with one multi-row INSERT per chunk, in a
+        single transaction.
+
+        The nodes for which caching is enabled are looked up in the cache with
+        a single query. Those with a cached equivalent, or whose class
+        overrides store(), are stored one by one once the others are inserted.
+
+        :param nodes: a list of validated unstored nodes, sorted such that the
+          sources of the cached input links of a node come before it
+        :parameter with_transaction: if False, no transaction is used.
+        :param use_cache: Determines whether caching is used to find an
+          equivalent node.
+        """
+        from aiida.backends.sqlalchemy import get_scoped_session
+        from aiida.common.caching import get_use_cache
+        session = get_scoped_session()
+
+        to_cache = [
+            node for node in nodes
+            if not node._has_custom_store() and (get_use_cache(type(node)) if use_cache is None else use_cache)
+        ]
+        cache_nodes = dict(zip((id(node) for node in to_cache), cls.find_cached(to_cache)))
+
+        bulk = []
+        single = []
+        for node in nodes:
+            if node._has_custom_store() or cache_nodes.get(id(node)) is not None:
+                single.append(node)
+            else:
+                bulk.append(node)
+
+        # The hashes are computed on the sandbox folders, before they are moved
+        hashes = [node.get_hash() for node in bulk]
+
+        # As in _db_store, the files are moved first, such that a node that
+        # exists in the DB always has its folder in place
+        moved = []
+        link_caches = [dict(node._inputlinks_cache) for node in bulk]
+        try:
+            for node in bulk:
+                node._repository_folder.replace_with_folder(node._get_temp_folder().abspath, move=True, overwrite=True)
+                moved.append(node)
+
+            cls._insert_dbnodes(session, bulk, hashes)
+
+            for node in bulk:
+                node._to_be_stored = False
+
+            # Only the links whose source is stored can be inserted now, the
+            # others come from nodes that are stored one by one below
+            cls._insert_cached_links(session, bulk)
+
+            for node in single:
+                cache_node = cache_nodes.get(id(node))
+                if cache_node is None:
+                    node.store(with_transaction=False, use_cache=use_cache)
+                else:
+                    node._check_are_parents_stored()
+                    node._store_from_cache(cache_node, with_transaction=False)
+                    node._add_outputs_from_cache(cache_node)
+                    cls._add_to_autogroup([node])
+
+            for node in bulk:
+                node._store_cached_input_links(with_transaction=False)
+
+            if with_transaction:
+                session.commit()
+        # This is one of the few cases where it is ok to do a 'global'
+        # except, also because I am re-raising the exception
+        except:
+            session.rollback()
+            # I put back the files in the sandbox folders and the links in the
+            # caches since the transaction did not succeed
+            for node in moved:
+                node._get_temp_folder().replace_with_folder(
+                    node._repository_folder.abspath, move=True, overwrite=True)
+            for node, link_cache in zip(bulk, link_caches):
+                node._to_be_stored = True
+                node._inputlinks_cache.clear()
+                node._inputlinks_cache.update(link_cache)
+            raise
+
+        for node in bulk:
+            # This should not be used anymore: I delete it to
+            # possibly free memory
+            del node._attrs_cache
+            node._temp_folder = None
+            node._repository_folder.deduplicate()
+
+        cls._add_to_autogroup(bulk)
+
+    @staticmethod
+    def _insert_dbnodes(session, nodes, hashes, chunk_size=500):
+        """
+        Insert the rows of new nodes, with their attributes and hash, and
+        attach their DbNode instances to the session as persistent objects.
+        """
+        from sqlalchemy.orm import make_transient_to_detached
+        from aiida.utils import timezone
+
+        table = DbNode.__table__
+        now = timezone.now()
+        dbnodes = {}
+        rows = []
+
+        for node, hash_ in zip(nodes, hashes):
+            dbnode = node._dbnode
+            # The DbNode may have been added to the session by the cascade of its user, it would be inserted again
+            if dbnode in session:
+                session.expunge(dbnode)
+
+            dbnode.label = dbnode.label if dbnode.label is not None else ''
+            dbnode.description = dbnode.description if dbnode.description is not None else ''
+            dbnode.ctime = dbnode.ctime or now
+            dbnode.mtime = dbnode.mtime or now
+            dbnode.nodeversion = dbnode.nodeversion or 1
+            dbnode.public = bool(dbnode.public)
+            dbnode.attributes = node._attrs_cache
+            dbnode.extras = {_HASH_EXTRA_KEY: hash_}
+
+            dbnodes[six.text_type(dbnode.uuid)] = dbnode
+            rows.append({
+                'uuid': six.text_type(dbnode.uuid),
+                'type': dbnode.type,
+                'process_type': dbnode.process_type,
+                'label': dbnode.label,
+                'description': dbnode.description,
+                'ctime': dbnode.ctime,
+                'mtime': dbnode.mtime,
+                'nodeversion': dbnode.nodeversion,
+                'public': dbnode.public,
+                'attributes': dbnode.attributes,
+                'extras': dbnode.extras,
+                'dbcomputer_id': dbnode.dbcomputer.id if dbnode.dbcomputer is not None else None,
+                'user_id': dbnode.user.id,
+            })
+
+        for start in range(0, len(rows), chunk_size):
+            statement = table.insert().values(rows[start:start + chunk_size]).returning(table.c.id, table.c.uuid)
+            for pk, uuid in session.execute(statement):
+                dbnode = dbnodes[six.text_type(uuid)]
+                dbnode.id = pk
+                make_transient_to_detached(dbnode)
+                session.add(dbnode)
+
+    @staticmethod
+    def _insert_cached_links(session, nodes, chunk_size=1000):
+        """
+        Insert the cached input links of stored nodes whose source is stored,
+        and remove them from the cache.
+
+        The links were checked by store_many with
+        :meth:`~aiida.orm.implementation.general.node.AbstractNode._check_cached_input_links`.
+        The reachability index needs no update: it is stale as soon as a link
+        is added, see :py:mod:`aiida.orm.utils.reachability`.
+        """
+        table = DbLink.__table__
+        rows = []
+
+        for node in nodes:
+            for label, (src, link_type) in list(node._inputlinks_cache.items()):
+                if src.is_stored:
+                    rows.append({'input_id': src.pk, 'output_id': node.pk, 'label': label, 'type': link_type.value})
+                    del node._inputlinks_cache[label]
+
+        for start in range(0, len(rows), chunk_size):
+            session.execute(table.insert().values(rows[start:start + chunk_size]))
+
     @property
     def uuid(self):
         return six.text_type(self._dbnode.uuid)
@@ -723,4 +951,44 @@ class Node(AbstractNode):
 
     def _ensure_model_uptodate(self, attribute_names=None):
         if self.is_stored:
+            # The first access to a deferred column loads it for the whole batch, which makes it up to date
+            if attribute_names and self._lazy_columns.issuperset(attribute_names):
+                self._lazy_columns.difference_update(attribute_names)
+                self._lazy_batch.load()
+                if not self._lazy_columns:
+                    self._lazy_batch = None
+                return
             self._dbnode.session.expire(self._dbnode, attribute_names=attribute_names)
+
+
+class _LazyLoadingBatch(object):
+    """
+    The DbNode instances of nodes that were loaded by the same query, without their attributes and extras. These
+    columns are loaded for all the nodes of the batch with a single query, when they are first accessed on any node.
+    """
+
+    columns = ('attributes', 'extras')
+
+    def __init__(self, dbnodes):
+        self._dbnodes = {dbnode.id: dbnode for dbnode in dbnodes}
+
+    def load(self):
+        """
+        Load the deferred columns of all the nodes of the batch, unless this was already done.
+        Columns that were loaded or modified in the meantime are left untouched.
+        """
+        from sqlalchemy import inspect
+        from sqlalchemy.orm.attributes import set_committed_value
+        from aiida.backends.sqlalchemy import get_scoped_session
+
+        dbnodes, self._dbnodes = self._dbnodes, {}
+        if not dbnodes:
+            return
+
+        query = get_scoped_session().query(DbNode.id, DbNode.attributes, DbNode.extras)
+        for pk, attributes, extras in query.filter(DbNode.id.in_(list(dbnodes))):
+            dbnode = dbnodes[pk]
+            unloaded = inspect(dbnode).unloaded
+            for column, value in zip(self.columns, (attributes, extras)):
+                if column in unloaded:
+                    set_committed_value(dbnode, column, value)
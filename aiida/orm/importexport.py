@@ -36,6 +36,14 @@ ATTRIBUTE_ENTITY_NAME = "Attribute"
 COMPUTER_ENTITY_NAME = "Computer"
 USER_ENTITY_NAME = "User"
 
+# Number of rows fetched at a time from the database while writing an export
+EXPORT_BATCH_SIZE = 1000
+
+# Number of nodes, links or group members inserted at a time by the batched import
+IMPORT_BATCH_SIZE = 1000
+# Number of threads moving the repository folders during the batched import
+IMPORT_NUM_WORKERS = 4
+
 # The signatures used to reference the entities in the import/export file
 NODE_SIGNATURE = "aiida.backends.djsite.db.models.DbNode"
 LINK_SIGNATURE = "aiida.backends.djsite.db.models.DbLink"
@@ -311,14 +319,32 @@ def deserialize_field(k, v, fields_info, import_unique_ids_mappings,
 
 
 def import_data(in_path, ignore_unknown_nodes=False,
-                silent=False):
+                silent=False, batch_size=None):
+    """
+    Import exported AiiDA environment to the AiiDA database.
+
+    :param in_path: the path to a file or folder that can be imported in AiiDA
+    :param ignore_unknown_nodes: if True, ignore the links to nodes that are
+        neither in the archive nor in the database
+    :param silent: suppress debug prints
+    :param batch_size: if given, import the archive in batches of this many
+        nodes with :py:func:`import_data_sqla_batched` or
+        :py:func:`import_data_dj_batched`, which keeps the memory bounded for
+        large archives.
+    """
     from aiida.backends.settings import BACKEND
     from aiida.backends.profile import BACKEND_DJANGO, BACKEND_SQLA
 
     if BACKEND == BACKEND_SQLA:
+        if batch_size is not None:
+            return import_data_sqla_batched(in_path, ignore_unknown_nodes=ignore_unknown_nodes,
+                                            silent=silent, batch_size=batch_size)
         return import_data_sqla(in_path, ignore_unknown_nodes=ignore_unknown_nodes,
                                 silent=silent)
     elif BACKEND == BACKEND_DJANGO:
+        if batch_size is not None:
+            return import_data_dj_batched(in_path, ignore_unknown_nodes=ignore_unknown_nodes,
+                                          silent=silent, batch_size=batch_size)
         return import_data_dj(in_path, ignore_unknown_nodes=ignore_unknown_nodes,
                               silent=silent)
     else:
@@ -629,6 +655,7 @@ def import_data_dj(in_path, ignore_unknown_nodes=False,
                         # in any case the source is a SandboxFolder)
                         destdir.replace_with_folder(subfolder.abspath,
                                                     move=True, overwrite=True)
+                        destdir.deduplicate()
 
                 # Store them all in once; however, the PK are not set in this way...
                 Model.objects.bulk_create(objects_to_create)
@@ -1220,6 +1247,7 @@ def import_data_sqla(in_path, ignore_unknown_nodes=False, silent=False):
                         # in any case the source is a SandboxFolder)
                         destdir.replace_with_folder(subfolder.abspath,
                                                     move=True, overwrite=True)
+                        destdir.deduplicate()
 
                         # For DbNodes, we also have to store Attributes!
                         import_entry_id = import_entry_ids[str(o.uuid)]
@@ -1460,6 +1488,1040 @@ def import_data_sqla(in_path, ignore_unknown_nodes=False, silent=False):
     return ret_dict
 
 
+def _extract_archive(in_path, folder, silent, nodes_export_subfolder):
+    """
+    Extract an export archive, or copy an export folder, into a sandbox folder.
+
+    :param in_path: the path to a file or folder that can be imported in AiiDA
+    :param folder: a SandboxFolder, used to extract the file tree
+    """
+    import os
+    import tarfile
+    import zipfile
+
+    from aiida.common.archive import extract_tree, extract_tar, extract_zip, extract_cif
+
+    if os.path.isdir(in_path):
+        extract_tree(in_path, folder, silent=silent)
+    else:
+        if tarfile.is_tarfile(in_path):
+            extract_tar(in_path, folder, silent=silent,
+                        nodes_export_subfolder=nodes_export_subfolder)
+        elif zipfile.is_zipfile(in_path):
+            extract_zip(in_path, folder, silent=silent,
+                        nodes_export_subfolder=nodes_export_subfolder)
+        elif os.path.isfile(in_path) and in_path.endswith('.cif'):
+            extract_cif(in_path, folder, silent=silent,
+                        nodes_export_subfolder=nodes_export_subfolder)
+        else:
+            raise ValueError("Unable to detect the input file format, it "
+                             "is neither a (possibly compressed) tar "
+                             "file, nor a zip file.")
+
+    if not folder.get_content_list():
+        from aiida.common.exceptions import ContentNotExistent
+        raise ContentNotExistent("The provided file/folder ({}) is empty"
+                                 .format(in_path))
+
+
+def _stage_import_data(data_path, staging, batch_size):
+    """
+    Read the data.json of an export incrementally into a sqlite database, so
+    that the nodes, their attributes, the links and the group members can be
+    read back in batches, in any order.
+
+    :param data_path: the absolute path of the data.json file
+    :param staging: a sqlite3 connection in autocommit mode
+    :param batch_size: the number of rows inserted at a time
+    :return: the `export_data` of all the entities but the nodes, which are few
+    """
+    import io
+    import json
+
+    staging.executescript("""
+        PRAGMA synchronous = OFF;
+        PRAGMA journal_mode = OFF;
+        CREATE TABLE nodes (id INTEGER PRIMARY KEY, uuid TEXT, data TEXT);
+        CREATE TABLE attributes (id INTEGER PRIMARY KEY, data TEXT);
+        CREATE TABLE conversions (id INTEGER PRIMARY KEY, data TEXT);
+        CREATE TABLE links (input TEXT, output TEXT, label TEXT, type TEXT);
+        CREATE TABLE group_nodes (group_uuid TEXT, node_uuid TEXT);
+        CREATE TABLE node_pks (uuid TEXT PRIMARY KEY, pk INTEGER, in_archive INTEGER);
+    """)
+
+    statements = {
+        'nodes': 'INSERT INTO nodes VALUES (?, ?, ?)',
+        'attributes': 'INSERT INTO attributes VALUES (?, ?)',
+        'conversions': 'INSERT INTO conversions VALUES (?, ?)',
+        'links': 'INSERT INTO links VALUES (?, ?, ?, ?)',
+        'group_nodes': 'INSERT INTO group_nodes VALUES (?, ?)',
+    }
+    rows = {table: [] for table in statements}
+
+    def split(keys):
+        # Split the sections, the node entries and the members of each group
+        return (len(keys) < 2 or keys == ('export_data', NODE_ENTITY_NAME) or
+                (len(keys) == 2 and keys[0] == 'groups_uuid'))
+
+    export_data = {}
+
+    staging.execute('BEGIN')
+    with io.open(data_path, encoding='utf8') as handle:
+        for keys, value in JsonStreamReader(handle).iter_items(split):
+            section = keys[0]
+            if section == 'export_data':
+                if keys[1] != NODE_ENTITY_NAME:
+                    export_data[keys[1]] = value
+                    continue
+                table = 'nodes'
+                rows[table].append((int(keys[2]), value['uuid'], json.dumps(value)))
+            elif section == 'node_attributes':
+                table = 'attributes'
+                rows[table].append((int(keys[1]), json.dumps(value)))
+            elif section == 'node_attributes_conversion':
+                table = 'conversions'
+                rows[table].append((int(keys[1]), json.dumps(value)))
+            elif section == 'links_uuid':
+                table = 'links'
+                rows[table].append((value['input'], value['output'], value['label'], value['type']))
+            elif section == 'groups_uuid':
+                table = 'group_nodes'
+                rows[table].append((keys[1], value))
+            else:
+                continue
+
+            if len(rows[table]) >= batch_size:
+                staging.executemany(statements[table], rows[table])
+                del rows[table][:]
+
+    for table, table_rows in rows.items():
+        staging.executemany(statements[table], table_rows)
+    staging.execute('CREATE INDEX nodes_uuid ON nodes (uuid)')
+    staging.execute('COMMIT')
+
+    return export_data
+
+
+def _import_entities_sqla(session, entity_name, entries, metadata,
+                          import_unique_ids_mappings,
+                          foreign_ids_reverse_mappings, ret_dict, silent):
+    """
+    Import the entries of an entity that is not a node, matching them to the
+    existing ones by their unique identifier with a single query.
+    """
+    import json
+
+    entity_sig = entity_names_to_signatures[entity_name]
+    fields_info = metadata['all_fields_info'].get(entity_name, {})
+    unique_identifier = metadata['unique_identifiers'][entity_name]
+    db_entity = get_object_from_string(entity_names_to_sqla_schema[entity_name])
+    unique_column = getattr(db_entity, unique_identifier)
+
+    import_unique_ids_mappings[entity_name] = {
+        int(k): v[unique_identifier] for k, v in entries.items()}
+
+    existing = {}
+    unique_ids = set(v[unique_identifier] for v in entries.values())
+    if unique_ids:
+        existing = {six.text_type(unique_id): pk for unique_id, pk in
+                    session.query(unique_column, db_entity.id).filter(
+                        unique_column.in_(unique_ids))}
+    foreign_ids_reverse_mappings[entity_name] = dict(existing)
+
+    if entity_name == COMPUTER_ENTITY_NAME:
+        computer_names = set(name for (name,) in session.query(db_entity.name))
+        dupl_counter = 0
+
+    created = []
+    for import_entry_id, entry_data in entries.items():
+        unique_id = entry_data[unique_identifier]
+        ret_entity = ret_dict.setdefault(entity_name, {'new': [], 'existing': []})
+
+        if unique_id in existing:
+            ret_entity['existing'].append((import_entry_id, existing[unique_id]))
+            if not silent:
+                print("existing %s: %s (%s->%s)" % (entity_sig, unique_id,
+                                                    import_entry_id,
+                                                    existing[unique_id]))
+            continue
+
+        if entity_name == COMPUTER_ENTITY_NAME:
+            # Export files generated with Django store the metadata and the
+            # transport parameters as serialized JSON strings
+            for key in ('metadata', 'transport_params'):
+                if isinstance(entry_data[key], (six.string_types, six.binary_type)):
+                    entry_data[key] = json.loads(entry_data[key])
+
+            orig_name = entry_data['name']
+            while entry_data['name'] in computer_names:
+                entry_data['name'] = orig_name + COMP_DUPL_SUFFIX.format(dupl_counter)
+                dupl_counter += 1
+            computer_names.add(entry_data['name'])
+
+        import_data = dict(deserialize_field(
+            k, v, fields_info=fields_info,
+            import_unique_ids_mappings=import_unique_ids_mappings,
+            foreign_ids_reverse_mappings=foreign_ids_reverse_mappings)
+                           for k, v in entry_data.items())
+
+        for file_fkey, model_fkey in file_fields_to_model_fields.get(entity_name, {}).items():
+            if model_fkey in import_data or file_fkey not in import_data:
+                continue
+            import_data[model_fkey] = import_data.pop(file_fkey)
+
+        db_object = db_entity(**import_data)
+        session.add(db_object)
+        created.append((import_entry_id, unique_id, db_object))
+
+    # Flush to get the PKs of the new entries
+    session.flush()
+
+    for import_entry_id, unique_id, db_object in created:
+        foreign_ids_reverse_mappings[entity_name][unique_id] = db_object.id
+        ret_dict[entity_name]['new'].append((import_entry_id, db_object.id))
+        if not silent:
+            print("NEW %s: %s (%s->%s)" % (entity_sig, unique_id,
+                                           import_entry_id, db_object.id))
+
+
+def _get_new_import_links(batch, existing_links, ignore_unknown_nodes, ret_dict):
+    """
+    Return the links of a batch of the staged links of an archive that are not
+    in the database yet, checking that they do not conflict with the existing
+    links entering the same nodes.
+
+    :param batch: a list of staged links, as tuples (rowid, input uuid,
+        output uuid, label, type, input pk, output pk), where the pks are None
+        for the nodes that are neither in the archive nor in the database
+    :param existing_links: the set of the links of the database entering the
+        output nodes of the batch, as tuples (input pk, output pk, label,
+        type), which is updated with the new links
+    :param ignore_unknown_nodes: if True, skip the links referring to unknown
+        nodes, otherwise raise a ValueError
+    :param ret_dict: the dictionary returned by the import, updated with the
+        new links
+    :return: a list of tuples (input pk, output pk, label, type) of the new links
+    """
+    from aiida.common.links import LinkType
+
+    existing_links_labels = {}
+    existing_input_links = {}
+    for in_id, out_id, label, _ in existing_links:
+        existing_links_labels[in_id, out_id] = label
+        existing_input_links[out_id, label] = in_id
+
+    new_links = []
+    for _, in_uuid, out_uuid, label, link_type, in_id, out_id in batch:
+        if in_id is None or out_id is None:
+            if ignore_unknown_nodes:
+                continue
+            raise ValueError("Trying to create a link with one "
+                             "or both unknown nodes, stopping "
+                             "(in_uuid={}, out_uuid={}, "
+                             "label={})".format(in_uuid, out_uuid, label))
+
+        link = (in_id, out_id, label, LinkType(link_type).value)
+        if link in existing_links:
+            # The link is already in place
+            continue
+
+        if existing_links_labels.get((in_id, out_id), label) != label:
+            raise ValueError("Trying to rename an existing link "
+                             "name, stopping (in={}, out={}, "
+                             "old_label={}, new_label={})"
+                             .format(in_id, out_id,
+                                     existing_links_labels[in_id, out_id], label))
+
+        # Only the RETURN links of workflows can enter a node from different
+        # inputs with the same label
+        if (out_id, label) in existing_input_links and LinkType(link_type) != LinkType.RETURN:
+            raise ValueError(
+                "There exists already an input link to node "
+                "with UUID {} with label {} but it does not "
+                "come from the expected input with UUID {} "
+                "but from a node with UUID {}."
+                .format(out_uuid, label, in_uuid,
+                        existing_input_links[out_id, label]))
+
+        new_links.append(link)
+        existing_links.add(link)
+        existing_links_labels[in_id, out_id] = label
+        existing_input_links[out_id, label] = in_id
+        ret_dict.setdefault(LINK_ENTITY_NAME, {'new': []})['new'].append((in_id, out_id))
+
+    return new_links
+
+
+def import_data_sqla_batched(in_path, ignore_unknown_nodes=False, silent=False,
+                             batch_size=IMPORT_BATCH_SIZE,
+                             num_workers=IMPORT_NUM_WORKERS):
+    """
+    Import exported AiiDA environment to the AiiDA database, like
+    :py:func:`import_data_sqla`, but without ever loading the whole data.json
+    in memory, to import large archives.
+
+    The data.json is first read incrementally into a temporary sqlite
+    database, from which the nodes, the links and the group members are read
+    back in batches. For every batch, the nodes that are already in the
+    database are found with a single query, and the new nodes, their states,
+    the links and the group members are inserted with multi-row INSERT
+    statements, while the repository folders of the new nodes are moved by a
+    pool of threads. The users, computers and groups are few and are imported
+    through the ORM.
+
+    :param in_path: the path to a file or folder that can be imported in AiiDA
+    :param ignore_unknown_nodes: if True, skip the links and the group members
+        referring to nodes that are neither in the archive nor in the database,
+        otherwise raise a ValueError
+    :param silent: suppress the prints of the progress
+    :param batch_size: the number of nodes, links or group members imported
+        at a time
+    :param num_workers: the number of threads moving the repository folders
+    :return: a dictionary with the new and existing entries, in the format
+        returned by :py:func:`import_data_sqla`
+    """
+    import json
+    import os
+    import sqlite3
+    import time
+    from multiprocessing.pool import ThreadPool
+
+    from aiida.utils import timezone
+
+    from aiida.orm import Node, Group
+    from aiida.common.folders import SandboxFolder, RepositoryFolder
+    from aiida.common.datastructures import calc_states
+
+    # Backend specific imports
+    import aiida.backends.sqlalchemy
+    from aiida.backends.sqlalchemy.models.group import DbGroup, table_groups_nodes
+    from aiida.backends.sqlalchemy.models.node import DbCalcState, DbLink, DbNode
+
+    # This is the export version expected by this function
+    expected_export_version = '0.3'
+
+    # The name of the subfolder in which the node files are stored
+    nodes_export_subfolder = 'nodes'
+
+    # The returned dictionary with new and existing nodes and links
+    ret_dict = {}
+
+    start_time = time.time()
+
+    # The sandbox has to remain open until the end
+    with SandboxFolder() as folder:
+        _extract_archive(in_path, folder, silent=silent,
+                         nodes_export_subfolder=nodes_export_subfolder)
+
+        try:
+            with open(folder.get_abs_path('metadata.json')) as f:
+                metadata = json.load(f)
+        except IOError as e:
+            raise ValueError("Unable to find the file {} in the import "
+                             "file or folder".format(e.filename))
+
+        if metadata['export_version'] != expected_export_version:
+            raise ValueError("File export version is {}, but I can "
+                             "import only version {}"
+                             .format(metadata['export_version'],
+                                     expected_export_version))
+
+        for import_field_name in metadata['all_fields_info']:
+            if import_field_name not in signatures_to_entity_names.values():
+                raise NotImplementedError("Apparently, you are importing a "
+                                          "file with a model '{}', but this "
+                                          "does not appear in "
+                                          "all_known_models!"
+                                          .format(import_field_name))
+
+        if not silent:
+            print("READING DATA...")
+
+        if not os.path.isfile(folder.get_abs_path('data.json')):
+            raise ValueError("Unable to find the file {} in the import "
+                             "file or folder".format(folder.get_abs_path('data.json')))
+
+        staging = sqlite3.connect(folder.get_abs_path('import.sqlite'), isolation_level=None)
+        session = aiida.backends.sqlalchemy.get_scoped_session()
+        pool = ThreadPool(num_workers)
+
+        try:
+            export_data = _stage_import_data(folder.get_abs_path('data.json'), staging, batch_size)
+
+            ###################################################
+            # CHECK THAT ALL THE LINKED NODES ARE KNOWN       #
+            ###################################################
+            # The nodes referred to by links and groups that are not in the
+            # archive have to be in the database already
+            referenced_uuids = [uuid for (uuid,) in staging.execute(
+                'SELECT uuid FROM (SELECT input AS uuid FROM links UNION SELECT output FROM links '
+                'UNION SELECT node_uuid FROM group_nodes) WHERE uuid NOT IN (SELECT uuid FROM nodes)')
+                                if validate_uuid(uuid)]
+
+            unknown_nodes = set(referenced_uuids)
+            for start in range(0, len(referenced_uuids), batch_size):
+                found = [(six.text_type(uuid), pk) for uuid, pk in session.query(DbNode.uuid, DbNode.id).filter(
+                    DbNode.uuid.in_(referenced_uuids[start:start + batch_size]))]
+                staging.executemany('INSERT INTO node_pks VALUES (?, ?, 0)', found)
+                unknown_nodes.difference_update(uuid for uuid, _ in found)
+
+            if unknown_nodes and not ignore_unknown_nodes:
+                raise ValueError(
+                    "The import file refers to {} nodes with unknown UUID, "
+                    "therefore it cannot be imported. Either first import the "
+                    "unknown nodes, or export also the parents when exporting. "
+                    "The unknown UUIDs are:\n".format(len(unknown_nodes)) +
+                    "\n".join('* {}'.format(uuid) for uuid in unknown_nodes))
+
+            ###############
+            # IMPORT DATA #
+            ###############
+            import_unique_ids_mappings = {}
+            foreign_ids_reverse_mappings = {}
+
+            for entity_name in (USER_ENTITY_NAME, COMPUTER_ENTITY_NAME):
+                _import_entities_sqla(session, entity_name, export_data.get(entity_name, {}), metadata,
+                                      import_unique_ids_mappings, foreign_ids_reverse_mappings,
+                                      ret_dict, silent)
+
+            if not silent:
+                print("STORING NODES, FILES & ATTRIBUTES...")
+
+            fields_info = metadata['all_fields_info'].get(NODE_ENTITY_NAME, {})
+            total_nodes = staging.execute('SELECT COUNT(*) FROM nodes').fetchone()[0]
+            done_nodes = 0
+            last_id = -1
+
+            def move_node_folder(uuid):
+                """
+                Move the repository folder of a new node from the archive to the repository.
+                """
+                subfolder = folder.get_subfolder(os.path.join(
+                    nodes_export_subfolder, export_shard_uuid(uuid)))
+                if not subfolder.exists():
+                    raise ValueError("Unable to find the repository "
+                                     "folder for node with UUID={} "
+                                     "in the exported file".format(uuid))
+                destdir = RepositoryFolder(section=Node._section_name, uuid=uuid)
+                destdir.replace_with_folder(subfolder.abspath, move=True, overwrite=True)
+                destdir.deduplicate()
+
+            while True:
+                batch = staging.execute(
+                    'SELECT nodes.id, nodes.uuid, nodes.data, attributes.data, conversions.data FROM nodes '
+                    'LEFT JOIN attributes ON attributes.id = nodes.id '
+                    'LEFT JOIN conversions ON conversions.id = nodes.id '
+                    'WHERE nodes.id > ? ORDER BY nodes.id LIMIT ?', (last_id, batch_size)).fetchall()
+                if not batch:
+                    break
+                last_id = batch[-1][0]
+
+                existing = {six.text_type(uuid): pk for uuid, pk in session.query(DbNode.uuid, DbNode.id).filter(
+                    DbNode.uuid.in_([row[1] for row in batch]))}
+
+                ret_nodes = ret_dict.setdefault(NODE_ENTITY_NAME, {'new': [], 'existing': []})
+                import_entry_ids = {}
+                new_rows = []
+                for import_entry_id, uuid, entry_data, attributes, attributes_conversion in batch:
+                    if uuid in existing:
+                        ret_nodes['existing'].append((str(import_entry_id), existing[uuid]))
+                        continue
+
+                    if attributes is None or attributes_conversion is None:
+                        raise ValueError("Unable to find attribute info "
+                                         "for DbNode with UUID = {}".format(uuid))
+
+                    row = dict(deserialize_field(
+                        k, v, fields_info=fields_info,
+                        import_unique_ids_mappings=import_unique_ids_mappings,
+                        foreign_ids_reverse_mappings=foreign_ids_reverse_mappings)
+                               for k, v in json.loads(entry_data).items())
+                    row['attributes'] = deserialize_attributes(
+                        json.loads(attributes), json.loads(attributes_conversion))
+                    row['extras'] = {}
+                    new_rows.append(row)
+                    import_entry_ids[uuid] = import_entry_id
+
+                # Before storing the nodes in the DB, I store their files
+                pool.map(move_node_folder, list(import_entry_ids))
+
+                just_saved = {}
+                if new_rows:
+                    statement = DbNode.__table__.insert().values(new_rows).returning(DbNode.id, DbNode.uuid)
+                    just_saved = {six.text_type(uuid): pk for pk, uuid in session.execute(statement)}
+                    # I set the state for all nodes, even if I should set it only for calculations
+                    session.execute(DbCalcState.__table__.insert().values(
+                        [{'dbnode_id': pk, 'state': calc_states.IMPORTED, 'time': timezone.now()}
+                         for pk in just_saved.values()]))
+
+                for uuid, pk in just_saved.items():
+                    ret_nodes['new'].append((str(import_entry_ids[uuid]), pk))
+
+                staging.executemany('INSERT INTO node_pks VALUES (?, ?, 1)',
+                                    list(existing.items()) + list(just_saved.items()))
+
+                done_nodes += len(batch)
+                if not silent:
+                    print("   {}/{} nodes ({} new, {:.0f} nodes/s)".format(
+                        done_nodes, total_nodes, len(just_saved),
+                        done_nodes / max(time.time() - start_time, 1e-6)))
+
+            if not silent:
+                print("STORING NODE LINKS...")
+
+            new_links = 0
+            last_rowid = 0
+            while True:
+                batch = staging.execute(
+                    'SELECT links.rowid, links.input, links.output, links.label, links.type, inputs.pk, outputs.pk '
+                    'FROM links LEFT JOIN node_pks AS inputs ON inputs.uuid = links.input '
+                    'LEFT JOIN node_pks AS outputs ON outputs.uuid = links.output '
+                    'WHERE links.rowid > ? ORDER BY links.rowid LIMIT ?', (last_rowid, batch_size)).fetchall()
+                if not batch:
+                    break
+                last_rowid = batch[-1][0]
+
+                # Only the links entering the nodes of this batch can conflict
+                output_ids = set(row[6] for row in batch if row[6] is not None)
+                existing_links = set()
+                if output_ids:
+                    existing_links.update(tuple(link) for link in session.query(
+                        DbLink.input_id, DbLink.output_id, DbLink.label, DbLink.type).filter(
+                            DbLink.output_id.in_(output_ids)))
+
+                links_to_store = [{'input_id': in_id, 'output_id': out_id, 'label': label, 'type': link_type}
+                                  for in_id, out_id, label, link_type in
+                                  _get_new_import_links(batch, existing_links, ignore_unknown_nodes, ret_dict)]
+
+                if links_to_store:
+                    session.execute(DbLink.__table__.insert().values(links_to_store))
+                    new_links += len(links_to_store)
+
+            if not silent:
+                print("   ({} new links...)".format(new_links))
+
+            _import_entities_sqla(session, GROUP_ENTITY_NAME, export_data.get(GROUP_ENTITY_NAME, {}), metadata,
+                                  import_unique_ids_mappings, foreign_ids_reverse_mappings, ret_dict, silent)
+
+            if not silent:
+                print("STORING GROUP ELEMENTS...")
+
+            group_pks = dict(foreign_ids_reverse_mappings[GROUP_ENTITY_NAME])
+            group_uuids = [uuid for (uuid,) in staging.execute('SELECT DISTINCT group_uuid FROM group_nodes')
+                           if uuid not in group_pks]
+            if group_uuids:
+                group_pks.update((six.text_type(uuid), pk) for uuid, pk in session.query(
+                    DbGroup.uuid, DbGroup.id).filter(DbGroup.uuid.in_(group_uuids)))
+            for uuid in group_uuids:
+                if uuid not in group_pks:
+                    raise ValueError("Unable to find the group with UUID {}".format(uuid))
+
+            last_rowid = 0
+            while True:
+                batch = staging.execute(
+                    'SELECT group_nodes.rowid, group_nodes.group_uuid, group_nodes.node_uuid, node_pks.pk '
+                    'FROM group_nodes LEFT JOIN node_pks ON node_pks.uuid = group_nodes.node_uuid '
+                    'WHERE group_nodes.rowid > ? ORDER BY group_nodes.rowid LIMIT ?',
+                    (last_rowid, batch_size)).fetchall()
+                if not batch:
+                    break
+                last_rowid = batch[-1][0]
+
+                members = set()
+                for _, group_uuid, node_uuid, node_pk in batch:
+                    if node_pk is None:
+                        if ignore_unknown_nodes:
+                            continue
+                        raise ValueError("Trying to add the node with unknown UUID {} to the "
+                                         "group with UUID {}".format(node_uuid, group_uuid))
+                    members.add((group_pks[group_uuid], node_pk))
+
+                if members:
+                    members.difference_update(session.query(
+                        table_groups_nodes.c.dbgroup_id, table_groups_nodes.c.dbnode_id).filter(
+                            table_groups_nodes.c.dbgroup_id.in_(set(group_pk for group_pk, _ in members)),
+                            table_groups_nodes.c.dbnode_id.in_(set(node_pk for _, node_pk in members))))
+                if members:
+                    session.execute(table_groups_nodes.insert().values(
+                        [{'dbgroup_id': group_pk, 'dbnode_id': node_pk} for group_pk, node_pk in members]))
+
+            ######################################################
+            # Put everything in a specific group
+            # So that we do not create empty groups
+            if total_nodes:
+                # Get an unique name for the import group, based on the
+                # current (local) time
+                basename = timezone.localtime(timezone.now()).strftime(
+                    "%Y%m%d-%H%M%S")
+                counter = 0
+                created = False
+                while not created:
+                    if counter == 0:
+                        group_name = basename
+                    else:
+                        group_name = "{}_{}".format(basename, counter)
+
+                    group = Group(name=group_name,
+                                  type_string=IMPORTGROUP_TYPE)
+                    if session.query(DbGroup).filter(
+                            DbGroup.name == group._dbgroup.name).count() == 0:
+                        session.add(group._dbgroup)
+                        created = True
+                    else:
+                        counter += 1
+                session.flush()
+
+                # Add all the nodes of the archive to the new group
+                last_rowid = 0
+                while True:
+                    batch = staging.execute(
+                        'SELECT rowid, pk FROM node_pks WHERE in_archive = 1 AND rowid > ? '
+                        'ORDER BY rowid LIMIT ?', (last_rowid, batch_size)).fetchall()
+                    if not batch:
+                        break
+                    last_rowid = batch[-1][0]
+                    session.execute(table_groups_nodes.insert().values(
+                        [{'dbgroup_id': group._dbgroup.id, 'dbnode_id': pk} for _, pk in batch]))
+
+                if not silent:
+                    print("IMPORTED NODES GROUPED IN IMPORT GROUP NAMED '{}'".format(group.name))
+            else:
+                if not silent:
+                    print("NO DBNODES TO IMPORT, SO NO GROUP CREATED")
+
+            if not silent:
+                print("COMMITTING EVERYTHING...")
+            session.commit()
+        except:
+            print("Rolling back")
+            session.rollback()
+            raise
+        finally:
+            pool.close()
+            staging.close()
+
+    if not silent:
+        print("DONE in {:.1f} s.".format(time.time() - start_time))
+
+    return ret_dict
+
+
+def _import_entities_dj(entity_name, entries, metadata, import_unique_ids_mappings,
+                        foreign_ids_reverse_mappings, ret_dict, silent):
+    """
+    Import the entries of an entity that is not a node, matching them to the
+    existing ones by their unique identifier with a single query.
+    """
+    import json
+
+    Model = get_object_from_string(entity_names_to_signatures[entity_name])
+    fields_info = metadata['all_fields_info'].get(entity_name, {})
+    unique_identifier = metadata['unique_identifiers'][entity_name]
+
+    import_unique_ids_mappings[entity_name] = {
+        int(k): v[unique_identifier] for k, v in entries.items()}
+
+    existing = {}
+    unique_ids = set(v[unique_identifier] for v in entries.values())
+    if unique_ids:
+        existing = {six.text_type(unique_id): pk for unique_id, pk in
+                    Model.objects.filter(**{'{}__in'.format(unique_identifier): unique_ids}).values_list(
+                        unique_identifier, 'pk')}
+    foreign_ids_reverse_mappings[entity_name] = dict(existing)
+
+    if entity_name == COMPUTER_ENTITY_NAME:
+        computer_names = set(Model.objects.values_list('name', flat=True))
+        dupl_counter = 0
+
+    objects_to_create = []
+    import_entry_ids = {}
+    for import_entry_id, entry_data in entries.items():
+        unique_id = entry_data[unique_identifier]
+        ret_entity = ret_dict.setdefault(entity_name, {'new': [], 'existing': []})
+
+        if unique_id in existing:
+            ret_entity['existing'].append((import_entry_id, existing[unique_id]))
+            if not silent:
+                print("existing %s: %s (%s->%s)" % (entity_name, unique_id,
+                                                    import_entry_id,
+                                                    existing[unique_id]))
+            continue
+
+        import_data = dict(deserialize_field(
+            k, v, fields_info=fields_info,
+            import_unique_ids_mappings=import_unique_ids_mappings,
+            foreign_ids_reverse_mappings=foreign_ids_reverse_mappings)
+                           for k, v in entry_data.items())
+
+        if entity_name == COMPUTER_ENTITY_NAME:
+            orig_name = import_data['name']
+            while import_data['name'] in computer_names:
+                import_data['name'] = orig_name + COMP_DUPL_SUFFIX.format(dupl_counter)
+                dupl_counter += 1
+            computer_names.add(import_data['name'])
+
+            # Export files generated with SQLAlchemy store the metadata and
+            # the transport parameters as dictionaries
+            for key in ('metadata', 'transport_params'):
+                if isinstance(import_data[key], dict):
+                    import_data[key] = json.dumps(import_data[key])
+
+        objects_to_create.append(Model(**import_data))
+        import_entry_ids[unique_id] = import_entry_id
+
+    Model.objects.bulk_create(objects_to_create)
+
+    # Get back the just-saved entries, bulk_create does not set their PKs
+    if import_entry_ids:
+        just_saved = Model.objects.filter(**{'{}__in'.format(unique_identifier): list(import_entry_ids)}).values_list(
+            unique_identifier, 'pk')
+        for unique_id, new_pk in just_saved:
+            unique_id = six.text_type(unique_id)
+            foreign_ids_reverse_mappings[entity_name][unique_id] = new_pk
+            ret_dict[entity_name]['new'].append((import_entry_ids[unique_id], new_pk))
+            if not silent:
+                print("NEW %s: %s (%s->%s)" % (entity_name, unique_id,
+                                               import_entry_ids[unique_id], new_pk))
+
+
+def import_data_dj_batched(in_path, ignore_unknown_nodes=False, silent=False,
+                           batch_size=IMPORT_BATCH_SIZE,
+                           num_workers=IMPORT_NUM_WORKERS):
+    """
+    Import exported AiiDA environment to the AiiDA database, like
+    :py:func:`import_data_dj`, but without ever loading the whole data.json
+    in memory, to import large archives.
+
+    The archive is read in batches as by :py:func:`import_data_sqla_batched`,
+    and the new nodes, their states and attributes, the links and the group
+    members of every batch are stored with a bulk_create per table.
+
+    :param in_path: the path to a file or folder that can be imported in AiiDA
+    :param ignore_unknown_nodes: if True, skip the links and the group members
+        referring to nodes that are neither in the archive nor in the database,
+        otherwise raise a ValueError
+    :param silent: suppress the prints of the progress
+    :param batch_size: the number of nodes, links or group members imported
+        at a time
+    :param num_workers: the number of threads moving the repository folders
+    :return: a dictionary with the new and existing entries, in the format
+        returned by :py:func:`import_data_dj`
+    """
+    import json
+    import os
+    import sqlite3
+    import time
+    from multiprocessing.pool import ThreadPool
+
+    from django.db import transaction
+    from aiida.utils import timezone
+
+    from aiida.orm import Node, Group
+    from aiida.common.folders import SandboxFolder, RepositoryFolder
+    from aiida.common.datastructures import calc_states
+    from aiida.backends.djsite.db import models
+
+    # This is the export version expected by this function
+    expected_export_version = '0.3'
+
+    # The name of the subfolder in which the node files are stored
+    nodes_export_subfolder = 'nodes'
+
+    # The returned dictionary with new and existing nodes and links
+    ret_dict = {}
+
+    start_time = time.time()
+
+    # The sandbox has to remain open until the end
+    with SandboxFolder() as folder:
+        _extract_archive(in_path, folder, silent=silent,
+                         nodes_export_subfolder=nodes_export_subfolder)
+
+        try:
+            with open(folder.get_abs_path('metadata.json')) as f:
+                metadata = json.load(f)
+        except IOError as e:
+            raise ValueError("Unable to find the file {} in the import "
+                             "file or folder".format(e.filename))
+
+        if metadata['export_version'] != expected_export_version:
+            raise ValueError("File export version is {}, but I can "
+                             "import only version {}"
+                             .format(metadata['export_version'],
+                                     expected_export_version))
+
+        for import_field_name in metadata['all_fields_info']:
+            if import_field_name not in signatures_to_entity_names.values():
+                raise NotImplementedError("Apparently, you are importing a "
+                                          "file with a model '{}', but this "
+                                          "does not appear in "
+                                          "all_known_models!"
+                                          .format(import_field_name))
+
+        if not silent:
+            print("READING DATA...")
+
+        if not os.path.isfile(folder.get_abs_path('data.json')):
+            raise ValueError("Unable to find the file {} in the import "
+                             "file or folder".format(folder.get_abs_path('data.json')))
+
+        staging = sqlite3.connect(folder.get_abs_path('import.sqlite'), isolation_level=None)
+        pool = ThreadPool(num_workers)
+
+        try:
+            export_data = _stage_import_data(folder.get_abs_path('data.json'), staging, batch_size)
+
+            ###################################################
+            # CHECK THAT ALL THE LINKED NODES ARE KNOWN       #
+            ###################################################
+            # The nodes referred to by links and groups that are not in the
+            # archive have to be in the database already
+            referenced_uuids = [uuid for (uuid,) in staging.execute(
+                'SELECT uuid FROM (SELECT input AS uuid FROM links UNION SELECT output FROM links '
+                'UNION SELECT node_uuid FROM group_nodes) WHERE uuid NOT IN (SELECT uuid FROM nodes)')
+                                if validate_uuid(uuid)]
+
+            unknown_nodes = set(referenced_uuids)
+            for start in range(0, len(referenced_uuids), batch_size):
+                found = [(six.text_type(uuid), pk) for uuid, pk in models.DbNode.objects.filter(
+                    uuid__in=referenced_uuids[start:start + batch_size]).values_list('uuid', 'pk')]
+                staging.executemany('INSERT INTO node_pks VALUES (?, ?, 0)', found)
+                unknown_nodes.difference_update(uuid for uuid, _ in found)
+
+            if unknown_nodes and not ignore_unknown_nodes:
+                raise ValueError(
+                    "The import file refers to {} nodes with unknown UUID, "
+                    "therefore it cannot be imported. Either first import the "
+                    "unknown nodes, or export also the parents when exporting. "
+                    "The unknown UUIDs are:\n".format(len(unknown_nodes)) +
+                    "\n".join('* {}'.format(uuid) for uuid in unknown_nodes))
+
+            ###############
+            # IMPORT DATA #
+            ###############
+            # DO ALL WITH A TRANSACTION
+            with transaction.atomic():
+                import_unique_ids_mappings = {}
+                foreign_ids_reverse_mappings = {}
+
+                for entity_name in (USER_ENTITY_NAME, COMPUTER_ENTITY_NAME):
+                    _import_entities_dj(entity_name, export_data.get(entity_name, {}), metadata,
+                                        import_unique_ids_mappings, foreign_ids_reverse_mappings,
+                                        ret_dict, silent)
+
+                if not silent:
+                    print("STORING NODES, FILES & ATTRIBUTES...")
+
+                fields_info = metadata['all_fields_info'].get(NODE_ENTITY_NAME, {})
+                total_nodes = staging.execute('SELECT COUNT(*) FROM nodes').fetchone()[0]
+                done_nodes = 0
+                last_id = -1
+
+                def move_node_folder(uuid):
+                    """
+                    Move the repository folder of a new node from the archive to the repository.
+                    """
+                    subfolder = folder.get_subfolder(os.path.join(
+                        nodes_export_subfolder, export_shard_uuid(uuid)))
+                    if not subfolder.exists():
+                        raise ValueError("Unable to find the repository "
+                                         "folder for node with UUID={} "
+                                         "in the exported file".format(uuid))
+                    destdir = RepositoryFolder(section=Node._section_name, uuid=uuid)
+                    destdir.replace_with_folder(subfolder.abspath, move=True, overwrite=True)
+                    destdir.deduplicate()
+
+                while True:
+                    batch = staging.execute(
+                        'SELECT nodes.id, nodes.uuid, nodes.data, attributes.data, conversions.data FROM nodes '
+                        'LEFT JOIN attributes ON attributes.id = nodes.id '
+                        'LEFT JOIN conversions ON conversions.id = nodes.id '
+                        'WHERE nodes.id > ? ORDER BY nodes.id LIMIT ?', (last_id, batch_size)).fetchall()
+                    if not batch:
+                        break
+                    last_id = batch[-1][0]
+
+                    existing = {six.text_type(uuid): pk for uuid, pk in models.DbNode.objects.filter(
+                        uuid__in=[row[1] for row in batch]).values_list('uuid', 'pk')}
+
+                    ret_nodes = ret_dict.setdefault(NODE_ENTITY_NAME, {'new': [], 'existing': []})
+                    import_entry_ids = {}
+                    new_attributes = {}
+                    objects_to_create = []
+                    for import_entry_id, uuid, entry_data, attributes, attributes_conversion in batch:
+                        if uuid in existing:
+                            ret_nodes['existing'].append((str(import_entry_id), existing[uuid]))
+                            continue
+
+                        if attributes is None or attributes_conversion is None:
+                            raise ValueError("Unable to find attribute info "
+                                             "for DbNode with UUID = {}".format(uuid))
+
+                        import_data = dict(deserialize_field(
+                            k, v, fields_info=fields_info,
+                            import_unique_ids_mappings=import_unique_ids_mappings,
+                            foreign_ids_reverse_mappings=foreign_ids_reverse_mappings)
+                                           for k, v in json.loads(entry_data).items())
+                        objects_to_create.append(models.DbNode(**import_data))
+                        new_attributes[uuid] = deserialize_attributes(
+                            json.loads(attributes), json.loads(attributes_conversion))
+                        import_entry_ids[uuid] = import_entry_id
+
+                    # Before storing the nodes in the DB, I store their files
+                    pool.map(move_node_folder, list(import_entry_ids))
+
+                    just_saved = {}
+                    if objects_to_create:
+                        # Store them all in once; however, the PK are not set in this way...
+                        models.DbNode.objects.bulk_create(objects_to_create)
+                        just_saved = {six.text_type(uuid): pk for uuid, pk in models.DbNode.objects.filter(
+                            uuid__in=list(import_entry_ids)).values_list('uuid', 'pk')}
+
+                        # I set the state for all nodes, even if I should set it only for calculations
+                        models.DbCalcState.objects.bulk_create([
+                            models.DbCalcState(dbnode_id=pk, state=calc_states.IMPORTED)
+                            for pk in just_saved.values()])
+
+                        attributes_to_create = []
+                        for uuid, pk in just_saved.items():
+                            attributes_to_create.extend(models.DbAttribute.reset_values_for_node(
+                                dbnode=pk, attributes=new_attributes[uuid],
+                                with_transaction=False, return_not_store=True))
+                        models.DbAttribute.objects.bulk_create(attributes_to_create)
+
+                    for uuid, pk in just_saved.items():
+                        ret_nodes['new'].append((str(import_entry_ids[uuid]), pk))
+
+                    staging.executemany('INSERT INTO node_pks VALUES (?, ?, 1)',
+                                        list(existing.items()) + list(just_saved.items()))
+
+                    done_nodes += len(batch)
+                    if not silent:
+                        print("   {}/{} nodes ({} new, {:.0f} nodes/s)".format(
+                            done_nodes, total_nodes, len(just_saved),
+                            done_nodes / max(time.time() - start_time, 1e-6)))
+
+                if not silent:
+                    print("STORING NODE LINKS...")
+
+                new_links = 0
+                last_rowid = 0
+                while True:
+                    batch = staging.execute(
+                        'SELECT links.rowid, links.input, links.output, links.label, links.type, inputs.pk, '
+                        'outputs.pk FROM links LEFT JOIN node_pks AS inputs ON inputs.uuid = links.input '
+                        'LEFT JOIN node_pks AS outputs ON outputs.uuid = links.output '
+                        'WHERE links.rowid > ? ORDER BY links.rowid LIMIT ?', (last_rowid, batch_size)).fetchall()
+                    if not batch:
+                        break
+                    last_rowid = batch[-1][0]
+
+                    # Only the links entering the nodes of this batch can conflict
+                    output_ids = set(row[6] for row in batch if row[6] is not None)
+                    existing_links = set()
+                    if output_ids:
+                        existing_links.update(models.DbLink.objects.filter(output_id__in=output_ids).values_list(
+                            'input_id', 'output_id', 'label', 'type'))
+
+                    links_to_store = [models.DbLink(input_id=in_id, output_id=out_id, label=label, type=link_type)
+                                      for in_id, out_id, label, link_type in
+                                      _get_new_import_links(batch, existing_links, ignore_unknown_nodes, ret_dict)]
+
+                    if links_to_store:
+                        models.DbLink.objects.bulk_create(links_to_store)
+                        new_links += len(links_to_store)
+
+                if not silent:
+                    print("   ({} new links...)".format(new_links))
+
+                _import_entities_dj(GROUP_ENTITY_NAME, export_data.get(GROUP_ENTITY_NAME, {}), metadata,
+                                    import_unique_ids_mappings, foreign_ids_reverse_mappings, ret_dict, silent)
+
+                if not silent:
+                    print("STORING GROUP ELEMENTS...")
+
+                GroupNodes = models.DbGroup.dbnodes.through
+                group_pks = dict(foreign_ids_reverse_mappings[GROUP_ENTITY_NAME])
+                group_uuids = [uuid for (uuid,) in staging.execute('SELECT DISTINCT group_uuid FROM group_nodes')
+                               if uuid not in group_pks]
+                if group_uuids:
+                    group_pks.update((six.text_type(uuid), pk) for uuid, pk in models.DbGroup.objects.filter(
+                        uuid__in=group_uuids).values_list('uuid', 'pk'))
+                for uuid in group_uuids:
+                    if uuid not in group_pks:
+                        raise ValueError("Unable to find the group with UUID {}".format(uuid))
+
+                last_rowid = 0
+                while True:
+                    batch = staging.execute(
+                        'SELECT group_nodes.rowid, group_nodes.group_uuid, group_nodes.node_uuid, node_pks.pk '
+                        'FROM group_nodes LEFT JOIN node_pks ON node_pks.uuid = group_nodes.node_uuid '
+                        'WHERE group_nodes.rowid > ? ORDER BY group_nodes.rowid LIMIT ?',
+                        (last_rowid, batch_size)).fetchall()
+                    if not batch:
+                        break
+                    last_rowid = batch[-1][0]
+
+                    members = set()
+                    for _, group_uuid, node_uuid, node_pk in batch:
+                        if node_pk is None:
+                            if ignore_unknown_nodes:
+                                continue
+                            raise ValueError("Trying to add the node with unknown UUID {} to the "
+                                             "group with UUID {}".format(node_uuid, group_uuid))
+                        members.add((group_pks[group_uuid], node_pk))
+
+                    if members:
+                        members.difference_update(GroupNodes.objects.filter(
+                            dbgroup_id__in=set(group_pk for group_pk, _ in members),
+                            dbnode_id__in=set(node_pk for _, node_pk in members)).values_list(
+                                'dbgroup_id', 'dbnode_id'))
+                    if members:
+                        GroupNodes.objects.bulk_create([
+                            GroupNodes(dbgroup_id=group_pk, dbnode_id=node_pk) for group_pk, node_pk in members])
+
+                ######################################################
+                # Put everything in a specific group
+                # So that we do not create empty groups
+                if total_nodes:
+                    # Get an unique name for the import group, based on the
+                    # current (local) time
+                    basename = timezone.localtime(timezone.now()).strftime(
+                        "%Y%m%d-%H%M%S")
+                    counter = 0
+                    group_name = basename
+                    while models.DbGroup.objects.filter(name=group_name).exists():
+                        counter += 1
+                        group_name = "{}_{}".format(basename, counter)
+                    group = Group(name=group_name, type_string=IMPORTGROUP_TYPE).store()
+
+                    # Add all the nodes of the archive to the new group
+                    last_rowid = 0
+                    while True:
+                        batch = staging.execute(
+                            'SELECT rowid, pk FROM node_pks WHERE in_archive = 1 AND rowid > ? '
+                            'ORDER BY rowid LIMIT ?', (last_rowid, batch_size)).fetchall()
+                        if not batch:
+                            break
+                        last_rowid = batch[-1][0]
+                        GroupNodes.objects.bulk_create([
+                            GroupNodes(dbgroup_id=group.pk, dbnode_id=pk) for _, pk in batch])
+
+                    if not silent:
+                        print("IMPORTED NODES GROUPED IN IMPORT GROUP NAMED '{}'".format(group.name))
+                else:
+                    if not silent:
+                        print("NO DBNODES TO IMPORT, SO NO GROUP CREATED")
+        finally:
+            pool.close()
+            staging.close()
+
+    if not silent:
+        print("DONE in {:.1f} s.".format(time.time() - start_time))
+
+    return ret_dict
+
+
 class HTMLGetLinksParser(HTMLParser):
     def __init__(self, filter_extension=None):
         """
@@ -1682,6 +2744,177 @@ def fill_in_query(partial_query, originating_entity_str, current_entity_str,
                       new_tag_suffixes)
 
 
+class JsonStreamWriter(object):
+    """
+    Write a JSON document incrementally to an open file handle, one item at
+    a time, so that large objects and lists never need to be built in memory.
+    Objects and lists are opened and closed explicitly; items of objects are
+    written with a key, items of lists without.
+    """
+
+    def __init__(self, handle):
+        self._handle = handle
+        # One flag per open container, telling whether it is still empty
+        self._is_empty = []
+
+    def _start_item(self, key):
+        import json
+
+        if self._is_empty:
+            if not self._is_empty[-1]:
+                self._handle.write(', ')
+            self._is_empty[-1] = False
+
+        if key is not None:
+            self._handle.write(json.dumps(six.text_type(key)))
+            self._handle.write(': ')
+
+    def begin_object(self, key=None):
+        self._start_item(key)
+        self._handle.write('{')
+        self._is_empty.append(True)
+
+    def end_object(self):
+        self._is_empty.pop()
+        self._handle.write('}')
+
+    def begin_list(self, key=None):
+        self._start_item(key)
+        self._handle.write('[')
+        self._is_empty.append(True)
+
+    def end_list(self):
+        self._is_empty.pop()
+        self._handle.write(']')
+
+    def write_item(self, value, key=None):
+        """
+        Serialize a value as the next item of the current container.
+        """
+        import json
+
+        self._start_item(key)
+        json.dump(value, self._handle)
+
+    def write_raw_item(self, handle, key=None):
+        """
+        Copy a value that was already serialized to JSON, for instance by
+        another JsonStreamWriter, from a file handle open for reading.
+        """
+        import shutil
+
+        self._start_item(key)
+        handle.seek(0)
+        shutil.copyfileobj(handle, self._handle)
+
+
+class JsonStreamReader(object):
+    """
+    Read a JSON document incrementally from an open file handle, yielding the
+    items of its objects and lists one at a time, so that large containers
+    never need to be decoded in memory as a whole.
+    """
+
+    def __init__(self, handle, chunk_size=65536):
+        import json
+
+        self._handle = handle
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self):
+        """
+        Read the next chunk of the file into the buffer, dropping what has
+        already been consumed. The chunk grows with the buffer, so that a
+        large value is read in a logarithmic number of attempts.
+
+        :return: False if the end of the file was reached, True otherwise
+        """
+        chunk = self._handle.read(max(self._chunk_size, len(self._buffer) - self._pos))
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _peek(self):
+        """
+        Skip the whitespace and return the next character, without consuming it.
+        """
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in ' \t\n\r':
+                self._pos += 1
+            if self._pos < len(self._buffer) or not self._fill():
+                break
+        if self._pos == len(self._buffer):
+            raise ValueError("Unexpected end of the JSON document")
+        return self._buffer[self._pos]
+
+    def _expect(self, characters):
+        char = self._peek()
+        if char not in characters:
+            raise ValueError("Expected one of '{}' at position {} of the JSON document, found '{}'".format(
+                characters, self._pos, char))
+        self._pos += 1
+        return char
+
+    def _decode(self):
+        """
+        Decode the value starting at the next character.
+        """
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+                # A number at the end of the buffer may continue in the next chunk
+                if end < len(self._buffer) or self._eof:
+                    break
+            except ValueError:
+                if self._eof:
+                    raise
+            self._fill()
+        self._pos = end
+        return value
+
+    def iter_items(self, split, keys=()):
+        """
+        Iterate over the values of the document, descending into the objects
+        and the lists for which `split` returns True, and decoding the others.
+
+        :param split: a function that takes the tuple of keys (or list indices)
+            leading to a value, and returns whether the value should be split
+            into its items rather than decoded. It is called with an empty
+            tuple for the whole document.
+        :param keys: the keys leading to the value at the current position
+        :return: a generator of tuples of the keys and each decoded value
+        """
+        if not split(keys):
+            yield keys, self._decode()
+            return
+
+        closing = '}' if self._expect('{[') == '{' else ']'
+        if self._peek() == closing:
+            self._pos += 1
+            return
+
+        index = 0
+        while True:
+            if closing == '}':
+                key = self._decode()
+                self._expect(':')
+            else:
+                key = index
+                index += 1
+            for item in self.iter_items(split, keys + (key,)):
+                yield item
+            if self._expect(',' + closing) == closing:
+                return
+
+
 def export_tree(what, folder,allowed_licenses=None, forbidden_licenses=None,
                 silent=False, input_forward=False, create_reversed=True,
                 return_reversed=False, call_reversed=False, **kwargs):
@@ -1712,12 +2945,14 @@ def export_tree(what, folder,allowed_licenses=None, forbidden_licenses=None,
     license
     """
     import json
+    import tempfile
     import aiida
 
     from aiida.orm import Node, Calculation, Data, Group, Code
     from aiida.common.links import LinkType
     from aiida.common.folders import RepositoryFolder
     from aiida.orm.querybuilder import QueryBuilder
+    from aiida.orm.utils.traversal import TraversalRule, traverse_graph
     if not silent:
         print("STARTING EXPORT...")
 
@@ -1725,9 +2960,6 @@ def export_tree(what, folder,allowed_licenses=None, forbidden_licenses=None,
 
     all_fields_info, unique_identifiers = get_all_fields_info()
 
-    # The set that contains the nodes ids of the nodes that should be exported
-    to_be_exported = set()
-
     given_data_entry_ids = set()
     given_calculation_entry_ids = set()
     given_group_entry_ids = set()
@@ -1753,193 +2985,33 @@ def export_tree(what, folder,allowed_licenses=None, forbidden_licenses=None,
         else:
             raise ValueError("I was given {}, which is not a DbNode or DbGroup instance".format(entry))
 
-    # We will iteratively explore the AiiDA graph to find further nodes that
-    # should also be exported.
-
-    # We repeat until there are no further nodes to be visited
-    while given_calculation_entry_ids or given_data_entry_ids:
-
-        # If is is a calculation node
-        if given_calculation_entry_ids:
-            curr_node_id = given_calculation_entry_ids.pop()
-            # If it is already visited continue to the next node
-            if curr_node_id in to_be_exported:
-                continue
-            # Otherwise say that it is a node to be exported
-            else:
-                to_be_exported.add(curr_node_id)
-
-            # INPUT(Data, Calculation) - Reversed
-            qb = QueryBuilder()
-            qb.append(Data, tag='predecessor', project=['id'])
-            qb.append(Calculation, output_of='predecessor',
-                      filters={'id': {'==': curr_node_id}},
-                      edge_filters={
-                          'type': {
-                              '==': LinkType.INPUT.value}})
-            res = {_[0] for _ in qb.all()}
-            given_data_entry_ids.update(res - to_be_exported)
-            # The same until Code becomes a subclass of Data
-            qb = QueryBuilder()
-            qb.append(Code, tag='predecessor', project=['id'])
-            qb.append(Calculation, output_of='predecessor',
-                      filters={'id': {'==': curr_node_id}},
-                      edge_filters={
-                          'type': {
-                              '==': LinkType.INPUT.value}})
-            res = {_[0] for _ in qb.all()}
-            given_data_entry_ids.update(res - to_be_exported)
-
-
-            # INPUT(Data, Calculation) - Forward
-            if input_forward:
-                qb = QueryBuilder()
-                qb.append(Data, tag='predecessor', project=['id'],
-                          filters={'id': {'==': curr_node_id}})
-                qb.append(Calculation, output_of='predecessor',
-                          edge_filters={
-                              'type': {
-                                  '==': LinkType.INPUT.value}})
-                res = {_[0] for _ in qb.all()}
-                given_data_entry_ids.update(res - to_be_exported)
-                # The same until Code becomes a subclass of Data
-                qb = QueryBuilder()
-                qb.append(Code, tag='predecessor', project=['id'],
-                          filters={'id': {'==': curr_node_id}})
-                qb.append(Calculation, output_of='predecessor',
-                          edge_filters={
-                              'type': {
-                                  '==': LinkType.INPUT.value}})
-                res = {_[0] for _ in qb.all()}
-                given_data_entry_ids.update(res - to_be_exported)
-
-
-            # CREATE/RETURN(Calculation, Data) - Forward
-            qb = QueryBuilder()
-            qb.append(Calculation, tag='predecessor',
-                      filters={'id': {'==': curr_node_id}})
-            qb.append(Data, output_of='predecessor', project=['id'],
-                      edge_filters={
-                          'type': {
-                              'in': [LinkType.CREATE.value,
-                                     LinkType.RETURN.value]}})
-            res = {_[0] for _ in qb.all()}
-            given_data_entry_ids.update(res - to_be_exported)
-            # The same until Code becomes a subclass of Data
-            qb = QueryBuilder()
-            qb.append(Calculation, tag='predecessor',
-                      filters={'id': {'==': curr_node_id}})
-            qb.append(Code, output_of='predecessor', project=['id'],
-                      edge_filters={
-                          'type': {
-                              'in': [LinkType.CREATE.value,
-                                     LinkType.RETURN.value]}})
-            res = {_[0] for _ in qb.all()}
-            given_data_entry_ids.update(res - to_be_exported)
-
-
-            # CREATE(Calculation, Data) - Reversed
-            if create_reversed:
-                qb = QueryBuilder()
-                qb.append(Calculation, tag='predecessor')
-                qb.append(Data, output_of='predecessor', project=['id'],
-                          filters={'id': {'==': curr_node_id}},
-                          edge_filters={
-                              'type': {
-                                  'in': [LinkType.CREATE.value]}})
-                res = {_[0] for _ in qb.all()}
-                given_data_entry_ids.update(res - to_be_exported)
-                # The same until Code becomes a subclass of Data
-                qb = QueryBuilder()
-                qb.append(Calculation, tag='predecessor')
-                qb.append(Code, output_of='predecessor', project=['id'],
-                          filters={'id': {'==': curr_node_id}},
-                          edge_filters={
-                              'type': {
-                                  'in': [LinkType.CREATE.value]}})
-                res = {_[0] for _ in qb.all()}
-                given_data_entry_ids.update(res - to_be_exported)
-
-
-            # RETURN(Calculation, Data) - Reversed
-            if return_reversed:
-                qb = QueryBuilder()
-                qb.append(Calculation, tag='predecessor')
-                qb.append(Data, output_of='predecessor', project=['id'],
-                          filters={'id': {'==': curr_node_id}},
-                          edge_filters={
-                              'type': {
-                                  'in': [LinkType.RETURN.value]}})
-                res = {_[0] for _ in qb.all()}
-                given_data_entry_ids.update(res - to_be_exported)
-                # The same until Code becomes a subclass of Data
-                qb = QueryBuilder()
-                qb.append(Calculation, tag='predecessor')
-                qb.append(Code, output_of='predecessor', project=['id'],
-                          filters={'id': {'==': curr_node_id}},
-                          edge_filters={
-                              'type': {
-                                  'in': [LinkType.RETURN.value]}})
-                res = {_[0] for _ in qb.all()}
-                given_data_entry_ids.update(res - to_be_exported)
-
-            # CALL(Calculation, Calculation) - Forward
-            qb = QueryBuilder()
-            qb.append(Calculation, tag='predecessor',
-                      filters={'id': {'==': curr_node_id}})
-            qb.append(Calculation, output_of='predecessor', project=['id'],
-                      edge_filters={
-                          'type': {
-                              '==': LinkType.CALL.value}})
-            res = {_[0] for _ in qb.all()}
-            given_calculation_entry_ids.update(res - to_be_exported)
-
-
-            # CALL(Calculation, Calculation) - Reversed
-            if call_reversed:
-                qb = QueryBuilder()
-                qb.append(Calculation, tag='predecessor')
-                qb.append(Calculation, output_of='predecessor', project=['id'],
-                          filters={'id': {'==': curr_node_id}},
-                          edge_filters={
-                              'type': {
-                                  '==': LinkType.CALL.value}})
-                res = {_[0] for _ in qb.all()}
-                given_calculation_entry_ids.update(res - to_be_exported)
-
-
-        # If it is a Data node
-        else:
-            curr_node_id = given_data_entry_ids.pop()
-            # If it is already visited continue to the next node
-            if curr_node_id in to_be_exported:
-                continue
-            # Otherwise say that it is a node to be exported
-            else:
-                to_be_exported.add(curr_node_id)
-
-            # Case 2:
-            # CREATE(Calculation, Data) - Reversed
-            qb = QueryBuilder()
-            qb.append(Calculation, tag='predecessor', project=['id'])
-            qb.append(Data, output_of='predecessor',
-                      filters={'id': {'==': curr_node_id}},
-                      edge_filters={
-                          'type': {
-                              '==': LinkType.CREATE.value}})
-            res = {_[0] for _ in qb.all()}
-            given_calculation_entry_ids.update(res - to_be_exported)
-            # The same until Code becomes a subclass of Data
-            qb = QueryBuilder()
-            qb.append(Calculation, tag='predecessor', project=['id'])
-            qb.append(Code, output_of='predecessor',
-                      filters={'id': {'==': curr_node_id}},
-                      edge_filters={
-                          'type': {
-                              '==': LinkType.CREATE.value}})
-            res = {_[0] for _ in qb.all()}
-            given_calculation_entry_ids.update(res - to_be_exported)
-
+    # The AiiDA graph is explored inside the database to find further nodes
+    # that should also be exported.
+    # Code is listed with Data until it becomes a subclass of Data
+    data_classes = (Data, Code)
+    rules = [
+        # INPUT(Data, Calculation) - Reversed
+        TraversalRule(LinkType.INPUT, forward=False, source=Calculation, target=data_classes),
+        # CREATE/RETURN(Calculation, Data) - Forward
+        TraversalRule(LinkType.CREATE, source=Calculation, target=data_classes),
+        TraversalRule(LinkType.RETURN, source=Calculation, target=data_classes),
+        # CALL(Calculation, Calculation) - Forward
+        TraversalRule(LinkType.CALL, source=Calculation, target=Calculation),
+    ]
+    # INPUT(Data, Calculation) - Forward
+    if input_forward:
+        rules.append(TraversalRule(LinkType.INPUT, source=data_classes, target=Calculation))
+    # CREATE(Calculation, Data) - Reversed
+    if create_reversed:
+        rules.append(TraversalRule(LinkType.CREATE, forward=False, source=data_classes, target=Calculation))
+    # RETURN(Calculation, Data) - Reversed
+    if return_reversed:
+        rules.append(TraversalRule(LinkType.RETURN, forward=False, source=data_classes, target=Calculation))
+    # CALL(Calculation, Calculation) - Reversed
+    if call_reversed:
+        rules.append(TraversalRule(LinkType.CALL, forward=False, source=Calculation, target=Calculation))
+
+    to_be_exported = traverse_graph(given_data_entry_ids | given_calculation_entry_ids, rules)
 
     # Here we get all the columns that we plan to project per entity that we
     # would like to extract
@@ -1994,10 +3066,24 @@ def export_tree(what, folder,allowed_licenses=None, forbidden_licenses=None,
     ############################################################
     ##### Start automatic recursive export data generation #####
     ############################################################
+    if not given_entities:
+        if not silent:
+            print("No nodes to store, exiting...")
+        return
+
     if not silent:
         print("STORING DATABASE ENTRIES...")
 
+    # The entries of the exported nodes are spooled to a temporary file, since
+    # they can be too many to be kept in memory. The entries of the other
+    # entities (users, computers, groups) are few and kept in a dictionary,
+    # which also removes the duplicates coming from the joins.
     export_data = dict()
+    node_entries_count = 0
+    node_entries_spool = tempfile.TemporaryFile(mode='w+')
+    node_entries_writer = JsonStreamWriter(node_entries_spool)
+    node_entries_writer.begin_object()
+
     entity_separator = '_'
     for entity_name, partial_query in entries_to_add.items():
 
@@ -2011,7 +3097,7 @@ def export_tree(what, folder,allowed_licenses=None, forbidden_licenses=None,
             fill_in_query(partial_query, entity_name, ref_model_name,
                           [entity_name], entity_separator)
 
-        for temp_d in partial_query.iterdict():
+        for temp_d in partial_query.iterdict(batch_size=EXPORT_BATCH_SIZE):
             for k in temp_d.keys():
                 # Get current entity
                 current_entity = k.split(entity_separator)[-1]
@@ -2021,307 +3107,268 @@ def export_tree(what, folder,allowed_licenses=None, forbidden_licenses=None,
                 if temp_d[k]["id"] is None:
                     continue
 
-                temp_d2 = {
-                    temp_d[k]["id"]:
-                        serialize_dict(temp_d[k],
+                entry = serialize_dict(temp_d[k],
                                        remove_fields=['id'],
                                        rename_fields=
-                                       model_fields_to_file_fields[current_entity])}
+                                       model_fields_to_file_fields[current_entity])
+
+                # Every row of the node query contains a different node
+                if k == NODE_ENTITY_NAME:
+                    node_entries_writer.write_item(entry, key=temp_d[k]["id"])
+                    node_entries_count += 1
+                    continue
+
                 try:
-                    export_data[current_entity].update(temp_d2)
+                    export_data[current_entity][temp_d[k]["id"]] = entry
                 except KeyError:
-                    export_data[current_entity] = temp_d2
-
-    ######################################
-    # Manually manage links and attributes
-    ######################################
-    # I use .get because there may be no nodes to export
-    all_nodes_pk = list()
-    if NODE_ENTITY_NAME in export_data:
-        all_nodes_pk.extend(export_data.get(NODE_ENTITY_NAME).keys())
+                    export_data[current_entity] = {temp_d[k]["id"]: entry}
 
-    if sum(len(model_data) for model_data in export_data.values()) == 0:
-        if not silent:
-            print("No nodes to store, exiting...")
-        return
+    node_entries_writer.end_object()
 
     if not silent:
         print("Exporting a total of {} db entries, of which {} nodes."
-              .format(sum(len(model_data) for model_data in export_data.values()),
-                      len(all_nodes_pk)))
+              .format(sum(len(model_data) for model_data in export_data.values())
+                      + node_entries_count, node_entries_count))
 
-    ## ATTRIBUTES
-    if not silent:
-        print("STORING NODE ATTRIBUTES...")
-    node_attributes = {}
-    node_attributes_conversion = {}
-
-    # A second QueryBuilder query to get the attributes. See if this can be
-    # optimized
-    if len(all_nodes_pk) > 0:
-        all_nodes_query = QueryBuilder()
-        all_nodes_query.append(Node, filters={"id": {"in": all_nodes_pk}},
-                               project=["*"])
-        for res in all_nodes_query.iterall():
-            n = res[0]
-            (node_attributes[str(n.pk)],
-             node_attributes_conversion[str(n.pk)]) = serialize_dict(
-                n.get_attrs(), track_conversion=True)
-
-    if not silent:
-        print("STORING NODE LINKS...")
+    # The sections of data.json are written one after the other, reading the
+    # database in batches, so that at no point the whole content is in memory
+    with folder.open('data.json', 'w') as f:
+        writer = JsonStreamWriter(f)
+        writer.begin_object()
+
+        writer.begin_object(key='export_data')
+        for entity_name, entity_data in export_data.items():
+            writer.write_item(entity_data, key=entity_name)
+        if node_entries_count > 0:
+            writer.write_raw_item(node_entries_spool, key=NODE_ENTITY_NAME)
+        writer.end_object()
+        node_entries_spool.close()
+
+        ## ATTRIBUTES
+        if not silent:
+            print("STORING NODE ATTRIBUTES...")
+
+        # The conversions are spooled while the attributes are written, to
+        # read every node only once
+        with tempfile.TemporaryFile(mode='w+') as conversion_spool:
+            conversion_writer = JsonStreamWriter(conversion_spool)
+            conversion_writer.begin_object()
+
+            writer.begin_object(key='node_attributes')
+            # A second QueryBuilder query to get the attributes. See if this can be
+            # optimized
+            if node_entries_count > 0:
+                all_nodes_query = QueryBuilder()
+                all_nodes_query.append(Node, filters={"id": {"in": to_be_exported}},
+                                       project=["*"])
+                for res in all_nodes_query.iterall(batch_size=EXPORT_BATCH_SIZE):
+                    n = res[0]
+                    attributes, conversion = serialize_dict(
+                        n.get_attrs(), track_conversion=True)
+                    writer.write_item(attributes, key=n.pk)
+                    conversion_writer.write_item(conversion, key=n.pk)
+            writer.end_object()
+
+            conversion_writer.end_object()
+            writer.write_raw_item(conversion_spool,
+                                  key='node_attributes_conversion')
 
-    links_uuid_dict = dict()
-    if len(all_nodes_pk) > 0:
-        # INPUT (Data, Calculation) - Forward, by the Calculation node
-        if input_forward:
-            # INPUT (Data, Calculation)
+        if not silent:
+            print("STORING NODE LINKS...")
+
+        writer.begin_list(key='links_uuid')
+        # Every link is written once: the forward and backward queries of a
+        # link type are disjoint, the forward queries only return the links
+        # to nodes that are not exported, and each query is distinct
+
+        def write_links(links_qb):
+            """
+            Write the links returned by a query projecting the uuid of the input,
+            the uuid of the output, the label and the type of each link.
+            """
+            for link in links_qb.distinct().iterall(batch_size=EXPORT_BATCH_SIZE):
+                writer.write_item(dict(zip(('input', 'output', 'label', 'type'), (str(_) for _ in link))))
+
+        if node_entries_count > 0:
+            # INPUT (Data, Calculation) - Forward, by the Calculation node
+            if input_forward:
+                # INPUT (Data, Calculation)
+                links_qb = QueryBuilder()
+                links_qb.append(Data,
+                                project=['uuid'], tag='input',
+                                filters = {'id': {'in': to_be_exported}})
+                links_qb.append(Calculation,
+                                project=['uuid'], tag='output',
+                                filters={'id': {'!in': to_be_exported}},
+                                edge_filters={'type':{'==':LinkType.INPUT.value}},
+                                edge_project=['label', 'type'], output_of='input')
+                write_links(links_qb)
+                # INPUT (Code, Calculation)
+                # The same as above until Code becomes a subclass of Data
+                links_qb = QueryBuilder()
+                links_qb.append(Code,
+                                project=['uuid'], tag='input',
+                                filters = {'id': {'in': to_be_exported}})
+                links_qb.append(Calculation,
+                                project=['uuid'], tag='output',
+                                filters={'id': {'!in': to_be_exported}},
+                                edge_filters={'type':{'==':LinkType.INPUT.value}},
+                                edge_project=['label', 'type'], output_of='input')
+                write_links(links_qb)
+
+            # INPUT (Data, Calculation) - Backward, by the Calculation node
             links_qb = QueryBuilder()
             links_qb.append(Data,
-                            project=['uuid'], tag='input',
-                            filters = {'id': {'in': all_nodes_pk}})
+                            project=['uuid'], tag='input')
             links_qb.append(Calculation,
                             project=['uuid'], tag='output',
+                            filters={'id': {'in': to_be_exported}},
                             edge_filters={'type':{'==':LinkType.INPUT.value}},
                             edge_project=['label', 'type'], output_of='input')
-            for input_uuid, output_uuid, link_label, link_type in links_qb.iterall():
-                val = {
-                    'input': str(input_uuid),
-                    'output': str(output_uuid),
-                    'label': str(link_label),
-                    'type':str(link_type)
-                }
-                links_uuid_dict[frozenset(val.items())] = val
-            # INPUT (Code, Calculation)
+            write_links(links_qb)
+            # INPUT (Data, Calculation) - Backward, by the Calculation node
             # The same as above until Code becomes a subclass of Data
             links_qb = QueryBuilder()
             links_qb.append(Code,
-                            project=['uuid'], tag='input',
-                            filters = {'id': {'in': all_nodes_pk}})
+                            project=['uuid'], tag='input')
             links_qb.append(Calculation,
                             project=['uuid'], tag='output',
-                            edge_filters={'type':{'==':LinkType.INPUT.value}},
+                            filters={'id': {'in': to_be_exported}},
+                            edge_filters={
+                                'type': {'==': LinkType.INPUT.value}},
                             edge_project=['label', 'type'], output_of='input')
-            for input_uuid, output_uuid, link_label, link_type in links_qb.iterall():
-                val = {
-                    'input': str(input_uuid),
-                    'output': str(output_uuid),
-                    'label': str(link_label),
-                    'type':str(link_type)
-                }
-                links_uuid_dict[frozenset(val.items())] = val
-
-        # INPUT (Data, Calculation) - Backward, by the Calculation node
-        links_qb = QueryBuilder()
-        links_qb.append(Data,
-                        project=['uuid'], tag='input')
-        links_qb.append(Calculation,
-                        project=['uuid'], tag='output',
-                        filters={'id': {'in': all_nodes_pk}},
-                        edge_filters={'type':{'==':LinkType.INPUT.value}},
-                        edge_project=['label', 'type'], output_of='input')
-        for input_uuid, output_uuid, link_label, link_type in links_qb.iterall():
-            val = {
-                'input': str(input_uuid),
-                'output': str(output_uuid),
-                'label': str(link_label),
-                'type':str(link_type)
-            }
-            links_uuid_dict[frozenset(val.items())] = val
-        # INPUT (Data, Calculation) - Backward, by the Calculation node
-        # The same as above until Code becomes a subclass of Data
-        links_qb = QueryBuilder()
-        links_qb.append(Code,
-                        project=['uuid'], tag='input')
-        links_qb.append(Calculation,
-                        project=['uuid'], tag='output',
-                        filters={'id': {'in': all_nodes_pk}},
-                        edge_filters={
-                            'type': {'==': LinkType.INPUT.value}},
-                        edge_project=['label', 'type'], output_of='input')
-        for input_uuid, output_uuid, link_label, link_type in links_qb.iterall():
-            val = {
-                'input': str(input_uuid),
-                'output': str(output_uuid),
-                'label': str(link_label),
-                'type': str(link_type)
-            }
-            links_uuid_dict[frozenset(val.items())] = val
-
-        # CREATE (Calculation, Data) - Forward, by the Calculation node
-        links_qb = QueryBuilder()
-        links_qb.append(Calculation,
-                        project=['uuid'], tag='input',
-                        filters={'id': {'in': all_nodes_pk}})
-        links_qb.append(Data,
-                        project=['uuid'], tag='output',
-                        edge_filters={'type': {'==': LinkType.CREATE.value}},
-                        edge_project=['label', 'type'], output_of='input')
-        for input_uuid, output_uuid, link_label, link_type in links_qb.iterall():
-            val = {
-                'input': str(input_uuid),
-                'output': str(output_uuid),
-                'label': str(link_label),
-                'type':str(link_type)
-            }
-            links_uuid_dict[frozenset(val.items())] = val
-        # CREATE (Calculation, Code) - Forward, by the Calculation node
-        # The same as above until Code becomes a subclass of Data
-        # This case will not happen (with the current setup - a code is not
-        # created by a calculation) but it is addded for completeness
-        links_qb = QueryBuilder()
-        links_qb.append(Calculation,
-                        project=['uuid'], tag='input',
-                        filters={'id': {'in': all_nodes_pk}})
-        links_qb.append(Code,
-                        project=['uuid'], tag='output',
-                        edge_filters={'type': {'==': LinkType.CREATE.value}},
-                        edge_project=['label', 'type'], output_of='input')
-        for input_uuid, output_uuid, link_label, link_type in links_qb.iterall():
-            val = {
-                'input': str(input_uuid),
-                'output': str(output_uuid),
-                'label': str(link_label),
-                'type': str(link_type)
-            }
-            links_uuid_dict[frozenset(val.items())] = val
-
-
-        # CREATE (Calculation, Data) - Backward, by the Data node
-        if create_reversed:
+            write_links(links_qb)
+
+            # CREATE (Calculation, Data) - Forward, by the Calculation node
             links_qb = QueryBuilder()
             links_qb.append(Calculation,
                             project=['uuid'], tag='input',
-                            filters={'id': {'in': all_nodes_pk}})
+                            filters={'id': {'in': to_be_exported}})
             links_qb.append(Data,
                             project=['uuid'], tag='output',
                             edge_filters={'type': {'==': LinkType.CREATE.value}},
                             edge_project=['label', 'type'], output_of='input')
-            for input_uuid, output_uuid, link_label, link_type in links_qb.iterall():
-                val = {
-                    'input': str(input_uuid),
-                    'output': str(output_uuid),
-                    'label': str(link_label),
-                    'type':str(link_type)
-                }
-                links_uuid_dict[frozenset(val.items())] = val
-        # CREATE (Calculation, Code) - Backward, by the Code node
-        # The same as above until Code becomes a subclass of Data
-        # This case will not happen (with the current setup - a code is not
-        # created by a calculation) but it is addded for completeness
-        if create_reversed:
+            write_links(links_qb)
+            # CREATE (Calculation, Code) - Forward, by the Calculation node
+            # The same as above until Code becomes a subclass of Data
+            # This case will not happen (with the current setup - a code is not
+            # created by a calculation) but it is addded for completeness
             links_qb = QueryBuilder()
             links_qb.append(Calculation,
                             project=['uuid'], tag='input',
-                            filters={'id': {'in': all_nodes_pk}})
-            links_qb.append(Data,
+                            filters={'id': {'in': to_be_exported}})
+            links_qb.append(Code,
                             project=['uuid'], tag='output',
                             edge_filters={'type': {'==': LinkType.CREATE.value}},
                             edge_project=['label', 'type'], output_of='input')
-            for input_uuid, output_uuid, link_label, link_type in links_qb.iterall():
-                val = {
-                    'input': str(input_uuid),
-                    'output': str(output_uuid),
-                    'label': str(link_label),
-                    'type':str(link_type)
-                }
-                links_uuid_dict[frozenset(val.items())] = val
-
-        # RETURN (Calculation, Data) - Forward, by the Calculation node
-        links_qb = QueryBuilder()
-        links_qb.append(Calculation,
-                        project=['uuid'], tag='input',
-                        filters={'id': {'in': all_nodes_pk}})
-        links_qb.append(Data,
-                        project=['uuid'], tag='output',
-                        edge_filters={'type': {'==': LinkType.RETURN.value}},
-                        edge_project=['label', 'type'], output_of='input')
-        for input_uuid, output_uuid, link_label, link_type in links_qb.iterall():
-            val = {
-                'input': str(input_uuid),
-                'output': str(output_uuid),
-                'label': str(link_label),
-                'type':str(link_type)
-            }
-            links_uuid_dict[frozenset(val.items())] = val
-
-        # RETURN (Calculation, Data) - Backward, by the Data node
-        if return_reversed:
+            write_links(links_qb)
+
+
+            # CREATE (Calculation, Data) - Backward, by the Data node
+            if create_reversed:
+                links_qb = QueryBuilder()
+                links_qb.append(Calculation,
+                                project=['uuid'], tag='input',
+                                filters={'id': {'!in': to_be_exported}})
+                links_qb.append(Data,
+                                project=['uuid'], tag='output',
+                                filters={'id': {'in': to_be_exported}},
+                                edge_filters={'type': {'==': LinkType.CREATE.value}},
+                                edge_project=['label', 'type'], output_of='input')
+                write_links(links_qb)
+            # CREATE (Calculation, Code) - Backward, by the Code node
+            # The same as above until Code becomes a subclass of Data
+            # This case will not happen (with the current setup - a code is not
+            # created by a calculation) but it is addded for completeness
+            if create_reversed:
+                links_qb = QueryBuilder()
+                links_qb.append(Calculation,
+                                project=['uuid'], tag='input',
+                                filters={'id': {'!in': to_be_exported}})
+                links_qb.append(Code,
+                                project=['uuid'], tag='output',
+                                filters={'id': {'in': to_be_exported}},
+                                edge_filters={'type': {'==': LinkType.CREATE.value}},
+                                edge_project=['label', 'type'], output_of='input')
+                write_links(links_qb)
+
+            # RETURN (Calculation, Data) - Forward, by the Calculation node
             links_qb = QueryBuilder()
             links_qb.append(Calculation,
-                            project=['uuid'], tag='input')
+                            project=['uuid'], tag='input',
+                            filters={'id': {'in': to_be_exported}})
             links_qb.append(Data,
                             project=['uuid'], tag='output',
-                            filters={'id': {'in': all_nodes_pk}},
                             edge_filters={'type': {'==': LinkType.RETURN.value}},
                             edge_project=['label', 'type'], output_of='input')
-            for input_uuid, output_uuid, link_label, link_type in links_qb.iterall():
-                val = {
-                    'input': str(input_uuid),
-                    'output': str(output_uuid),
-                    'label': str(link_label),
-                    'type':str(link_type)
-                }
-                links_uuid_dict[frozenset(val.items())] = val
-
-        # CALL (Calculation [caller], Calculation [called]) - Forward, by
-        # the Calculation node
-        links_qb = QueryBuilder()
-        links_qb.append(Calculation,
-                        project=['uuid'], tag='input',
-                        filters={'id': {'in': all_nodes_pk}})
-        links_qb.append(Calculation,
-                        project=['uuid'], tag='output',
-                        edge_filters={'type': {'==': LinkType.CALL.value}},
-                        edge_project=['label', 'type'], output_of='input')
-        for input_uuid, output_uuid, link_label, link_type in links_qb.iterall():
-            val = {
-                'input': str(input_uuid),
-                'output': str(output_uuid),
-                'label': str(link_label),
-                'type':str(link_type)
-            }
-            links_uuid_dict[frozenset(val.items())] = val
-
-        # CALL (Calculation [caller], Calculation [called]) - Backward,
-        # by the Calculation [called] node
-        if call_reversed:
+            write_links(links_qb)
+
+            # RETURN (Calculation, Data) - Backward, by the Data node
+            if return_reversed:
+                links_qb = QueryBuilder()
+                links_qb.append(Calculation,
+                                project=['uuid'], tag='input',
+                                filters={'id': {'!in': to_be_exported}})
+                links_qb.append(Data,
+                                project=['uuid'], tag='output',
+                                filters={'id': {'in': to_be_exported}},
+                                edge_filters={'type': {'==': LinkType.RETURN.value}},
+                                edge_project=['label', 'type'], output_of='input')
+                write_links(links_qb)
+
+            # CALL (Calculation [caller], Calculation [called]) - Forward, by
+            # the Calculation node
             links_qb = QueryBuilder()
             links_qb.append(Calculation,
-                            project=['uuid'], tag='input')
+                            project=['uuid'], tag='input',
+                            filters={'id': {'in': to_be_exported}})
             links_qb.append(Calculation,
                             project=['uuid'], tag='output',
-                            filters={'id': {'in': all_nodes_pk}},
                             edge_filters={'type': {'==': LinkType.CALL.value}},
                             edge_project=['label', 'type'], output_of='input')
-            for input_uuid, output_uuid, link_label, link_type in links_qb.iterall():
-                val = {
-                    'input': str(input_uuid),
-                    'output': str(output_uuid),
-                    'label': str(link_label),
-                    'type':str(link_type)
-                }
-                links_uuid_dict[frozenset(val.items())] = val
+            write_links(links_qb)
 
-    links_uuid = list(links_uuid_dict.values())
+            # CALL (Calculation [caller], Calculation [called]) - Backward,
+            # by the Calculation [called] node
+            if call_reversed:
+                links_qb = QueryBuilder()
+                links_qb.append(Calculation,
+                                project=['uuid'], tag='input',
+                                filters={'id': {'!in': to_be_exported}})
+                links_qb.append(Calculation,
+                                project=['uuid'], tag='output',
+                                filters={'id': {'in': to_be_exported}},
+                                edge_filters={'type': {'==': LinkType.CALL.value}},
+                                edge_project=['label', 'type'], output_of='input')
+                write_links(links_qb)
+
+        writer.end_list()
 
-    if not silent:
-        print("STORING GROUP ELEMENTS...")
-    groups_uuid = dict()
-    # If a group is in the exported date, we export the group/node correlation
-    if GROUP_ENTITY_NAME in export_data:
-        for curr_group in export_data[GROUP_ENTITY_NAME]:
-            group_uuid_qb = QueryBuilder()
-            group_uuid_qb.append(entity_names_to_entities[GROUP_ENTITY_NAME],
-                                 filters={'id': {'==': curr_group}},
-                                 project=['uuid'], tag='group')
-            group_uuid_qb.append(entity_names_to_entities[NODE_ENTITY_NAME],
-                                 project=['uuid'], member_of='group')
-            for res in group_uuid_qb.iterall():
-                if str(res[0]) in groups_uuid:
-                    groups_uuid[str(res[0])].append(str(res[1]))
-                else:
-                    groups_uuid[str(res[0])] = [str(res[1])]
+        if not silent:
+            print("STORING GROUP ELEMENTS...")
+
+        writer.begin_object(key='groups_uuid')
+        # If a group is in the exported date, we export the group/node correlation
+        if GROUP_ENTITY_NAME in export_data:
+            for curr_group in export_data[GROUP_ENTITY_NAME]:
+                group_uuid_qb = QueryBuilder()
+                group_uuid_qb.append(entity_names_to_entities[GROUP_ENTITY_NAME],
+                                     filters={'id': {'==': curr_group}},
+                                     project=['uuid'], tag='group')
+                group_uuid_qb.append(entity_names_to_entities[NODE_ENTITY_NAME],
+                                     project=['uuid'], member_of='group')
+                # Groups without nodes are not written, as they have no rows
+                is_empty = True
+                for res in group_uuid_qb.iterall(batch_size=EXPORT_BATCH_SIZE):
+                    if is_empty:
+                        writer.begin_list(key=str(res[0]))
+                        is_empty = False
+                    writer.write_item(str(res[1]))
+                if not is_empty:
+                    writer.end_list()
+        writer.end_object()
+
+        writer.end_object()
 
     ######################################
     # Now I store
@@ -2330,23 +3377,6 @@ def export_tree(what, folder,allowed_licenses=None, forbidden_licenses=None,
     nodesubfolder = folder.get_subfolder('nodes', create=True,
                                          reset_limit=True)
 
-    # Add the proper signatures to the exported data
-    for entity_name in export_data.keys():
-        export_data[entity_name] = (
-            export_data.pop(entity_name))
-
-    if not silent:
-        print("STORING DATA...")
-
-    with folder.open('data.json', 'w') as f:
-        json.dump({
-            'node_attributes': node_attributes,
-            'node_attributes_conversion': node_attributes_conversion,
-            'export_data': export_data,
-            'links_uuid': links_uuid,
-            'groups_uuid': groups_uuid,
-        }, f)
-
     # Add proper signature to unique identifiers & all_fields_info
     # Ignore if a key doesn't exist in any of the two dictionaries
 
@@ -2364,13 +3394,13 @@ def export_tree(what, folder,allowed_licenses=None, forbidden_licenses=None,
         print("STORING FILES...")
 
     # If there are no nodes, there are no files to store
-    if len(all_nodes_pk) > 0:
+    if node_entries_count > 0:
         # Large speed increase by not getting the node itself and looping in memory
         # in python, but just getting the uuid
         uuid_query = QueryBuilder()
-        uuid_query.append(Node, filters={"id": {"in": all_nodes_pk}},
+        uuid_query.append(Node, filters={"id": {"in": to_be_exported}},
                           project=["uuid"])
-        for res in uuid_query.all():
+        for res in uuid_query.iterall(batch_size=EXPORT_BATCH_SIZE):
             uuid = str(res[0])
             sharded_uuid = export_shard_uuid(uuid)
 
@@ -2456,18 +3486,25 @@ class MyWritingZipFile(object):
         self._buffer = None
 
     def open(self):
-        from six.moves import cStringIO as StringIO
+        import tempfile
 
         if self._buffer is not None:
             raise IOError("Cannot open again!")
-        self._buffer = StringIO()
+        # The content is spooled to disk, since it can be as large as the
+        # data.json of an export, and then copied to the zip in chunks
+        self._buffer = tempfile.NamedTemporaryFile(mode='w+', delete=False)
 
     def write(self, data):
         self._buffer.write(data)
 
     def close(self):
-        self._buffer.seek(0)
-        self._zipfile.writestr(self._fname, self._buffer.read())
+        import os
+
+        self._buffer.close()
+        try:
+            self._zipfile.write(self._buffer.name, self._fname)
+        finally:
+            os.remove(self._buffer.name)
         self._buffer = None
 
     def __enter__(self):
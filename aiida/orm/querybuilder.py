@@ -23,6 +23,7 @@ when instantiated by the user.
 from __future__ import absolute_import
 from __future__ import print_function
 import warnings
+from collections import OrderedDict, namedtuple
 # Checking for correct input with the inspect module
 from inspect import isclass as inspect_isclass
 
@@ -151,6 +152,112 @@ def get_querybuilder_classifiers_from_type(ormclasstype, obj):
 
 
 
+def _rows_to_columns(fields, rows):
+    """
+    Convert a list of rows into a dictionary mapping every field to a numpy array of its values.
+    """
+    import numbers
+    import numpy as np
+
+    columns = {}
+    for index, field in enumerate(fields):
+        values = [row[index] for row in rows]
+        if all(isinstance(value, (numbers.Number, np.number, np.bool_)) for value in values):
+            columns[field] = np.array(values)
+        else:
+            # Filling the array element by element avoids that numpy broadcasts lists or tuples
+            column = np.empty(len(values), dtype=object)
+            for position, value in enumerate(values):
+                column[position] = value
+            columns[field] = column
+    return columns
+
+
+class _Parameter(object):
+    """
+    Mixin for the filter values that are bound as named parameters of a cached query, see `_parametrize_filters`.
+    """
+    key = None
+
+
+# The classes of the filter values that are bound as parameters, by the type of the value
+_PARAMETER_CLASSES = {
+    base: type(str('{}Parameter'.format(base.__name__)), (_Parameter, base), {})
+    for base in set(six.integer_types + (float, str, six.text_type))
+}
+
+# The queries built by the QueryBuilder, by the hash of their shape, from the least to the most recently used
+_QUERY_CACHE = OrderedDict()
+
+_CachedQuery = namedtuple('_CachedQuery', [
+    'query', 'tag_to_alias_map', 'tag_to_projected_entity_dict', 'nr_of_projections', 'attrkeys_as_in_sql_result'
+])
+
+
+def _parametrize_filters(filters, values):
+    """
+    Replace the numbers and strings in a filter specification by parameters.
+
+    :param filters: the filter specification, or part of it
+    :param values: a dictionary to which the key and the value of each parameter is added
+    :returns: a tuple with the shape of the specification, where every parameter is replaced by the name of its type,
+        and the specification where every parameter is replaced by a copy of its value that carries its key
+    """
+    if isinstance(filters, dict):
+        shape = {}
+        parametrized = {}
+        # Sorting the keys gives the same parameter keys to every specification with the same shape
+        for key in sorted(filters, key=str):
+            shape[key], parametrized[key] = _parametrize_filters(filters[key], values)
+        return shape, parametrized
+    elif isinstance(filters, (list, tuple)):
+        items = [_parametrize_filters(item, values) for item in filters]
+        return [shape for shape, _ in items], type(filters)(item for _, item in items)
+    elif type(filters) in _PARAMETER_CLASSES:
+        parameter = _PARAMETER_CLASSES[type(filters)](filters)
+        parameter.key = 'qb_param_{}'.format(len(values))
+        values[parameter.key] = filters
+        return type(filters).__name__, parameter
+    return filters, filters
+
+
+def _iter_bind_parameters(query):
+    """
+    Iterate over the bind parameters of the statement of a query.
+    """
+    from sqlalchemy.sql import visitors
+    from sqlalchemy.sql.elements import BindParameter
+
+    for element in visitors.iterate(query.statement, {}):
+        if isinstance(element, BindParameter):
+            yield element
+
+
+def _bind_parameters(query, keys):
+    """
+    Give the bind parameters of a query, whose value is a parameter of `_parametrize_filters`, the key of the parameter,
+    so that their value can be set with `query.params`.
+
+    :param query: a query built with parametrized filters
+    :param keys: the keys of all the parameters of the filters
+    :returns: True if every parameter has become a bind parameter of the query, False if the query cannot be reused
+        with other values, for example because a value was transformed while building the query
+    """
+    for bind in _iter_bind_parameters(query):
+        if isinstance(bind.value, _Parameter):
+            bind.key = bind._orig_key = bind.value.key  # pylint: disable=protected-access
+            bind.unique = False
+
+    # The statement is compiled again for every execution, so check that the renamed bind parameters are the ones used
+    bound = set()
+    for bind in _iter_bind_parameters(query):
+        if isinstance(bind.value, _Parameter):
+            if bind.key != bind.value.key:
+                return False
+            bound.add(bind.key)
+    return bound == set(keys)
+
+
 class QueryBuilder(object):
     """
     The class to query the AiiDA database. 
@@ -170,6 +277,10 @@ class QueryBuilder(object):
     # namely tag of first entity + _EDGE_TAG_DELIM + tag of second entity
     _EDGE_TAG_DELIM = '--'
     _VALID_PROJECTION_KEYS = ('func', 'cast')
+    # Maximum number of lazy nodes whose attributes and extras are loaded together
+    _LAZY_BATCH_SIZE = 1000
+    # Maximum number of built queries that are kept to be reused by queries with the same shape
+    _QUERY_CACHE_SIZE = 256
 
     def __init__(self, *args, **kwargs):
         """
@@ -200,6 +311,9 @@ class QueryBuilder(object):
         :param order_by:
             How to order the results. As the 2 above, can be set also at later stage,
             check :func:`QueryBuilder.order_by` for more information.
+        :param list after:
+            Return only the results that come after this cursor, in the order of the results.
+            Details in :func:`QueryBuilder.after`.
 
         """
         from aiida.backends.settings import BACKEND
@@ -275,6 +389,14 @@ class QueryBuilder(object):
         # The user can inject a query, this keyword stores whether this was done.
         # Check QueryBuilder.inject_query
         self._injected = False
+        # Whether the current query was built in raw mode, projecting entities as their id.
+        # Check QueryBuilder.iterrows
+        self._raw = False
+        # Whether the current query joins descendants and ancestors through the reachability index.
+        # Check QueryBuilder._is_reachability_index_usable
+        self._use_reachability_index = False
+        # Whether the current query was made distinct with QueryBuilder.distinct
+        self._distinct = False
 
         # Setting debug levels:
         self.set_debug(kwargs.pop('debug', False))
@@ -325,10 +447,13 @@ class QueryBuilder(object):
         if order_spec:
             self.order_by(order_spec)
 
+        # The cursor for keyset pagination, check QueryBuilder.after
+        self.after(kwargs.pop('after', None))
+
         # I've gone through all the keywords, popping each item
         # If kwargs is not empty, there is a problem:
         if kwargs:
-            valid_keys = ('path', 'filters', 'project', 'limit', 'offset', 'order_by')
+            valid_keys = ('path', 'filters', 'project', 'limit', 'offset', 'order_by', 'after')
             raise InputValidationError(
                 "Received additional keywords: {}"
                 "\nwhich I cannot process"
@@ -356,7 +481,7 @@ class QueryBuilder(object):
                 engine))
 
         que = self.get_query()
-        return str(que.statement.compile(
+        return str(que.statement.params(que._params).compile(
                 compile_kwargs={"literal_binds": True},
                 dialect=mydialect.dialect())
             )
@@ -1095,7 +1220,11 @@ class QueryBuilder(object):
                     "will not work!\n"
                     "I suggest you apply functions on a column, e.g. ('id')\n"
                 )
-            self._query = self._query.add_entity(alias)
+            if self._raw:
+                # No ORM instance is built in raw mode, the entity is represented by its id
+                self._query = self._query.add_columns(_get_column('id', alias))
+            else:
+                self._query = self._query.add_entity(alias)
         else:
             entity_to_project = self._get_projectable_entity(
                 alias, column_name, attr_key,
@@ -1231,6 +1360,107 @@ class QueryBuilder(object):
         self._offset = offset
         return self
 
+    def after(self, cursor):
+        """
+        Return only the rows that come after a given row, in the order of the results.
+        This allows to page through the results with keyset pagination: the next page
+        is requested with the cursor of the last row of the current page, rather than
+        with an offset, which requires the database to go through all the rows of the
+        previous pages.
+
+        The results have to be ordered on the columns of a single vertex, the last of
+        which has to be its id, such that the order is unique. The cursor is the list of
+        the values of these columns for the last row, as returned by :meth:`get_cursor`.
+
+        Usage::
+
+            qb = QueryBuilder()
+            qb.append(Node, tag='node', project=['id', 'ctime', 'label'])
+            qb.order_by({'node': [{'ctime': 'desc'}, 'id']})
+            qb.limit(100)
+
+            page = qb.dict()
+            while page:
+                # do something with the page, then get the next one
+                qb.after(qb.get_cursor(page[-1]['node']))
+                page = qb.dict()
+
+        :param list cursor: the cursor, or None to return all the rows
+        """
+        if cursor is not None and not isinstance(cursor, (list, tuple)):
+            raise InputValidationError("The cursor has to be a list, or None")
+        self._after = list(cursor) if cursor is not None else None
+        return self
+
+    def _get_keyset_order(self):
+        """
+        Return the order of the results, as needed for keyset pagination.
+
+        :returns: a tuple with the tag of the ordered vertex and a list of the ordered
+            entities, with tuples of the column or attribute path and its specification
+        :raise InputValidationError: if the results are not ordered on a single vertex,
+            with its id as last column
+        """
+        tags = set(tag for order_spec in self._order_by for tag in order_spec)
+        if len(tags) != 1:
+            raise InputValidationError(
+                "Keyset pagination requires the results to be ordered on a single vertex"
+            )
+        tag = tags.pop()
+
+        entities = [
+            (entitytag, entityspec)
+            for order_spec in self._order_by
+            for entitydict in order_spec[tag]
+            for entitytag, entityspec in entitydict.items()
+        ]
+        if entities[-1][0] != 'id':
+            raise InputValidationError(
+                "Keyset pagination requires the id to be the last column in the order of the results"
+            )
+
+        return tag, entities
+
+    def get_cursor(self, result):
+        """
+        Return the cursor of a row of results, to pass to :meth:`after`.
+
+        :param dict result: the values projected for the ordered vertex, as returned
+            by :meth:`dict` for its tag, which have to include all the ordered entities
+        :returns: the cursor, as a list
+        """
+        _, entities = self._get_keyset_order()
+        try:
+            return [result[entitytag] for entitytag, _ in entities]
+        except KeyError as exception:
+            raise InputValidationError(
+                "The cursor requires the projection of {}".format(exception)
+            )
+
+    def _build_keyset_filter(self, alias, entities, cursor):
+        """
+        Build the filter expression of keyset pagination. For an order on (a asc, b desc, id asc)
+        this selects the rows where a > a0, or a = a0 and b < b0, or a = a0 and b = b0 and id > id0.
+
+        :param alias: the alias of the ordered vertex
+        :param entities: the ordered entities, as returned by :meth:`_get_keyset_order`
+        :param cursor: the values of the ordered entities of the last row
+        """
+        if len(cursor) != len(entities):
+            raise InputValidationError(
+                "The cursor has {} values, but the results are ordered by {} columns"
+                "".format(len(cursor), len(entities))
+            )
+
+        alternatives = []
+        for index, (entitytag, entityspec) in enumerate(entities):
+            operator = '<' if entityspec.get('order', 'asc') == 'desc' else '>'
+            conditions = [{tag: {'==': value}} for (tag, _), value in zip(entities[:index], cursor[:index])]
+            conditions.append({entitytag: {operator: cursor[index]}})
+            alternatives.append({'and': conditions})
+
+        return self._build_filters(alias, {'or': alternatives})
+
     def _build_filters(self, alias, filter_spec):
         """
         Recurse through the filter specification and apply filter operations.
@@ -1395,12 +1625,36 @@ class QueryBuilder(object):
         )
         return aliased_edge
 
-    def _join_descendants_recursive(self, joined_entity, entity_to_join, isouterjoin, filter_dict, expand_path=False):
+    def _join_reachability_index(self, joined_entity, entity_to_join, isouterjoin, joined_column, column_to_join):
+        """
+        Join the entity through the reachability index instead of a recursive query,
+        see :py:mod:`aiida.orm.utils.reachability`.
+        Every pair of connected nodes is returned once, instead of once for every path between them.
+
+        :param joined_column: the column of the index with the id of the joined entity
+        :param column_to_join: the column of the index with the id of the entity to join
+        """
+        reachability = aliased(self._impl.Reachability)
+        self._query = self._query.join(
+            reachability,
+            getattr(reachability, joined_column) == joined_entity.id
+        ).join(
+            entity_to_join,
+            getattr(reachability, column_to_join) == entity_to_join.id,
+            isouter=isouterjoin
+        )
+        return reachability
+
+    def _join_descendants_recursive(self, joined_entity, entity_to_join, isouterjoin, filter_dict, expand_path=False,
+                                    use_index=False):
         """
         joining descendants using the recursive functionality
         :TODO: Move the filters to be done inside the recursive query (for example on depth)
         :TODO: Pass an option to also show the path, if this is wanted.
         """
+        if use_index:
+            return self._join_reachability_index(
+                joined_entity, entity_to_join, isouterjoin, 'ancestor_id', 'descendant_id')
 
         self._check_dbentities(
             (joined_entity, self._impl.Node),
@@ -1460,13 +1714,17 @@ class QueryBuilder(object):
         )
         return descendants_recursive.c
 
-    def _join_ancestors_recursive(self, joined_entity, entity_to_join, isouterjoin, filter_dict, expand_path=False):
+    def _join_ancestors_recursive(self, joined_entity, entity_to_join, isouterjoin, filter_dict, expand_path=False,
+                                  use_index=False):
         """
         joining ancestors using the recursive functionality
         :TODO: Move the filters to be done inside the recursive query (for example on depth)
         :TODO: Pass an option to also show the path, if this is wanted.
 
         """
+        if use_index:
+            return self._join_reachability_index(
+                joined_entity, entity_to_join, isouterjoin, 'descendant_id', 'ancestor_id')
         self._check_dbentities(
             (joined_entity, self._impl.Node),
             (entity_to_join, self._impl.Node),
@@ -1814,6 +2072,7 @@ class QueryBuilder(object):
             'order_by': self._order_by,
             'limit': self._limit,
             'offset': self._offset,
+            'after': self._after,
         })
 
         # ~ self._get_json_compatible()
@@ -1889,8 +2148,14 @@ class QueryBuilder(object):
                         (self._filters[edge_tag].get('path', None) is not None) or
                         any(['path' in d.keys() for d in self._projections[edge_tag]])
                 )
+                # The reachability index only knows the pairs of nodes, so it is used if the edge is not needed
+                use_index = (
+                        self._use_reachability_index and not expand_path and
+                        not self._filters[edge_tag] and not self._projections[edge_tag] and
+                        not any(edge_tag in order_spec for order_spec in self._order_by)
+                )
                 aliased_edge = connection_func(toconnectwith, alias, isouterjoin=isouterjoin, filter_dict=filter_dict,
-                                               expand_path=expand_path)
+                                               expand_path=expand_path, use_index=use_index)
             else:
                 aliased_edge = connection_func(toconnectwith, alias, isouterjoin=isouterjoin)
             if aliased_edge is not None:
@@ -1912,6 +2177,13 @@ class QueryBuilder(object):
                 self._build_filters(alias, filter_specs)
             )
 
+        ######################### KEYSET ###############################
+        if self._after is not None:
+            tag, entities = self._get_keyset_order()
+            self._query = self._query.filter(
+                self._build_keyset_filter(self._tag_to_alias_map[tag], entities, self._after)
+            )
+
         ######################### PROJECTIONS ##########################
         # first clear the entities in the case the first item in the
         # path was not meant to be projected
@@ -1991,6 +2263,92 @@ class QueryBuilder(object):
 
         return self._query
 
+    def _is_reachability_index_usable(self):
+        """
+        Return whether the query is distinct, the path has a descendant_of or ancestor_of relationship and the
+        reachability index is fresh.
+        The index returns every pair of nodes once, while the recursive query returns one row for every path, so only
+        distinct queries, which do not use the edge of the relationship, get the same rows through the index.
+        """
+        if not self._distinct:
+            return False
+
+        if not any(vertex.get('joining_keyword') in ('descendant_of', 'ancestor_of') for vertex in self._path):
+            return False
+
+        from aiida.orm.utils.reachability import is_reachability_index_fresh
+        return is_reachability_index_fresh()
+
+    def _build_cached(self):
+        """
+        Build the query, reusing the query built for an earlier query of the same shape if possible.
+
+        The shape of a query is its queryhelp where the numbers and strings in the filters are replaced by their type.
+        These values are bound as named parameters of the query, so that a query is built only once for every shape
+        and then executed with the values of the filters of each QueryBuilder.
+        Queries whose values cannot be bound, for example because they are used in a JSON document, are always built.
+
+        :returns: an instance of sqlalchemy.orm.Query
+        """
+        from aiida.common.hashing import make_hash
+
+        self._use_reachability_index = self._is_reachability_index_usable()
+
+        if self._QUERY_CACHE_SIZE <= 0:
+            return self._build()
+
+        values = {}
+        shape, filters = _parametrize_filters(self._filters, values)
+        shape_hash = make_hash({
+            'path': self._path,
+            'filters': shape,
+            'project': self._projections,
+            'order_by': self._order_by,
+            'limit': self._limit,
+            'offset': self._offset,
+            'after': self._after,
+            'raw': self._raw,
+            'reachability': self._use_reachability_index,
+        })
+
+        try:
+            cached = _QUERY_CACHE.pop(shape_hash)
+        except KeyError:
+            original_filters = self._filters
+            self._filters = filters
+            try:
+                query = self._build()
+            finally:
+                self._filters = original_filters
+            if _bind_parameters(query, values.keys()):
+                cached = _CachedQuery(
+                    query, dict(self._tag_to_alias_map), self.tag_to_projected_entity_dict, self.nr_of_projections,
+                    self._attrkeys_as_in_sql_result
+                )
+            else:
+                cached = None
+        else:
+            if cached is not None:
+                query = cached.query.with_session(self._impl.get_session())
+                self._tag_to_alias_map = dict(cached.tag_to_alias_map)
+                self.tag_to_projected_entity_dict = cached.tag_to_projected_entity_dict
+                self.nr_of_projections = cached.nr_of_projections
+                self._attrkeys_as_in_sql_result = cached.attrkeys_as_in_sql_result
+                self.tags_location_dict = {path['tag']: index for index, path in enumerate(self._path)}
+
+        _QUERY_CACHE[shape_hash] = cached
+        while len(_QUERY_CACHE) > self._QUERY_CACHE_SIZE:
+            try:
+                _QUERY_CACHE.popitem(last=False)
+            except KeyError:
+                break
+
+        if cached is None:
+            return self._build()
+
+        self._query = query.params(**values)
+        return self._query
+
     def except_if_input_to(self, calc_class):
         """
         Makes counterquery based on the own path, only selecting
@@ -2082,13 +2440,18 @@ class QueryBuilder(object):
                 given_tags.append(path['edge_tag'])
         return given_tags
 
-    def get_query(self):
+    def get_query(self, raw=False):
         """
         Instantiates and manipulates a sqlalchemy.orm.Query instance if this is needed.
         First,  I check if the query instance is still valid by hashing the queryhelp.
         In this way, if a user asks for the same query twice, I am not recreating an instance.
 
+        :param bool raw: if True, build the query in raw mode, where the entities projected
+            with '*' are projected as their id column, see :meth:`iterrows`.
+
         :returns: an instance of sqlalchemy.orm.Query that is specific to the backend used.
+            The values of the filters are bound as parameters of the query, which are set with
+            ``query.params``, so they are only used when the query itself is executed.
 
         """
         from aiida.common.hashing import make_hash
@@ -2108,13 +2471,20 @@ class QueryBuilder(object):
             need_to_build = True
         elif self._injected:
             need_to_build = False
-        elif self._hash == queryhelp_hash:
-            need_to_build = False
+        elif self._hash == queryhelp_hash and self._raw == raw:
+            # Links stored since the query was built make the reachability index stale
+            need_to_build = self._use_reachability_index and not self._is_reachability_index_usable()
         else:
             need_to_build = True
+            if self._hash != queryhelp_hash:
+                # The query changed since it was made distinct
+                self._distinct = False
 
         if need_to_build:
-            query = self._build()
+            self._raw = raw
+            query = self._build_cached()
+            if self._distinct:
+                query = self._query = query.distinct()
             self._hash = queryhelp_hash
         else:
             try:
@@ -2124,7 +2494,11 @@ class QueryBuilder(object):
                     "AttributeError thrown even though I should\n"
                     "have _query as an attribute"
                 )
+                self._raw = raw
+                self._use_reachability_index = self._is_reachability_index_usable()
                 query = self._build()
+                if self._distinct:
+                    query = self._query = query.distinct()
                 self._hash = queryhelp_hash
         return query
 
@@ -2162,7 +2536,14 @@ class QueryBuilder(object):
 
         :returns: self
         """
-        self._query = self.get_query().distinct()
+        if self._injected:
+            self._query = self.get_query().distinct()
+        else:
+            # The query is built again, since a distinct query can join descendants and ancestors
+            # through the reachability index
+            self._distinct = True
+            self._hash = None
+            self.get_query()
         return self
 
     def first(self):
@@ -2212,16 +2593,22 @@ class QueryBuilder(object):
             raise NotExistent("No result was found")
         return res[0]
 
-    def count(self):
+    def count(self, estimate=False):
         """
         Counts the number of rows returned by the backend.
 
+        :param bool estimate: if True, return the number of rows estimated by the
+            query planner of the database, which does not execute the query. This is
+            much faster for queries with many results, but only gives an order of magnitude.
+
         :returns: the number of rows as an integer
         """
         query = self.get_query()
+        if estimate:
+            return self._impl.estimate_count(query)
         return self._impl.count(query)
 
-    def iterall(self, batch_size=100):
+    def iterall(self, batch_size=100, lazy=False):
         """
         Same as :meth:`.all`, but returns a generator.
         Be aware that this is only safe if no commit will take place during this
@@ -2232,15 +2619,39 @@ class QueryBuilder(object):
         :param int batch_size:
             The size of the batches to ask the backend to batch results in subcollections.
             You can optimize the speed of the query by tuning this parameter.
+        :param bool lazy:
+            If True, the attributes and extras of the nodes are not fetched by the query.
+            They are loaded the first time they are accessed on any node, with a single query
+            for all the nodes of the same batch, see :meth:`.all`.
 
         :returns: a generator of lists
         """
 
         query = self.get_query()
 
+        if not lazy:
+            for item in self._impl.iterall(query, batch_size, self._attrkeys_as_in_sql_result):
+                yield item
+            return
+
+        query = self._impl.defer_node_columns(query, [
+            self._tag_to_alias_map[tag]
+            for tag, projected_entities_dict in self.tag_to_projected_entity_dict.items()
+            if '*' in projected_entities_dict
+        ])
+
+        rows = []
         for item in self._impl.iterall(query, batch_size, self._attrkeys_as_in_sql_result):
-            yield item
-        return
+            rows.append(item)
+            if len(rows) == (batch_size or self._LAZY_BATCH_SIZE):
+                Node._set_lazy_loading([entity for row in rows for entity in row if isinstance(entity, Node)])
+                for row in rows:
+                    yield row
+                rows = []
+
+        Node._set_lazy_loading([entity for row in rows for entity in row if isinstance(entity, Node)])
+        for row in rows:
+            yield row
 
     def iterdict(self, batch_size=100):
         """
@@ -2261,7 +2672,84 @@ class QueryBuilder(object):
         for item in self._impl.iterdict(query, batch_size, self.tag_to_projected_entity_dict):
             yield item
 
-    def all(self, batch_size=None):
+    def get_row_fields(self):
+        """
+        Return the names of the fields of the rows returned by :meth:`iterrows`,
+        one per projection, in the order of the projections. The name is made
+        of the tag and the projected key, e.g. ``calc_id`` or
+        ``structure_attributes_cell`` for the projection of ``attributes.cell``
+        on the vertex with tag ``structure``. Entities projected with '*' are
+        returned as their id, and their field is therefore named ``<tag>_id``
+        as well, e.g. ``calc_id``.
+
+        :returns: a list of strings
+        """
+        import re
+
+        self.get_query(raw=True)
+        fields = [None] * len(self._attrkeys_as_in_sql_result)
+        for tag, projected_entities_dict in self.tag_to_projected_entity_dict.items():
+            for attrkey, index_in_sql_result in projected_entities_dict.items():
+                if attrkey == '*':
+                    attrkey = 'id'
+                fields[index_in_sql_result] = re.sub(r'\W', '_', '{}_{}'.format(tag, attrkey))
+        return fields
+
+    def iterrows(self, batch_size=100):
+        """
+        Same as :meth:`.iterall`, but returns lightweight named tuples of the raw
+        values of the projected columns and attribute paths, without ever
+        instantiating an ORM or AiiDA class. Entities projected with '*' are
+        returned as their id, in a field named ``<tag>_id``. This is much faster when scanning many rows, and
+        the rows are fetched with a server-side cursor in batches of
+        `batch_size`, so that the memory does not grow with the number of results.
+        The same restrictions on commits as for :meth:`.iterall` apply.
+
+        Usage::
+
+            qb = QueryBuilder()
+            qb.append(StructureData, tag='structure', project=['id', 'attributes.cell'])
+            for row in qb.iterrows():
+                print(row.structure_id, row.structure_attributes_cell)
+
+        :param int batch_size:
+            The size of the batches to ask the backend to batch results in subcollections.
+
+        :returns: a generator of named tuples, whose fields are given by :meth:`get_row_fields`
+        """
+        from collections import namedtuple
+
+        row_class = namedtuple('QueryRow', self.get_row_fields(), rename=True)
+        query = self.get_query(raw=True)
+
+        for item in self._impl.iterall(query, batch_size, self._attrkeys_as_in_sql_result, raw=True):
+            yield row_class(*item)
+
+    def iterbatches(self, batch_size=1000):
+        """
+        Same as :meth:`.iterrows`, but returns the rows in batches, in columnar
+        format. Every batch is a dictionary mapping each field given by
+        :meth:`get_row_fields` to a numpy array of its values in the batch.
+        Columns of integers, floats or booleans without null values get the
+        corresponding numpy type, all the others are arrays of objects.
+
+        :param int batch_size: the maximum number of rows of each batch
+
+        :returns: a generator of dictionaries of numpy arrays
+        """
+        fields = self.get_row_fields()
+        rows = []
+
+        for row in self.iterrows(batch_size=batch_size):
+            rows.append(row)
+            if len(rows) == batch_size:
+                yield _rows_to_columns(fields, rows)
+                rows = []
+
+        if rows:
+            yield _rows_to_columns(fields, rows)
+
+    def all(self, batch_size=None, lazy=False):
         """
         Executes the full query with the order of the rows as returned by the backend.
         the order inside each row is given by the order of the vertices in the path
@@ -2272,11 +2760,18 @@ class QueryBuilder(object):
             You can optimize the speed of the query by tuning this parameter.
             Leave the default (*None*) if speed is not critical or if you don't know
             what you're doing!
+        :param bool lazy:
+            If True, the attributes and extras of the nodes are not fetched by the query.
+            The first time that they are accessed on a node, they are loaded with a single
+            query for all the nodes of the same batch, of *batch_size* rows or of 1000 rows
+            if this is not specified. The repository folders are always only created when
+            they are first accessed. Use this to iterate over many nodes when only some
+            of them, or only their columns like the pk or the label, are needed.
 
         :returns: a list of lists of all projected entities.
         """
 
-        return list(self.iterall(batch_size=batch_size))
+        return list(self.iterall(batch_size=batch_size, lazy=lazy))
 
     def dict(self, batch_size=None):
         """
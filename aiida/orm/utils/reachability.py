@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""
+The reachability index: an opt-in table of all the pairs of nodes connected by a path of create and input links.
+
+When the index is fresh, the QueryBuilder joins the ``descendant_of`` and ``ancestor_of`` relationships through it,
+instead of walking the links with a recursive query. The index is not updated when a link is added, which is what
+made the old transitive closure table too costly to maintain, but on demand, with :func:`update_reachability_index`
+or ``verdi devel reachability``, which ``verdi import`` also runs when the index is enabled: it is fresh as long as no
+link was added since. Deleting or changing a link may disconnect pairs of nodes, which cannot be found incrementally,
+so a trigger of the database then clears the index.
+
+The index knows which pairs of nodes are connected, not through how many paths, while the recursive query returns
+one row for every path. The QueryBuilder therefore only uses the index for distinct queries, see
+:py:meth:`aiida.orm.querybuilder.QueryBuilder.distinct`, which do not use the edge of the relationship: the rows are
+then the same. The freshness of the index is checked in the database every time such a query is built or run.
+"""
+from __future__ import absolute_import
+
+from aiida.common.links import LinkType
+
+__all__ = [
+    'is_reachability_index_enabled', 'is_reachability_index_fresh', 'update_reachability_index',
+    'clear_reachability_index'
+]
+
+# The global setting with the id of the last link in the index, which is deleted by the trigger clearing the index
+LINK_ID_KEY = 'reachability|link_id'
+
+# The types of the links followed by the descendant_of and ancestor_of relationships of the QueryBuilder
+LINK_TYPES = (LinkType.CREATE.value, LinkType.INPUT.value)
+
+# Above this number of new links, the index is rebuilt instead of being updated one link at a time
+MAX_INCREMENTAL_LINKS = 10000
+
+_LAST_LINK_ID = "SELECT max(id) FROM db_dblink WHERE type IN %(types)s"
+
+_NEW_LINKS = """
+    SELECT input_id, output_id FROM db_dblink
+    WHERE type IN %(types)s AND id > %(link_id)s
+    ORDER BY id
+    LIMIT %(limit)s
+"""
+
+# Every ancestor of the input, including itself, now reaches every descendant of the output, including itself
+_ADD_LINK = """
+    INSERT INTO db_dbreachability (ancestor_id, descendant_id)
+    SELECT ancestors.id, descendants.id
+    FROM (
+        SELECT %(input_id)s AS id
+        UNION SELECT ancestor_id FROM db_dbreachability WHERE descendant_id = %(input_id)s
+    ) AS ancestors CROSS JOIN (
+        SELECT %(output_id)s AS id
+        UNION SELECT descendant_id FROM db_dbreachability WHERE ancestor_id = %(output_id)s
+    ) AS descendants
+    WHERE NOT EXISTS (
+        SELECT 1 FROM db_dbreachability AS pair
+        WHERE pair.ancestor_id = ancestors.id AND pair.descendant_id = descendants.id
+    )
+"""
+
+_REBUILD = """
+    INSERT INTO db_dbreachability (ancestor_id, descendant_id)
+    WITH RECURSIVE pair (ancestor_id, descendant_id) AS (
+        SELECT input_id, output_id FROM db_dblink WHERE type IN %(types)s
+        UNION
+        SELECT pair.ancestor_id, link.output_id
+        FROM pair JOIN db_dblink AS link ON link.input_id = pair.descendant_id
+        WHERE link.type IN %(types)s
+    )
+    SELECT ancestor_id, descendant_id FROM pair
+"""
+
+
+def _get_last_link_id(cursor):
+    cursor.execute(_LAST_LINK_ID, {'types': LINK_TYPES})
+    return cursor.fetchone()[0] or 0
+
+
+def is_reachability_index_enabled():
+    """
+    Return whether the reachability index is enabled, i.e. it was updated and was not cleared since.
+    """
+    from aiida.backends.utils import get_global_setting
+
+    try:
+        get_global_setting(LINK_ID_KEY)
+    except KeyError:
+        return False
+
+    return True
+
+
+def is_reachability_index_fresh():
+    """
+    Return whether the reachability index is enabled and contains all the links of the database, i.e. the id of the
+    last link in the index is the largest id of the links it follows.
+    """
+    from aiida.backends.utils import get_global_setting, get_db_cursor
+
+    try:
+        link_id = get_global_setting(LINK_ID_KEY)
+    except KeyError:
+        return False
+
+    with get_db_cursor() as cursor:
+        return link_id == _get_last_link_id(cursor)
+
+
+def update_reachability_index(rebuild=False):
+    """
+    Add the links created since the last update to the reachability index, which enables it if it was not.
+
+    The index is rebuilt in bulk when it is not enabled, or was cleared, or when many links were added, for example by
+    an import, since this is then faster than adding the links one at a time. Links cannot be added or deleted while
+    the index is being updated.
+
+    :param rebuild: if True, always rebuild the index in bulk
+    :return: the number of links added to the index, or None if it was rebuilt
+    """
+    from aiida.backends.utils import get_global_setting, set_global_setting, get_db_cursor
+
+    with get_db_cursor(commit=True) as cursor:
+        cursor.execute('LOCK TABLE db_dblink IN SHARE MODE')
+
+        try:
+            link_id = None if rebuild else get_global_setting(LINK_ID_KEY)
+        except KeyError:
+            link_id = None
+
+        if link_id is not None:
+            cursor.execute(_NEW_LINKS, {'types': LINK_TYPES, 'link_id': link_id, 'limit': MAX_INCREMENTAL_LINKS + 1})
+            links = cursor.fetchall()
+
+        if link_id is None or len(links) > MAX_INCREMENTAL_LINKS:
+            cursor.execute('TRUNCATE db_dbreachability')
+            cursor.execute(_REBUILD, {'types': LINK_TYPES})
+            links = None
+        else:
+            for input_id, output_id in links:
+                cursor.execute(_ADD_LINK, {'input_id': input_id, 'output_id': output_id})
+
+        set_global_setting(
+            LINK_ID_KEY,
+            _get_last_link_id(cursor),
+            description='The id of the last link in the reachability index of the provenance graph')
+
+    return None if links is None else len(links)
+
+
+def clear_reachability_index():
+    """
+    Clear and disable the reachability index, after which the QueryBuilder uses recursive queries again.
+    """
+    from aiida.backends.utils import get_db_cursor
+
+    with get_db_cursor(commit=True) as cursor:
+        # The same statements as the trigger, which works with the settings table of both backends
+        cursor.execute('DELETE FROM db_dbsetting WHERE key = %(key)s', {'key': LINK_ID_KEY})
+        cursor.execute('TRUNCATE db_dbreachability')
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""
+Traversal of the provenance graph inside the database.
+
+The closure of a set of nodes under a set of rules is computed with a single recursive query, instead of one query
+per visited node or per layer of the graph: only the seeds are sent to the database, and the pks of the closure are
+returned at once as an array.
+"""
+from __future__ import absolute_import
+
+from aiida.common.links import LinkType
+
+__all__ = ['TraversalRule', 'traverse_graph']
+
+# The current node of the traversal is `node`, the link is `link` and the node it leads to is `target`
+_TRAVERSE = """
+    WITH RECURSIVE closure (id) AS (
+        SELECT unnest(%(seeds)s::integer[])
+        UNION
+        SELECT target.id
+        FROM closure
+        JOIN db_dbnode AS node ON node.id = closure.id
+        JOIN db_dblink AS link ON {link_condition}
+        JOIN db_dbnode AS target
+            ON target.id = CASE WHEN link.input_id = closure.id THEN link.output_id ELSE link.input_id END
+        WHERE {rule_conditions}
+    )
+    SELECT array_agg(id) FROM closure
+"""
+
+
+class TraversalRule(object):
+    """
+    A rule of a graph traversal: the links of a given type are followed in a given direction, from the nodes of the
+    given source classes to the nodes of the given target classes.
+    """
+
+    def __init__(self, link_type, forward=True, source=None, target=None):
+        """
+        :param link_type: the :py:class:`LinkType <aiida.common.links.LinkType>` of the links to follow
+        :param forward: if True, the links are followed from their input to their output, otherwise the other way round
+        :param source: a Node subclass, or a tuple of them, to which the rule applies. By default, to every node.
+        :param target: a Node subclass, or a tuple of them, of the nodes that can be reached. By default, every node.
+        """
+        if not isinstance(link_type, LinkType):
+            raise TypeError("link_type should be a LinkType, got {}".format(type(link_type)))
+
+        self.link_type = link_type
+        self.forward = forward
+        self.source = self._get_type_strings(source)
+        self.target = self._get_type_strings(target)
+
+    @staticmethod
+    def _get_type_strings(classes):
+        """
+        Return the query type strings of the given classes, or None if any node matches.
+        """
+        if classes is None:
+            return None
+        if not isinstance(classes, (tuple, list)):
+            classes = (classes,)
+
+        type_strings = tuple(cls._query_type_string for cls in classes)
+        # The type string of Node matches every node
+        if '' in type_strings:
+            return None
+        return type_strings
+
+    def __repr__(self):
+        return "TraversalRule({0.link_type}, forward={0.forward}, source={0.source}, target={0.target})".format(self)
+
+
+def _get_type_condition(alias, type_strings, parameters):
+    """
+    Return the SQL condition matching the nodes of an alias with one of the type strings, adding its parameters.
+    """
+    conditions = []
+    for type_string in type_strings:
+        name = 'type_{}'.format(len(parameters))
+        parameters[name] = type_string + '%'
+        conditions.append('{}.type LIKE %({})s'.format(alias, name))
+    return '({})'.format(' OR '.join(conditions))
+
+
+def traverse_graph(seeds, rules):
+    """
+    Return the pks of the nodes reachable from the seeds by repeatedly following the rules, including the seeds.
+
+    :param seeds: an iterable of node pks from which the traversal starts
+    :param rules: a list of :py:class:`TraversalRule`; a link is followed if it matches any rule
+    :return: a set of node pks
+    """
+    from aiida.backends.utils import get_db_cursor
+
+    seeds = sorted(set(int(pk) for pk in seeds))
+    if not seeds:
+        return set()
+    if not rules:
+        return set(seeds)
+
+    parameters = {'seeds': seeds}
+    rule_conditions = []
+
+    for rule in rules:
+        name = 'link_type_{}'.format(len(parameters))
+        parameters[name] = rule.link_type.value
+        conditions = [
+            'link.{}_id = closure.id'.format('input' if rule.forward else 'output'),
+            'link.type = %({})s'.format(name),
+        ]
+        if rule.source is not None:
+            conditions.append(_get_type_condition('node', rule.source, parameters))
+        if rule.target is not None:
+            conditions.append(_get_type_condition('target', rule.target, parameters))
+        rule_conditions.append('({})'.format(' AND '.join(conditions)))
+
+    directions = set(rule.forward for rule in rules)
+    link_condition = ' OR '.join(
+        'link.{}_id = closure.id'.format('input' if forward else 'output') for forward in sorted(directions))
+
+    query = _TRAVERSE.format(link_condition=link_condition, rule_conditions='\n            OR '.join(rule_conditions))
+
+    with get_db_cursor() as cursor:
+        cursor.execute(query, parameters)
+        pks = cursor.fetchone()[0]
+
+    return set(pks or [])
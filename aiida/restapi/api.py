@@ -92,10 +92,15 @@ class AiidaApi(Api):
         from aiida.restapi.resources import Calculation, Computer, User, Code, Data, \
             Group, Node, StructureData, KpointsData, BandsData, UpfData, CifData, ServerInfo
 
+        from aiida.restapi.common.caching import get_response_cache
+
         self.app = app
 
         super(AiidaApi, self).__init__(app=app, prefix=kwargs['PREFIX'], catch_all_404s=True)
 
+        # The resources are instantiated for every request, so they all receive the same cache
+        kwargs['response_cache'] = get_response_cache(kwargs.pop('RESPONSE_CACHE', None))
+
 
         self.add_resource(ServerInfo,
                           "/server/",
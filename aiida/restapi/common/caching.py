@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""
+Caching of the responses of the REST API.
+
+Stored nodes can only change through their extras, which increment their nodeversion and update their mtime. The
+responses that only depend on one node (its contents, or its tree of inputs and outputs) are therefore identified by
+the url and a version of the node, read with one small query instead of the queries that build the response. The
+identifier is used both as the key of the cached response and as its HTTP ETag, such that clients sending it back in
+an If-None-Match header get a 304 response.
+"""
+from __future__ import absolute_import
+
+import collections
+import hashlib
+import os
+import tempfile
+import threading
+
+from six.moves import cPickle as pickle
+
+__all__ = ['ResponseCache', 'MemoryResponseCache', 'DiskResponseCache', 'get_response_cache', 'get_response_etag']
+
+# Query types of the node resources whose response is cached
+CACHED_QUERY_TYPES = ('attributes', 'extras', 'visualization', 'download', 'tree', 'statistics')
+
+# A complete uuid is matched with an equality, that can use the index of the column
+_NODE_VERSION = """
+    SELECT id, nodeversion, mtime FROM db_dbnode WHERE {condition} LIMIT 2
+"""
+
+# The tree also shows the neighbours of the node, and links can be added to stored nodes
+_TREE_VERSION = """
+    SELECT count(link.id), max(link.id), max(neighbour.mtime), sum(neighbour.nodeversion)
+    FROM db_dblink AS link
+    JOIN db_dbnode AS neighbour
+        ON neighbour.id = CASE WHEN link.input_id = %(pk)s THEN link.output_id ELSE link.input_id END
+    WHERE link.input_id = %(pk)s OR link.output_id = %(pk)s
+"""
+
+# The statistics only depend on the type, the user and the creation time of the nodes, that never change: the new
+# nodes are found with the index of the primary key, the changed ones with the largest modification time
+_STATISTICS_VERSION = """
+    SELECT max(id), max(mtime) FROM db_dbnode
+"""
+
+
+class ResponseCache(object):
+    """
+    Base class of the stores of the responses of the REST API, that map a key to a tuple (status, headers, body).
+    """
+
+    def get(self, key):
+        """
+        Return the response stored with the given key, or None if there is none.
+        """
+        raise NotImplementedError
+
+    def set(self, key, value):
+        """
+        Store a response with the given key.
+        """
+        raise NotImplementedError
+
+
+class MemoryResponseCache(ResponseCache):
+    """
+    Store of the responses in the memory of the process, discarding the least recently used ones.
+
+    The cache holds at most `max_entries` responses, whose bodies take at most `max_bytes` bytes. Responses with a
+    body larger than `max_body_bytes`, e.g. the downloads of large files, are not stored: they are still sent with
+    their ETag, such that clients can make conditional requests.
+    """
+
+    def __init__(self, max_entries=1000, max_bytes=64 * 1024 * 1024, max_body_bytes=1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_body_bytes = min(max_body_bytes, max_bytes)
+        self._entries = collections.OrderedDict()
+        self._nbytes = 0
+        # The API is served by several threads
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            try:
+                value = self._entries.pop(key)
+            except KeyError:
+                return None
+            self._entries[key] = value
+            return value
+
+    def set(self, key, value):
+        nbytes = len(value[2])
+        if nbytes > self.max_body_bytes:
+            return
+
+        with self._lock:
+            old_value = self._entries.pop(key, None)
+            if old_value is not None:
+                self._nbytes -= len(old_value[2])
+            self._entries[key] = value
+            self._nbytes += nbytes
+            while len(self._entries) > self.max_entries or self._nbytes > self.max_bytes:
+                self._nbytes -= len(self._entries.popitem(last=False)[1][2])
+
+
+class DiskResponseCache(ResponseCache):
+    """
+    Store of the responses in files of a directory, that can be shared by several processes serving the API.
+
+    Each response is written to a temporary file that is then renamed, such that a process never reads a partial
+    file. When there are more files than the maximum number of entries, the least recently written ones are deleted.
+    """
+
+    def __init__(self, directory, max_entries=10000):
+        self.directory = os.path.abspath(os.path.expanduser(directory))
+        self.max_entries = max_entries
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+
+    def _get_path(self, key):
+        return os.path.join(self.directory, key)
+
+    def get(self, key):
+        try:
+            with open(self._get_path(key), 'rb') as handle:
+                return pickle.load(handle)
+        except (IOError, OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def set(self, key, value):
+        handle, temp_path = tempfile.mkstemp(dir=self.directory, prefix='.tmp')
+        try:
+            with os.fdopen(handle, 'wb') as temp_file:
+                pickle.dump(value, temp_file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.rename(temp_path, self._get_path(key))
+        except Exception:
+            os.remove(temp_path)
+            raise
+
+        self._evict()
+
+    def _evict(self):
+        """
+        Delete the oldest files if there are more than the maximum number of entries.
+        """
+        names = [name for name in os.listdir(self.directory) if not name.startswith('.tmp')]
+        if len(names) <= self.max_entries:
+            return
+
+        paths = []
+        for name in names:
+            path = self._get_path(name)
+            try:
+                paths.append((os.path.getmtime(path), path))
+            except OSError:
+                # Deleted by another process in the meantime
+                pass
+
+        for _, path in sorted(paths)[:len(paths) - self.max_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def get_response_cache(config):
+    """
+    Return the response cache described by a configuration dictionary, or None if caching is disabled.
+
+    :param config: None, or a dictionary with the 'type' of the cache, either 'memory' or 'disk', the maximum number
+        of entries 'max_entries' and, for the memory cache, the maximum size of all the bodies 'max_bytes' and of a
+        single body 'max_body_bytes' in bytes, or, for the disk cache, the 'directory' where the responses are stored
+    """
+    if not config:
+        return None
+
+    config = dict(config)
+    cache_type = config.pop('type', 'memory')
+
+    if cache_type == 'memory':
+        return MemoryResponseCache(**config)
+    elif cache_type == 'disk':
+        return DiskResponseCache(**config)
+
+    raise ValueError("Unknown type of response cache '{}', use 'memory' or 'disk'".format(cache_type))
+
+
+def _get_response_version(query_type, uuid_pattern):
+    """
+    Return a tuple that changes whenever the response of a query on a node changes, or None if it is not cacheable.
+    """
+    from aiida.backends.utils import get_db_cursor
+
+    if query_type == 'statistics':
+        with get_db_cursor() as cursor:
+            cursor.execute(_STATISTICS_VERSION)
+            return tuple(cursor.fetchone())
+
+    if query_type not in CACHED_QUERY_TYPES or uuid_pattern is None:
+        return None
+
+    if len(uuid_pattern) == 36:
+        query = _NODE_VERSION.format(condition='uuid = %(uuid)s')
+    else:
+        query = _NODE_VERSION.format(condition='uuid::text LIKE %(uuid)s')
+        uuid_pattern = '{}%'.format(uuid_pattern)
+
+    with get_db_cursor() as cursor:
+        cursor.execute(query, {'uuid': uuid_pattern})
+        rows = cursor.fetchall()
+
+        # The pattern does not match a unique node: the response is an error, left to the translator
+        if len(rows) != 1:
+            return None
+
+        version = tuple(rows[0])
+
+        if query_type == 'tree':
+            cursor.execute(_TREE_VERSION, {'pk': version[0]})
+            version += tuple(cursor.fetchone())
+
+    return version
+
+
+def get_response_etag(url, query_type, uuid_pattern):
+    """
+    Return the ETag of the response to a request on the node resources, also used as its key in the response cache.
+
+    :param url: the full url of the request, with its query string
+    :param query_type: the query type parsed from the path of the request
+    :param uuid_pattern: the uuid, or the starting pattern of the uuid, parsed from the path of the request
+    :return: a string, or None if the response cannot be cached
+    """
+    version = _get_response_version(query_type, uuid_pattern)
+    if version is None:
+        return None
+
+    return hashlib.sha224(repr((url, version)).encode('utf-8')).hexdigest()
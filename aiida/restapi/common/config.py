@@ -59,6 +59,19 @@ CACHING_TIMEOUTS = { #Caching TIMEOUTS (in seconds)
     'codes': 10,
 }
 
+"""
+Cache of the responses with the contents, the trees and the statistics of the
+nodes, which are also sent with an ETag for conditional requests. Set to None
+to disable it.
+
+type: 'memory' (per process, least recently used responses are discarded) or
+'disk' (in 'directory', can be shared by several processes)
+max_entries: maximum number of stored responses
+max_bytes: for the memory cache, maximum size in bytes of the stored responses
+max_body_bytes: for the memory cache, responses larger than this are not stored
+"""
+RESPONSE_CACHE = {'type': 'memory', 'max_entries': 1000, 'max_bytes': 64 * 1024 * 1024, 'max_body_bytes': 1024 * 1024}
+
 # IO tree
 MAX_TREE_DEPTH = 5
 
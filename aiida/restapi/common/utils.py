@@ -235,7 +235,8 @@ class Utils(object):
                 return (resource_type, page, id, query_type)
 
     def validate_request(self, limit=None, offset=None, perpage=None, page=None,
-                         query_type=None, is_querystring_defined=False):
+                         query_type=None, is_querystring_defined=False,
+                         after=None, count=None):
         """
         Performs various checks on the consistency of the request.
         Add here all the checks that you want to do, except validity of the page
@@ -262,6 +263,85 @@ class Utils(object):
         if query_type in ('schema') and is_querystring_defined:
             raise RestInputValidationError("schema requests do not allow "
                                            "specifying a query string")
+        # 5. the cursor of keyset pagination is incompatible with offset and
+        # pages
+        if after is not None and (offset is not None or page is not None):
+            raise RestValidationError("after key is incompatible with offset "
+                                      "and with requesting a specific page")
+        # 6. pages require the exact number of results
+        if page is not None and count not in (None, 'exact'):
+            raise RestValidationError("requesting a specific page requires "
+                                      "the exact count of the results")
+
+    @staticmethod
+    def get_count_mode(count, after):
+        """
+        Return how to count the results of a request. Unless specified with the
+        count key, the results are counted exactly, except when paging with a
+        cursor, where only the estimate of the database is returned, since
+        counting all the results takes about as long as going through them.
+
+        :param count: the value of the count key, if any
+        :param after: the value of the after key, if any
+        :return: one of 'exact', 'estimate' and 'none'
+        """
+        if count is not None:
+            return count
+        if after is not None:
+            return 'estimate'
+        return 'exact'
+
+    def encode_cursor(self, cursor):
+        """
+        Encode the cursor of keyset pagination as an opaque url-safe string
+
+        :param cursor: the list of the values of the ordered columns of the
+            last result, as returned by the QueryBuilder
+        :return: the string to pass as the value of the after key
+        """
+        import base64
+        import json
+        from uuid import UUID
+
+        values = []
+        for value in cursor:
+            if isinstance(value, datetime):
+                values.append({'datetime': value.isoformat()})
+            elif isinstance(value, UUID):
+                values.append(str(value))
+            else:
+                values.append(value)
+
+        encoded = base64.urlsafe_b64encode(json.dumps(values).encode('utf-8'))
+        return encoded.decode('ascii').rstrip('=')
+
+    def decode_cursor(self, string):
+        """
+        Decode the cursor of keyset pagination encoded by encode_cursor()
+
+        :param string: the value of the after key
+        :return: the cursor, to be passed to the QueryBuilder
+        """
+        import base64
+        import binascii
+        import json
+        from dateutil import parser as dtparser
+
+        try:
+            padded = string + '=' * (-len(string) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+        except (binascii.Error, TypeError, ValueError):
+            raise RestInputValidationError("the value of after is not a "
+                                           "valid cursor")
+
+        if not isinstance(values, list):
+            raise RestInputValidationError("the value of after is not a "
+                                           "valid cursor")
+
+        return [
+            dtparser.parse(value['datetime']) if isinstance(value, dict)
+            else value for value in values
+        ]
 
 
     def paginate(self, page, perpage, total_count):
@@ -333,21 +413,27 @@ class Utils(object):
 
         return (limit, offset, rel_pages)
 
-    def build_headers(self, rel_pages=None, url=None, total_count=None):
+    def build_headers(self, rel_pages=None, url=None, total_count=None,
+                      next_cursor=None):
         """
         Construct the header dictionary for an HTTP response. It includes related
         pages, total count of results (before pagination).
 
         :param rel_pages: a dictionary defining related pages (first, prev, next, last)
         :param url: (string) the full url, i.e. the url that the client uses to get Rest resources
+        :param total_count: the total count of results, or None if it was not
+            requested, in which case the X-Total-Count header is omitted
+        :param next_cursor: the encoded cursor of the last result, if the
+            next page exists, which is linked with the after key
         """
 
         ## Type validation
         # mandatory parameters
-        try:
-            total_count = int(total_count)
-        except ValueError:
-            raise InputValidationError("total_count must be a long integer")
+        if total_count is not None:
+            try:
+                total_count = int(total_count)
+            except ValueError:
+                raise InputValidationError("total_count must be a long integer")
 
         # non mandatory parameters
         if rel_pages is not None and not isinstance(rel_pages, dict):
@@ -361,16 +447,19 @@ class Utils(object):
 
         ## Input consistency
         # rel_pages cannot be defined without url
-        if rel_pages is not None and url is None:
-            raise InputValidationError("'rel_pages' parameter requires 'url' "
+        if (rel_pages is not None or next_cursor is not None) and url is None:
+            raise InputValidationError("'rel_pages' and 'next_cursor' "
+                                       "parameters require 'url' "
                                        "parameter to be defined")
 
         headers = {}
+        expose_header = []
 
         ## Setting mandatory headers
         # set X-Total-Count
-        headers['X-Total-Count'] = total_count
-        expose_header = ["X-Total-Count"]
+        if total_count is not None:
+            headers['X-Total-Count'] = total_count
+            expose_header.append("X-Total-Count")
 
         ## Two auxiliary functions
         def split_url(url):
@@ -404,6 +493,18 @@ class Utils(object):
             else:
                 pass
 
+        # set the link to the next page of keyset pagination, replacing the
+        # cursor of the current page if any
+        if next_cursor is not None:
+            (path, query_string, question_mark) = split_url(url)
+            fields = [field for field in query_string.split('&')
+                      if field and not field.startswith('after=')]
+            fields.append('after={}'.format(next_cursor))
+            headers['Link'] = headers.get('Link', '') + \
+                '<' + path + '?' + '&'.join(fields) + '>; rel=next, '
+            if "Link" not in expose_header:
+                expose_header.append("Link")
+
         # to expose header access in cross-domain requests
         headers['Access-Control-Expose-Headers'] = ','.join(expose_header)
 
@@ -510,6 +611,8 @@ class Utils(object):
         visformat = None
         filename = None
         rtype = None
+        after = None
+        count = None
 
         ## Count how many time a key has been used for the filters and check if
         # reserved keyword
@@ -577,6 +680,14 @@ class Utils(object):
             raise RestInputValidationError(
                 "You cannot specify rtype more than "
                 "once")
+        if 'after' in field_counts.keys() and field_counts['after'] > 1:
+            raise RestInputValidationError(
+                "You cannot specify after more than "
+                "once")
+        if 'count' in field_counts.keys() and field_counts['count'] > 1:
+            raise RestInputValidationError(
+                "You cannot specify count more than "
+                "once")
 
         ## Extract results
         for field in field_list:
@@ -677,6 +788,26 @@ class Utils(object):
                         "only assignment operator '=' "
                         "is permitted after 'rtype'")
 
+            elif field[0] == 'after':
+                if field[1] == '=':
+                    after = self.decode_cursor(field[2])
+                else:
+                    raise RestInputValidationError(
+                        "only assignment operator '=' "
+                        "is permitted after 'after'")
+
+            elif field[0] == 'count':
+                if field[1] == '=':
+                    count = field[2]
+                else:
+                    raise RestInputValidationError(
+                        "only assignment operator '=' "
+                        "is permitted after 'count'")
+                if count not in ('exact', 'estimate', 'none'):
+                    raise RestInputValidationError(
+                        "count must be one of 'exact', 'estimate' "
+                        "and 'none'")
+
             else:
 
                 ## Construct the filter entry.
@@ -709,7 +840,8 @@ class Utils(object):
         #     limit = self.LIMIT_DEFAULT
 
         return (limit, offset, perpage, orderby, filters, alist, nalist, elist,
-                nelist, downloadformat, visformat, filename, rtype)
+                nelist, downloadformat, visformat, filename, rtype, after,
+                count)
 
     def parse_query_string(self, query_string):
         """
@@ -835,7 +967,10 @@ class Utils(object):
         listField = Group(
             key + (Literal('=in=') | Literal('=notin=')) + valueList)
         orderbyField = Group(key + Literal('=') + valueList)
-        Field = (listField | orderbyField | singleField)
+        # The cursor of keyset pagination is an opaque url-safe string
+        cursorField = Group(Literal('after') + Literal('=') +
+                            Word(alphanums + '-_'))
+        Field = (cursorField | listField | orderbyField | singleField)
 
         # Fields separator
         separator = Suppress(Literal('&'))
@@ -15,6 +15,7 @@ from six.moves.urllib.parse import unquote  # pylint: disable=import-error
 from flask import request, make_response
 from flask_restful import Resource
 
+from aiida.restapi.common.caching import get_response_etag
 from aiida.restapi.common.utils import Utils
 
 
@@ -119,7 +120,7 @@ class BaseResource(Resource):
         ## Parse request
         (resource_type, page, id, query_type) = self.utils.parse_path(path, parse_pk_uuid=self.parse_pk_uuid)
         (limit, offset, perpage, orderby, filters, _alist, _nalist, _elist, _nelist, _downloadformat, _visformat,
-         _filename, _rtype) = self.utils.parse_query_string(query_string)
+         _filename, _rtype, after, count) = self.utils.parse_query_string(query_string)
 
         ## Validate request
         self.utils.validate_request(
@@ -128,7 +129,9 @@ class BaseResource(Resource):
             perpage=perpage,
             page=page,
             query_type=query_type,
-            is_querystring_defined=(bool(query_string)))
+            is_querystring_defined=(bool(query_string)),
+            after=after,
+            count=count)
 
         ## Treat the schema case which does not imply access to the DataBase
         if query_type == 'schema':
@@ -143,19 +146,27 @@ class BaseResource(Resource):
             self.trans.set_query(filters=filters, orders=orderby, id=id)
 
             ## Count results
-            total_count = self.trans.get_total_count()
+            total_count = self.trans.get_total_count(count=self.utils.get_count_mode(count, after))
 
             ## Pagination (if required)
             if page is not None:
                 (limit, offset, rel_pages) = self.utils.paginate(page, perpage, total_count)
                 self.trans.set_limit_offset(limit=limit, offset=offset)
+
+                ## Retrieve results
+                results = self.trans.get_results()
+
                 headers = self.utils.build_headers(rel_pages=rel_pages, url=request.url, total_count=total_count)
             else:
-                self.trans.set_limit_offset(limit=limit, offset=offset)
-                headers = self.utils.build_headers(url=request.url, total_count=total_count)
+                self.trans.set_limit_offset(limit=limit, offset=offset, after=after)
 
-            ## Retrieve results
-            results = self.trans.get_results()
+                ## Retrieve results
+                results = self.trans.get_results()
+
+                next_cursor = self.trans.get_next_cursor()
+                if next_cursor is not None:
+                    next_cursor = self.utils.encode_cursor(next_cursor)
+                headers = self.utils.build_headers(url=request.url, total_count=total_count, next_cursor=next_cursor)
 
         ## Build response and return it
         data = dict(
@@ -194,11 +205,52 @@ class Node(Resource):
         self.utils = Utils(**self.utils_confs)
         self.method_decorators = {'get': kwargs.get('get_decorators', [])}
 
-    #pylint: disable=too-many-locals,too-many-statements
-    #pylint: disable=redefined-builtin,invalid-name,too-many-branches
+        # Shared by all the instances, that are created for every request
+        self.response_cache = kwargs.get('response_cache', None)
+
+    #pylint: disable=redefined-builtin,invalid-name
     def get(self, id=None, page=None):
         """
         Get method for the Node resource.
+
+        If a response cache is configured, the responses with the contents, the tree or the statistics of the nodes
+        are taken from the cache when the nodes did not change, and are sent with an ETag, such that the clients
+        sending it back in an If-None-Match header get a 304 response.
+        :return:
+        """
+        if self.response_cache is None:
+            return self._get(id=id, page=page)
+
+        path = unquote(request.path)
+        (_, _, uuid_pattern, query_type) = self.utils.parse_path(path, parse_pk_uuid=self.parse_pk_uuid)
+
+        etag = get_response_etag(unquote(request.url), query_type, uuid_pattern)
+        if etag is None:
+            return self._get(id=id, page=page)
+
+        if etag in request.if_none_match:
+            response = make_response('', 304)
+            response.set_etag(etag)
+            return response
+
+        cached = self.response_cache.get(etag)
+        if cached is not None:
+            (status, headers, body) = cached
+            response = make_response(body, status, headers)
+        else:
+            response = self._get(id=id, page=page)
+            if response.status_code != 200:
+                return response
+            self.response_cache.set(etag, (response.status_code, list(response.headers.items()), response.get_data()))
+
+        response.set_etag(etag)
+        return response
+
+    #pylint: disable=too-many-locals,too-many-statements
+    #pylint: disable=redefined-builtin,invalid-name,too-many-branches
+    def _get(self, id=None, page=None):
+        """
+        Build the response of the get method, without caching.
         :return:
         """
 
@@ -212,7 +264,7 @@ class Node(Resource):
         (resource_type, page, id, query_type) = self.utils.parse_path(path, parse_pk_uuid=self.parse_pk_uuid)
 
         (limit, offset, perpage, orderby, filters, alist, nalist, elist, nelist, downloadformat, visformat, filename,
-         rtype) = self.utils.parse_query_string(query_string)
+         rtype, after, count) = self.utils.parse_query_string(query_string)
 
         ## Validate request
         self.utils.validate_request(
@@ -221,7 +273,9 @@ class Node(Resource):
             perpage=perpage,
             page=page,
             query_type=query_type,
-            is_querystring_defined=(bool(query_string)))
+            is_querystring_defined=(bool(query_string)),
+            after=after,
+            count=count)
 
         ## Treat the schema case which does not imply access to the DataBase
         if query_type == 'schema':
@@ -235,7 +289,7 @@ class Node(Resource):
         ## Treat the statistics
         elif query_type == "statistics":
             (limit, offset, perpage, orderby, filters, alist, nalist, elist, nelist, downloadformat, visformat,
-             filename, rtype) = self.utils.parse_query_string(query_string)
+             filename, rtype, after, count) = self.utils.parse_query_string(query_string)
             headers = self.utils.build_headers(url=request.url, total_count=0)
             if filters:
                 usr = filters["user"]["=="]
@@ -264,7 +318,7 @@ class Node(Resource):
                 rtype=rtype)
 
             ## Count results
-            total_count = self.trans.get_total_count()
+            total_count = self.trans.get_total_count(count=self.utils.get_count_mode(count, after))
 
             ## Pagination (if required)
             if page is not None:
@@ -277,7 +331,7 @@ class Node(Resource):
                 headers = self.utils.build_headers(rel_pages=rel_pages, url=request.url, total_count=total_count)
             else:
 
-                self.trans.set_limit_offset(limit=limit, offset=offset)
+                self.trans.set_limit_offset(limit=limit, offset=offset, after=after)
                 ## Retrieve results
                 results = self.trans.get_results()
 
@@ -312,7 +366,10 @@ class Node(Resource):
                     elif status == 500:
                         results = results[query_type]["data"]
 
-                headers = self.utils.build_headers(url=request.url, total_count=total_count)
+                next_cursor = self.trans.get_next_cursor()
+                if next_cursor is not None:
+                    next_cursor = self.utils.encode_cursor(next_cursor)
+                headers = self.utils.build_headers(url=request.url, total_count=total_count, next_cursor=next_cursor)
 
         ## Build response
         data = dict(
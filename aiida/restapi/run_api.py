@@ -178,7 +178,8 @@ def run_api(App, Api, *args, **kwargs):
     # Instantiate an Api by associating its app
     api_kwargs = dict(PREFIX=confs.PREFIX,
                       PERPAGE_DEFAULT=confs.PERPAGE_DEFAULT,
-                      LIMIT_DEFAULT=confs.LIMIT_DEFAULT)
+                      LIMIT_DEFAULT=confs.LIMIT_DEFAULT,
+                      RESPONSE_CACHE=getattr(confs, 'RESPONSE_CACHE', None))
     api = Api(app, **api_kwargs)
 
     # Check if the app has to be hooked-up or just returned
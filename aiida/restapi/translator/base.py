@@ -102,6 +102,11 @@ class BaseTranslator(object):
         # query_builder object (No initialization)
         self.qb = QueryBuilder()
 
+        # The limit of the query and the results returned, to build the
+        # cursor of the next page
+        self._limit = None
+        self._results = []
+
         self.LIMIT_DEFAULT = kwargs['LIMIT_DEFAULT']
         self.schema = None
 
@@ -197,12 +202,24 @@ class BaseTranslator(object):
 
             #    @cache.memoize(timeout=CACHING_TIMEOUTS[self.__label__])
 
-    def get_total_count(self):
+    def get_total_count(self, count='exact'):
         """
         Returns the number of rows of the query.
 
-        :return: total_count
+        :param count: 'exact' to count the rows, 'estimate' to get the number
+            of rows estimated by the database without executing the query, or
+            'none' to skip counting
+        :return: total_count, or None if count is 'none'
         """
+        if count == 'none':
+            return None
+
+        if count == 'estimate':
+            if not self._is_qb_initialized:
+                raise InvalidOperation("query builder object has not been "
+                                       "initialized.")
+            return self.qb.count(estimate=True)
+
         ## Count the results if needed
         if not self._total_count:
             self.count()
@@ -296,21 +313,28 @@ class BaseTranslator(object):
             """
             Takes a list of signed column names ex. ['id', '-ctime',
             '+mtime']
-            and transforms it in a order_by compatible dictionary
+            and transforms it in a order_by compatible list. The order is
+            completed with the id, such that it is unique as required by
+            keyset pagination.
             :param columns: (list of strings)
-            :return: a dictionary
+            :return: a list of dictionaries
             """
-            order_dict = {}
+            order_list = []
             for column in columns:
                 if column[0] == '-':
-                    order_dict[column[1:]] = 'desc'
+                    column, order = column[1:], 'desc'
                 elif column[0] == '+':
-                    order_dict[column[1:]] = 'asc'
+                    column, order = column[1:], 'asc'
                 else:
-                    order_dict[column] = 'asc'
-            if 'pk' in order_dict:
-                order_dict[pk_dbsynonym] = order_dict.pop('pk')
-            return order_dict
+                    order = 'asc'
+                if column == 'pk':
+                    column = pk_dbsynonym
+                order_list.append({column: order})
+                if column == pk_dbsynonym:
+                    break
+            else:
+                order_list.append({pk_dbsynonym: 'asc'})
+            return order_list
 
         ## Assign orderby field query_help
         for tag, columns in orders.items():
@@ -360,10 +384,9 @@ class BaseTranslator(object):
             tagged_projections = {self._result_type: projections}
             self.set_projections(tagged_projections)
 
-        ##Add order_by
-        if orders is not None:
-            tagged_orders = {self._result_type: orders}
-            self.set_order(tagged_orders)
+        ##Add order_by, the results are ordered by id by default
+        tagged_orders = {self._result_type: orders or []}
+        self.set_order(tagged_orders)
 
         ## Initialize the query_object
         self.init_qb()
@@ -374,12 +397,14 @@ class BaseTranslator(object):
         """
         return self._query_help
 
-    def set_limit_offset(self, limit=None, offset=None):
+    def set_limit_offset(self, limit=None, offset=None, after=None):
         """
         sets limits and offset directly to the query_builder object
 
         :param limit:
         :param offset:
+        :param after: the cursor of the last result of the previous page, for
+            keyset pagination
         :return:
         """
 
@@ -408,12 +433,20 @@ class BaseTranslator(object):
         if self._is_qb_initialized:
             if limit is not None:
                 self.qb.limit(limit)
+                self._limit = limit
             else:
                 pass
             if offset is not None:
                 self.qb.offset(offset)
             else:
                 pass
+            if after is not None:
+                try:
+                    self.qb.after(after)
+                    # Check that the cursor matches the order of the results
+                    self.qb.get_query()
+                except InputValidationError as exc:
+                    raise RestInputValidationError(str(exc))
         else:
             raise InvalidOperation("query builder object has not been "
                                    "initialized.")
@@ -433,8 +466,9 @@ class BaseTranslator(object):
                                    "initialized.")
 
         results = []
-        if self._total_count > 0:
+        if self._total_count is None or self._total_count > 0:
             results = [res[label] for res in self.qb.dict()]
+        self._results = results
 
         # TODO think how to make it less hardcoded
         if self._result_type == 'input_of':
@@ -456,15 +490,28 @@ class BaseTranslator(object):
             raise InvalidOperation("query builder object has not been "
                                    "initialized.")
 
-        ## Count the total number of rows returned by the query (if not
-        # already done)
-        if self._total_count is None:
-            self.count()
-
         ## Retrieve data
         data = self.get_formatted_result(self._result_type)
         return data
 
+    def get_next_cursor(self):
+        """
+        Returns the cursor of the last result, to request the next page with
+        keyset pagination. It is only available after get_results(), if the
+        page was full.
+
+        :return: the cursor, or None if there is no next page
+        """
+        # A page that is not full is the last one
+        if self._is_id_query or self._limit is None or len(self._results) < self._limit:
+            return None
+
+        try:
+            return self.qb.get_cursor(self._results[-1])
+        except InputValidationError:
+            # The results are ordered by a column that is not projected
+            return None
+
     def _check_id_validity(self, id):
         """
         Checks whether id corresponds to an object of the expected type,
@@ -100,6 +100,9 @@ class SshTransport(aiida.transport.Transport):
     # This should be incremented to 30, probably.
     _DEFAULT_SAFE_OPEN_INTERVAL = 5
 
+    # Maximum number of SFTP channels opened on the same connection to retrieve files concurrently
+    _MAX_SFTP_CHANNELS = 4
+
     @classmethod
     def _convert_username_fromstring(cls, string):
         """
@@ -520,6 +523,29 @@ class SshTransport(aiida.transport.Transport):
         self._client.close()
         self._is_open = False
 
+    def is_alive(self):
+        """
+        Check whether the SSH connection is still active, with a single stat of the root directory over the SFTP
+        channel as a cheap no-op round trip to the remote.
+
+        :return: True if the transport is open and the connection responds, False otherwise
+        """
+        import paramiko
+
+        if not self._is_open:
+            return False
+
+        ssh_transport = self._client.get_transport()
+        if ssh_transport is None or not ssh_transport.is_active():
+            return False
+
+        try:
+            self._sftp.stat('/')
+        except (IOError, OSError, EOFError, paramiko.SSHException):
+            return False
+
+        return True
+
     @property
     def sshclient(self):
         if not self._is_open:
@@ -1012,6 +1038,87 @@ class SshTransport(aiida.transport.Transport):
                 pass
             raise
 
+    def get_many(self, remotepaths, localpaths, ignore_nonexisting=False):
+        """
+        Get multiple files or folders from remote to local.
+
+        Files are retrieved concurrently over several SFTP channels opened on the same SSH connection, such that
+        the latency of the individual transfers overlaps. Folders are retrieved afterwards with `gettree`.
+
+        :param remotepaths: list of remote paths, without pathname patterns
+        :param localpaths: list of absolute local paths, one for each remote path
+        :param ignore_nonexisting: if True, remote paths that do not exist are skipped instead of raising
+        :raise ValueError: if the number of remote and local paths differ or a local path is not absolute
+        :raise IOError: if a remote path is not found and ignore_nonexisting is False
+        """
+        from multiprocessing.pool import ThreadPool
+        import threading
+
+        if len(remotepaths) != len(localpaths):
+            raise ValueError("The number of remote and local paths must be the same")
+
+        if len(remotepaths) < 2:
+            return super(SshTransport, self).get_many(remotepaths, localpaths, ignore_nonexisting)
+
+        for localpath in localpaths:
+            if not os.path.isabs(localpath):
+                raise ValueError("The localpath must be an absolute path")
+
+        cwd = self.getcwd()
+        thread_data = threading.local()
+        sftp_clients = []
+        sftp_clients_lock = threading.Lock()
+
+        def get_single(paths):
+            """Retrieve a single file with the SFTP channel of the current thread, returning the folders to skip."""
+            remotepath, localpath = paths
+
+            if not hasattr(thread_data, 'sftp'):
+                thread_data.sftp = self.sshclient.open_sftp()
+                with sftp_clients_lock:
+                    sftp_clients.append(thread_data.sftp)
+
+            absolute_remotepath = os.path.join(cwd, remotepath) if cwd is not None else remotepath
+
+            try:
+                attributes = thread_data.sftp.stat(absolute_remotepath)
+            except IOError as exception:
+                if getattr(exception, 'errno', None) != 2:
+                    raise
+                if ignore_nonexisting:
+                    return None
+                raise IOError("The remote path {} does not exist".format(remotepath))
+
+            if S_ISDIR(attributes.st_mode):
+                return remotepath, localpath
+
+            if os.path.isdir(localpath):
+                localpath = os.path.join(localpath, os.path.split(remotepath)[1])
+
+            # Workaround for bug #724 in paramiko -- remove localpath on IOError
+            try:
+                thread_data.sftp.get(absolute_remotepath, localpath)
+            except IOError:
+                try:
+                    os.remove(localpath)
+                except OSError:
+                    pass
+                raise
+
+            return None
+
+        pool = ThreadPool(min(self._MAX_SFTP_CHANNELS, len(remotepaths)))
+        try:
+            folders = [folder for folder in pool.map(get_single, zip(remotepaths, localpaths)) if folder is not None]
+        finally:
+            pool.close()
+            pool.join()
+            for sftp in sftp_clients:
+                sftp.close()
+
+        for remotepath, localpath in folders:
+            self.gettree(remotepath, localpath)
+
     def gettree(self, remotepath, localpath, callback=None, dereference=True, overwrite=True):
         """
         Get a folder recursively from remote to local.
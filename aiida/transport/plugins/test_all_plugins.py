@@ -1107,6 +1107,60 @@ class TestPutGetTree(unittest.TestCase):
             t.chdir('..')
             t.rmtree(directory)
 
+    @run_for_all_plugins
+    def test_get_many(self, custom_transport):
+        """Test retrieving multiple files and folders at once, ignoring non-existing ones."""
+        import os
+        import random
+        import string, shutil
+
+        local_dir = os.path.join('/', 'tmp')
+        remote_dir = local_dir
+        directory = 'tmp_try'
+
+        with custom_transport as t:
+            t.chdir(remote_dir)
+
+            while os.path.exists(os.path.join(local_dir, directory)):
+                # I append a random letter/number until it is unique
+                directory += random.choice(string.ascii_uppercase + string.digits)
+
+            t.mkdir(directory)
+            t.chdir(directory)
+
+            local_base_dir = os.path.join(local_dir, directory, 'local')
+            local_destination = os.path.join(local_dir, directory, 'destination')
+            os.mkdir(local_base_dir)
+            os.mkdir(local_destination)
+
+            text = 'Viva Verdi\n'
+            for filename in ['a.txt', 'b.tmp', 'c.txt']:
+                with open(os.path.join(local_base_dir, filename), 'w') as f:
+                    f.write(text)
+
+            remotepaths = [os.path.join('local', 'a.txt'), os.path.join('local', 'c.txt'), 'local', 'non_existing']
+            localpaths = [os.path.join(local_destination, name) for name in ['a.out', 'c.out', 'folder', 'none']]
+
+            with self.assertRaises(IOError):
+                t.get_many(remotepaths, localpaths)
+
+            shutil.rmtree(local_destination)
+            os.mkdir(local_destination)
+
+            t.get_many(remotepaths, localpaths, ignore_nonexisting=True)
+            self.assertEquals(set(['a.out', 'c.out', 'folder']), set(os.listdir(local_destination)))
+            self.assertEquals(
+                set(['a.txt', 'b.tmp', 'c.txt']), set(os.listdir(os.path.join(local_destination, 'folder'))))
+            with open(os.path.join(local_destination, 'c.out')) as f:
+                self.assertEquals(f.read(), text)
+
+            with self.assertRaises(ValueError):
+                t.get_many(remotepaths, localpaths[:1])
+
+            # exit
+            t.chdir('..')
+            t.rmtree(directory)
+
     @run_for_all_plugins
     def test_put_get_abs_path(self, custom_transport):
         """
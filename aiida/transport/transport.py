@@ -95,6 +95,16 @@ class Transport(object):
     def is_open(self):
         return self._is_open
 
+    def is_alive(self):
+        """
+        Check whether the transport is open and its connection can still be used. This is meant to be a cheap check
+        that can be performed before reusing a transport that has been kept open for a while. Transport plugins whose
+        connection can drop should override this method, by default it returns whether the transport is open.
+
+        :return: True if the transport is open and usable, False otherwise
+        """
+        return self.is_open
+
     def open(self):
         """
         Opens a local transport channel
@@ -393,6 +403,24 @@ class Transport(object):
         """
         raise NotImplementedError
 
+    def get_many(self, remotepaths, localpaths, ignore_nonexisting=False):
+        """
+        Retrieve multiple files or folders from remote sources to local destinations.
+
+        The default implementation simply calls `get` for each pair of paths. Transport plugins with a high latency
+        per operation can override it to retrieve the files concurrently.
+
+        :param remotepaths: list of remote paths, without pathname patterns
+        :param localpaths: list of absolute local paths, one for each remote path
+        :param ignore_nonexisting: if True, remote paths that do not exist are skipped instead of raising
+        :raise ValueError: if the number of remote and local paths differ
+        """
+        if len(remotepaths) != len(localpaths):
+            raise ValueError("The number of remote and local paths must be the same")
+
+        for remotepath, localpath in zip(remotepaths, localpaths):
+            self.get(remotepath, localpath, ignore_nonexisting=ignore_nonexisting)
+
     def getcwd(self):
         """
         Get working directory
@@ -43,6 +43,8 @@ def delete_nodes(pks, follow_calls=False, follow_returns=False,
     from aiida.orm.data import Data
     from aiida.orm import load_node
     from aiida.orm.backend import construct_backend
+    from aiida.orm.utils.traversal import TraversalRule, traverse_graph
+    from aiida.common.folders import RepositoryFolder
     from aiida.backends.utils import delete_nodes_and_connections
 
     backend = construct_backend()
@@ -55,32 +57,14 @@ def delete_nodes(pks, follow_calls=False, follow_returns=False,
             print("Nothing to delete")
         return
 
-    # The following code is just for the querying of downwards provenance.
-    # Ideally, there should be a module to interface with, but this is the solution for now.
-    # By only dealing with ids, and keeping track of what has been already
-    # visited in the query, there's good performance and no infinite loops.
-    link_types_to_follow = [LinkType.CREATE.value, LinkType.INPUT.value]
+    # The downwards provenance is followed inside the database, with a single query
+    link_types_to_follow = [LinkType.CREATE, LinkType.INPUT]
     if follow_calls:
-        link_types_to_follow.append(LinkType.CALL.value)
+        link_types_to_follow.append(LinkType.CALL)
     if follow_returns:
-        link_types_to_follow.append(LinkType.RETURN.value)
+        link_types_to_follow.append(LinkType.RETURN)
 
-    edge_filters = {'type': {'in': link_types_to_follow}}
-
-    # Operational set always includes the recently (in the last iteration added) nodes.
-    operational_set = set().union(set(pks))  # Union to copy the set!
-    pks_set_to_delete = set().union(set(pks))
-    while operational_set:
-        # new_pks_set are the the pks of all nodes that are connected to the operational node set
-        # with the links specified.
-        new_pks_set = set([i for i, in QueryBuilder().append(
-            Node, filters={'id': {'in': operational_set}}).append(
-            Node, project='id', edge_filters=edge_filters).iterall()])
-        # The operational set is only those pks that haven't been yet put into the pks_set_to_delete.
-        operational_set = new_pks_set.difference(pks_set_to_delete)
-
-        # I add these pks in the pks_set_to_delete with a union
-        pks_set_to_delete = pks_set_to_delete.union(new_pks_set)
+    pks_set_to_delete = traverse_graph(pks, [TraversalRule(link_type) for link_type in link_types_to_follow])
 
     if verbosity > 0:
         print("I {} delete {} node{}"
@@ -160,7 +144,10 @@ def delete_nodes(pks, follow_calls=False, follow_returns=False,
     # the nodes.  I will delete the folders only later, so that if
     # there is a problem during the deletion of the nodes in
     # the DB, I don't delete the folders
-    folders = [load_node(_).folder for _ in pks_set_to_delete]
+    folders = [
+        RepositoryFolder(section=Node._section_name, uuid=uuid) for uuid, in QueryBuilder().append(
+            Node, filters={'id': {'in': pks_set_to_delete}}, project='uuid').iterall()
+    ]
 
     delete_nodes_and_connections(pks_set_to_delete)
 
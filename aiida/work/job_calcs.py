@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+###########################################################################
+# Copyright (c), The AiiDA team. All rights reserved.                     #
+# This file is part of the AiiDA code.                                    #
+#                                                                         #
+# The code is hosted on GitHub at https://github.com/aiidateam/aiida_core #
+# For further information on the license, see the LICENSE.txt file        #
+# For further information please visit http://www.aiida.net               #
+###########################################################################
+"""A job manager to batch the scheduler state queries of multiple job calculations."""
+from __future__ import absolute_import
+import contextlib
+import logging
+import time
+
+import six
+import tornado.concurrent
+import tornado.gen
+
+__all__ = ['JobsList', 'JobManager']
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class JobsList(object):
+    """
+    A list of the jobs of a single authinfo whose scheduler state is being tracked.
+
+    Clients register their interest in the state of a job through `request_job_info_update` and get back a future.
+    Internally the list will wait until the minimum poll interval of the computer has elapsed since the last update,
+    at which point it will query the scheduler once for all the jobs that were requested up to that point, and
+    resolve all the futures with the corresponding `JobInfo`. This way the number of scheduler queries (a costly
+    operation) is independent of the number of jobs that are running on a given computer.
+    """
+
+    def __init__(self, authinfo, transport_queue, last_updated=None):
+        """
+        :param authinfo: the authinfo whose jobs are tracked by this list
+        :param transport_queue: the TransportQueue from which to request a Transport
+        :param last_updated: the time of the last scheduler query, if any
+        """
+        self._authinfo = authinfo
+        self._transport_queue = transport_queue
+        self._loop = transport_queue.loop()
+        self._last_updated = last_updated
+        self._job_update_requests = {}
+        self._update_handle = None
+
+    @property
+    def last_updated(self):
+        """
+        Get the time of the last successful scheduler query
+
+        :return: the time since epoch of the last update or None if the list was never updated
+        """
+        return self._last_updated
+
+    def get_minimum_update_interval(self):
+        """
+        Get the minimum interval between two scheduler queries, as configured on the computer
+
+        :return: the minimum interval in seconds
+        """
+        return self._authinfo.computer.get_minimum_job_poll_interval()
+
+    @contextlib.contextmanager
+    def request_job_info_update(self, job_id):
+        """
+        Request an update of the `JobInfo` of the job with the given id. Because the scheduler is not queried
+        immediately, the client is given back a future that can be yielded to get the `JobInfo`::
+
+            @tornado.gen.coroutine
+            def update_task(jobs_list, job_id):
+                with jobs_list.request_job_info_update(job_id) as request:
+                    job_info = yield request
+
+        The result of the future will be None if the job was not returned by the scheduler, which typically means
+        that it has already finished.
+
+        :param job_id: the job id of the job as returned by the scheduler
+        :return: a future that can be yielded to give the `JobInfo`
+        """
+        future = self._job_update_requests.setdefault(job_id, tornado.concurrent.Future())
+        self._ensure_updating()
+        yield future
+
+    @tornado.gen.coroutine
+    def _get_jobs_from_scheduler(self):
+        """
+        Query the scheduler for the state of all the jobs that are currently requested
+
+        :return: a tuple of the update requests that were included in the query and a dictionary of the `JobInfo`
+            returned by the scheduler, indexed by job id
+        """
+        with self._transport_queue.request_transport(self._authinfo) as request:
+            transport = yield request
+
+            requests = dict(self._job_update_requests)
+            scheduler = self._authinfo.computer.get_scheduler()
+            scheduler.set_transport(transport)
+
+            kwargs = {'as_dict': True}
+
+            if scheduler.get_feature('can_query_by_user'):
+                kwargs['user'] = '$USER'
+            else:
+                # In general schedulers can either query by user or by jobs, but not both
+                # (see also docs of the Scheduler class)
+                kwargs['jobs'] = [six.text_type(job_id) for job_id in requests]
+
+            _LOGGER.debug('querying the scheduler of %s for %d jobs', self._authinfo, len(requests))
+            found_jobs = scheduler.getJobs(**kwargs)
+            self._last_updated = time.time()
+
+            raise tornado.gen.Return((requests, found_jobs))
+
+    @tornado.gen.coroutine
+    def _update_job_info(self):
+        """
+        Query the scheduler and resolve the futures of all outstanding update requests with the result
+        """
+        if not self._update_requests_outstanding():
+            self._job_update_requests = {}
+            return
+
+        # Only the requests that were included in the query are resolved, requests that arrived while waiting for the
+        # scheduler response are left for the next update
+        try:
+            requests, found_jobs = yield self._get_jobs_from_scheduler()
+        except Exception as exception:  # pylint: disable=broad-except
+            _LOGGER.warning('querying the scheduler of %s failed: %s', self._authinfo, exception)
+            requests, self._job_update_requests = self._job_update_requests, {}
+            for future in requests.values():
+                if not future.done():
+                    future.set_exception(exception)
+        else:
+            for job_id, future in requests.items():
+                if self._job_update_requests.get(job_id, None) is future:
+                    del self._job_update_requests[job_id]
+                if not future.done():
+                    future.set_result(found_jobs.get(job_id, None))
+
+    def _ensure_updating(self):
+        """
+        Make sure that an update of the job infos is scheduled if there are outstanding requests
+        """
+        if self._update_handle is not None:
+            return
+
+        @tornado.gen.coroutine
+        def updating():
+            """Perform the update and reschedule if requests arrived in the meantime."""
+            yield self._update_job_info()
+
+            if self._update_requests_outstanding():
+                self._update_handle = self._loop.call_later(self._get_next_update_delay(), updating)
+            else:
+                self._update_handle = None
+
+        self._update_handle = self._loop.call_later(self._get_next_update_delay(), updating)
+
+    def _get_next_update_delay(self):
+        """
+        Get the delay until the next scheduler query is allowed, respecting the minimum update interval
+
+        :return: the delay in seconds
+        """
+        if self._last_updated is None:
+            return 0.
+
+        elapsed = time.time() - self._last_updated
+        return max(self.get_minimum_update_interval() - elapsed, 0.)
+
+    def _update_requests_outstanding(self):
+        """
+        :return: True if there are update requests that have not been resolved yet, False otherwise
+        """
+        return any(not future.done() for future in self._job_update_requests.values())
+
+
+class JobManager(object):
+    """
+    A manager of the `JobsList` instances of all the authinfos that are used by the processes of a runner.
+
+    The daemon runner holds a single instance such that the job state update requests of all the job calculations
+    that it is running are batched per authinfo.
+    """
+
+    def __init__(self, transport_queue):
+        """
+        :param transport_queue: the TransportQueue from which the jobs lists should request a Transport
+        """
+        self._transport_queue = transport_queue
+        self._jobs_lists = {}
+
+    def get_jobs_list(self, authinfo):
+        """
+        Get or create the jobs list for the given authinfo
+
+        :param authinfo: the authinfo
+        :return: the `JobsList` of the authinfo
+        """
+        if authinfo.id not in self._jobs_lists:
+            self._jobs_lists[authinfo.id] = JobsList(authinfo, self._transport_queue)
+
+        return self._jobs_lists[authinfo.id]
+
+    @contextlib.contextmanager
+    def request_job_info_update(self, authinfo, job_id):
+        """
+        Request an update of the `JobInfo` of a job, see `JobsList.request_job_info_update`
+
+        :param authinfo: the authinfo that should be used to query the scheduler
+        :param job_id: the job id of the job as returned by the scheduler
+        :return: a future that can be yielded to give the `JobInfo`
+        """
+        with self.get_jobs_list(authinfo).request_job_info_update(job_id) as request:
+            yield request
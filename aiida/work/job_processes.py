@@ -105,17 +105,18 @@ def task_submit_job(node, transport_queue, calc_info, script_filename, cancel_fl
 
 
 @coroutine
-def task_update_job(node, transport_queue, cancel_flag):
+def task_update_job(node, job_manager, cancel_flag):
     """
     Transport task that will attempt to update the scheduler state of a job calculation
 
-    The task will first request a transport from the queue. Once the transport is yielded, the relevant execmanager
+    The task will first request a job info update from the job manager, which batches the update requests of all the
+    jobs of the same authinfo into a single scheduler query. Once the job info is yielded, the relevant execmanager
     function is called, wrapped in the exponential_backoff_retry coroutine, which, in case of a caught exception, will
     retry after an interval that increases exponentially with the number of retries, for a maximum number of retries.
     If all retries fail, the task will raise a TransportTaskException
 
     :param node: the node that represents the job calculation
-    :param transport_queue: the TransportQueue from which to request a Transport
+    :param job_manager: the JobManager from which to request the job info update
     :param cancel_flag: the cancelled flag that will be queried to determine whether the task was cancelled
     :raises: Return if the tasks was successfully completed
     :raises: TransportTaskException if after the maximum number of retries the transport task still excepted
@@ -124,18 +125,19 @@ def task_update_job(node, transport_queue, cancel_flag):
     max_attempts = TRANSPORT_TASK_MAXIMUM_ATTEMTPS
 
     authinfo = node.get_computer().get_authinfo(node.get_user())
+    job_id = node.get_job_id()
 
     @coroutine
     def do_update():
-        with transport_queue.request_transport(authinfo) as request:
-            transport = yield request
+        with job_manager.request_job_info_update(authinfo, job_id) as update_request:
+            job_info = yield update_request
 
-            # It may have taken time to get the transport, check if we've been cancelled
-            if cancel_flag.is_cancelled:
-                raise plumpy.CancelledError('task_update_job for calculation<{}> cancelled'.format(node.pk))
+        # It may have taken time to get the job info, check if we've been cancelled
+        if cancel_flag.is_cancelled:
+            raise plumpy.CancelledError('task_update_job for calculation<{}> cancelled'.format(node.pk))
 
-            logger.info('updating calculation<{}>'.format(node.pk))
-            raise Return(execmanager.update_calculation(node, transport))
+        logger.info('updating calculation<{}>'.format(node.pk))
+        raise Return(execmanager.update_calculation(node, job_info))
 
     state_success = calc_states.COMPUTED
 
@@ -277,6 +279,7 @@ class Waiting(plumpy.Waiting):
 
         calculation = self.process.calc
         transport_queue = self.process.runner.transport
+        job_manager = self.process.runner.job_manager
 
         if isinstance(self.data, tuple):
             command = self.data[0]
@@ -296,7 +299,7 @@ class Waiting(plumpy.Waiting):
                 job_done = False
 
                 while not job_done:
-                    job_done = yield self._launch_task(task_update_job, calculation, transport_queue)
+                    job_done = yield self._launch_task(task_update_job, calculation, job_manager)
 
                 raise Return(self.retrieve())
 
@@ -19,6 +19,7 @@ import plumpy
 
 from aiida.orm import load_node, load_workflow
 from . import futures
+from . import job_calcs
 from . import persistence
 from . import rmq
 from . import transports
@@ -87,6 +88,7 @@ class Runner(object):
         self._poll_interval = poll_interval
         self._rmq_submit = rmq_submit
         self._transport = transports.TransportQueue(self._loop)
+        self._job_manager = job_calcs.JobManager(self._transport)
 
         if enable_persistence:
             self._persister = persister if persister is not None else persistence.AiiDAPersister()
@@ -124,6 +126,10 @@ class Runner(object):
     def transport(self):
         return self._transport
 
+    @property
+    def job_manager(self):
+        return self._job_manager
+
     @property
     def persister(self):
         return self._persister
@@ -149,10 +155,14 @@ class Runner(object):
             return self._loop.run_sync(lambda: future)
 
     def close(self):
-        """Close the runner by stopping the loop and disconnecting the RmqConnector if it has one."""
+        """
+        Close the runner by stopping the loop, closing the transports kept open by the transport queue and
+        disconnecting the RmqConnector if it has one.
+        """
         assert not self._closed
 
         self.stop()
+        self._transport.close()
 
         if self._rmq_connector is not None:
             self._rmq_connector.disconnect()
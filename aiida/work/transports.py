@@ -25,10 +25,17 @@ class TransportRequest(object):
     """ Information kept about request for a transport object """
 
     # pylint: disable=too-few-public-methods
-    def __init__(self):
+    def __init__(self, computer_id=None):
         super(TransportRequest, self).__init__()
         self.future = tornado.concurrent.Future()
         self.count = 0
+        self.computer_id = computer_id
+        self.open_callback_handle = None
+        self.close_callback_handle = None
+
+    def is_open(self):
+        """ Return whether the transport of this request has been successfully opened """
+        return self.future.done() and self.future.exception() is None
 
 
 class TransportQueue(object):
@@ -41,20 +48,48 @@ class TransportQueue(object):
     it will open the transport and give it to all the clients that asked for it
     up to that point.  This way opening of transports (a costly operation) can
     be minimised.
+
+    Optionally, transports that are no longer used can be kept open in a pool for
+    a given idle time, such that subsequent requests can reuse the connection
+    instead of opening a new one. Before a pooled transport is handed out again it
+    is checked to be still alive, and it is transparently reopened if the connection
+    has dropped in the meantime. The number of transports that are open at the same
+    time for a single computer can be capped as well.
     """
     AuthInfoEntry = namedtuple('AuthInfoEntry', ['authinfo', 'transport', 'callbacks', 'callback_handle'])
 
-    def __init__(self, loop=None):
+    def __init__(self, loop=None, keep_alive=None, max_connections_per_computer=None):
         """
         :param loop: The event loop to use, will use tornado.ioloop.IOLoop.current() if not supplied
+        :param keep_alive: The time in seconds an idle transport is kept open for reuse, defaults to the value of the
+            `transport.keep_alive` property. With a value of 0 transports are closed as soon as they are no longer used
+        :param max_connections_per_computer: The maximum number of transports that are open at the same time for a
+            single computer, defaults to the value of the `transport.max_connections_per_computer` property.
+            A value of 0 means there is no limit
         """
+        from aiida.common.setup import get_property
+
+        if keep_alive is None:
+            keep_alive = get_property('transport.keep_alive')
+
+        if max_connections_per_computer is None:
+            max_connections_per_computer = get_property('transport.max_connections_per_computer')
+
         self._loop = loop if loop is not None else tornado.ioloop.IOLoop.current()
+        self._keep_alive = keep_alive
+        self._max_connections_per_computer = max_connections_per_computer
         self._transport_requests = {}
 
     def loop(self):
         """ Get the loop being used by this transport queue """
         return self._loop
 
+    def close(self):
+        """ Close all the idle transports that are being kept open in the pool """
+        for authinfo_id, transport_request in list(self._transport_requests.items()):
+            if transport_request.count == 0:
+                self._close_transport(authinfo_id, transport_request)
+
     @contextlib.contextmanager
     def request_transport(self, authinfo):
         """
@@ -73,9 +108,13 @@ class TransportQueue(object):
         """
         transport_request = self._transport_requests.get(authinfo.id, None)
 
-        open_callback_handle = None
+        if transport_request is not None and transport_request.count == 0:
+            # Nobody is using the transport, so it is an idle one being kept open in the pool
+            transport_request = self._reuse_pooled_transport(authinfo, transport_request)
+
         if transport_request is None:
-            transport_request = TransportRequest()
+            computer_id = authinfo.computer.id if self._max_connections_per_computer else None
+            transport_request = TransportRequest(computer_id)
             self._transport_requests[authinfo.id] = transport_request
 
             transport = authinfo.get_transport()
@@ -84,6 +123,15 @@ class TransportQueue(object):
             def do_open():
                 """ Actually open the transport """
                 if transport_request.count > 0:
+                    if not self._has_free_connection(transport_request):
+                        # Try again later, when one of the other transports for this computer may have been closed
+                        _LOGGER.debug(
+                            'Transport request delaying opening transport for %s: maximum number of '
+                            'connections reached', authinfo)
+                        transport_request.open_callback_handle = self._loop.call_later(
+                            max(safe_open_interval, 1.), do_open)
+                        return
+
                     # The user still wants the transport so open it
                     _LOGGER.debug('Transport request opening transport for %s', authinfo)
                     try:
@@ -95,7 +143,7 @@ class TransportQueue(object):
                         transport_request.future.set_result(transport)
 
             # Save the handle so that we can cancel the callback if the user no longer wants it
-            open_callback_handle = self._loop.call_later(safe_open_interval, do_open)
+            transport_request.open_callback_handle = self._loop.call_later(safe_open_interval, do_open)
 
         try:
             transport_request.count += 1
@@ -111,10 +159,86 @@ class TransportQueue(object):
             assert transport_request.count >= 0, "Transport request count dropped blow 0!"
             # Check if there are no longer any users that want the transport
             if transport_request.count == 0:
-                if transport_request.future.done():
+                if not transport_request.future.done():
+                    self._loop.remove_timeout(transport_request.open_callback_handle)
+                    del self._transport_requests[authinfo.id]
+                elif not transport_request.is_open():
+                    del self._transport_requests[authinfo.id]
+                elif self._keep_alive > 0:
+                    _LOGGER.debug('Transport request keeping transport for %s open for %s seconds', authinfo,
+                                  self._keep_alive)
+                    transport_request.close_callback_handle = self._loop.call_later(
+                        self._keep_alive, self._close_transport, authinfo.id, transport_request)
+                else:
                     _LOGGER.debug('Transport request closing transport for %s', authinfo)
-                    transport_request.future.result().close()
-                elif open_callback_handle is not None:
-                    self._loop.remove_timeout(open_callback_handle)
+                    self._close_transport(authinfo.id, transport_request)
+
+    def _reuse_pooled_transport(self, authinfo, transport_request):
+        """
+        Take an idle transport out of the pool, checking that its connection is still alive
+
+        :param authinfo: The authinfo of the transport
+        :param transport_request: The transport request of the pooled transport
+        :return: The transport request if the transport can be reused, None if it was closed because it is dead
+        """
+        self._loop.remove_timeout(transport_request.close_callback_handle)
+        transport_request.close_callback_handle = None
+
+        if transport_request.future.result().is_alive():
+            _LOGGER.debug('Transport request reusing pooled transport for %s', authinfo)
+            return transport_request
+
+        _LOGGER.info('Pooled transport for %s is no longer alive, it will be reopened', authinfo)
+        self._close_transport(authinfo.id, transport_request)
+
+        return None
+
+    def _close_transport(self, authinfo_id, transport_request):
+        """
+        Close the transport of a request and remove the request from the queue
+
+        :param authinfo_id: The id of the authinfo of the transport
+        :param transport_request: The transport request whose transport to close
+        """
+        if self._transport_requests.get(authinfo_id, None) is not transport_request:
+            # The request has already been closed and possibly replaced by a new one
+            return
+
+        del self._transport_requests[authinfo_id]
+
+        if transport_request.close_callback_handle is not None:
+            self._loop.remove_timeout(transport_request.close_callback_handle)
+            transport_request.close_callback_handle = None
+
+        transport = transport_request.future.result()
+        try:
+            if transport.is_open:
+                transport.close()
+        except Exception as exception:  # pylint: disable=broad-except
+            _LOGGER.warning('exception occurred while trying to close transport:\n %s', exception)
+
+    def _has_free_connection(self, transport_request):
+        """
+        Check whether the transport of a request can be opened without exceeding the maximum number of connections
+        for its computer. If the maximum is reached, an idle pooled transport for the same computer will be closed
+        to make room, if there is one.
+
+        :param transport_request: The transport request that wants to open its transport
+        :return: True if the transport can be opened, False otherwise
+        """
+        if not self._max_connections_per_computer:
+            return True
+
+        open_requests = [(authinfo_id, request)
+                         for authinfo_id, request in self._transport_requests.items()
+                         if request.computer_id == transport_request.computer_id and request.is_open()]
+
+        if len(open_requests) < self._max_connections_per_computer:
+            return True
+
+        for authinfo_id, request in open_requests:
+            if request.count == 0:
+                self._close_transport(authinfo_id, request)
+                return True
 
-                del self._transport_requests[authinfo.id]
+        return False